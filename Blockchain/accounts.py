@@ -0,0 +1,167 @@
+### Import Libraries ###
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Sender of newly created coins (genesis distribution), it is never debited
+MINT_ADDRESS = "0"
+# Number of blocks which can be rolled back without rebuilding the balances
+UNDO_DEPTH = 100
+
+
+class InsufficientFundsError(ValueError):
+    """
+    Raised when a transaction spends more than the available balance of its payer
+    """
+
+
+def payment(transaction: Dict) -> Optional[Tuple[str, str, float]]:
+    """
+    Money movement of a transaction
+    Plain transfers move amount from sender to recipient, purchases from buyer to seller.
+    Uploads move no money.
+    :param transaction: transaction or typed record
+    :return: (payer, payee, amount) or None
+    """
+    transaction_type = transaction.get("type")
+    if transaction_type is None:
+        payer, payee = transaction.get("sender"), transaction.get("recipient")
+    elif transaction_type in ("data_purchase", "model_purchase"):
+        payer, payee = transaction.get("buyer"), transaction.get("seller")
+    else:
+        return None
+
+    amount = transaction.get("amount")
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+        return None
+    return payer, payee, amount
+
+
+class AccountState:
+    """
+    Balances of all addresses, updated block by block
+    Every applied block leaves an undo entry with the previous balances of the
+    addresses it touched, so the last blocks can be rolled back in O(block) when
+    a block is discarded.
+    Pending spends are summed per payer, which makes the check "can this address
+    afford one more transaction" O(1) at mempool admission.
+    """
+
+    def __init__(self, undo_depth: int = UNDO_DEPTH) -> None:
+        self.balances: Dict[str, float] = {}
+        # (block hash, [(address, balance before the block or None)]) of the last blocks
+        self._journal: deque = deque(maxlen=undo_depth)
+        # transaction_id -> (payer, amount) of the pending transactions
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        # payer -> [sum of its pending spends, number of pending transactions]
+        self._pending_spent: Dict[str, List] = {}
+
+    def balance(self, address: str) -> float:
+        """
+        Confirmed balance of an address
+        """
+        return self.balances.get(address, 0)
+
+    def available(self, address: str) -> float:
+        """
+        Confirmed balance minus the spends of the address which are still pending
+        """
+        pending = self._pending_spent.get(address)
+        return self.balances.get(address, 0) - (pending[0] if pending else 0)
+
+    def check(self, transaction: Dict) -> None:
+        """
+        Checks that the payer of a new transaction can afford it
+        :param transaction: transaction which is about to enter the mempool
+        :raises InsufficientFundsError: if the amount is negative or exceeds the available balance
+        """
+        movement = payment(transaction)
+        if movement is None:
+            return
+        payer, _, amount = movement
+        if amount < 0:
+            raise InsufficientFundsError(f"Negative amount {amount} is not allowed")
+        if payer == MINT_ADDRESS:
+            return
+        available = self.available(payer)
+        if amount > available:
+            raise InsufficientFundsError(f"{payer} can't spend {amount}, available balance is {available}")
+
+    def add_pending(self, transaction: Dict) -> None:
+        """
+        Reserves the amount of a transaction which entered the mempool
+        """
+        movement = payment(transaction)
+        transaction_id = transaction.get("transaction_id")
+        if movement is None or movement[0] == MINT_ADDRESS or transaction_id in self._pending:
+            return
+        payer, _, amount = movement
+        self._pending[transaction_id] = (payer, amount)
+        pending = self._pending_spent.setdefault(payer, [0, 0])
+        pending[0] += amount
+        pending[1] += 1
+
+    def remove_pending(self, transaction_id: str) -> None:
+        """
+        Releases the reservation of a transaction which left the mempool (mined or evicted)
+        """
+        entry = self._pending.pop(transaction_id, None)
+        if entry is None:
+            return
+        payer, amount = entry
+        pending = self._pending_spent[payer]
+        pending[1] -= 1
+        if pending[1] == 0:
+            # Without pending transactions the sum is exactly 0, no float rest stays behind
+            del self._pending_spent[payer]
+        else:
+            pending[0] -= amount
+
+    def apply_block(self, block) -> None:
+        """
+        Applies all payments of a block to the balances and records the undo entry
+        Transactions of the block are no longer pending afterwards.
+        :param block: <Block> block added to the chain
+        """
+        undo: List[Tuple[str, Optional[float]]] = []
+        for transaction in block.transactions:
+            self.remove_pending(transaction.get("transaction_id"))
+            movement = payment(transaction)
+            if movement is None:
+                continue
+            payer, payee, amount = movement
+            if payer != MINT_ADDRESS:
+                self._add(payer, -amount, undo)
+            self._add(payee, amount, undo)
+        self._journal.append((block.hash, undo))
+
+    def rollback_block(self, block) -> None:
+        """
+        Reverts the balances of the last applied block
+        :param block: <Block> the block which is discarded, has to be the last applied one
+        :raises ValueError: if the block is not the last applied block or older than the undo journal
+        """
+        if not self._journal or self._journal[-1][0] != block.hash:
+            raise ValueError(f"Block {block.index} can't be rolled back, it is not in the undo journal")
+        _, undo = self._journal.pop()
+        for address, previous in reversed(undo):
+            if previous is None:
+                del self.balances[address]
+            else:
+                self.balances[address] = previous
+
+    def load(self, balances: Dict[str, float]) -> None:
+        """
+        Replaces the balances (e.g. from a snapshot), the undo journal starts empty
+        """
+        self.balances = dict(balances)
+        self._journal.clear()
+
+    def clear(self) -> None:
+        self.balances = {}
+        self._journal.clear()
+        self._pending.clear()
+        self._pending_spent.clear()
+
+    def _add(self, address: str, amount: float, undo: List) -> None:
+        undo.append((address, self.balances.get(address)))
+        self.balances[address] = self.balances.get(address, 0) + amount
@@ -0,0 +1,400 @@
+### Import Libraries ###
+import bisect
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from Blockchain.blockchain import Block
+from Blockchain.codec import encode_block, decode_block
+
+# A new segment is started once the active one would grow beyond this size
+SEGMENT_SIZE = 64 * 1024 * 1024
+# Sparse index: offset of every INDEX_INTERVAL-th block of a segment
+INDEX_INTERVAL = 64
+
+# fsync policies
+SYNC_ALWAYS = "always"  # after every append
+SYNC_BATCH = "batch"  # after SYNC_BATCH_RECORDS blocks or SYNC_BATCH_SECONDS, whichever comes first
+SYNC_NEVER = "never"  # only on sync(), rotation and close(), the OS writes back the rest
+SYNC_BATCH_RECORDS = 64
+SYNC_BATCH_SECONDS = 1.0
+
+# Record: block index, payload length, CRC32 of the payload, then the block encoded with Blockchain/codec.py
+RECORD_HEADER = struct.Struct(">QII")
+# Index file of a full segment: (block index, offset) pairs, the last pair is (next block index, segment size)
+INDEX_ENTRY = struct.Struct(">QQ")
+
+SEGMENT_SUFFIX = ".log"
+INDEX_SUFFIX = ".idx"
+
+
+class BlockLogError(ValueError):
+    """
+    Raised for blocks appended out of order and for damaged records in full segments
+    """
+
+
+class _Segment:
+    """
+    One segment file with the blocks first_index <= index < first_index + count
+    """
+
+    __slots__ = ("first_index", "path", "count", "size", "sparse_indexes", "sparse_offsets")
+
+    def __init__(self, directory: str, first_index: int) -> None:
+        self.first_index = first_index
+        self.path = os.path.join(directory, f"{first_index:020d}{SEGMENT_SUFFIX}")
+        self.count = 0
+        self.size = 0
+        self.sparse_indexes: List[int] = []
+        self.sparse_offsets: List[int] = []
+
+    @property
+    def end_index(self) -> int:
+        return self.first_index + self.count
+
+    @property
+    def index_path(self) -> str:
+        return self.path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+
+    def remember(self, offset: int, interval: int) -> None:
+        """
+        Adds the record at offset as next block, every interval-th block goes into the sparse index
+        """
+        if self.count % interval == 0:
+            self.sparse_indexes.append(self.first_index + self.count)
+            self.sparse_offsets.append(offset)
+        self.count += 1
+
+    def seek_offset(self, index: int) -> int:
+        """
+        Offset of the closest indexed record at or before the block
+        """
+        position = bisect.bisect_right(self.sparse_indexes, index) - 1
+        return self.sparse_offsets[position] if position >= 0 else 0
+
+
+class BlockLog:
+    """
+    Append-only log of encoded blocks in size-rotated segment files
+    Every record carries its block index, length and CRC32, so a torn write at the end of the
+    active segment is detected and cut off when the log is opened. Full segments get an index
+    file with a sparse offset index, random reads seek to the closest indexed record and skip
+    forward over the record headers. The log is only shortened from the end (truncate),
+    e.g. when blocks are discarded or a longer chain is adopted.
+    """
+
+    def __init__(self, directory: str, segment_size: int = SEGMENT_SIZE, sync: str = SYNC_BATCH,
+                 sync_records: int = SYNC_BATCH_RECORDS, sync_seconds: float = SYNC_BATCH_SECONDS,
+                 index_interval: int = INDEX_INTERVAL) -> None:
+        """
+        :param directory: <str> directory of the segment files, created if missing
+        :param segment_size: <int> size in bytes after which a new segment is started
+        :param sync: SYNC_ALWAYS, SYNC_BATCH or SYNC_NEVER
+        :param sync_records: <int> blocks per fsync with SYNC_BATCH
+        :param sync_seconds: <float> maximum age of unsynced blocks with SYNC_BATCH
+        :param index_interval: <int> blocks per sparse index entry
+        """
+        if sync not in (SYNC_ALWAYS, SYNC_BATCH, SYNC_NEVER):
+            raise ValueError(f"Unknown sync policy: {sync}")
+        if segment_size < 1 or index_interval < 1:
+            raise ValueError("segment_size and index_interval have to be positive")
+        self.directory = directory
+        self.segment_size = segment_size
+        self.sync_policy = sync
+        self.sync_records = max(1, sync_records)
+        self.sync_seconds = sync_seconds
+        self.index_interval = index_interval
+
+        self._segments: List[_Segment] = []
+        self._file = None
+        self._lock = threading.RLock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        # Stats, e.g. for benchmarks and the startup log
+        self.syncs = 0
+        self.recovered_bytes = 0  # torn tail cut off when the log was opened
+
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    # ---- Opening and recovery ----
+
+    def _open(self) -> None:
+        first_indexes = sorted(int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(self.directory)
+                               if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit())
+        if not first_indexes:
+            first_indexes = [0]
+
+        for position, first_index in enumerate(first_indexes):
+            segment = _Segment(self.directory, first_index)
+            if self._segments and first_index != self._segments[-1].end_index:
+                raise BlockLogError(f"Segment {segment.path} does not continue block {self._segments[-1].end_index - 1}")
+            if position < len(first_indexes) - 1:
+                if not self._load_index(segment):
+                    self._scan(segment, verify=False, full=True)
+            else:
+                # The active segment may end with a torn write
+                self._scan(segment, verify=True, full=False)
+            self._segments.append(segment)
+        self._open_active()
+
+    def _scan(self, segment: _Segment, verify: bool, full: bool) -> None:
+        """
+        Reads the record headers of a segment and builds its sparse index
+        :param verify: check the CRC of every record
+        :param full: the segment is full, a damaged record is an error instead of a torn tail
+        """
+        file_size = os.path.getsize(segment.path) if os.path.exists(segment.path) else 0
+        offset = 0
+        with open(segment.path, "ab+") as f:
+            f.seek(0)
+            while offset + RECORD_HEADER.size <= file_size:
+                index, length, checksum = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                end = offset + RECORD_HEADER.size + length
+                if index != segment.end_index or end > file_size:
+                    break
+                if verify:
+                    if zlib.crc32(f.read(length)) != checksum:
+                        break
+                else:
+                    f.seek(length, os.SEEK_CUR)
+                segment.remember(offset, self.index_interval)
+                offset = end
+
+            if offset < file_size:
+                if full:
+                    raise BlockLogError(f"Damaged record at offset {offset} of the full segment {segment.path}")
+                # Torn write of a crash, the blocks after it were never acknowledged as synced
+                f.truncate(offset)
+                f.flush()
+                os.fsync(f.fileno())
+                self.recovered_bytes += file_size - offset
+        segment.size = offset
+
+    def _load_index(self, segment: _Segment) -> bool:
+        """
+        Loads the index file of a full segment
+        :return: False if it is missing or does not match the segment, then the segment is scanned
+        """
+        try:
+            with open(segment.index_path, "rb") as f:
+                data = f.read()
+            entries = [INDEX_ENTRY.unpack_from(data, position) for position in range(0, len(data), INDEX_ENTRY.size)]
+        except (OSError, struct.error):
+            return False
+        if len(entries) < 2:
+            return False
+        end_index, size = entries[-1]
+        if size != os.path.getsize(segment.path):
+            return False
+        segment.sparse_indexes = [index for index, _ in entries[:-1]]
+        segment.sparse_offsets = [offset for _, offset in entries[:-1]]
+        segment.count = end_index - segment.first_index
+        segment.size = size
+        return True
+
+    def _write_index(self, segment: _Segment) -> None:
+        entries = list(zip(segment.sparse_indexes, segment.sparse_offsets)) + [(segment.end_index, segment.size)]
+        tmp_path = f"{segment.index_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(INDEX_ENTRY.pack(index, offset) for index, offset in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, segment.index_path)
+
+    def _open_active(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._segments[-1].path, "ab")
+        self._sync_directory()
+
+    def _sync_directory(self) -> None:
+        # New and removed segment files survive a crash only with a synced directory (not possible on Windows)
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        descriptor = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    # ---- Writing ----
+
+    def __len__(self) -> int:
+        return self._segments[-1].end_index
+
+    def append(self, block: Block) -> None:
+        """
+        Appends the next block
+        :raises BlockLogError: if the block does not follow the last block of the log
+        """
+        self.append_many([block])
+
+    def append_many(self, blocks: Iterable[Block]) -> None:
+        """
+        Appends consecutive blocks with one write per segment and at most one fsync
+        """
+        with self._lock:
+            buffer = bytearray()
+            for block in blocks:
+                if block.index != len(self):
+                    raise BlockLogError(f"Block {block.index} can't follow block {len(self) - 1}")
+                payload = encode_block(block)
+                record_size = RECORD_HEADER.size + len(payload)
+                active = self._segments[-1]
+                if active.size > 0 and active.size + record_size > self.segment_size:
+                    self._file.write(buffer)
+                    buffer.clear()
+                    self._rotate()
+                    active = self._segments[-1]
+                # Counted before the write, a failed write leaves a torn tail which the next open cuts off
+                active.remember(active.size, self.index_interval)
+                active.size += record_size
+                buffer += RECORD_HEADER.pack(block.index, len(payload), zlib.crc32(payload))
+                buffer += payload
+                self._unsynced += 1
+            self._file.write(buffer)
+            self._file.flush()
+            self._maybe_sync()
+
+    def _rotate(self) -> None:
+        """
+        Closes the full active segment (synced, with index file) and starts the next one
+        """
+        full = self._segments[-1]
+        self._fsync()
+        self._write_index(full)
+        self._segments.append(_Segment(self.directory, full.end_index))
+        self._open_active()
+
+    def _maybe_sync(self) -> None:
+        if self.sync_policy == SYNC_ALWAYS:
+            self._fsync()
+        elif self.sync_policy == SYNC_BATCH and (self._unsynced >= self.sync_records or
+                                                 time.monotonic() - self._last_sync >= self.sync_seconds):
+            self._fsync()
+
+    def _fsync(self) -> None:
+        if self._unsynced == 0:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.syncs += 1
+
+    def sync(self) -> None:
+        """
+        Writes all appended blocks to disk, independent of the sync policy
+        """
+        with self._lock:
+            self._fsync()
+
+    def truncate(self, length: int) -> None:
+        """
+        Removes the blocks with index >= length
+        :param length: <int> number of blocks to keep
+        """
+        with self._lock:
+            if length >= len(self):
+                return
+            length = max(length, 0)
+            self._fsync()
+            while len(self._segments) > 1 and self._segments[-1].first_index >= length:
+                removed = self._segments.pop()
+                for path in (removed.path, removed.index_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+            segment = self._segments[-1]
+            offset = self._record_offset(segment, length) if length < segment.end_index else segment.size
+            with open(segment.path, "r+b") as f:
+                f.truncate(offset)
+                f.flush()
+                os.fsync(f.fileno())
+            # The segment is active again, its index is kept in memory only
+            if os.path.exists(segment.index_path):
+                os.remove(segment.index_path)
+            keep = bisect.bisect_left(segment.sparse_indexes, length)
+            del segment.sparse_indexes[keep:]
+            del segment.sparse_offsets[keep:]
+            segment.count = length - segment.first_index
+            segment.size = offset
+            self._open_active()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._fsync()
+                self._file.close()
+                self._file = None
+
+    # ---- Reading ----
+
+    def _record_offset(self, segment: _Segment, index: int) -> int:
+        """
+        Offset of a block in its segment: seek to the sparse index entry, then skip over record headers
+        """
+        offset = segment.seek_offset(index)
+        with open(segment.path, "rb") as f:
+            f.seek(offset)
+            while True:
+                record_index, length, _ = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                if record_index == index:
+                    return offset
+                offset += RECORD_HEADER.size + length
+                f.seek(offset)
+
+    def read(self, index: int) -> Block:
+        """
+        A single block
+        :raises IndexError: if the block is not in the log
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("block index out of range")
+        return self.read_range(index, index + 1)[0]
+
+    def read_range(self, start: int, end: int) -> List[Block]:
+        """
+        Blocks start <= index < end which are in the log, in order
+        :raises BlockLogError: if a record does not match its checksum
+        """
+        return list(self.iter_blocks(start, end))
+
+    def iter_blocks(self, start: int = 0, end: Optional[int] = None) -> Iterator[Block]:
+        """
+        Streams the blocks start <= index < end segment by segment
+        """
+        with self._lock:
+            # Appends only go to the end, the records up to here don't change while iterating
+            if self._file is not None:
+                self._file.flush()
+            end = len(self) if end is None else min(end, len(self))
+            segments = [(segment, segment.size) for segment in self._segments
+                        if segment.first_index < end and segment.end_index > start]
+        index = max(start, 0)
+        for segment, size in segments:
+            if index >= end:
+                break
+            for record_index, payload in self._read_records(segment, index, min(end, segment.end_index), size):
+                yield decode_block(payload)
+                index = record_index + 1
+
+    def _read_records(self, segment: _Segment, start: int, end: int, size: int) -> Iterator[Tuple[int, bytes]]:
+        offset = self._record_offset(segment, start)
+        with open(segment.path, "rb") as f:
+            f.seek(offset)
+            index = start
+            while index < end and offset < size:
+                record_index, length, checksum = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                payload = f.read(length)
+                if record_index != index or zlib.crc32(payload) != checksum:
+                    raise BlockLogError(f"Damaged record of block {index} in {segment.path}")
+                yield record_index, payload
+                offset += RECORD_HEADER.size + length
+                index += 1
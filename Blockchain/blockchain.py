@@ -1,9 +1,37 @@
 ### Import Libraries ###
 import hashlib
 import json
+import os
+import threading
 import time
-from typing import List, Dict, Any, Optional, Tuple
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple
 import uuid
+from urllib.parse import urlparse
+
+from Blockchain.mining import ParallelMiner, MiningResult
+from Blockchain.proof import valid_proof
+from Blockchain import validation
+from Blockchain.mempool import Mempool, MempoolFullError, DEFAULT_CAPACITY, EVICT_REJECT
+from Blockchain.ledger import PurchaseLedger
+from Blockchain.accounts import AccountState
+from Blockchain.signatures import SignatureVerifier, SignatureError, PLACEHOLDER_SIGNATURE, sign_transaction
+from Blockchain.difficulty import DifficultyRetargeter, chain_work
+from Blockchain.snapshot import ChainSnapshot, SNAPSHOT_INTERVAL
+from Blockchain.header import LEGACY_BLOCK_VERSION, BLOCK_VERSION, HEADER_FORMAT, BlockHeader, pack_header
+from Blockchain.lazy_chain import LazyChain, BLOCK_CACHE_SIZE
+from Blockchain.consensus import ConsensusEngine, ProofOfWork
+from Blockchain.bloom import BloomFilter, DEFAULT_FALSE_POSITIVE_RATE, block_filter, hash_key, matches_any, transaction_keys
+from Blockchain.merkle import transaction_hash, merkle_root, merkle_proof, verify_merkle_proof
+from Blockchain.transactions import (
+    Transaction, TransferTransaction, DataUploadTransaction, ModelUploadTransaction,
+    DataPurchaseTransaction, ModelPurchaseTransaction, as_transaction, canonical_bytes,
+)
+
+
+# Default limits per block, larger mempools are spread over several blocks
+MAX_BLOCK_TRANSACTIONS = 1_000
+MAX_BLOCK_BYTES = 1_000_000  # Block.size: header and serialized transactions
 
 
 class Block:
@@ -13,40 +41,137 @@ class Block:
     The Hash of the previous Block (except for the Genesis Block)
     A unix-timestamp
     A list of the transactions in this block
+    The Merkle root of the transaction hashes
     A number for the PoW
     The difficulty used for mining this block
     The actual mining time in seconds (NEW)
     The hashed block as a string
+    The seal of a proof-of-authority block (not part of the hash)
+
+    Blocks use __slots__ and are immutable once their hash is set,
+    the serialized transactions and the block size are cached.
     """
 
+    __slots__ = ("index", "previous_hash", "timestamp", "transactions", "proof", "difficulty",
+                 "mining_time", "version", "merkle_root", "hash", "seal",
+                 "_sealed", "_transactions_json", "_size")
+
+    # Caches which may still be filled in after the block is sealed
+    _CACHE_SLOTS = ("_transactions_json", "_size")
+
     def __init__(self, index: int, previous_hash: str, timestamp: float,
-                 transactions: List[Dict], proof: int = 0, difficulty: int = 4,
-                 mining_time: float = 0.0, hash: str = None) -> None:
+                 transactions: List[Dict], proof: int = 0, difficulty: float = 4,
+                 mining_time: float = 0.0, hash: str = None, merkle_root: str = None,
+                 version: int = BLOCK_VERSION, seal: str = "") -> None:
+        self._sealed = False
+        self._transactions_json = None
+        self._size = None
         self.index = index
         self.previous_hash = previous_hash
         self.timestamp = timestamp
-        self.transactions = transactions
+        self.transactions = tuple(as_transaction(tx) for tx in transactions)
         self.proof = proof
         self.difficulty = difficulty  # Store the difficulty used for mining
         self.mining_time = mining_time  # NEW: Store actual mining time in seconds
+        self.version = version
+        self.seal = seal
+        self.merkle_root = merkle_root or self.calculate_merkle_root()
         self.hash = hash or self.calculate_hash()
+        self._sealed = True
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, "_sealed", False) and name not in self._CACHE_SLOTS:
+            raise AttributeError(f"Block {self.index} is already mined and can't be changed")
+        object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        # Rebuild through __init__, attribute assignment is blocked after sealing
+        return (Block, (self.index, self.previous_hash, self.timestamp, self.transactions, self.proof,
+                        self.difficulty, self.mining_time, self.hash, self.merkle_root, self.version, self.seal))
+
+    def with_seal(self, seal: str) -> "Block":
+        """
+        Copy of the block with a consensus seal, the hash stays the same
+        :param seal: <str> seal, e.g. the signature of a proof-of-authority node
+        :return: sealed Block
+        """
+        return Block(self.index, self.previous_hash, self.timestamp, self.transactions, self.proof,
+                     self.difficulty, self.mining_time, self.hash, self.merkle_root, self.version, seal)
+
+    @classmethod
+    def from_storage(cls, **fields: Any) -> "Block":
+        """
+        Creates a block from stored fields including its stored hash
+        Blocks from before the Merkle headers keep their JSON hash (legacy version)
+        :param fields: keyword arguments of Block, hash is required
+        :return: restored Block
+        """
+        block = cls(**fields)
+        if block.calculate_hash() != block.hash:
+            legacy = cls(version=LEGACY_BLOCK_VERSION, **fields)
+            if legacy.calculate_hash() == legacy.hash:
+                return legacy
+        return block
+
+    def transaction_hashes(self) -> List[bytes]:
+        """
+        Leaf hashes of the transactions in block order
+        """
+        return [transaction_hash(tx) for tx in self.transactions]
+
+    def calculate_merkle_root(self) -> str:
+        """
+        Calculates the Merkle root over the transaction hashes
+        :return: <str> hex Merkle root
+        """
+        return merkle_root(self.transaction_hashes()).hex()
+
+    def header_bytes(self) -> bytes:
+        """
+        Fixed-size binary header, independent of the number of transactions
+        :return: <bytes> packed header
+        """
+        return pack_header(self)
 
     def calculate_hash(self) -> str:
         """"
         Calculates the SHA-256 hash of a Block
         :return: <str> SHA-256 hash of the Block
         """
-        block_string = json.dumps(
-            {
-                "index": self.index,
-                "previous_hash": self.previous_hash,
-                "timestamp": self.timestamp,
-                "transactions": self.transactions,
-                "proof": self.proof,
-                "difficulty": self.difficulty,  # Include difficulty in hash calculation
-                "mining_time": self.mining_time,  # Include mining time in hash calculation
-            }, sort_keys=True).encode()
-        return hashlib.sha256(block_string).hexdigest()
+        if self.version == LEGACY_BLOCK_VERSION:
+            # Blocks from before the Merkle headers hash the full block as JSON
+            block_string = json.dumps(
+                {
+                    "index": self.index,
+                    "previous_hash": self.previous_hash,
+                    "timestamp": self.timestamp,
+                    "transactions": [dict(tx) for tx in self.transactions],
+                    "proof": self.proof,
+                    "difficulty": self.difficulty,  # Include difficulty in hash calculation
+                    "mining_time": self.mining_time,  # Include mining time in hash calculation
+                }, sort_keys=True).encode()
+            return hashlib.sha256(block_string).hexdigest()
+
+        return hashlib.sha256(self.header_bytes()).hexdigest()
+
+    @property
+    def transactions_json(self) -> str:
+        """
+        JSON list of the transactions, built once from the cached canonical bytes
+        """
+        if self._transactions_json is None:
+            self._transactions_json = "[" + ",".join(
+                canonical_bytes(tx).decode() for tx in self.transactions) + "]"
+        return self._transactions_json
+
+    @property
+    def size(self) -> int:
+        """
+        Serialized size of the block in bytes (header and transactions)
+        """
+        if self._size is None:
+            self._size = HEADER_FORMAT.size + len(self.transactions_json.encode())
+        return self._size
 
     def to_dict(self) -> Dict[str, Any]:
         """"
@@ -56,36 +181,153 @@ class Block:
             "index": self.index,
             "previous_hash": self.previous_hash,
             "timestamp": self.timestamp,
-            "transactions": self.transactions,
+            "transactions": [dict(tx) for tx in self.transactions],
             "proof": self.proof,
             "difficulty": self.difficulty,  # Include difficulty in serialization
             "mining_time": self.mining_time,  # Include mining time in serialization
+            "merkle_root": self.merkle_root,
+            "version": self.version,
             "hash": self.hash,
+            "seal": self.seal,
         }
 
 
 class Blockchain:
-    def __init__(self):
-        self.chain = []  # List for saving the blocks in the chain
-        self.current_transactions = []  # temporary memory for transactions to get mined into the next block
+    def __init__(self, mining_workers: int = None, checkpoint_path: str = None,
+                 mempool_capacity: int = DEFAULT_CAPACITY, mempool_eviction: str = EVICT_REJECT,
+                 max_block_transactions: int = MAX_BLOCK_TRANSACTIONS, max_block_bytes: int = MAX_BLOCK_BYTES,
+                 snapshot_path: str = None, snapshot_interval: int = SNAPSHOT_INTERVAL,
+                 enforce_balances: bool = False, require_signatures: bool = False,
+                 block_loader: Callable[[int, int], List[Block]] = None, block_cache_size: int = BLOCK_CACHE_SIZE,
+                 bloom_false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+                 consensus: ConsensusEngine = None):
+        """
+        :param mining_workers: number of processes used for the PoW (default: all cores)
+        :param checkpoint_path: JSON file for the validation checkpoint (default: kept in memory only)
+        :param mempool_capacity: maximum number of pending transactions
+        :param mempool_eviction: policy for a full mempool (EVICT_REJECT or EVICT_OLDEST)
+        :param max_block_transactions: maximum number of transactions per block
+        :param max_block_bytes: maximum serialized size of a block in bytes
+        :param snapshot_path: JSON file for snapshots of the derived state (default: no snapshots)
+        :param snapshot_interval: a snapshot is written every snapshot_interval blocks
+        :param enforce_balances: reject transactions whose payer can't afford them (default: only track balances)
+        :param require_signatures: reject transactions without a valid Ed25519 signature (default: placeholders allowed)
+        :param block_loader: loads stored blocks (start, end), keeps only headers in memory (default: all blocks in memory)
+        :param block_cache_size: number of block bodies kept in memory with a block_loader
+        :param bloom_false_positive_rate: false positive rate of the per-block Bloom filters
+        :param consensus: engine which produces and checks the blocks (default: ProofOfWork)
+        """
+        if max_block_bytes <= HEADER_FORMAT.size + 2:
+            raise ValueError(f"max_block_bytes has to be larger than the block header ({HEADER_FORMAT.size} bytes)")
+        self.max_block_transactions = max_block_transactions
+        self.max_block_bytes = max_block_bytes
+
+        # List for saving the blocks in the chain, with a block_loader only the headers stay in memory
+        self._chain = LazyChain(block_loader, block_cache_size) if block_loader else []
+        # Pending transactions to get mined into the next block
+        self.mempool = Mempool(capacity=mempool_capacity, eviction=mempool_eviction,
+                               on_evict=self._forget_pending_transaction)
         self.nodes = set()  # Set for nodes in the Network
 
         # Listen für Daten und Modelle hinzufügen
         self.data_list = []  # Liste für alle Daten-Einträge
         self.model_list = []  # Liste für alle Modell-Einträge
+        self.data_entries = {}  # data_id -> Eintrag aus data_list
+        self.model_entries = {}  # model_id -> Eintrag aus model_list
+
+        # transaction_id -> (block_index, position, transaction), block_index and position are None while pending
+        self.transaction_index: Dict[str, Tuple[Optional[int], Optional[int], Dict]] = {}
+
+        # Bloom filter per block over its addresses and item ids, scans skip blocks which can't match
+        self.bloom_false_positive_rate = bloom_false_positive_rate
+        self.block_filters: List[BloomFilter] = []
+
+        # Confirmed purchases: item -> buyers and buyer -> purchases
+        self.purchase_ledger = PurchaseLedger()
+
+        # Balances per address, applied block by block with an undo journal
+        self.accounts = AccountState()
+        self.enforce_balances = enforce_balances
+
+        # address -> hex Ed25519 public key, signatures of blocks are verified as one batch
+        self.public_keys: Dict[str, str] = {}
+        self.signature_verifier = SignatureVerifier(self.public_keys, require_signatures=require_signatures)
+
+        # Multi-core PoW engine and stats of the last search
+        self.miner = ParallelMiner(workers=mining_workers)
+        self.last_mining_result: Optional[MiningResult] = None
+
+        # Difficulty of the next block from the recent mining times
+        self.retargeter = DifficultyRetargeter()
+
+        # PoW or proof of authority, used by mine_block, make_block and the validation
+        self.consensus = consensus or ProofOfWork()
+
+        # Guards chain and mempool when blocks are mined on a background thread
+        self.lock = threading.RLock()
+
+        # "Validated up to block N, tip hash H", lets validate_chain skip the known prefix
+        self.checkpoint_path = checkpoint_path
+        self.validation_checkpoint = validation.ValidationCheckpoint.load(checkpoint_path) if checkpoint_path else None
+
+        # Snapshots of listings, purchases and transaction index, a restart only replays the blocks after them
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
 
         # Create Genesis Block
         self.create_genesis_block()
 
+    @property
+    def chain(self):
+        return self._chain
+
+    @chain.setter
+    def chain(self, blocks: List[Block]) -> None:
+        # A lazy chain keeps its loader and cache, only its blocks are replaced
+        if isinstance(self._chain, LazyChain) and blocks is not self._chain:
+            self._chain.clear()
+            self._chain.extend(blocks)
+        else:
+            self._chain = blocks
+
+    @property
+    def lazy_blocks(self) -> bool:
+        """
+        True if only the headers are kept in memory and the blocks are loaded on demand
+        """
+        return isinstance(self._chain, LazyChain)
+
+    def block_header(self, index: int):
+        """
+        Header of a block, without loading the block if it is not in memory
+        :param index: <int> block index (negative from the end)
+        :return: <BlockHeader> or the Block itself
+        """
+        return self._chain.header(index) if self.lazy_blocks else self._chain[index]
+
+    @property
+    def current_transactions(self) -> List[Dict]:
+        """
+        Pending transactions in block order (snapshot of the mempool)
+        """
+        return self.mempool.ordered()
+
+    @current_transactions.setter
+    def current_transactions(self, transactions: List[Dict]) -> None:
+        for transaction in self.mempool:
+            self._forget_pending_transaction(transaction)
+        self.mempool.clear()
+        for transaction in transactions:
+            self._add_pending_transaction(as_transaction(transaction))
+
     def hash(self, block: Block) -> str:
         """"
         Creates a SHA-256 hash of a Block
         :param block: <Block> Block
         :return: <str> SHA-256 hash of the Block
         """
-        # Make sure the dictionary is sorted to not get inconsistend Hashes
-        block_string = json.dumps(block.to_dict(), sort_keys=True).encode()
-        return hashlib.sha256(block_string).hexdigest()
+        # Header hash, the transactions are covered by the Merkle root
+        return block.calculate_hash()
 
     def create_genesis_block(self):
         """"
@@ -101,56 +343,57 @@ class Blockchain:
         )
 
         self.chain.append(genesis_block)
+        self._index_block(genesis_block)
         return genesis_block
 
-    def create_genesis_transaction(self) -> Dict:
+    def create_genesis_transaction(self) -> TransferTransaction:
         """
         Create the first transaction for the genesis block
         In real cryptocurrencys the token Distribution is done here
         """
-        return {
-            "sender": "0",
-            "recipient": "genesis",
-            "amount": 1,
-            "timestamp": time.time(),
+        return TransferTransaction(
+            sender="0",
+            recipient="genesis",
+            amount=1,
+            timestamp=time.time(),
             # Signature is just a spaceholder here
-            "signature": "0",
-            "transaction_id": str(uuid.uuid4()).replace("-", "")
-        }
+            signature="0",
+            transaction_id=str(uuid.uuid4()).replace("-", "")
+        )
 
-    def make_transaction(self, sender: str, recipient: str, amount: float) -> str:
+    def make_transaction(self, sender: str, recipient: str, amount: float, private_key=None) -> str:
         """
         Creates a new transaction for the next Block to mine
         :param sender: address of the sender
         :param recipient: address of the recipient
         :param amount: amount to be transmitted
+        :param private_key: Ed25519 key of the sender (optional, unsigned transactions carry the placeholder)
         :return: Index of the Block which the transaction will be hold
         """
-        transaction = {
-            "sender": sender,
-            "recipient": recipient,
-            "amount": amount,
-            "timestamp": time.time(),
-            # Normally this would be created using kryptographic methods
-            "signature": "placeholder_signature",
-            "transaction_id": str(uuid.uuid4()).replace("-", "")
-        }
+        transaction = self._signed(TransferTransaction(
+            sender=sender,
+            recipient=recipient,
+            amount=amount,
+            timestamp=time.time(),
+            signature=PLACEHOLDER_SIGNATURE,
+            transaction_id=str(uuid.uuid4()).replace("-", "")
+        ), private_key)
 
         # Add transaction to the List
-        self.current_transactions.append(transaction)
+        self._add_pending_transaction(transaction)
 
         # Return index of the block which will handle the transaction
         return self.last_block.index + 1
 
 
 
-    def make_block(self, proof: int, difficulty: int = 4, mining_time: float = 0.0) -> Block:
+    def make_block(self, proof: int, difficulty: float = 4, mining_time: float = 0.0) -> Block:
         """
         Creates a new Block in the Blockchain
         :param proof: The proof of work
         :param difficulty: The difficulty used for mining
         :param mining_time: The actual time taken to mine this block in seconds
-        :return: new Block
+        :return: new Block, sealed by the consensus engine
         """
         previous_block = self.last_block
 
@@ -159,28 +402,566 @@ class Blockchain:
             index=len(self.chain),
             previous_hash=previous_block.hash,
             timestamp=time.time(),
-            transactions=self.current_transactions,
+            transactions=self.next_block_transactions(),
             proof=proof,
             difficulty=difficulty,  # Store the difficulty used
             mining_time=mining_time,  # Store the actual mining time
         )
-
-        # Reset current transactions
-        self.current_transactions = []
+        block = self.consensus.seal_block(block)
 
         # Add Block to the chain
         self.chain.append(block)
+        self._index_block(block)
+
+        # Remove the confirmed transactions from the mempool
+        self.mempool.remove_confirmed(block)
+
+        if self.snapshot_path and block.index % self.snapshot_interval == 0:
+            self.save_snapshot()
         return block
 
-    def set_block_index(self, block: Block) -> None:
+    def next_block_transactions(self) -> List[Dict]:
+        """
+        The pending transactions which fit into the next block (count and byte limit)
+        :return: list of transactions in inclusion order
+        """
+        # "[" + transactions joined by "," + "]": the mempool counts one separator per transaction
+        max_bytes = self.max_block_bytes - HEADER_FORMAT.size - 1
+        return self.mempool.select(self.max_block_transactions, max_bytes)
+
+    def discard_last_block(self) -> Block:
+        """
+        Removes the last block from the chain, e.g. when it lost against a competing block
+        Balances are rolled back through the undo journal, purchases and the transaction index
+        are reverted and the transactions of the block become pending again.
+        :return: the discarded block
+        :raises ValueError: for the genesis block or a block older than the undo journal
+        """
+        with self.lock:
+            if len(self.chain) <= 1:
+                raise ValueError("The genesis block can't be discarded")
+            block = self.last_block
+            self.accounts.rollback_block(block)
+            self.chain.pop()
+            del self.block_filters[block.index:]
+            for transaction in block.transactions:
+                self.purchase_ledger.remove(transaction)
+                self.transaction_index.pop(transaction.get("transaction_id"), None)
+
+            # The transactions of the block go back to the front of the mempool
+            self._requeue_transactions(list(block.transactions))
+            return block
+
+    def replace_chain(self, chain: List[Block]) -> int:
+        """
+        Replaces the chain by another one, e.g. a longer valid chain of another node
+        The chain has to be validated by the caller. The derived state is restored
+        (from the snapshot if it still fits) and the transactions of the dropped blocks
+        which are not part of the new chain become pending again.
+        :param chain: <list> the new chain starting with its genesis block
+        :return: <int> index of the first replaced block (length of the common prefix)
+        """
+        if not chain:
+            raise ValueError("The new chain is empty")
+        with self.lock:
+            fork_point = self.common_prefix(chain)
+
+            # Genesis transactions of a foreign genesis block are never pending again
+            dropped = [transaction for block in self.chain[max(fork_point, 1):] for transaction in block.transactions]
+            self._store_replaced_blocks(chain, fork_point)
+            pending = self.mempool.ordered()
+            self.mempool.clear()
+            self.chain = list(chain)
+            self.restore_derived_state()
+            self._requeue_transactions(dropped, pending)
+            return fork_point
+
+    def _store_replaced_blocks(self, chain: List[Block], fork_point: int) -> None:
+        """
+        Called by replace_chain before the chain is swapped, subclasses persist the new blocks here
+        :param chain: <list> the new chain
+        :param fork_point: <int> index of the first replaced block
+        """
+
+    def common_prefix(self, chain: List[Block]) -> int:
+        """
+        Number of blocks at the start of both chains which are the same
+        """
+        fork_point = 0
+        for index in range(min(len(self.chain), len(chain))):
+            if self.block_header(index).hash != chain[index].hash:
+                break
+            fork_point += 1
+        return fork_point
+
+    def _requeue_transactions(self, transactions: List[Dict], pending: List[Dict] = None) -> None:
+        """
+        Puts transactions back in front of the pending ones, confirmed transactions are skipped
+        :param transactions: transactions of discarded blocks
+        :param pending: the pending transactions (default: taken out of the mempool)
+        """
+        if pending is None:
+            pending = self.mempool.ordered()
+            self.mempool.clear()
+        for transaction in transactions + pending:
+            transaction_id = transaction.get("transaction_id")
+            if not transaction_id:
+                continue
+            entry = self.transaction_index.get(transaction_id)
+            if entry is not None and entry[0] is not None:
+                continue
+            try:
+                if self.mempool.add(transaction):
+                    self._index_pending_transaction(transaction)
+            except MempoolFullError:
+                self._forget_pending_transaction(transaction)
+
+    def get_balance(self, address: str, include_pending: bool = False) -> float:
+        """
+        Balance of an address in O(1)
+        :param address: blockchain address
+        :param include_pending: subtract the spends which are still in the mempool
+        :return: confirmed (or available) balance
+        """
+        if include_pending:
+            return self.accounts.available(address)
+        return self.accounts.balance(address)
+
+    def register_node(self, address: str) -> str:
+        """
+        Adds a node to the network of this blockchain
+        :param address: address of the node, e.g. "http://192.168.0.5:5000" or "192.168.0.5:5000"
+        :return: <str> the normalized address (host:port)
+        :raises ValueError: if the address has no host
+        """
+        parsed = urlparse(address if "//" in address else f"//{address}")
+        if not parsed.netloc:
+            raise ValueError(f"Invalid node address: {address}")
+        self.nodes.add(parsed.netloc)
+        return parsed.netloc
+
+    def register_public_key(self, address: str, public_key: str) -> None:
+        """
+        Registers the Ed25519 public key of an address, its signatures are checked against it
+        :param address: blockchain address
+        :param public_key: <str> raw public key as hex
+        """
+        self.public_keys[address] = public_key
+
+    @staticmethod
+    def _signed(transaction: Transaction, private_key) -> Transaction:
+        """
+        Signs a new transaction, without key it keeps the placeholder signature
+        """
+        if private_key is None:
+            return transaction
+        fields = transaction.to_dict()
+        fields.pop("type", None)
+        fields["signature"] = sign_transaction(transaction, private_key)
+        return type(transaction)(**fields)
+
+    def _add_pending_transaction(self, transaction: Dict) -> None:
+        """
+        Adds a transaction to the mempool and the transaction index
+        :param transaction: the new transaction
+        :raises MempoolFullError: if the mempool is full and rejects new transactions
+        :raises InsufficientFundsError: if balances are enforced and the payer can't afford the transaction
+        :raises SignatureError: if the signature does not match the registered key of the signer
+        """
+        if not self.signature_verifier.check_transaction(transaction):
+            raise SignatureError(f"Invalid signature of transaction {transaction.get('transaction_id')}")
+        with self.lock:
+            if self.enforce_balances and transaction.get("transaction_id") not in self.mempool:
+                self.accounts.check(transaction)
+            if self.mempool.add(transaction):
+                self._index_pending_transaction(transaction)
+
+    def _add_pending_transactions(self, transactions: List[Dict]) -> None:
+        """
+        Adds several transactions to the mempool and the transaction index under one lock
+        All signatures and balances are checked before the first transaction is added.
+        :param transactions: the new transactions
+        :raises MempoolFullError: if the mempool can't take all of them and rejects new transactions
+        :raises InsufficientFundsError: if balances are enforced and a payer can't afford a transaction
+        :raises SignatureError: if a signature does not match the registered key of the signer
+        """
+        for transaction in transactions:
+            if not self.signature_verifier.check_transaction(transaction):
+                raise SignatureError(f"Invalid signature of transaction {transaction.get('transaction_id')}")
+        with self.lock:
+            if self.enforce_balances:
+                for transaction in transactions:
+                    if transaction.get("transaction_id") not in self.mempool:
+                        self.accounts.check(transaction)
+            pending = [transaction for transaction in transactions
+                       if transaction.get("transaction_id") not in self.mempool]
+            self.mempool.add_many(pending)
+            for transaction in pending:
+                if transaction["transaction_id"] not in self.mempool:
+                    continue  # evicted again by later transactions of the same batch (EVICT_OLDEST)
+                self._index_pending_transaction(transaction)
+
+    def _remove_pending_transactions(self, transaction_ids: Iterable[str]) -> None:
+        """
+        Takes pending transactions out of the mempool again, e.g. when storing their uploads failed
+        The transaction index, the pending balances and the listings forget them as well.
+        :param transaction_ids: ids of the transactions, unknown or confirmed ones are ignored
+        """
+        with self.lock:
+            for transaction_id in transaction_ids:
+                transaction = self.mempool.get(transaction_id)
+                if transaction is not None:
+                    self.mempool.remove([transaction_id])
+                    self._forget_pending_transaction(transaction)
+
+    def _index_pending_transaction(self, transaction: Dict) -> None:
+        """
+        Adds a transaction which just entered the mempool to the transaction index,
+        the pending balances and (uploads) the listings
+        """
+        self.transaction_index[transaction["transaction_id"]] = (None, None, transaction)
+        self.accounts.add_pending(transaction)
+        if transaction.get("type") in ("data_upload", "model_upload"):
+            self._add_listing(transaction)
+
+    def _forget_pending_transaction(self, transaction: Dict) -> None:
+        """
+        Removes a pending transaction from the transaction index, the pending balances
+        and (uploads) the listings, e.g. evicted from the mempool
+        """
+        self.accounts.remove_pending(transaction["transaction_id"])
+        entry = self.transaction_index.get(transaction["transaction_id"])
+        confirmed = entry is not None and entry[0] is not None
+        if entry is not None and not confirmed:
+            del self.transaction_index[transaction["transaction_id"]]
+        if not confirmed and transaction.get("type") in ("data_upload", "model_upload"):
+            self._remove_listing(transaction)
+
+    def _index_block(self, block: Block) -> None:
+        """
+        Adds all transactions of a block to the transaction index, the purchase ledger,
+        the listings and the balances
+        :param block: Block in the chain
+        """
+        # With lazy blocks the index holds only positions, find_transaction loads the transaction
+        keep = not self.lazy_blocks
+        for position, transaction in enumerate(block.transactions):
+            transaction_id = transaction.get("transaction_id")
+            if transaction_id:
+                self.transaction_index[transaction_id] = (block.index, position, transaction if keep else None)
+            if transaction.get("type") in ("data_upload", "model_upload"):
+                self._add_listing(transaction)
+        self.purchase_ledger.record_block(block)
+        self.accounts.apply_block(block)
+        self._add_block_filter(block)
+
+    def _add_block_filter(self, block: Block) -> None:
+        # Filters after the block belong to a replaced chain
+        del self.block_filters[block.index:]
+        self.block_filters.append(block_filter(block, self.bloom_false_positive_rate))
+
+    def _add_listing(self, transaction: Dict) -> None:
+        """
+        Adds the marketplace entry of an upload transaction to data_list or model_list (once per item)
+        """
+        if transaction["type"] == "data_upload":
+            key, items, entries = "data_id", self.data_list, self.data_entries
+        else:
+            key, items, entries = "model_id", self.model_list, self.model_entries
+
+        transaction_id = transaction["transaction_id"]
+        if transaction_id in entries:
+            return
+        entry = {
+            key: transaction_id,
+            "owner": transaction["owner"],
+            "metadata": transaction["metadata"],
+            "price": transaction["price"],
+            "timestamp": transaction["timestamp"]
+        }
+        items.append(entry)
+        entries[transaction_id] = entry
+
+    def _remove_listing(self, transaction: Dict) -> None:
+        """
+        Removes the marketplace entry of an upload transaction which will not be mined
+        """
+        if transaction["type"] == "data_upload":
+            items, entries = self.data_list, self.data_entries
+        else:
+            items, entries = self.model_list, self.model_entries
+
+        entry = entries.pop(transaction["transaction_id"], None)
+        if entry is not None:
+            items.remove(entry)
+
+    def _clear_derived_state(self) -> None:
+        self.transaction_index = {}
+        self.block_filters = []
+        self.purchase_ledger.clear()
+        self.data_list = []
+        self.model_list = []
+        self.data_entries = {}
+        self.model_entries = {}
+        self.accounts.clear()
+
+    def _index_pending_transactions(self) -> None:
+        for transaction in self.mempool:
+            self._index_pending_transaction(transaction)
+
+    def rebuild_transaction_index(self) -> None:
+        """
+        Rebuilds the transaction index, the purchase ledger and the listings from the chain
+        and the pending transactions
+        Needed after the chain was replaced, e.g. restored from the database
+        """
+        self._clear_derived_state()
+        for block in self.chain:
+            self._index_block(block)
+        self._index_pending_transactions()
+
+    def create_snapshot(self) -> ChainSnapshot:
+        """
+        Snapshot of the derived state of the confirmed blocks
+        Pending uploads are left out, they are not part of the chain yet.
+        :return: <ChainSnapshot> state at the current tip
+        """
+        with self.lock:
+            def position(transaction_id):
+                block_index, index_position, _ = self.transaction_index[transaction_id]
+                return None if block_index is None else [block_index, index_position]
+
+            uploads = [position(entry["data_id"]) for entry in self.data_list]
+            uploads += [position(entry["model_id"]) for entry in self.model_list]
+            purchases = sorted(position(transaction["transaction_id"])
+                               for _, transaction in self.purchase_ledger.all_purchases())
+            return ChainSnapshot(
+                height=len(self.chain),
+                tip_hash=self.last_block.hash,
+                uploads=[upload for upload in uploads if upload is not None],
+                purchases=purchases,
+                balances=dict(self.accounts.balances),
+            )
+
+    def save_snapshot(self) -> ChainSnapshot:
+        """
+        Writes a snapshot of the current state to snapshot_path
+        """
+        if not self.snapshot_path:
+            raise ValueError("No snapshot_path set")
+        snapshot = self.create_snapshot()
+        snapshot.save(self.snapshot_path)
+        return snapshot
+
+    def restore_derived_state(self) -> int:
+        """
+        Rebuilds the derived state after the chain was restored
+        Loads the snapshot if it fits the chain and replays only the blocks after it,
+        otherwise all blocks are replayed.
+        :return: <int> number of replayed blocks
+        """
+        snapshot = ChainSnapshot.load(self.snapshot_path) if self.snapshot_path else None
+        # Positions are block indexes, a chain restored without its genesis block can't use them
+        if snapshot is None or not snapshot.covers(self.chain) or self.last_block.index != len(self.chain) - 1:
+            self.rebuild_transaction_index()
+            return len(self.chain)
+
+        with self.lock:
+            self._clear_derived_state()
+            chain = self.chain
+            for block in islice(chain, snapshot.height):
+                self._index_snapshot_block(block)
+            self._apply_snapshot(snapshot, lambda block_index, position: chain[block_index].transactions[position])
+
+            for block in islice(chain, snapshot.height, None):
+                self._index_block(block)
+            self._index_pending_transactions()
+        return len(self.chain) - snapshot.height
+
+    def restore_blocks(self, blocks: Iterable[Block]) -> int:
+        """
+        Replaces the chain by stored blocks and rebuilds the derived state in the same pass
+        Same result as setting the chain and calling restore_derived_state, but the blocks are
+        only iterated once, so a stream from the storage never has to be held in memory
+        (with a block_loader) or loaded a second time. Blocks covered by a fitting snapshot only
+        get their transaction ids and Bloom filters, the transactions the snapshot refers to are
+        picked up on the way.
+        :param blocks: the stored blocks in index order, starting with the genesis block
+        :return: <int> number of replayed blocks
+        :raises ValueError: if a block does not follow the previous one
+        """
+        snapshot = ChainSnapshot.load(self.snapshot_path) if self.snapshot_path else None
+        height = snapshot.height if snapshot else 0
+        wanted = {tuple(position) for position in snapshot.uploads + snapshot.purchases} if snapshot else set()
+        found: Dict[Tuple[int, int], Dict] = {}
+
+        with self.lock:
+            self.chain = []
+            self._clear_derived_state()
+            chain = self.chain
+            for block in blocks:
+                if block.index != len(chain):
+                    raise ValueError(f"Stored block {block.index} can't follow block {len(chain) - 1}")
+                if block.index == height and snapshot is not None:
+                    self._apply_snapshot(snapshot, lambda block_index, position: found[block_index, position])
+                chain.append(block)
+
+                if block.index >= height:
+                    self._index_block(block)
+                    continue
+                self._index_snapshot_block(block)
+                for position, transaction in enumerate(block.transactions):
+                    if (block.index, position) in wanted:
+                        found[block.index, position] = transaction
+                if block.index == height - 1 and block.hash != snapshot.tip_hash:
+                    # Snapshot of another chain: index the blocks so far completely and go on without it
+                    snapshot, height = None, 0
+                    self._clear_derived_state()
+                    for indexed in chain:
+                        self._index_block(indexed)
+
+            if snapshot is not None and len(chain) == height:
+                self._apply_snapshot(snapshot, lambda block_index, position: found[block_index, position])
+            elif snapshot is not None and len(chain) < height:
+                # Chain shorter than the snapshot
+                height = 0
+                self._clear_derived_state()
+                for block in chain:
+                    self._index_block(block)
+            self._index_pending_transactions()
+        return len(chain) - height
+
+    def _index_snapshot_block(self, block: Block) -> None:
+        """
+        Derived state of a block covered by a snapshot: only transaction ids and the Bloom filter
+        """
+        keep = not self.lazy_blocks
+        transaction_index = self.transaction_index
+        block_index = block.index
+        for position, transaction in enumerate(block.transactions):
+            transaction_id = transaction.get("transaction_id")
+            if transaction_id:
+                transaction_index[transaction_id] = (block_index, position, transaction if keep else None)
+        self._add_block_filter(block)
+
+    def _apply_snapshot(self, snapshot: ChainSnapshot, transaction_at: Callable[[int, int], Dict]) -> None:
+        """
+        Listings, purchases and balances of a snapshot
+        :param transaction_at: returns the transaction at (block index, position)
+        """
+        for block_index, position in snapshot.uploads:
+            self._add_listing(transaction_at(block_index, position))
+        for block_index, position in snapshot.purchases:
+            self.purchase_ledger.record(transaction_at(block_index, position), block_index)
+        self.accounts.load(snapshot.balances)
+
+    def blocks_matching(self, *keys: str) -> Iterator[Block]:
+        """
+        Blocks which may contain one of the keys (address or item id)
+        Blocks whose Bloom filter rules out all keys are skipped without touching their
+        transactions, the rest still has to be checked (false positives).
+        :param keys: addresses or item ids
+        :return: iterator over the candidate blocks in chain order
+        """
+        key_hashes = [hash_key(key) for key in keys]
+        for index, bloom in enumerate(self.block_filters):
+            if matches_any(bloom, key_hashes):
+                yield self.chain[index]
+
+    def transactions_matching(self, *keys: str) -> Iterator[Tuple[Block, Dict]]:
+        """
+        (block, transaction) of every confirmed transaction which contains one of the keys
+        in one of its address or item id fields
+        """
+        wanted = set(keys)
+        for block in self.blocks_matching(*keys):
+            for transaction in block.transactions:
+                if not wanted.isdisjoint(transaction_keys(transaction)):
+                    yield block, transaction
+
+    def find_transaction(self, transaction_id: str) -> Optional[Tuple[Optional[int], Optional[int], Dict]]:
+        """
+        Looks up a transaction by its id in O(1)
+        :param transaction_id: id of the transaction
+        :return: (block_index, position, transaction) or None, block_index and position are None for pending transactions
+        """
+        entry = self.transaction_index.get(transaction_id)
+        if entry is not None and entry[2] is None:
+            # Lazy blocks: the transaction is loaded from its block
+            block_index, position, _ = entry
+            return block_index, position, self.chain[block_index].transactions[position]
+        return entry
+
+    def find_item(self, item_id: str, confirmed_only: bool = False) -> Optional[Dict]:
+        """
+        Returns the data_upload or model_upload transaction of a marketplace item
+        :param item_id: id of the item (transaction id of the upload)
+        :param confirmed_only: ignore uploads which are not mined yet
+        :return: upload transaction or None
+        """
+        entry = self.find_transaction(item_id)
+        if entry is None:
+            return None
+        block_index, _, transaction = entry
+        if confirmed_only and block_index is None:
+            return None
+        if transaction.get("type") not in ("data_upload", "model_upload"):
+            return None
+        return transaction
+
+    def get_transaction_proof(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Creates a Merkle inclusion proof for a mined transaction
+        A client only needs the block header (merkle_root) to check it
+        :param transaction_id: id of the transaction
+        :return: proof as dict or None if the transaction is unknown or still pending
+        """
+        entry = self.find_transaction(transaction_id)
+        if entry is None or entry[0] is None:
+            return None
+
+        block_index, position, _ = entry
+        block = self.chain[block_index]
+        leaves = block.transaction_hashes()
+
+        return {
+            "transaction_id": transaction_id,
+            "block_index": block_index,
+            "block_hash": block.hash,
+            "merkle_root": block.merkle_root,
+            "position": position,
+            "leaf_hash": leaves[position].hex(),
+            "path": merkle_proof(leaves, position),
+        }
+
+    @staticmethod
+    def verify_transaction_proof(proof: Dict[str, Any]) -> bool:
+        """
+        Checks a proof created by get_transaction_proof
+        :param proof: the proof
+        :return: True if valid False otherwise
+        """
+        return verify_merkle_proof(proof["leaf_hash"], proof["path"], proof["merkle_root"])
+
+    def set_block_index(self, block: Block) -> Block:
         """
         Sets the index of the Block in the Blockchain
         Mainly just there if blocks will be added from another source from the api
         Don't know if we are gonna use this tbh
+        Blocks are immutable, so a copy with the new index (and hash) is returned
         :param block:
-        :return:
+        :return: Block with the next index of this chain
         """
-        block.index = len(self.chain)
+        return Block(
+            index=len(self.chain),
+            previous_hash=block.previous_hash,
+            timestamp=block.timestamp,
+            transactions=block.transactions,
+            proof=block.proof,
+            difficulty=block.difficulty,
+            mining_time=block.mining_time,
+            version=block.version,
+        )
 
     @property
     def last_block(self) -> Block:
@@ -195,32 +976,25 @@ class Blockchain:
         Validates a given Block by checking:
         previous block hash,
         index,
-        PoW,
-        validating all transactions in the Block
+        PoW or the seal of the consensus engine,
+        Merkle root,
+        the block hash itself,
+        validating all transactions in the Block,
+        the signatures of all transactions as one batch
         :param block: Block to validate
         :param previous_block:
         :return: True if valid False otherwise
         """
+        return validation.validate_block(block, previous_block, self.signature_verifier, self.consensus)
 
-        if block.previous_hash != previous_block.hash:
-            return False
-
-        if block.index != previous_block.index + 1:
-            return False
-
-        if not self.valid_proof(previous_block.proof, block.proof, block.difficulty):
-            return False
-
-        for transaction in block.transactions:
-            if not self.validate_transaction(transaction):
-                return False
-
-        return True
-
-    def validate_chain(self, chain: List[Block] = None) -> bool:
+    def validate_chain(self, chain: List[Block] = None, workers: int = 1, use_checkpoint: bool = True) -> bool:
         """
         Validates the chain
+        With a checkpoint only the blocks after the validated prefix are checked,
+        long tails are checked in parallel chunks on a process pool.
         :param chain: chain to validate
+        :param workers: number of processes, None for all cores (default: 1 = serial)
+        :param use_checkpoint: skip the prefix covered by the validation checkpoint
         :return: True if valid False otherwise
         """
 
@@ -229,274 +1003,286 @@ class Blockchain:
         if len(chain) == 0:
             return False
 
-        # Validate each block in the chain
-        for i in range(1, len(chain)):
-            if not self.validate_block(chain[i], chain[i - 1]):
+        if use_checkpoint and self.validation_checkpoint and self.validation_checkpoint.covers(chain):
+            start = self.validation_checkpoint.length
+        else:
+            # The first block has no predecessor, at least its own hash has to match
+            if chain[0].hash != chain[0].calculate_hash():
                 return False
+            start = 1
 
-        return True
-
+        # Validate each block after the checkpoint, the block before is needed as predecessor
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(chain) - start + 1 >= validation.PARALLEL_MIN_BLOCKS:
+            valid = validation.validate_range_parallel(chain[start - 1:], workers, verifier=self.signature_verifier,
+                                                       consensus=self.consensus)
+        else:
+            # Chunk by chunk, a lazy chain only loads the blocks of one chunk at a time
+            valid = all(validation.validate_range(chain[first - 1:first + validation.CHUNK_SIZE],
+                                                  self.signature_verifier, self.consensus)
+                        for first in range(start, len(chain), validation.CHUNK_SIZE))
 
+        # Only the own chain moves the checkpoint, a foreign chain may never be adopted
+        if valid and use_checkpoint and chain is self.chain:
+            self._update_validation_checkpoint(chain)
+        return valid
 
-    def proof_of_work(self, last_proof: int, difficulty: int = 4) -> tuple:
+    def _update_validation_checkpoint(self, chain: List[Block]) -> None:
+        """
+        Remembers the validated tip and persists it if a checkpoint path is set
+        """
+        checkpoint = validation.ValidationCheckpoint(length=len(chain), tip_hash=chain[-1].hash)
+        if checkpoint == self.validation_checkpoint:
+            return
+        self.validation_checkpoint = checkpoint
+        if self.checkpoint_path:
+            checkpoint.save(self.checkpoint_path)
+
+    def proof_of_work(self, last_proof: int, difficulty: float = 4,
+                      progress: Callable[[int, float], None] = None) -> tuple:
         """
         Simple proof (parallel to bitcoins PoW with adjustable difficulty)
         - find a number P' so that hash(P * P') has 'difficulty' leading zeros
+        The nonce space is searched on all cores of the miner,
+        attempts and hash rate are kept in last_mining_result
 
         :param last_proof: <int> last proof
-        :param difficulty: <int> number of leading zeros required (default: 4)
+        :param difficulty: <float> number of leading zeros required, fractions in zero bits (default: 4)
+        :param progress: called with (nonces tested so far, seconds elapsed) during the search
         :return: <tuple> New Proof and time taken in seconds
         """
-        start_time = time.time()
-        proof = 0
-        while self.valid_proof(last_proof, proof, difficulty) is False:
-            proof += 1
+        result = self.miner.mine(last_proof, difficulty, progress)
+        self.last_mining_result = result
+        return result.proof, result.time_taken
 
-        end_time = time.time()
-        time_taken = end_time - start_time
-        return proof, time_taken
-
-    def valid_proof(self, last_proof: int, proof: int, difficulty: int = 4) -> bool:
+    def valid_proof(self, last_proof: int, proof: int, difficulty: float = 4) -> bool:
         """
         Validates a Proof: Has hash(last_proof, proof) 'difficulty' leading zeros
         :param last_proof: <int> last proof
         :param proof: <int> proof
-        :param difficulty: <int> number of leading zeros required (default: 4)
+        :param difficulty: <float> number of leading zeros required, 2.5 = 10 zero bits (default: 4)
         :return: True if correct False otherwise
         """
 
-        guess = f"{last_proof}{proof}".encode()
-        guess_hash = hashlib.sha256(guess).hexdigest()
-        return guess_hash[:difficulty] == "0" * difficulty
+        # Raw digest against the zero-nibble mask, same result as comparing the hexdigest
+        return valid_proof(last_proof, proof, difficulty)
+
+    def next_difficulty(self) -> float:
+        """
+        Difficulty for the next block, retargeted from the mining times of the recent blocks
+        :return: <float> number of leading hex zeros (multiple of 0.25)
+        """
+        # Difficulty and mining time are in the headers, lazy blocks don't have to be loaded
+        return self.retargeter.next_difficulty(self.chain.headers if self.lazy_blocks else self.chain)
+
+    def cumulative_work(self, start: int = 0) -> float:
+        """
+        Expected work of the chain from block start on, the synchronization adopts the chain with the most work
+        :param start: <int> index of the first block counted
+        """
+        return chain_work(islice(self.chain.headers if self.lazy_blocks else self.chain, start, None))
 
-    def mine_block(self, difficulty=4) -> tuple:
+    def mine_block(self, difficulty: float = None, progress: Callable[[int, float], None] = None) -> tuple:
         """
         Mines a new Block
-        :param difficulty: <int> mining difficulty (number of leading zeros)
+        The PoW runs without holding the chain lock, so transactions can be added meanwhile.
+        With proof of authority there is no search, the block is signed right away.
+        :param difficulty: <float> mining difficulty (number of leading zeros), None = retargeted
+        :param progress: called with (nonces tested so far, seconds elapsed) during the search
         :return: tuple of (new Block, time taken to mine)
         """
 
-        # Do the PoW
-        last_block = self.last_block
-        last_proof = last_block.proof
-        proof, mining_time = self.proof_of_work(last_proof, difficulty)
+        while True:
+            # Do the PoW (or whatever the consensus engine needs for the next block)
+            last_block = self.last_block
+            proof, block_difficulty, mining_time = self.consensus.prepare_block(self, last_block, difficulty, progress)
 
-        # Create new Block with the used difficulty AND the actual mining time
-        block = self.make_block(proof, difficulty, mining_time)
+            with self.lock:
+                if self.last_block is not last_block:
+                    # Another thread added a block during the search, the proof is stale
+                    continue
 
-        # Aktualisiere die purchased_by-Listen für Daten und Modelle basierend auf geminen Transaktionen
-        for tx in block.transactions:
-            if tx.get("type") == "data_purchase":
-                buyer = tx.get("buyer")
-                data_id = tx.get("data_id")
-                # Finde den data_entry und füge den Käufer hinzu
-                for data_entry in self.data_list:
-                    if data_entry["data_id"] == data_id and buyer not in data_entry["purchased_by"]:
-                        data_entry["purchased_by"].append(buyer)
+                # Create new Block with the used difficulty AND the actual mining time
+                # (make_block indexes the block, its purchases go into the purchase ledger)
+                block = self.make_block(proof, block_difficulty, mining_time)
 
-            elif tx.get("type") == "model_purchase":
-                buyer = tx.get("buyer")
-                model_id = tx.get("model_id")
-                # Finde den model_entry und füge den Käufer hinzu
-                for model_entry in self.model_list:
-                    if model_entry["model_id"] == model_id and buyer not in model_entry["purchased_by"]:
-                        model_entry["purchased_by"].append(buyer)
+                return block, mining_time
 
-        return block, mining_time
+    def mine_pending(self, difficulty: float = None, max_blocks: int = None,
+                     progress: Callable[[int, float], None] = None) -> List[Tuple[Block, float]]:
+        """
+        Drains the mempool into as many blocks as needed, each within the block limits
+        :param difficulty: <float> mining difficulty (number of leading zeros), None = retargeted per block
+        :param max_blocks: <int> stop after this many blocks (default: until the mempool is empty)
+        :param progress: passed to mine_block, called during the search of every block
+        :return: list of (new Block, time taken to mine) per block
+        """
+        mined = []
+        while len(self.mempool) > 0 and (max_blocks is None or len(mined) < max_blocks):
+            mined.append(self.mine_block(difficulty, progress))
+        return mined
 
     # ---- Data-Marktplatz Funktionen ----
 
-    def data_upload_transaction(self, owner: str, metadata: Dict, price: float) -> str:
+    def data_upload_transaction(self, owner: str, metadata: Dict, price: float, private_key=None) -> str:
         """
         Erstellt eine neue Transaktion für den Upload von Daten
 
         :param owner: Adresse des Datenbesitzers
         :param metadata: Metadaten der Daten (Format, Größe, Beschreibung, etc.)
         :param price: Preis der Daten
+        :param private_key: Ed25519-Schlüssel des Besitzers (optional, sonst Platzhalter-Signatur)
         :return: Transaktions-ID
         """
         transaction_id = str(uuid.uuid4()).replace("-", "")
 
-        transaction = {
-            "type": "data_upload",
-            "owner": owner,
-            "metadata": metadata,
-            "price": price,
-            "timestamp": time.time(),
-            "signature": "placeholder_signature",  # In einer echten Implementierung wäre dies kryptografisch signiert
-            "transaction_id": transaction_id
-        }
+        transaction = self._signed(DataUploadTransaction(
+            owner=owner,
+            metadata=metadata,
+            price=price,
+            timestamp=time.time(),
+            signature=PLACEHOLDER_SIGNATURE,
+            transaction_id=transaction_id
+        ), private_key)
 
-        # Transaktion zur aktuellen Liste hinzufügen
-        self.current_transactions.append(transaction)
-
-        # Data-Entry in die data_list hinzufügen
-        data_entry = {
-            "data_id": transaction_id,
-            "owner": owner,
-            "metadata": metadata,
-            "price": price,
-            "timestamp": time.time(),
-            "purchased_by": []
-        }
-        self.data_list.append(data_entry)
+        # Transaktion zur aktuellen Liste hinzufügen, der Data-Entry kommt damit in die data_list
+        self._add_pending_transaction(transaction)
 
         return transaction_id
 
-    def model_upload_transaction(self, owner: str, metadata: Dict, price: float) -> str:
+    def model_upload_transaction(self, owner: str, metadata: Dict, price: float, private_key=None) -> str:
         """
         Erstellt eine neue Transaktion für den Upload eines ML-Modells
 
         :param owner: Adresse des Modellbesitzers
         :param metadata: Metadaten des Modells (Typ, Hyperparameter, Performance, etc.)
         :param price: Preis des Modells
+        :param private_key: Ed25519-Schlüssel des Besitzers (optional, sonst Platzhalter-Signatur)
         :return: Transaktions-ID
         """
         transaction_id = str(uuid.uuid4()).replace("-", "")
 
-        transaction = {
-            "type": "model_upload",
-            "owner": owner,
-            "metadata": metadata,
-            "price": price,
-            "timestamp": time.time(),
-            "signature": "placeholder_signature",
-            "transaction_id": transaction_id
-        }
+        transaction = self._signed(ModelUploadTransaction(
+            owner=owner,
+            metadata=metadata,
+            price=price,
+            timestamp=time.time(),
+            signature=PLACEHOLDER_SIGNATURE,
+            transaction_id=transaction_id
+        ), private_key)
 
-        # Transaktion zur aktuellen Liste hinzufügen
-        self.current_transactions.append(transaction)
-
-        # Model-Entry in die model_list hinzufügen
-        model_entry = {
-            "model_id": transaction_id,
-            "owner": owner,
-            "metadata": metadata,
-            "price": price,
-            "timestamp": time.time(),
-            "purchased_by": []
-        }
-        self.model_list.append(model_entry)
+        # Transaktion zur aktuellen Liste hinzufügen, der Model-Entry kommt damit in die model_list
+        self._add_pending_transaction(transaction)
 
         return transaction_id
 
-    def data_purchase_transaction(self, buyer: str, data_id: str, amount: float) -> str:
+    def upload_transactions(self, upload_type: str, uploads: Iterable[Tuple[str, Dict, float]],
+                            private_key=None) -> List[str]:
+        """
+        Erstellt mehrere Upload-Transaktionen und fügt sie gemeinsam zum Mempool hinzu
+
+        :param upload_type: "data_upload" oder "model_upload"
+        :param uploads: (Besitzer, Metadaten, Preis) je Upload
+        :param private_key: Ed25519-Schlüssel der Besitzer (optional, sonst Platzhalter-Signatur)
+        :return: Transaktions-IDs in der Reihenfolge der Uploads
+        """
+        record_class = {DataUploadTransaction.TYPE: DataUploadTransaction,
+                        ModelUploadTransaction.TYPE: ModelUploadTransaction}[upload_type]
+        transactions = [self._signed(record_class(
+            owner=owner,
+            metadata=metadata,
+            price=price,
+            timestamp=time.time(),
+            signature=PLACEHOLDER_SIGNATURE,
+            transaction_id=str(uuid.uuid4()).replace("-", "")
+        ), private_key) for owner, metadata, price in uploads]
+
+        # Alle auf einmal in den Mempool, die Listings kommen mit den Transaktionen
+        self._add_pending_transactions(transactions)
+
+        return [transaction["transaction_id"] for transaction in transactions]
+
+    def data_purchase_transaction(self, buyer: str, data_id: str, amount: float, private_key=None) -> str:
         """
         Erstellt eine neue Transaktion für den Kauf von Daten
 
         :param buyer: Adresse des Käufers
         :param data_id: ID der zu kaufenden Daten (Transaktions-ID der data_upload-Transaktion)
         :param amount: Betrag, der bezahlt wird
+        :param private_key: Ed25519-Schlüssel des Käufers (optional, sonst Platzhalter-Signatur)
         :return: Transaktions-ID
         """
         transaction_id = str(uuid.uuid4()).replace("-", "")
 
-        # Finde den Besitzer der Daten
+        # Finde den Besitzer der Daten über die Indizes
         data_owner = None
-        data_entry = None
-
-        # Suche in der data_list
-        for entry in self.data_list:
-            if entry["data_id"] == data_id:
-                data_owner = entry["owner"]
-                data_entry = entry
-                break
-
-        if data_owner is None:
-            # Suche in der Blockchain
-            for block in self.chain:
-                for tx in block.transactions:
-                    if tx.get("type") == "data_upload" and tx.get("transaction_id") == data_id:
-                        data_owner = tx.get("owner")
-                        break
+        data_entry = self.data_entries.get(data_id)
 
-        if data_owner is None:
-            # Suche auch in ausstehenden Transaktionen
-            for tx in self.current_transactions:
-                if tx.get("type") == "data_upload" and tx.get("transaction_id") == data_id:
-                    data_owner = tx.get("owner")
-                    break
+        if data_entry is not None:
+            data_owner = data_entry["owner"]
+        else:
+            # Upload in der Blockchain oder in ausstehenden Transaktionen
+            upload = self.find_item(data_id)
+            if upload is not None and upload.get("type") == "data_upload":
+                data_owner = upload.get("owner")
 
         if data_owner is None:
             raise ValueError(f"Daten mit ID {data_id} nicht gefunden")
 
-        transaction = {
-            "type": "data_purchase",
-            "buyer": buyer,
-            "seller": data_owner,
-            "data_id": data_id,
-            "amount": amount,
-            "timestamp": time.time(),
-            "signature": "placeholder_signature",
-            "transaction_id": transaction_id
-        }
+        transaction = self._signed(DataPurchaseTransaction(
+            buyer=buyer,
+            seller=data_owner,
+            data_id=data_id,
+            amount=amount,
+            timestamp=time.time(),
+            signature=PLACEHOLDER_SIGNATURE,
+            transaction_id=transaction_id
+        ), private_key)
 
         # Transaktion zur aktuellen Liste hinzufügen
-        self.current_transactions.append(transaction)
-
-        # Aktualisiere die purchased_by Liste im data_entry, falls vorhanden
-        if data_entry and buyer not in data_entry["purchased_by"]:
-            data_entry["purchased_by"].append(buyer)
+        self._add_pending_transaction(transaction)
 
         return transaction_id
 
-    def model_purchase_transaction(self, buyer: str, model_id: str, amount: float) -> str:
+    def model_purchase_transaction(self, buyer: str, model_id: str, amount: float, private_key=None) -> str:
         """
         Erstellt eine neue Transaktion für den Kauf eines ML-Modells
 
         :param buyer: Adresse des Käufers
         :param model_id: ID des zu kaufenden Modells (Transaktions-ID der model_upload-Transaktion)
         :param amount: Betrag, der bezahlt wird
+        :param private_key: Ed25519-Schlüssel des Käufers (optional, sonst Platzhalter-Signatur)
         :return: Transaktions-ID
         """
         transaction_id = str(uuid.uuid4()).replace("-", "")
 
-        # Finde den Besitzer des Modells
+        # Finde den Besitzer des Modells über die Indizes
         model_owner = None
-        model_entry = None
-
-        # Suche in der model_list
-        for entry in self.model_list:
-            if entry["model_id"] == model_id:
-                model_owner = entry["owner"]
-                model_entry = entry
-                break
+        model_entry = self.model_entries.get(model_id)
 
-        if model_owner is None:
-            # Suche in der Blockchain
-            for block in self.chain:
-                for tx in block.transactions:
-                    if tx.get("type") == "model_upload" and tx.get("transaction_id") == model_id:
-                        model_owner = tx.get("owner")
-                        break
-
-        if model_owner is None:
-            # Suche auch in ausstehenden Transaktionen
-            for tx in self.current_transactions:
-                if tx.get("type") == "model_upload" and tx.get("transaction_id") == model_id:
-                    model_owner = tx.get("owner")
-                    break
+        if model_entry is not None:
+            model_owner = model_entry["owner"]
+        else:
+            # Upload in der Blockchain oder in ausstehenden Transaktionen
+            upload = self.find_item(model_id)
+            if upload is not None and upload.get("type") == "model_upload":
+                model_owner = upload.get("owner")
 
         if model_owner is None:
             raise ValueError(f"Modell mit ID {model_id} nicht gefunden")
 
-        transaction = {
-            "type": "model_purchase",
-            "buyer": buyer,
-            "seller": model_owner,
-            "model_id": model_id,
-            "amount": amount,
-            "timestamp": time.time(),
-            "signature": "placeholder_signature",
-            "transaction_id": transaction_id
-        }
+        transaction = self._signed(ModelPurchaseTransaction(
+            buyer=buyer,
+            seller=model_owner,
+            model_id=model_id,
+            amount=amount,
+            timestamp=time.time(),
+            signature=PLACEHOLDER_SIGNATURE,
+            transaction_id=transaction_id
+        ), private_key)
 
         # Transaktion zur aktuellen Liste hinzufügen
-        self.current_transactions.append(transaction)
-
-        # Aktualisiere die purchased_by Liste im model_entry, falls vorhanden
-        if model_entry and buyer not in model_entry["purchased_by"]:
-            model_entry["purchased_by"].append(buyer)
+        self._add_pending_transaction(transaction)
 
         return transaction_id
 
@@ -508,33 +1294,7 @@ class Blockchain:
         :param transaction: Zu validierende Transaktion
         :return: True oder False
         """
-        # Prüfe Transaktionstyp
-        if "type" not in transaction:
-            # Standard-Transaktion (Geldtransfer)
-            if not all(k in transaction for k in ("sender", "recipient", "amount", "timestamp", "signature")):
-                return False
-        elif transaction["type"] == "data_upload":
-            if not all(k in transaction for k in ("owner", "metadata", "price", "timestamp", "signature")):
-                return False
-        elif transaction["type"] == "model_upload":
-            if not all(k in transaction for k in ("owner", "metadata", "price", "timestamp", "signature")):
-                return False
-        elif transaction["type"] == "data_purchase":
-            if not all(k in transaction for k in ("buyer", "seller", "data_id", "amount", "timestamp", "signature")):
-                return False
-        elif transaction["type"] == "model_purchase":
-            if not all(k in transaction for k in ("buyer", "seller", "model_id", "amount", "timestamp", "signature")):
-                return False
-        else:
-            # Unbekannter Transaktionstyp
-            return False
-
-        # Hier könnten weitere Validierungen hinzugefügt werden, z.B.:
-        # - Überprüfung der Signatur
-        # - Überprüfung des Guthabens des Käufers
-        # - Überprüfung, ob die Daten/Modelle existieren
-
-        return True
+        return validation.validate_transaction(transaction)
 
     def get_data_listing(self) -> List[Dict]:
         """
@@ -542,8 +1302,9 @@ class Blockchain:
 
         :return: Liste von Daten-Metadaten
         """
-        # Verwende die data_list direkt, da sie alle Daten enthält
-        return self.data_list
+        # Käufer kommen aus dem Purchase-Ledger (nur bestätigte Käufe)
+        return [dict(entry, purchased_by=sorted(self.purchase_ledger.buyers(entry["data_id"])))
+                for entry in self.data_list]
 
     def get_model_listing(self) -> List[Dict]:
         """
@@ -551,5 +1312,16 @@ class Blockchain:
 
         :return: Liste von Modell-Metadaten
         """
-        # Verwende die model_list direkt, da sie alle Modelle enthält
-        return self.model_list
\ No newline at end of file
+        # Käufer kommen aus dem Purchase-Ledger (nur bestätigte Käufe)
+        return [dict(entry, purchased_by=sorted(self.purchase_ledger.buyers(entry["model_id"])))
+                for entry in self.model_list]
+
+    def has_purchased(self, buyer: str, item_id: str) -> bool:
+        """
+        Prüft in O(1), ob ein Käufer ein Item (Daten oder Modell) bestätigt gekauft hat
+
+        :param buyer: Adresse des Käufers
+        :param item_id: data_id bzw. model_id
+        :return: True, wenn ein Kauf in einem Block steht
+        """
+        return self.purchase_ledger.has_purchased(buyer, item_id)
@@ -0,0 +1,139 @@
+### Import Libraries ###
+import hashlib
+import math
+from typing import Iterable, Set, Tuple
+
+# Probability that a filter claims a key it does not contain
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+# Smallest filter, blocks with few transactions still get a few bytes
+MIN_FILTER_BITS = 64
+
+# Transaction fields holding addresses or item ids
+KEY_FIELDS = ("sender", "recipient", "owner", "buyer", "seller", "data_id", "model_id")
+
+
+def hash_key(key: str) -> Tuple[int, int]:
+    """
+    The two 64 bit hashes of a key, every filter derives its bit positions from them
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but without false negatives
+    "key in filter" is False only if the key was never added, a True has to be checked
+    against the real data. Bit positions come from one BLAKE2b digest per key (enhanced double hashing).
+    """
+
+    __slots__ = ("size", "hash_count", "bits")
+
+    def __init__(self, size: int, hash_count: int, bits: bytes = None) -> None:
+        """
+        :param size: <int> number of bits
+        :param hash_count: <int> bit positions per key
+        :param bits: <bytes> content of an existing filter
+        """
+        if size < 1 or hash_count < 1:
+            raise ValueError("size and hash_count have to be positive")
+        self.size = size
+        self.hash_count = hash_count
+        self.bits = bytearray(bits) if bits is not None else bytearray((size + 7) // 8)
+        if len(self.bits) != (size + 7) // 8:
+            raise ValueError(f"A filter of {size} bits needs {(size + 7) // 8} bytes")
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE) -> "BloomFilter":
+        """
+        Filter sized for a number of keys
+        :param capacity: <int> expected number of keys
+        :param false_positive_rate: <float> target false positive rate, between 0 and 1
+        """
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate has to be between 0 and 1")
+        capacity = max(capacity, 1)
+        size = max(MIN_FILTER_BITS, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        # Optimal for the optimal size, larger minimum filters only get fewer false positives
+        hash_count = max(1, round(-math.log2(false_positive_rate)))
+        return cls(size, hash_count)
+
+    def _positions(self, key_hash: Tuple[int, int]):
+        # Enhanced double hashing, plain first + i * second repeats positions in small filters
+        size = self.size
+        position, step = key_hash[0] % size, key_hash[1] % size
+        for i in range(self.hash_count):
+            yield position
+            position = (position + step) % size
+            step = (step + i + 1) % size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(hash_key(key)):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return self.contains_hash(hash_key(key))
+
+    def contains_hash(self, key_hash: Tuple[int, int]) -> bool:
+        """
+        Membership test with a precomputed hash_key, one hash serves the filters of all blocks
+        """
+        # Same positions as _positions, inlined: this runs once per block in a scan
+        bits = self.bits
+        size = self.size
+        position, step = key_hash[0] % size, key_hash[1] % size
+        for i in range(self.hash_count):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                # Most blocks fail at the first probes
+                return False
+            position = (position + step) % size
+            step = (step + i + 1) % size
+        return True
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
+
+
+def transaction_keys(transaction) -> Set[str]:
+    """
+    Addresses and item ids of a transaction
+    Uploads add their transaction id, it is the id of the listed item.
+    """
+    keys = {transaction.get(key) for key in KEY_FIELDS}
+    if transaction.get("type") in ("data_upload", "model_upload"):
+        keys.add(transaction.get("transaction_id"))
+    keys.discard(None)
+    keys.discard("")
+    return keys
+
+
+def block_keys(block) -> Set[str]:
+    """
+    Addresses and item ids of all transactions of a block
+    """
+    keys = set()
+    for transaction in block.transactions:
+        keys |= transaction_keys(transaction)
+    return keys
+
+
+def block_filter(block, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE) -> BloomFilter:
+    """
+    Bloom filter over the addresses and item ids of a block
+    :param block: <Block>
+    :param false_positive_rate: <float> target false positive rate
+    :return: <BloomFilter>
+    """
+    keys = block_keys(block)
+    bloom = BloomFilter.for_capacity(len(keys), false_positive_rate)
+    for key in keys:
+        bloom.add(key)
+    return bloom
+
+
+def matches_any(bloom: BloomFilter, key_hashes: Iterable[Tuple[int, int]]) -> bool:
+    """
+    True if the filter may contain one of the keys
+    :param key_hashes: hash_key of every key
+    """
+    return any(bloom.contains_hash(key_hash) for key_hash in key_hashes)
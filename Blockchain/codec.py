@@ -0,0 +1,316 @@
+### Import Libraries ###
+import hashlib
+import json
+import re
+import struct
+from typing import Any, Dict, List, Tuple, Union
+
+from Blockchain.blockchain import Block, BLOCK_VERSION, HEADER_FORMAT
+from Blockchain.transactions import Transaction, TRANSACTION_TYPES
+
+# Binary block format
+# prefix:       magic, codec version, flags
+# header:       HEADER_FORMAT, the same bytes the block hash of version 2 blocks is taken over
+# [raw previous hash]  only with FLAG_RAW_PREVIOUS_HASH (e.g. "0" of the genesis block)
+# [seal]        only with FLAG_SEALED, varint length + UTF-8 (proof-of-authority blocks)
+# transactions: varint count, then per transaction a type code and its values
+MAGIC = b"MB"
+CODEC_VERSION = 1
+PREFIX_FORMAT = struct.Struct(">2sBB")
+
+# Flags keep the exact Python values, the JSON hash of legacy blocks depends on them
+FLAG_RAW_PREVIOUS_HASH = 0x01  # previous hash is not 64 hex characters
+FLAG_INT_TIMESTAMP = 0x02
+FLAG_INT_DIFFICULTY = 0x04
+FLAG_INT_MINING_TIME = 0x08
+FLAG_SEALED = 0x10
+
+# Transaction type codes, the fields follow in the order of the record's FIELDS
+TYPE_CODES = {
+    None: 0,
+    "data_upload": 1,
+    "model_upload": 2,
+    "data_purchase": 3,
+    "model_purchase": 4,
+}
+CODE_TYPES = {code: transaction_type for transaction_type, code in TYPE_CODES.items()}
+TYPE_DICT = 0xFF  # transaction without a known record type, stored as canonical JSON
+
+# Value tags
+TAG_STR = 0  # varint length + UTF-8
+TAG_HEX = 1  # byte length + raw bytes, for lowercase hex strings (ids, addresses, hashes)
+TAG_INT = 2  # zigzag varint
+TAG_FLOAT = 3  # 8 byte double
+TAG_JSON = 4  # varint length + canonical JSON (dicts, lists, bool, None)
+
+_HEX_PATTERN = re.compile(r"(?:[0-9a-f]{2}){1,255}")
+_DOUBLE = struct.Struct(">d")
+_HEX64_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class CodecError(ValueError):
+    """
+    Raised when bytes are not a valid encoded block or transaction
+    """
+
+
+# ---- Varints ----
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+# ---- Values ----
+
+def _write_str(out: bytearray, value: str) -> None:
+    if _HEX_PATTERN.fullmatch(value):
+        out.append(TAG_HEX)
+        out.append(len(value) // 2)
+        out += bytes.fromhex(value)
+    else:
+        encoded = value.encode()
+        out.append(TAG_STR)
+        _write_varint(out, len(encoded))
+        out += encoded
+
+
+def _write_int(out: bytearray, value: int) -> None:
+    out.append(TAG_INT)
+    _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+
+
+def _write_float(out: bytearray, value: float) -> None:
+    out.append(TAG_FLOAT)
+    out += _DOUBLE.pack(value)
+
+
+def _write_json(out: bytearray, value: Any) -> None:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    out.append(TAG_JSON)
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+# Exact type -> writer, bool is no int here and everything else (dict, list, None, subclasses) is JSON
+_WRITERS = {str: _write_str, int: _write_int, float: _write_float}
+
+
+def _write_value(out: bytearray, value: Any) -> None:
+    _WRITERS.get(type(value), _write_json)(out, value)
+
+
+def _read_hex(data: bytes, pos: int) -> Tuple[str, int]:
+    end = pos + 1 + data[pos]
+    return data[pos + 1:end].hex(), end
+
+
+def _read_str(data: bytes, pos: int) -> Tuple[str, int]:
+    length, pos = _read_varint(data, pos)
+    return data[pos:pos + length].decode(), pos + length
+
+
+def _read_int(data: bytes, pos: int) -> Tuple[int, int]:
+    value, pos = _read_varint(data, pos)
+    return (value >> 1) ^ -(value & 1), pos
+
+
+def _read_float(data: bytes, pos: int) -> Tuple[float, int]:
+    return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+
+
+def _read_json(data: bytes, pos: int) -> Tuple[Any, int]:
+    length, pos = _read_varint(data, pos)
+    return json.loads(data[pos:pos + length].decode()), pos + length
+
+
+# Indexed by the value tag
+_READERS = (_read_str, _read_hex, _read_int, _read_float, _read_json)
+
+
+def _read_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    if tag >= len(_READERS):
+        raise CodecError(f"Unknown value tag {tag}")
+    return _READERS[tag](data, pos + 1)
+
+
+# ---- Transactions ----
+
+def _write_transaction(out: bytearray, transaction: Union[Transaction, Dict]) -> None:
+    if isinstance(transaction, Transaction):
+        out.append(TYPE_CODES[transaction.TYPE])
+        for name in transaction.FIELDS:
+            _write_value(out, getattr(transaction, name))
+    else:
+        encoded = json.dumps(transaction, sort_keys=True, separators=(",", ":")).encode()
+        out.append(TYPE_DICT)
+        _write_varint(out, len(encoded))
+        out += encoded
+
+
+def _read_transaction(data: bytes, pos: int) -> Tuple[Union[Transaction, Dict], int]:
+    code = data[pos]
+    pos += 1
+    if code == TYPE_DICT:
+        length, pos = _read_varint(data, pos)
+        return json.loads(data[pos:pos + length].decode()), pos + length
+
+    if code not in CODE_TYPES:
+        raise CodecError(f"Unknown transaction type code {code}")
+    record_class = TRANSACTION_TYPES[CODE_TYPES[code]]
+    values = []
+    for _ in record_class.FIELDS:
+        value, pos = _read_value(data, pos)
+        values.append(value)
+    return record_class.from_values(values), pos
+
+
+def encode_transaction(transaction: Union[Transaction, Dict]) -> bytes:
+    """
+    Encodes a single transaction
+    :param transaction: typed record or plain dict
+    :return: <bytes> encoded transaction
+    """
+    out = bytearray()
+    _write_transaction(out, transaction)
+    return bytes(out)
+
+
+def decode_transaction(data: bytes) -> Union[Transaction, Dict]:
+    """
+    Decodes a transaction written by encode_transaction
+    """
+    try:
+        transaction, pos = _read_transaction(data, 0)
+    except (IndexError, UnicodeDecodeError, struct.error, json.JSONDecodeError) as e:
+        raise CodecError(f"Invalid encoded transaction: {e}") from e
+    if pos != len(data):
+        raise CodecError("Trailing bytes after transaction")
+    return transaction
+
+
+# ---- Blocks ----
+
+def encode_block(block: Block) -> bytes:
+    """
+    Encodes a block into the versioned binary format
+    The encoding is deterministic: the same block always gives the same bytes.
+    :param block: <Block> block to encode
+    :return: <bytes> encoded block
+    """
+    raw_previous_hash = not _HEX64_PATTERN.fullmatch(block.previous_hash)
+    flags = 0
+    if raw_previous_hash:
+        flags |= FLAG_RAW_PREVIOUS_HASH
+    if isinstance(block.timestamp, int):
+        flags |= FLAG_INT_TIMESTAMP
+    if isinstance(block.difficulty, int):
+        flags |= FLAG_INT_DIFFICULTY
+    if isinstance(block.mining_time, int):
+        flags |= FLAG_INT_MINING_TIME
+    if block.seal:
+        flags |= FLAG_SEALED
+
+    out = bytearray(PREFIX_FORMAT.pack(MAGIC, CODEC_VERSION, flags))
+    out += block.header_bytes()
+    if raw_previous_hash:
+        encoded = block.previous_hash.encode()
+        _write_varint(out, len(encoded))
+        out += encoded
+    if block.seal:
+        encoded = block.seal.encode()
+        _write_varint(out, len(encoded))
+        out += encoded
+
+    _write_varint(out, len(block.transactions))
+    for transaction in block.transactions:
+        _write_transaction(out, transaction)
+    return bytes(out)
+
+
+def decode_block(data: bytes) -> Block:
+    """
+    Decodes a block written by encode_block
+    The Merkle root is taken from the header, validate_block still checks it against the transactions.
+    :param data: <bytes> encoded block
+    :return: <Block> decoded block
+    :raises CodecError: if the data is no valid encoded block
+    """
+    try:
+        magic, codec_version, flags = PREFIX_FORMAT.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise CodecError("Data is not an encoded block")
+        if codec_version != CODEC_VERSION:
+            raise CodecError(f"Unsupported block codec version {codec_version}")
+
+        pos = PREFIX_FORMAT.size
+        header = data[pos:pos + HEADER_FORMAT.size]
+        (version, index, previous_hash, timestamp, merkle_root,
+         proof, difficulty, mining_time) = HEADER_FORMAT.unpack(header)
+        pos += HEADER_FORMAT.size
+
+        previous_hash = previous_hash.hex()
+        if flags & FLAG_RAW_PREVIOUS_HASH:
+            length, pos = _read_varint(data, pos)
+            previous_hash = data[pos:pos + length].decode()
+            pos += length
+
+        seal = ""
+        if flags & FLAG_SEALED:
+            length, pos = _read_varint(data, pos)
+            seal = data[pos:pos + length].decode()
+            pos += length
+
+        count, pos = _read_varint(data, pos)
+        transactions: List = []
+        for _ in range(count):
+            transaction, pos = _read_transaction(data, pos)
+            transactions.append(transaction)
+    except (IndexError, UnicodeDecodeError, struct.error, json.JSONDecodeError) as e:
+        raise CodecError(f"Invalid encoded block: {e}") from e
+
+    if pos != len(data):
+        raise CodecError("Trailing bytes after block")
+
+    return Block(
+        index=index,
+        previous_hash=previous_hash,
+        timestamp=int(timestamp) if flags & FLAG_INT_TIMESTAMP else timestamp,
+        transactions=transactions,
+        proof=proof,
+        difficulty=int(difficulty) if flags & FLAG_INT_DIFFICULTY else difficulty,
+        mining_time=int(mining_time) if flags & FLAG_INT_MINING_TIME else mining_time,
+        # The header is already packed, version 2 hashes need no second packing
+        hash=hashlib.sha256(header).hexdigest() if version == BLOCK_VERSION else None,
+        merkle_root=merkle_root.hex(),
+        version=version,
+        seal=seal,
+    )
+
+
+def encoded_block_hash(data: bytes) -> str:
+    """
+    Hash of an encoded version 2 block without decoding the transactions
+    :param data: <bytes> encoded block
+    :return: <str> SHA-256 hash of the header
+    """
+    start = PREFIX_FORMAT.size
+    version = struct.unpack_from(">H", data, start)[0]
+    if version != BLOCK_VERSION:
+        raise CodecError("Only version 2 blocks are hashed over their header")
+    return hashlib.sha256(data[start:start + HEADER_FORMAT.size]).hexdigest()
@@ -0,0 +1,155 @@
+### Import Libraries ###
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from Blockchain.mining import MiningResult
+from Blockchain.proof import valid_proof
+from Blockchain.signatures import public_key_hex, sign_bytes, verify_bytes
+
+# Names of the engines, e.g. for the configuration of a node
+CONSENSUS_POW = "pow"
+CONSENSUS_POA = "poa"
+
+# Seal of a proof-of-authority block: "<public key>:<signature of the block hash>"
+SEAL_SEPARATOR = ":"
+
+
+class ConsensusError(ValueError):
+    """
+    Raised when a node can't produce a block with its consensus engine
+    """
+
+
+class ConsensusEngine:
+    """
+    Rules for producing and accepting blocks
+    Blockchain.mine_block asks prepare_block for the proof fields of the next block
+    (without holding the chain lock), make_block passes the new block through seal_block
+    and the validation checks every block and header with verify_header.
+    """
+
+    name: str = None
+
+    def prepare_block(self, blockchain, last_block, difficulty: float = None,
+                      progress: Callable[[int, float], None] = None) -> Tuple[int, float, float]:
+        """
+        Proof fields of the block after last_block
+        Every engine leaves the stats of its work in blockchain.last_mining_result
+        :param blockchain: <Blockchain> the chain the block is produced for
+        :param last_block: <Block> current tip
+        :param difficulty: <float> requested difficulty, None = engine default
+        :param progress: called with (attempts so far, seconds elapsed) during a search
+        :return: <tuple> (proof, difficulty, mining time in seconds)
+        """
+        raise NotImplementedError
+
+    def seal_block(self, block):
+        """
+        Finishes a new block before it is added to the chain
+        :param block: <Block> block built from the fields of prepare_block
+        :return: <Block> the block to add
+        """
+        return block
+
+    def verify_header(self, header, previous_header) -> bool:
+        """
+        Checks the consensus part of a block or header against its predecessor
+        :param header: <Block> or <BlockHeader>
+        :param previous_header: <Block> or <BlockHeader> before it
+        :return: True if valid False otherwise
+        """
+        raise NotImplementedError
+
+
+class ProofOfWork(ConsensusEngine):
+    """
+    The PoW of the chain: hash(last proof, proof) needs 'difficulty' leading zeros
+    """
+
+    name = CONSENSUS_POW
+
+    def prepare_block(self, blockchain, last_block, difficulty: float = None,
+                      progress: Callable[[int, float], None] = None) -> Tuple[int, float, float]:
+        block_difficulty = blockchain.next_difficulty() if difficulty is None else difficulty
+        # Through the blockchain, it keeps the stats of the search in last_mining_result
+        proof, mining_time = blockchain.proof_of_work(last_block.proof, block_difficulty, progress)
+        return proof, block_difficulty, mining_time
+
+    def verify_header(self, header, previous_header) -> bool:
+        return valid_proof(previous_header.proof, header.proof, header.difficulty)
+
+
+def seal_signer(header) -> Optional[str]:
+    """
+    Public key of the authority which sealed a block
+    :param header: <Block> or <BlockHeader>
+    :return: <str> hex public key or None for unsealed blocks
+    """
+    signer, separator, _ = (header.seal or "").partition(SEAL_SEPARATOR)
+    return signer if separator else None
+
+
+class ProofOfAuthority(ConsensusEngine):
+    """
+    Blocks are signed by one of a fixed set of authority keys instead of searching a PoW
+    The seal is the Ed25519 signature of the block hash with the public key of the signer.
+    It is stored with the block but not covered by the hash, the hash already covers everything it vouches for.
+    Blocks before transition_height are checked as PoW blocks, so a chain can switch to PoA.
+    Nodes without an authority key validate and sync but can't produce blocks.
+    """
+
+    name = CONSENSUS_POA
+
+    def __init__(self, authorities: Iterable[str], private_key: Ed25519PrivateKey = None,
+                 transition_height: int = 0) -> None:
+        """
+        :param authorities: hex public keys allowed to seal blocks
+        :param private_key: Ed25519 key of this node (default: validate only)
+        :param transition_height: <int> index of the first sealed block
+        """
+        self.authorities = frozenset(authorities)
+        if not self.authorities:
+            raise ConsensusError("Proof of authority needs at least one authority")
+        self.private_key = private_key
+        self.public_key = public_key_hex(private_key) if private_key is not None else None
+        if self.public_key is not None and self.public_key not in self.authorities:
+            raise ConsensusError("The key of this node is not one of the authorities")
+        self.transition_height = transition_height
+        self._proof_of_work = ProofOfWork()
+
+    def __getstate__(self) -> Dict:
+        # Sent to the processes of the parallel chain validation, they only verify
+        state = self.__dict__.copy()
+        state["private_key"] = None
+        return state
+
+    def prepare_block(self, blockchain, last_block, difficulty: float = None,
+                      progress: Callable[[int, float], None] = None) -> Tuple[int, float, float]:
+        start = time.perf_counter()
+        if self.private_key is None:
+            raise ConsensusError("This node has no authority key and can't seal blocks")
+        if last_block.index + 1 < self.transition_height:
+            raise ConsensusError(f"Blocks before {self.transition_height} have to be mined with proof of work")
+        # Nothing to search, the block is signed in seal_block
+        blockchain.last_mining_result = MiningResult(proof=0, time_taken=time.perf_counter() - start,
+                                                     attempts=0, workers=0)
+        return 0, 0, 0.0
+
+    def seal_block(self, block):
+        signature = sign_bytes(bytes.fromhex(block.hash), self.private_key)
+        return block.with_seal(f"{self.public_key}{SEAL_SEPARATOR}{signature}")
+
+    def verify_header(self, header, previous_header) -> bool:
+        if header.index < self.transition_height:
+            return self._proof_of_work.verify_header(header, previous_header)
+
+        signer = seal_signer(header)
+        if signer not in self.authorities:
+            return False
+        try:
+            block_hash = bytes.fromhex(header.hash)
+        except (ValueError, TypeError):
+            return False
+        return verify_bytes(block_hash, header.seal.partition(SEAL_SEPARATOR)[2], signer)
@@ -0,0 +1,165 @@
+### Import Libraries ###
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from Blockchain.proof import BITS_PER_NIBBLE, MAX_DIFFICULTY
+
+# Block interval the retargeting aims for, in seconds
+TARGET_BLOCK_TIME = 5.0
+# Number of recent blocks the hash rate is estimated from
+RETARGET_WINDOW = 10
+# Blocks searched for the window, as a multiple of the window (blocks without mining time are skipped)
+RETARGET_LOOKBACK = 4
+# Used as long as there is no block with a mining time yet
+INITIAL_DIFFICULTY = 4.0
+MIN_DIFFICULTY = 1.0
+MAX_RETARGET_DIFFICULTY = 6.0
+# Largest change per block in hex zeros (1.0 = 16 times more or less work)
+MAX_ADJUSTMENT = 1.0
+# Difficulties are multiples of one leading zero bit
+DIFFICULTY_STEP = 1 / BITS_PER_NIBBLE
+
+
+def expected_attempts(difficulty: float) -> float:
+    """
+    Expected number of hashes to find a proof (2 ** leading zero bits)
+    :param difficulty: <float> number of leading hex zeros
+    """
+    return 16.0 ** difficulty
+
+
+def chain_work(blocks: Iterable) -> float:
+    """
+    Cumulative expected work of blocks or headers, chains are compared by it instead of their length
+    A long chain of cheap blocks does not outweigh a shorter one that took more hashes.
+    """
+    return sum(expected_attempts(block.difficulty) for block in blocks)
+
+
+@dataclass
+class SimulatedBlock:
+    """
+    Minimal block for the simulation, has the fields the retargeter reads
+    """
+    index: int
+    difficulty: float
+    mining_time: float
+
+
+class DifficultyRetargeter:
+    """
+    Computes the difficulty of the next block from the recent block times
+    The hash rate is estimated over a moving window as expected work / mining time,
+    the next difficulty is the one whose expected work takes target_block_time at that rate.
+    The change per block is limited and the result is rounded to whole zero bits.
+    """
+
+    def __init__(self, target_block_time: float = TARGET_BLOCK_TIME, window: int = RETARGET_WINDOW,
+                 initial_difficulty: float = INITIAL_DIFFICULTY, min_difficulty: float = MIN_DIFFICULTY,
+                 max_difficulty: float = MAX_RETARGET_DIFFICULTY, max_adjustment: float = MAX_ADJUSTMENT,
+                 lookback: int = None) -> None:
+        """
+        :param lookback: <int> most recent blocks searched for the window (default: RETARGET_LOOKBACK * window)
+        """
+        if target_block_time <= 0 or window < 1:
+            raise ValueError("target_block_time and window have to be positive")
+        if not 0 <= min_difficulty <= max_difficulty <= MAX_DIFFICULTY:
+            raise ValueError(f"Difficulty bounds have to be within 0 and {MAX_DIFFICULTY}")
+
+        self.target_block_time = target_block_time
+        self.window = window
+        self.initial_difficulty = initial_difficulty
+        self.min_difficulty = min_difficulty
+        self.max_difficulty = max_difficulty
+        self.max_adjustment = max_adjustment
+        self.lookback = max(lookback or RETARGET_LOOKBACK * window, window)
+
+    def quantize(self, difficulty: float) -> float:
+        """
+        Rounds a difficulty to whole zero bits and clamps it to the bounds
+        """
+        difficulty = round(difficulty / DIFFICULTY_STEP) * DIFFICULTY_STEP
+        return min(max(difficulty, self.min_difficulty), self.max_difficulty)
+
+    def window_samples(self, chain: Sequence) -> List[Tuple[float, float]]:
+        """
+        (difficulty, mining_time) of the recent blocks which have a mining time
+        The genesis block and blocks restored without mining time are skipped.
+        Only the last lookback blocks are read: PoA blocks and restored blocks have no mining time,
+        and walking the whole chain would load every block of a lazy chain.
+        """
+        samples = []
+        for position in range(len(chain) - 1, max(len(chain) - 1 - self.lookback, -1), -1):
+            if len(samples) >= self.window:
+                break
+            block = chain[position]
+            mining_time = getattr(block, "mining_time", None)
+            if block.index > 0 and mining_time and mining_time > 0:
+                samples.append((float(block.difficulty), float(mining_time)))
+        samples.reverse()
+        return samples
+
+    def estimate_hash_rate(self, chain: Sequence) -> Optional[float]:
+        """
+        Hash rate over the window in hashes per second (None without samples)
+        """
+        return self._hash_rate(self.window_samples(chain))
+
+    @staticmethod
+    def _hash_rate(samples: List[Tuple[float, float]]) -> Optional[float]:
+        if not samples:
+            return None
+        work = sum(expected_attempts(difficulty) for difficulty, _ in samples)
+        return work / sum(mining_time for _, mining_time in samples)
+
+    def next_difficulty(self, chain: Sequence) -> float:
+        """
+        Difficulty for the block after the given chain
+        :param chain: <list> blocks, oldest first
+        :return: <float> difficulty in hex zeros, a multiple of 0.25
+        """
+        samples = self.window_samples(chain)
+        if not samples:
+            return self.quantize(self.initial_difficulty)
+
+        hash_rate = self._hash_rate(samples)
+        ideal = math.log(hash_rate * self.target_block_time, 16)
+
+        # Limit the step relative to the last block, one outlier must not swing the difficulty
+        last_difficulty = samples[-1][0]
+        ideal = min(max(ideal, last_difficulty - self.max_adjustment), last_difficulty + self.max_adjustment)
+        return self.quantize(ideal)
+
+
+def simulate(history: Sequence[Tuple[float, float]], retargeter: DifficultyRetargeter) -> List[Dict]:
+    """
+    Replays a chain history with the retargeter
+    Every historic block gives the hash rate of its miner (expected work / mining time).
+    The simulated block is mined with the retargeted difficulty at that hash rate,
+    so its time scales with the expected work of the new difficulty.
+    :param history: <list> (difficulty, mining_time) of the blocks after the genesis block
+    :param retargeter: engine to test
+    :return: <list> per block: historic and simulated difficulty and time
+    """
+    simulated_chain = [SimulatedBlock(index=0, difficulty=0.0, mining_time=0.0)]
+    results = []
+
+    for index, (difficulty, mining_time) in enumerate(history, start=1):
+        if not mining_time or mining_time <= 0:
+            continue
+        hash_rate = expected_attempts(difficulty) / mining_time
+
+        next_difficulty = retargeter.next_difficulty(simulated_chain)
+        simulated_time = expected_attempts(next_difficulty) / hash_rate
+        simulated_chain.append(SimulatedBlock(index=index, difficulty=next_difficulty, mining_time=simulated_time))
+
+        results.append({
+            "index": index,
+            "historic_difficulty": difficulty,
+            "historic_time": mining_time,
+            "difficulty": next_difficulty,
+            "time": simulated_time,
+        })
+
+    return results
@@ -0,0 +1,85 @@
+### Import Libraries ###
+import hashlib
+import struct
+from typing import Any, Dict
+
+# Block header versions
+LEGACY_BLOCK_VERSION = 1  # hash over the JSON of the whole block
+BLOCK_VERSION = 2  # hash over the fixed-size header with Merkle root
+
+# version, index, previous hash, timestamp, merkle root, proof, difficulty, mining time
+HEADER_FORMAT = struct.Struct(">HQ32sd32sQdd")
+
+
+def pack_header(header) -> bytes:
+    """
+    Packs the header fields of a Block or BlockHeader into HEADER_FORMAT
+    :param header: object with the header attributes
+    :return: <bytes> packed header
+    """
+    return HEADER_FORMAT.pack(
+        header.version,
+        header.index,
+        bytes.fromhex(header.previous_hash.rjust(64, "0")),  # Genesis has "0"
+        header.timestamp,
+        bytes.fromhex(header.merkle_root),
+        header.proof,
+        header.difficulty,
+        header.mining_time,
+    )
+
+
+class BlockHeader:
+    """
+    Header of a block without its transactions
+    Used to check a chain (links, PoW, header hash) before the block bodies are downloaded.
+    The hash of a legacy block covers its transactions, so it can only be checked with the body.
+    The seal of a proof-of-authority block is not part of the hash, it is carried along for the header checks.
+    """
+
+    __slots__ = ("index", "previous_hash", "timestamp", "merkle_root", "proof", "difficulty",
+                 "mining_time", "version", "hash", "transaction_count", "seal")
+
+    FIELDS = __slots__
+
+    def __init__(self, index: int, previous_hash: str, timestamp: float, merkle_root: str, proof: int,
+                 difficulty: float, mining_time: float, version: int, hash: str, transaction_count: int,
+                 seal: str = "") -> None:
+        self.index = index
+        self.previous_hash = previous_hash
+        self.timestamp = timestamp
+        self.merkle_root = merkle_root
+        self.proof = proof
+        self.difficulty = difficulty
+        self.mining_time = mining_time
+        self.version = version
+        self.hash = hash
+        self.transaction_count = transaction_count
+        self.seal = seal
+
+    @classmethod
+    def from_block(cls, block) -> "BlockHeader":
+        return cls(block.index, block.previous_hash, block.timestamp, block.merkle_root, block.proof,
+                   block.difficulty, block.mining_time, block.version, block.hash, len(block.transactions),
+                   block.seal)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BlockHeader":
+        """
+        :raises KeyError: if a header field is missing (the seal is optional)
+        """
+        return cls(**{field: data[field] for field in cls.FIELDS if field != "seal"}, seal=data.get("seal", ""))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def hash_matches(self) -> bool:
+        """
+        Checks the hash of a version 2 header, legacy hashes need the transactions and pass here
+        """
+        if self.version == LEGACY_BLOCK_VERSION:
+            return True
+        try:
+            return hashlib.sha256(pack_header(self)).hexdigest() == self.hash
+        except (ValueError, TypeError, struct.error):
+            return False
@@ -0,0 +1,161 @@
+### Import Libraries ###
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Iterator, List, Union
+
+from Blockchain.header import BlockHeader
+
+# Block bodies kept in memory by default
+BLOCK_CACHE_SIZE = 256
+# Blocks loaded per storage query while iterating
+LOAD_WINDOW = 64
+
+
+class MissingBlockError(LookupError):
+    """
+    Raised when the storage can't deliver a block body matching its header
+    """
+
+
+class LazyChain:
+    """
+    Chain which keeps only the headers in memory and loads the blocks on demand
+    Supports the list operations the blockchain code uses: len, chain[i], slices,
+    iteration, append, extend, pop and clear. chain[i] returns the full Block.
+    Recently used blocks stay in a bounded LRU cache, every other body is read
+    through load_blocks(start, end) from the storage and checked against its header.
+    Blocks which are appended have to be in the storage before they drop out of the cache.
+    """
+
+    def __init__(self, load_blocks: Callable[[int, int], List], cache_size: int = BLOCK_CACHE_SIZE,
+                 blocks: Iterable = ()) -> None:
+        """
+        :param load_blocks: returns the stored blocks with index start <= index < end, in order
+        :param cache_size: <int> number of block bodies kept in memory
+        :param blocks: initial blocks
+        """
+        if cache_size < 1:
+            raise ValueError("cache_size has to be at least 1")
+        self.load_blocks = load_blocks
+        self.cache_size = cache_size
+        self._headers: List[BlockHeader] = []
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.extend(blocks)
+
+    # ---- List interface ----
+
+    def __len__(self) -> int:
+        return len(self._headers)
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[Any, List]:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self._headers))
+            if step != 1:
+                return [self._get(index) for index in range(start, stop, step)]
+            return self._get_range(start, stop)
+
+        index = item + len(self._headers) if item < 0 else item
+        if not 0 <= index < len(self._headers):
+            raise IndexError("chain index out of range")
+        return self._get(index)
+
+    def __iter__(self) -> Iterator:
+        # Window by window, a full iteration needs one storage query per window
+        for start in range(0, len(self._headers), LOAD_WINDOW):
+            yield from self._get_range(start, min(start + LOAD_WINDOW, len(self._headers)))
+
+    def __reversed__(self) -> Iterator:
+        for index in range(len(self._headers) - 1, -1, -1):
+            yield self._get(index)
+
+    def append(self, block) -> None:
+        """
+        Adds a block, it stays in the cache until newer blocks push it out
+        """
+        with self._lock:
+            if block.index != len(self._headers):
+                raise ValueError(f"Block {block.index} can't follow block {len(self._headers) - 1}")
+            self._headers.append(BlockHeader.from_block(block))
+            self._remember(block.index, block)
+
+    def extend(self, blocks: Iterable) -> None:
+        for block in blocks:
+            self.append(block)
+
+    def pop(self, index: int = -1):
+        """
+        Removes the last block (only the tip can be removed)
+        """
+        with self._lock:
+            if index not in (-1, len(self._headers) - 1):
+                raise IndexError("Only the last block can be removed")
+            block = self._get(len(self._headers) - 1)
+            self._headers.pop()
+            self._cache.pop(block.index, None)
+            return block
+
+    def clear(self) -> None:
+        with self._lock:
+            self._headers.clear()
+            self._cache.clear()
+
+    # ---- Headers and cache ----
+
+    @property
+    def headers(self) -> List[BlockHeader]:
+        """
+        The in-memory headers, read only
+        """
+        return self._headers
+
+    def header(self, index: int) -> BlockHeader:
+        return self._headers[index]
+
+    def cached_blocks(self) -> int:
+        return len(self._cache)
+
+    def cache_info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self._cache), "size": self.cache_size}
+
+    def _remember(self, index: int, block) -> None:
+        self._cache[index] = block
+        self._cache.move_to_end(index)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _get(self, index: int):
+        with self._lock:
+            block = self._cache.get(index)
+            if block is not None:
+                self.hits += 1
+                self._cache.move_to_end(index)
+                return block
+        return self._get_range(index, index + 1)[0]
+
+    def _get_range(self, start: int, stop: int) -> List:
+        """
+        Blocks start <= index < stop, the missing ones are loaded with one storage query
+        """
+        if start >= stop:
+            return []
+        with self._lock:
+            blocks: List = [self._cache.get(index) for index in range(start, stop)]
+            missing = [offset for offset, block in enumerate(blocks) if block is None]
+            self.hits += len(blocks) - len(missing)
+            if missing:
+                self.misses += len(missing)
+                first, last = start + missing[0], start + missing[-1]
+                loaded = {block.index: block for block in self.load_blocks(first, last + 1)}
+                for offset in missing:
+                    index = start + offset
+                    block = loaded.get(index)
+                    if block is None or block.hash != self._headers[index].hash:
+                        raise MissingBlockError(f"Block {index} is not in the storage or does not match its header")
+                    blocks[offset] = block
+
+            for index in range(start, stop):
+                self._remember(index, blocks[index - start])
+            return blocks
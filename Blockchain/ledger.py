@@ -0,0 +1,134 @@
+### Import Libraries ###
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# Purchase transaction type -> field holding the item id
+PURCHASE_ITEM_FIELDS = {
+    "data_purchase": "data_id",
+    "model_purchase": "model_id",
+}
+
+
+def purchased_item_id(transaction: Dict) -> Optional[str]:
+    """
+    Item id of a purchase transaction
+    :param transaction: transaction or typed record
+    :return: data_id / model_id or None if it is no purchase
+    """
+    field = PURCHASE_ITEM_FIELDS.get(transaction.get("type"))
+    return transaction.get(field) if field else None
+
+
+class PurchaseLedger:
+    """
+    Confirmed purchases of the marketplace
+    item_id -> set of buyers answers "has X bought Y" in O(1),
+    buyer -> purchases lists everything a user bought without scanning the chain.
+    The ledger is updated per block when the block is added to the chain.
+    """
+
+    def __init__(self) -> None:
+        # item_id -> buyers
+        self._buyers: Dict[str, set] = {}
+        # buyer -> {transaction_id: (block_index, purchase transaction)} in chain order
+        self._purchases: Dict[str, Dict[str, Tuple[int, Dict]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(purchases) for purchases in self._purchases.values())
+
+    def record(self, transaction: Dict, block_index: int) -> bool:
+        """
+        Records one confirmed transaction, everything except purchases is ignored
+        :param transaction: transaction of a block
+        :param block_index: index of the block
+        :return: True if the buyer did not own the item before
+        """
+        item_id = purchased_item_id(transaction)
+        if item_id is None:
+            return False
+
+        buyer = transaction.get("buyer")
+        self._purchases.setdefault(buyer, {})[transaction.get("transaction_id")] = (block_index, transaction)
+
+        buyers = self._buyers.setdefault(item_id, set())
+        if buyer in buyers:
+            return False
+        buyers.add(buyer)
+        return True
+
+    def remove(self, transaction: Dict) -> None:
+        """
+        Removes a purchase again, e.g. when its block is discarded
+        The buyer keeps the item if another confirmed purchase of it remains.
+        """
+        item_id = purchased_item_id(transaction)
+        buyer = transaction.get("buyer")
+        purchases = self._purchases.get(buyer)
+        if item_id is None or not purchases or purchases.pop(transaction.get("transaction_id"), None) is None:
+            return
+        if not purchases:
+            del self._purchases[buyer]
+        elif any(purchased_item_id(other) == item_id for _, other in purchases.values()):
+            return
+
+        buyers = self._buyers.get(item_id)
+        if buyers is not None:
+            buyers.discard(buyer)
+            if not buyers:
+                del self._buyers[item_id]
+
+    def record_block(self, block) -> None:
+        """
+        Records all purchases of a newly added block
+        :param block: <Block> Block in the chain
+        """
+        for transaction in block.transactions:
+            self.record(transaction, block.index)
+
+    def has_purchased(self, buyer: str, item_id: str) -> bool:
+        """
+        Has the buyer a confirmed purchase of the item
+        """
+        buyers = self._buyers.get(item_id)
+        return buyers is not None and buyer in buyers
+
+    def has_purchased_before(self, buyer: str, item_id: str, height: int) -> bool:
+        """
+        Has the buyer a confirmed purchase of the item in one of the blocks below height
+        """
+        return any(block_index < height and purchased_item_id(transaction) == item_id
+                   for block_index, transaction in self._purchases.get(buyer, {}).values())
+
+    def buyers(self, item_id: str) -> FrozenSet[str]:
+        """
+        All buyers of an item
+        """
+        return frozenset(self._buyers.get(item_id, ()))
+
+    def items(self, buyer: str) -> List[str]:
+        """
+        Ids of all items bought by a buyer (each item once, in purchase order)
+        """
+        items = {}
+        for _, transaction in self._purchases.get(buyer, {}).values():
+            items[purchased_item_id(transaction)] = True
+        return list(items)
+
+    def purchases(self, buyer: str) -> List[Tuple[int, Dict]]:
+        """
+        All confirmed purchase transactions of a buyer in chain order
+        :return: list of (block_index, purchase transaction)
+        """
+        return list(self._purchases.get(buyer, {}).values())
+
+    def all_purchases(self) -> List[Tuple[int, Dict]]:
+        """
+        Confirmed purchases of all buyers as (block_index, purchase transaction)
+        """
+        return [purchase for purchases in self._purchases.values() for purchase in purchases.values()]
+
+    def purchase_count(self, buyer: str) -> int:
+        return len(self._purchases.get(buyer, ()))
+
+    def clear(self) -> None:
+        self._buyers.clear()
+        self._purchases.clear()
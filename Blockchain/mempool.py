@@ -0,0 +1,218 @@
+### Import Libraries ###
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from Blockchain.transactions import canonical_bytes
+
+# Default number of pending transactions
+DEFAULT_CAPACITY = 50_000
+
+# What happens when a transaction arrives at a full mempool
+EVICT_REJECT = "reject"  # the new transaction is refused
+EVICT_OLDEST = "oldest"  # the oldest pending transaction is dropped
+
+# Transaction fields holding an address, used for the per-address index
+ADDRESS_FIELDS = ("sender", "recipient", "owner", "buyer", "seller")
+
+
+class MempoolFullError(ValueError):
+    """
+    Raised when a transaction is refused because the mempool is full
+    """
+
+
+class Mempool:
+    """
+    Pool of the pending transactions
+    Transactions are stored in arrival order and deduplicated by their transaction_id.
+    Secondary indexes by type and by address keep lookups like
+    "pending purchases of this buyer" independent of the pool size.
+    Removing the transactions of a mined block costs O(transactions in the block).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, eviction: str = EVICT_REJECT,
+                 on_evict: Callable[[Dict], None] = None) -> None:
+        """
+        :param capacity: <int> maximum number of pending transactions
+        :param eviction: <str> EVICT_REJECT or EVICT_OLDEST
+        :param on_evict: called with every transaction dropped by the eviction
+        """
+        if eviction not in (EVICT_REJECT, EVICT_OLDEST):
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+
+        self.capacity = capacity
+        self.eviction = eviction
+        self.on_evict = on_evict
+        self.evicted_count = 0
+
+        # transaction_id -> transaction, dicts keep the insertion order (= arrival order)
+        self._transactions: Dict[str, Dict] = {}
+        # type (None for transfers) -> {transaction_id: transaction}
+        self._by_type: Dict[Optional[str], Dict[str, Dict]] = {}
+        # address -> {transaction_id: transaction}
+        self._by_address: Dict[str, Dict[str, Dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self._transactions)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(list(self._transactions.values()))
+
+    def __contains__(self, transaction_id: str) -> bool:
+        return transaction_id in self._transactions
+
+    def add(self, transaction: Dict) -> bool:
+        """
+        Adds a pending transaction
+        :param transaction: transaction with a transaction_id
+        :return: True if added, False if a transaction with that id is already pending
+        :raises MempoolFullError: if the mempool is full and the policy is EVICT_REJECT
+        """
+        transaction_id = transaction.get("transaction_id")
+        if not transaction_id:
+            raise ValueError("Transaction without transaction_id can't be added to the mempool")
+        if transaction_id in self._transactions:
+            return False
+
+        if len(self._transactions) >= self.capacity:
+            if self.eviction == EVICT_REJECT or not self._transactions:
+                raise MempoolFullError(f"Mempool is full ({self.capacity} pending transactions)")
+            oldest = next(iter(self._transactions.values()))
+            self._remove(oldest["transaction_id"])
+            self.evicted_count += 1
+            if self.on_evict is not None:
+                self.on_evict(oldest)
+
+        self._transactions[transaction_id] = transaction
+        self._by_type.setdefault(transaction.get("type"), {})[transaction_id] = transaction
+        for address in self._addresses(transaction):
+            self._by_address.setdefault(address, {})[transaction_id] = transaction
+        return True
+
+    def add_many(self, transactions: Iterable[Dict]) -> int:
+        """
+        Adds several pending transactions at once (e.g. a bulk upload)
+        With EVICT_REJECT either all new transactions fit or none is added.
+        :param transactions: transactions with a transaction_id
+        :return: number of added transactions, already pending ones are skipped
+        :raises MempoolFullError: if the new transactions don't fit and the policy is EVICT_REJECT
+        """
+        new: Dict[str, Dict] = {}
+        for transaction in transactions:
+            transaction_id = transaction.get("transaction_id")
+            if not transaction_id:
+                raise ValueError("Transaction without transaction_id can't be added to the mempool")
+            if transaction_id not in self._transactions:
+                new.setdefault(transaction_id, transaction)
+
+        if self.eviction == EVICT_REJECT and len(self._transactions) + len(new) > self.capacity:
+            raise MempoolFullError(f"Mempool can't take {len(new)} more transactions "
+                                   f"({len(self._transactions)} of {self.capacity} pending)")
+        for transaction in new.values():
+            self.add(transaction)
+        return len(new)
+
+    def get(self, transaction_id: str) -> Optional[Dict]:
+        """
+        Returns a pending transaction by its id
+        """
+        return self._transactions.get(transaction_id)
+
+    def by_type(self, transaction_type: Optional[str]) -> List[Dict]:
+        """
+        Pending transactions of one type in arrival order
+        :param transaction_type: e.g. "data_purchase", None for plain transfers
+        """
+        return list(self._by_type.get(transaction_type, {}).values())
+
+    def by_address(self, address: str, types: Iterable[Optional[str]] = None) -> List[Dict]:
+        """
+        Pending transactions in which an address takes part (sender, recipient, owner, buyer or seller)
+        :param address: blockchain address
+        :param types: only return these transaction types (optional)
+        """
+        transactions = self._by_address.get(address, {}).values()
+        if types is None:
+            return list(transactions)
+        types = set(types)
+        return [transaction for transaction in transactions if transaction.get("type") in types]
+
+    def ordered(self, limit: int = None) -> List[Dict]:
+        """
+        Pending transactions in the order they are included into blocks (arrival order)
+        :param limit: maximum number of transactions (default: all)
+        """
+        if limit is None:
+            return list(self._transactions.values())
+        transactions = []
+        for transaction in self._transactions.values():
+            if len(transactions) >= limit:
+                break
+            transactions.append(transaction)
+        return transactions
+
+    def select(self, max_transactions: int = None, max_bytes: int = None) -> List[Dict]:
+        """
+        Takes the next transactions for a block in inclusion order, without removing them
+        Selection stops at the first transaction which does not fit anymore, so the
+        arrival order (e.g. upload before purchase) is kept across blocks.
+        A single transaction larger than max_bytes is returned alone, otherwise it would block the pool.
+        :param max_transactions: maximum number of transactions (default: unlimited)
+        :param max_bytes: maximum serialized size, every transaction counts with one separator byte
+        :return: list of transactions
+        """
+        selected = []
+        used_bytes = 0
+        for transaction in self._transactions.values():
+            if max_transactions is not None and len(selected) >= max_transactions:
+                break
+            if max_bytes is not None:
+                size = len(canonical_bytes(transaction)) + 1
+                if selected and used_bytes + size > max_bytes:
+                    break
+                used_bytes += size
+            selected.append(transaction)
+        return selected
+
+    def remove(self, transaction_ids: Iterable[str]) -> int:
+        """
+        Removes transactions by id, unknown ids are ignored
+        :return: number of removed transactions
+        """
+        return sum(self._remove(transaction_id) for transaction_id in transaction_ids)
+
+    def remove_confirmed(self, block) -> int:
+        """
+        Removes all transactions which were included in a block
+        :param block: <Block> newly added block
+        :return: number of removed transactions
+        """
+        return self.remove(transaction.get("transaction_id") for transaction in block.transactions)
+
+    def clear(self) -> None:
+        self._transactions.clear()
+        self._by_type.clear()
+        self._by_address.clear()
+
+    def _remove(self, transaction_id: str) -> bool:
+        transaction = self._transactions.pop(transaction_id, None)
+        if transaction is None:
+            return False
+
+        transaction_type = transaction.get("type")
+        self._discard(self._by_type, transaction_type, transaction_id)
+        for address in self._addresses(transaction):
+            self._discard(self._by_address, address, transaction_id)
+        return True
+
+    @staticmethod
+    def _discard(index: Dict, key, transaction_id: str) -> None:
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(transaction_id, None)
+            if not bucket:
+                del index[key]
+
+    @staticmethod
+    def _addresses(transaction: Dict) -> set:
+        return {transaction[field] for field in ADDRESS_FIELDS
+                if field in transaction and isinstance(transaction[field], str)}
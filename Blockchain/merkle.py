@@ -0,0 +1,89 @@
+### Import Libraries ###
+import hashlib
+from typing import List, Dict
+
+from Blockchain.transactions import canonical_bytes
+
+# Domain separation between leaves and inner nodes (RFC 6962)
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def transaction_hash(transaction: Dict) -> bytes:
+    """
+    Hashes one transaction for the Merkle tree
+    :param transaction: <dict> transaction or typed record
+    :return: <bytes> SHA-256 leaf hash
+    """
+    return hashlib.sha256(LEAF_PREFIX + canonical_bytes(transaction)).digest()
+
+
+def _hash_pair(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _next_level(level: List[bytes]) -> List[bytes]:
+    """
+    Combines a level of the tree pairwise, an odd last node is paired with itself
+    """
+    if len(level) % 2 == 1:
+        level = level + [level[-1]]
+    return [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    """
+    Calculates the Merkle root of a list of leaf hashes
+    :param leaves: <list> leaf hashes
+    :return: <bytes> root hash (hash of the empty string for no leaves)
+    """
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+
+    level = list(leaves)
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def merkle_proof(leaves: List[bytes], position: int) -> List[Dict[str, str]]:
+    """
+    Creates the inclusion proof of one leaf
+    :param leaves: <list> leaf hashes of the block
+    :param position: <int> position of the leaf
+    :return: <list> sibling hashes from the leaf up to the root, each with its side
+    """
+    if position < 0 or position >= len(leaves):
+        raise IndexError(f"Position {position} not in block with {len(leaves)} transactions")
+
+    path = []
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2 == 1:
+            level = level + [level[-1]]
+        sibling = position ^ 1
+        path.append({
+            "hash": level[sibling].hex(),
+            "position": "left" if sibling < position else "right",
+        })
+        level = _next_level(level)
+        position //= 2
+    return path
+
+
+def verify_merkle_proof(leaf_hash: str, path: List[Dict[str, str]], root: str) -> bool:
+    """
+    Checks an inclusion proof without the rest of the block
+    :param leaf_hash: <str> hex hash of the transaction (see transaction_hash)
+    :param path: <list> result of merkle_proof
+    :param root: <str> hex Merkle root from the block header
+    :return: True if the transaction is part of the block
+    """
+    current = bytes.fromhex(leaf_hash)
+    for step in path:
+        sibling = bytes.fromhex(step["hash"])
+        if step["position"] == "left":
+            current = _hash_pair(sibling, current)
+        else:
+            current = _hash_pair(current, sibling)
+    return current.hex() == root
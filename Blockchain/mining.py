@@ -0,0 +1,233 @@
+### Import Libraries ###
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from Blockchain.proof import ProofChecker
+
+# Number of nonces handed to a worker per task
+CHUNK_SIZE = 50_000
+# Workers look at the stop event after this many nonces
+STOP_CHECK_INTERVAL = 4_096
+# Below this difficulty the pool overhead is bigger than the search itself
+PARALLEL_MIN_DIFFICULTY = 4
+# Value of the shared best proof while no proof is known
+NO_PROOF = 2 ** 63 - 1
+
+# Smallest proof found so far by any worker of the current search (set by _init_worker)
+_best_proof = None
+
+
+def _init_worker(best_proof) -> None:
+    """
+    Initializer for the worker processes, keeps a reference to the shared best proof
+    :param best_proof: <multiprocessing.Value> smallest proof found so far, NO_PROOF if none
+    """
+    global _best_proof
+    _best_proof = best_proof
+
+
+def _lower_best_proof(best_proof, proof: int) -> None:
+    with best_proof.get_lock():
+        if proof < best_proof.value:
+            best_proof.value = proof
+
+
+def search_range(last_proof: int, difficulty: int, start: int, count: int) -> Tuple[Optional[int], int]:
+    """
+    Searches the nonces [start, start + count) for a valid proof
+    Uses the midstate fast path, accepts the same proofs as Blockchain.valid_proof
+    :param last_proof: <int> proof of the last block
+    :param difficulty: <int> number of leading zeros required
+    :param start: <int> first nonce to test
+    :param count: <int> number of nonces to test
+    :return: <tuple> (proof or None, number of nonces tested)
+    """
+    checker = ProofChecker(last_proof, difficulty)
+    end = start + count
+    nonce = start
+
+    while nonce < end:
+        proof, tested = checker.search(nonce, min(STOP_CHECK_INTERVAL, end - nonce))
+        if proof is not None:
+            if _best_proof is not None:
+                _lower_best_proof(_best_proof, proof)
+            return proof, proof - start + 1
+        nonce += tested
+
+        # Another worker already found a smaller proof, the rest of this chunk can't win
+        if _best_proof is not None and nonce >= _best_proof.value:
+            break
+
+    return None, nonce - start
+
+
+@dataclass
+class MiningResult:
+    """
+    Result of one proof-of-work search
+    """
+    proof: int
+    time_taken: float
+    attempts: int
+    workers: int
+
+    @property
+    def hash_rate(self) -> float:
+        """
+        Hashes per second of the search
+        """
+        if self.time_taken <= 0:
+            return float(self.attempts)
+        return self.attempts / self.time_taken
+
+    def to_dict(self) -> dict:
+        return {
+            "proof": self.proof,
+            "time_taken": self.time_taken,
+            "attempts": self.attempts,
+            "workers": self.workers,
+            "hash_rate": self.hash_rate,
+        }
+
+
+class ParallelMiner:
+    """
+    Multi-core proof-of-work engine
+    The nonce space is split into chunks which are handed to a process pool.
+    As soon as one worker finds a valid proof the workers above it stop, the chunks below it
+    are searched to the end. The result is the smallest valid nonce, the same proof the serial
+    search finds. The pool is created on first use and reused for all following blocks.
+    """
+
+    def __init__(self, workers: int = None, chunk_size: int = CHUNK_SIZE,
+                 min_parallel_difficulty: int = PARALLEL_MIN_DIFFICULTY) -> None:
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.min_parallel_difficulty = min_parallel_difficulty
+
+        self._executor = None
+        self._best_proof = None
+        self._lock = threading.Lock()
+
+    def mine(self, last_proof: int, difficulty: int = 4,
+             progress: Callable[[int, float], None] = None) -> MiningResult:
+        """
+        Finds a proof for the given last proof
+        :param last_proof: <int> proof of the last block
+        :param difficulty: <int> number of leading zeros required
+        :param progress: called with (nonces tested so far, seconds elapsed) after every chunk
+        :return: <MiningResult> proof, time taken, attempts and hash rate
+        """
+        with self._lock:
+            start_time = time.time()
+            report = None
+            if progress is not None:
+                def report(attempts):
+                    progress(attempts, time.time() - start_time)
+
+            if self.workers == 1 or difficulty < self.min_parallel_difficulty:
+                proof, attempts = self._mine_serial(last_proof, difficulty, report)
+                workers = 1
+            else:
+                proof, attempts = self._mine_parallel(last_proof, difficulty, report)
+                workers = self.workers
+            time_taken = time.time() - start_time
+
+        return MiningResult(proof=proof, time_taken=time_taken, attempts=attempts, workers=workers)
+
+    def _mine_serial(self, last_proof: int, difficulty: int,
+                     report: Callable[[int], None] = None) -> Tuple[int, int]:
+        """
+        Searches the nonces in the calling process
+        """
+        start = 0
+        attempts = 0
+        while True:
+            proof, tested = search_range(last_proof, difficulty, start, self.chunk_size)
+            attempts += tested
+            if proof is not None:
+                return proof, attempts
+            if report is not None:
+                report(attempts)
+            start += self.chunk_size
+
+    def _mine_parallel(self, last_proof: int, difficulty: int,
+                       report: Callable[[int], None] = None) -> Tuple[int, int]:
+        """
+        Searches the nonces in chunks on the process pool
+        """
+        executor = self._get_executor()
+        self._best_proof.value = NO_PROOF
+
+        next_start = 0
+        attempts = 0
+        best = None
+        # future -> first nonce of its chunk
+        pending = {}
+
+        def submit():
+            nonlocal next_start
+            pending[executor.submit(search_range, last_proof, difficulty, next_start, self.chunk_size)] = next_start
+            next_start += self.chunk_size
+
+        # Keep every worker busy with one chunk in reserve
+        for _ in range(self.workers * 2):
+            submit()
+
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    proof, tested = future.result()
+                    attempts += tested
+                    if proof is not None and (best is None or proof < best):
+                        best = proof
+
+                if best is not None:
+                    # No new chunks, only the ones below the proof can hold a smaller one.
+                    # Chunks above it are cancelled or stop at their next check of the shared best proof.
+                    _lower_best_proof(self._best_proof, best)
+                    for future, start in list(pending.items()):
+                        if start >= best and future.cancel():
+                            del pending[future]
+                    continue
+
+                if report is not None:
+                    report(attempts)
+                for _ in done:
+                    submit()
+        finally:
+            self._best_proof.value = NO_PROOF
+
+        return best, attempts
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Creates the process pool on first use
+        """
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            self._best_proof = context.Value("q", NO_PROOF)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._best_proof,),
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker processes
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+                self._best_proof = None
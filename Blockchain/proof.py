@@ -0,0 +1,115 @@
+### Import Libraries ###
+import hashlib
+from typing import Optional, Tuple
+
+# Nonces tested per call of ProofChecker.search (default)
+BATCH_SIZE = 4_096
+
+# Length of a SHA-256 hexdigest, a difficulty above this can never be met
+MAX_DIFFICULTY = 64
+BITS_PER_NIBBLE = 4
+
+
+def difficulty_bits(difficulty: float) -> int:
+    """
+    Converts a difficulty in hex zeros into leading zero bits
+    Fractional difficulties are possible in steps of a quarter nibble (one bit),
+    e.g. 2.5 means 10 leading zero bits. Integer difficulties keep their old meaning.
+    :param difficulty: <float> number of leading hex zeros
+    :return: <int> number of leading zero bits
+    """
+    return int(round(difficulty * BITS_PER_NIBBLE))
+
+
+def difficulty_mask(difficulty: float) -> Optional[Tuple[bytes, Optional[int]]]:
+    """
+    Precomputes the zero-bit mask for a difficulty
+    A digest has the required leading zero bits exactly when its first bits // 8
+    bytes are zero and, for the remaining bits, the next byte is below 2 ** (8 - rest).
+    For an integer difficulty this is the same as hexdigest()[:difficulty] == "0" * difficulty
+    :param difficulty: <float> number of leading hex zeros required
+    :return: <tuple> (zero byte prefix, limit of the next byte or None) or None if no hash can match
+    """
+    if difficulty < 0 or difficulty > MAX_DIFFICULTY:
+        # Same result as the string comparison of valid_proof
+        return None
+    bits = difficulty_bits(difficulty)
+    rest = bits % 8
+    return bytes(bits // 8), (1 << (8 - rest)) if rest else None
+
+
+def digest_meets_mask(digest: bytes, mask: Optional[Tuple[bytes, Optional[int]]]) -> bool:
+    """
+    Compares a raw SHA-256 digest against a precomputed zero-bit mask
+    :param digest: <bytes> raw digest
+    :param mask: <tuple> result of difficulty_mask
+    :return: True if the digest has the required leading zeros
+    """
+    if mask is None:
+        return False
+    zero_prefix, limit = mask
+    full = len(zero_prefix)
+    if digest[:full] != zero_prefix:
+        return False
+    return limit is None or digest[full] < limit
+
+
+def valid_proof(last_proof: int, proof: int, difficulty: float = 4) -> bool:
+    """
+    Checks a single proof without a Blockchain instance (used by the validation workers)
+    :param last_proof: <int> last proof
+    :param proof: <int> proof
+    :param difficulty: <int> number of leading zeros required
+    :return: True if correct False otherwise
+    """
+    guess = f"{last_proof}{proof}".encode()
+    return digest_meets_mask(hashlib.sha256(guess).digest(), difficulty_mask(difficulty))
+
+
+class ProofChecker:
+    """
+    Fast proof checking for one last_proof
+    The constant last_proof prefix is hashed once, every nonce continues
+    from a copy of that midstate and is compared on the raw digest bytes.
+    Accepts exactly the same proofs as Blockchain.valid_proof.
+    """
+
+    def __init__(self, last_proof: int, difficulty: float = 4) -> None:
+        self.last_proof = last_proof
+        self.difficulty = difficulty
+        self.mask = difficulty_mask(difficulty)
+        self._midstate = hashlib.sha256(f"{last_proof}".encode())
+
+    def check(self, proof: int) -> bool:
+        """
+        Checks a single proof
+        :param proof: <int> proof
+        :return: True if correct False otherwise
+        """
+        guess = self._midstate.copy()
+        guess.update(f"{proof}".encode())
+        return digest_meets_mask(guess.digest(), self.mask)
+
+    def search(self, start: int, count: int = BATCH_SIZE) -> Tuple[Optional[int], int]:
+        """
+        Tests the nonces [start, start + count) as one batch
+        :param start: <int> first nonce
+        :param count: <int> number of nonces
+        :return: <tuple> (first valid proof or None, number of nonces tested)
+        """
+        if self.mask is None:
+            return None, count
+
+        zero_prefix, limit = self.mask
+        full = len(zero_prefix)
+        copy = self._midstate.copy
+
+        # Local names keep the attribute lookups out of the hot loop
+        for proof in range(start, start + count):
+            guess = copy()
+            guess.update(b"%d" % proof)
+            digest = guess.digest()
+            if digest[:full] == zero_prefix and (limit is None or digest[full] < limit):
+                return proof, proof - start + 1
+
+        return None, count
@@ -0,0 +1,266 @@
+### Import Libraries ###
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+
+from Blockchain.accounts import MINT_ADDRESS
+
+# Signature of transactions created before real signatures existed
+PLACEHOLDER_SIGNATURE = "placeholder_signature"
+
+# Transaction field holding the address which has to sign, per transaction type
+SIGNER_FIELDS = {
+    None: "sender",
+    "data_upload": "owner",
+    "model_upload": "owner",
+    "data_purchase": "buyer",
+    "model_purchase": "buyer",
+}
+
+# Below this number of signatures a batch is verified on the calling thread
+PARALLEL_MIN_SIGNATURES = 256
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+
+class SignatureError(ValueError):
+    """
+    Raised when a transaction is refused because of an invalid signature
+    """
+
+
+# ---- Keys ----
+
+def generate_private_key() -> Ed25519PrivateKey:
+    return Ed25519PrivateKey.generate()
+
+
+def private_key_to_hex(private_key: Ed25519PrivateKey) -> str:
+    """
+    Raw 32 byte private key as hex
+    """
+    return private_key.private_bytes(serialization.Encoding.Raw, serialization.PrivateFormat.Raw,
+                                     serialization.NoEncryption()).hex()
+
+
+def private_key_from_hex(private_key_hex: str) -> Ed25519PrivateKey:
+    return Ed25519PrivateKey.from_private_bytes(bytes.fromhex(private_key_hex))
+
+
+def public_key_hex(private_key: Ed25519PrivateKey) -> str:
+    """
+    Raw 32 byte public key as hex, the format stored in User.public_key
+    """
+    return private_key.public_key().public_bytes(serialization.Encoding.Raw,
+                                                 serialization.PublicFormat.Raw).hex()
+
+
+@lru_cache(maxsize=4096)
+def _load_public_key(public_key: str) -> Ed25519PublicKey:
+    return Ed25519PublicKey.from_public_bytes(bytes.fromhex(public_key))
+
+
+# ---- Signing ----
+
+def signer(transaction: Mapping) -> Optional[str]:
+    """
+    Address which has to sign the transaction (sender, owner or buyer)
+    """
+    field = SIGNER_FIELDS.get(transaction.get("type"))
+    return transaction.get(field) if field else None
+
+
+def signing_bytes(transaction: Mapping) -> bytes:
+    """
+    Bytes covered by the signature: canonical JSON of all fields except the signature
+    :param transaction: transaction, typed record or the fields of a new transaction
+    """
+    fields = {key: value for key, value in transaction.items() if key != "signature"}
+    return json.dumps(fields, sort_keys=True, separators=(",", ":")).encode()
+
+
+def sign_transaction(transaction: Mapping, private_key: Ed25519PrivateKey) -> str:
+    """
+    Signs a transaction
+    :param transaction: fields of the transaction (including "type", the signature field is ignored)
+    :param private_key: Ed25519 key of the signer
+    :return: <str> hex signature
+    """
+    return sign_bytes(signing_bytes(transaction), private_key)
+
+
+def verify_signature(transaction: Mapping, public_key: str) -> bool:
+    """
+    Checks the signature of a single transaction
+    :param transaction: signed transaction
+    :param public_key: <str> hex public key of the signer
+    :return: True if valid False otherwise
+    """
+    return verify_bytes(signing_bytes(transaction), transaction.get("signature"), public_key)
+
+
+def sign_bytes(data: bytes, private_key: Ed25519PrivateKey) -> str:
+    """
+    Signs raw bytes, e.g. a block hash
+    :return: <str> hex signature
+    """
+    return private_key.sign(data).hex()
+
+
+def verify_bytes(data: bytes, signature: str, public_key: str) -> bool:
+    """
+    Checks a hex signature over raw bytes
+    :param data: <bytes> signed data
+    :param signature: <str> hex signature
+    :param public_key: <str> hex public key of the signer
+    :return: True if valid False otherwise
+    """
+    try:
+        _load_public_key(public_key).verify(bytes.fromhex(signature), data)
+        return True
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+
+
+def verify_signatures(items: Sequence[Tuple[Mapping, str]]) -> List[bool]:
+    """
+    Verifies a chunk of (transaction, public key) pairs
+    Runs in the pool workers of SignatureVerifier.
+    """
+    return [verify_signature(transaction, public_key) for transaction, public_key in items]
+
+
+# ---- Batches ----
+
+class SignatureVerifier:
+    """
+    Verifies the signatures of whole blocks as one batch
+    The public key of a signer is looked up in public_keys (address -> hex key).
+    Transactions with the placeholder signature are accepted unless require_signatures is set
+    or the signer has a registered key, so chains from before real signatures stay valid.
+    Every other signature has to match the registered key of its signer.
+    Coins minted by address "0" are not signed.
+    Large batches are split into chunks and verified on a thread or process pool.
+    """
+
+    def __init__(self, public_keys: Mapping[str, str] = None, require_signatures: bool = False,
+                 workers: int = None, executor: str = EXECUTOR_THREAD,
+                 parallel_min: int = PARALLEL_MIN_SIGNATURES) -> None:
+        """
+        :param public_keys: address -> hex public key, read at verification time
+        :param require_signatures: reject transactions without a real signature
+        :param workers: <int> pool size (default: all cores)
+        :param executor: EXECUTOR_THREAD or EXECUTOR_PROCESS
+        :param parallel_min: <int> smallest batch verified on the pool
+        """
+        if executor not in (EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.public_keys = public_keys if public_keys is not None else {}
+        self.require_signatures = require_signatures
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.executor = executor
+        self.parallel_min = parallel_min
+
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        # Sent to the processes of the parallel chain validation, the pool stays here
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["_pool_lock"] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
+
+    def check_transaction(self, transaction: Mapping) -> bool:
+        """
+        Verifies one transaction, e.g. at mempool admission
+        """
+        item = self._verification_item(transaction)
+        if item is None:
+            return self._accepted_without_check(transaction)
+        return verify_signature(*item)
+
+    def verify_transactions(self, transactions: Sequence[Mapping]) -> List[bool]:
+        """
+        Verifies a batch of transactions
+        :return: <list> one result per transaction
+        """
+        results = [True] * len(transactions)
+        items = []
+        positions = []
+        for position, transaction in enumerate(transactions):
+            item = self._verification_item(transaction)
+            if item is None:
+                results[position] = self._accepted_without_check(transaction)
+            else:
+                items.append(item)
+                positions.append(position)
+
+        for position, valid in zip(positions, self._verify_items(items)):
+            results[position] = valid
+        return results
+
+    def verify_block(self, block) -> bool:
+        """
+        Verifies all signatures of a block as one batch
+        :param block: <Block>
+        :return: True if every transaction is signed correctly (or may stay unsigned)
+        """
+        return all(self.verify_transactions(block.transactions))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _verification_item(self, transaction: Mapping) -> Optional[Tuple[Mapping, str]]:
+        """
+        (transaction, public key) if the signature has to be checked cryptographically
+        """
+        address = signer(transaction)
+        if address == MINT_ADDRESS:
+            return None
+        public_key = self.public_keys.get(address)
+        return None if public_key is None else (transaction, public_key)
+
+    def _accepted_without_check(self, transaction: Mapping) -> bool:
+        if signer(transaction) == MINT_ADDRESS:
+            return True
+        # Only signers without a registered key get here: a registered key always has to sign.
+        # Placeholder signature of a keyless signer: only accepted in the compatibility mode
+        # Real signature without registered key: nothing to check it against
+        return transaction.get("signature") == PLACEHOLDER_SIGNATURE and not self.require_signatures
+
+    def _verify_items(self, items: List[Tuple[Mapping, str]]) -> List[bool]:
+        if self.workers <= 1 or len(items) < self.parallel_min:
+            return verify_signatures(items)
+
+        chunk_size = -(-len(items) // self.workers)
+        chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+        results = []
+        for chunk_results in self._get_pool().map(verify_signatures, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def _get_pool(self) -> Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                if self.executor == EXECUTOR_PROCESS:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="signatures")
+            return self._pool
@@ -0,0 +1,74 @@
+### Import Libraries ###
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+SNAPSHOT_VERSION = 2
+# Blocks between two snapshots written while mining
+SNAPSHOT_INTERVAL = 100
+
+
+@dataclass
+class ChainSnapshot:
+    """
+    Derived marketplace state after the first `height` blocks of the chain
+    Balances are stored as they are, listings and purchases as (block_index, position) of their transactions,
+    the records themselves stay in the chain, so a snapshot only fits a chain which
+    contains its tip hash. Restoring only touches these transactions instead of
+    replaying every transaction of every block.
+    """
+    height: int
+    tip_hash: str
+    # (block_index, position) of the upload transactions in listing order
+    uploads: List[List[int]] = field(default_factory=list)
+    # (block_index, position) of every purchase in chain order
+    purchases: List[List[int]] = field(default_factory=list)
+    # address -> confirmed balance
+    balances: Dict[str, float] = field(default_factory=dict)
+
+    def covers(self, chain: List) -> bool:
+        """
+        Checks if the snapshot was taken on a prefix of the given chain
+        """
+        return 0 < self.height <= len(chain) and chain[self.height - 1].hash == self.tip_hash
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "height": self.height,
+            "tip_hash": self.tip_hash,
+            "uploads": self.uploads,
+            "purchases": self.purchases,
+            "balances": self.balances,
+        }
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ChainSnapshot"]:
+        """
+        Reads a snapshot file
+        :param path: <str> path of the JSON file
+        :return: snapshot or None if the file is missing, unreadable or from another version
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != SNAPSHOT_VERSION:
+                return None
+            return cls(height=int(data["height"]), tip_hash=str(data["tip_hash"]),
+                       uploads=data["uploads"], purchases=data["purchases"], balances=data["balances"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def save(self, path: str) -> None:
+        """
+        Writes the snapshot atomically (temporary file + os.replace)
+        A crash while writing leaves the previous snapshot intact.
+        :param path: <str> path of the JSON file
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,384 @@
+### Import Libraries ###
+import json
+import struct
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from flask import Blueprint, Response, jsonify, request
+
+from Blockchain import validation
+from Blockchain.blockchain import Block, BlockHeader
+from Blockchain.codec import CodecError, decode_block, encode_block
+from Blockchain.difficulty import chain_work
+
+# Headers per /sync/headers response
+MAX_HEADERS = 2_000
+# Blocks per /sync/blocks request, the ranges are downloaded in parallel
+RANGE_SIZE = 100
+MAX_RANGE_SIZE = 1_000
+DOWNLOAD_WORKERS = 4
+# Seconds until a request to another node is given up
+REQUEST_TIMEOUT = 10
+
+# Length prefix of every encoded block in a /sync/blocks response
+_LENGTH = struct.Struct(">I")
+
+
+class SyncError(Exception):
+    """
+    Raised when a node sends an invalid or unexpected answer during the synchronization
+    """
+
+
+# ---- Chain positions ----
+
+def block_locator(chain: Sequence) -> List[List]:
+    """
+    (index, hash) of some blocks of the chain, dense at the tip and exponentially sparser towards the genesis
+    Another node finds the last block both chains share in O(log n) entries.
+    :param chain: <list> blocks or headers
+    :return: <list> [index, hash] pairs, newest first, always ending with the genesis block
+    """
+    locator = []
+    index = len(chain) - 1
+    step = 1
+    while index > 0:
+        locator.append([index, chain[index].hash])
+        if len(locator) >= 10:
+            step *= 2
+        index -= step
+    if chain:
+        locator.append([0, chain[0].hash])
+    return locator
+
+
+def fork_point(chain: Sequence, locator: Sequence) -> int:
+    """
+    Number of blocks at the start of the chain which are shared with the chain of the locator
+    :param chain: <list> own blocks
+    :param locator: <list> [index, hash] pairs of the other chain, newest first
+    :return: <int> index of the first block which is not shared (0: not even the genesis block)
+    """
+    for index, block_hash in locator:
+        if isinstance(index, int) and 0 <= index < len(chain) and chain[index].hash == block_hash:
+            return index + 1
+    return 0
+
+
+def pack_blocks(blocks: Sequence[Block]) -> bytes:
+    """
+    Encoded blocks, each with a 4 byte length prefix
+    """
+    out = bytearray()
+    for block in blocks:
+        encoded = encode_block(block)
+        out += _LENGTH.pack(len(encoded))
+        out += encoded
+    return bytes(out)
+
+
+def unpack_blocks(data: bytes) -> List[Block]:
+    """
+    Decodes the blocks written by pack_blocks
+    :raises CodecError: if the data is truncated or a block is invalid
+    """
+    blocks = []
+    pos = 0
+    while pos < len(data):
+        if pos + _LENGTH.size > len(data):
+            raise CodecError("Truncated block length")
+        (length,) = _LENGTH.unpack_from(data, pos)
+        pos += _LENGTH.size
+        if pos + length > len(data):
+            raise CodecError("Truncated block")
+        blocks.append(decode_block(data[pos:pos + length]))
+        pos += length
+    return blocks
+
+
+# ---- Server ----
+
+def create_sync_blueprint(blockchain) -> Blueprint:
+    """
+    HTTP endpoints other nodes synchronize with
+    GET  /sync/status           height, cumulative work and tip of the chain
+    POST /sync/headers          headers after the last block shared with a block locator
+    GET  /sync/blocks           encoded blocks of a range (start, end exclusive)
+    POST /nodes/register        adds nodes to blockchain.nodes
+    POST /nodes/sync            synchronizes with the registered nodes
+    :param blockchain: <Blockchain> chain served and updated by the endpoints
+    :return: <Blueprint> to register at the Flask app
+    """
+    sync = Blueprint("sync", __name__)
+
+    @sync.route("/sync/status")
+    def status():
+        chain = blockchain.chain
+        return jsonify({"height": len(chain), "work": blockchain.cumulative_work(), "tip_hash": chain[-1].hash,
+                        "genesis_hash": chain[0].hash})
+
+    @sync.route("/sync/headers", methods=["POST"])
+    def headers():
+        payload = request.get_json(silent=True) or {}
+        locator = payload.get("locator")
+        if not isinstance(locator, list) or not all(isinstance(entry, list) and len(entry) == 2 for entry in locator):
+            return jsonify({"error": "locator has to be a list of [index, hash] pairs"}), 400
+        try:
+            count = max(0, min(int(payload.get("count", MAX_HEADERS)), MAX_HEADERS))
+        except (TypeError, ValueError):
+            return jsonify({"error": "count has to be a number"}), 400
+
+        chain = blockchain.chain
+        start = fork_point(chain, locator)
+        return jsonify({
+            "start": start,
+            "height": len(chain),
+            "headers": [BlockHeader.from_block(block).to_dict() for block in chain[start:start + count]],
+        })
+
+    @sync.route("/sync/blocks")
+    def blocks():
+        start = request.args.get("start", type=int)
+        end = request.args.get("end", type=int)
+        if start is None or end is None or start < 0 or end <= start or end - start > MAX_RANGE_SIZE:
+            return jsonify({"error": f"start < end and at most {MAX_RANGE_SIZE} blocks are required"}), 400
+        return Response(pack_blocks(blockchain.chain[start:end]), mimetype="application/octet-stream")
+
+    @sync.route("/nodes/register", methods=["POST"])
+    def register_nodes():
+        nodes = (request.get_json(silent=True) or {}).get("nodes")
+        if not isinstance(nodes, list) or not nodes:
+            return jsonify({"error": "Please supply a list of nodes"}), 400
+        try:
+            for node in nodes:
+                blockchain.register_node(node)
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"total_nodes": sorted(blockchain.nodes)}), 201
+
+    @sync.route("/nodes/sync", methods=["POST"])
+    def synchronize():
+        result = ChainSync(blockchain).synchronize()
+        return jsonify(result.to_dict())
+
+    return sync
+
+
+# ---- Client ----
+
+@dataclass
+class SyncResult:
+    """
+    Outcome of one synchronization round
+    """
+    adopted: bool
+    height: int
+    peer: Optional[str] = None
+    fork_point: Optional[int] = None
+    downloaded_blocks: int = 0
+    seconds: float = 0.0
+    # peer -> reason why its chain was not adopted
+    rejected: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            "adopted": self.adopted,
+            "height": self.height,
+            "peer": self.peer,
+            "fork_point": self.fork_point,
+            "downloaded_blocks": self.downloaded_blocks,
+            "seconds": self.seconds,
+            "rejected": self.rejected,
+        }
+
+
+class ChainSync:
+    """
+    Headers-first synchronization with the nodes of a blockchain
+    1. asks every node for its height, cumulative work and tip
+    2. fetches the headers after the last shared block of the chain with the most work and checks links, PoW or seals
+       and header hashes
+    3. downloads only the missing bodies, in ranges spread over all nodes with the same tip
+    4. validates the bodies against the headers and adopts the chain if it still has more work than the own one
+    Chains are compared by the sum of 16 ** difficulty over their blocks, not by their length, since the
+    difficulty of a block is only checked against its own proof. If the chain with the most work turns out
+    to be invalid the next one is tried.
+    """
+
+    def __init__(self, blockchain, workers: int = DOWNLOAD_WORKERS, range_size: int = RANGE_SIZE,
+                 timeout: float = REQUEST_TIMEOUT) -> None:
+        """
+        :param blockchain: <Blockchain> own chain, its nodes are the peers
+        :param workers: <int> parallel body downloads
+        :param range_size: <int> blocks per body request
+        :param timeout: <float> seconds per request
+        """
+        self.blockchain = blockchain
+        self.workers = max(1, workers)
+        self.range_size = max(1, min(range_size, MAX_RANGE_SIZE))
+        self.timeout = timeout
+
+    def synchronize(self) -> SyncResult:
+        """
+        Adopts the valid chain with the most work of the registered nodes
+        :return: <SyncResult> whether and from which node a chain was adopted
+        """
+        start_time = time.perf_counter()
+        rejected = {}
+        statuses = []
+        for node in sorted(self.blockchain.nodes):
+            try:
+                status = self._get_json(node, "/sync/status")
+                statuses.append((node, float(status["work"]), str(status["tip_hash"])))
+            except (SyncError, KeyError, TypeError, ValueError) as e:
+                rejected[node] = str(e)
+
+        # Most work first, on invalid chains fall back to the next one
+        statuses.sort(key=lambda entry: entry[1], reverse=True)
+        own_work = self.blockchain.cumulative_work()
+        for node, work, tip_hash in statuses:
+            if work <= own_work:
+                break
+            sources = [other for other, _, other_tip in statuses if other_tip == tip_hash]
+            try:
+                first_new, blocks = self._fetch_chain(node, sources)
+            except (SyncError, CodecError) as e:
+                rejected[node] = str(e)
+                continue
+
+            # Validated without the lock, mining goes on meanwhile
+            candidate = self.blockchain.chain[:first_new] + blocks
+            if not self.blockchain.validate_chain(candidate):
+                rejected[node] = "chain is invalid"
+                continue
+
+            with self.blockchain.lock:
+                chain = self.blockchain.chain
+                if first_new > 0 and (len(chain) < first_new or chain[first_new - 1] is not candidate[first_new - 1]):
+                    # The own chain changed below the fork point during the download
+                    rejected[node] = "own chain changed during the download"
+                    continue
+                # Only the blocks after the shared prefix differ
+                if chain_work(blocks) <= self.blockchain.cumulative_work(first_new):
+                    rejected[node] = "chain has no more work than the own chain"
+                    continue
+                self.blockchain.replace_chain(candidate)
+
+            return SyncResult(adopted=True, height=len(self.blockchain.chain), peer=node, fork_point=first_new,
+                              downloaded_blocks=len(blocks), seconds=time.perf_counter() - start_time,
+                              rejected=rejected)
+
+        return SyncResult(adopted=False, height=len(self.blockchain.chain),
+                          seconds=time.perf_counter() - start_time, rejected=rejected)
+
+    def _fetch_chain(self, node: str, sources: List[str]) -> Tuple[int, List[Block]]:
+        """
+        Headers of the node after the shared prefix, then the bodies of these blocks
+        :return: (index of the first new block, new blocks)
+        """
+        headers = self._fetch_headers(node)
+        # The locator is sparse towards the genesis, headers of blocks we already have are skipped
+        chain = self.blockchain.chain
+        while headers and headers[0].index < len(chain) and chain[headers[0].index].hash == headers[0].hash:
+            headers.pop(0)
+        if not headers:
+            raise SyncError("node has no new blocks")
+        first_new = headers[0].index
+        previous = self.blockchain.chain[first_new - 1] if first_new > 0 else None
+        if not validation.validate_headers(headers, previous, self.blockchain.consensus):
+            raise SyncError("invalid headers")
+        return first_new, self._download_bodies(sources, headers)
+
+    def _fetch_headers(self, node: str) -> List[BlockHeader]:
+        """
+        All headers of the node after the last block shared with the own chain
+        """
+        locator = block_locator(self.blockchain.chain)
+        headers: List[BlockHeader] = []
+        while True:
+            answer = self._post_json(node, "/sync/headers", {"locator": locator, "count": MAX_HEADERS})
+            try:
+                batch = [BlockHeader.from_dict(header) for header in answer["headers"]]
+                start, height = int(answer["start"]), int(answer["height"])
+            except (KeyError, TypeError, ValueError) as e:
+                raise SyncError(f"invalid headers answer: {e}") from e
+
+            if headers and start != headers[-1].index + 1:
+                raise SyncError("node changed its chain during the header download")
+            if any(header.index != start + offset for offset, header in enumerate(batch)):
+                raise SyncError("headers are not consecutive")
+            headers.extend(batch)
+            if not batch or start + len(batch) >= height:
+                break
+            locator = [[headers[-1].index, headers[-1].hash]]
+
+        if not headers:
+            raise SyncError("node sent no new headers")
+        return headers
+
+    def _download_bodies(self, sources: List[str], headers: List[BlockHeader]) -> List[Block]:
+        """
+        Downloads the blocks of the headers in ranges, spread round robin over the sources
+        A range which fails at one source is retried at the next one.
+        """
+        ranges = [headers[start:start + self.range_size] for start in range(0, len(headers), self.range_size)]
+
+        def download(task):
+            number, range_headers = task
+            errors = []
+            for attempt in range(len(sources)):
+                source = sources[(number + attempt) % len(sources)]
+                try:
+                    return self._fetch_blocks(source, range_headers)
+                except (SyncError, CodecError) as e:
+                    errors.append(f"{source}: {e}")
+            raise SyncError("; ".join(errors))
+
+        if self.workers == 1 or len(ranges) == 1:
+            results = [download(task) for task in enumerate(ranges)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(ranges)), thread_name_prefix="sync") as pool:
+                results = list(pool.map(download, enumerate(ranges)))
+        return [block for blocks in results for block in blocks]
+
+    def _fetch_blocks(self, node: str, headers: List[BlockHeader]) -> List[Block]:
+        """
+        Blocks of one range, each has to match its header
+        """
+        start, end = headers[0].index, headers[-1].index + 1
+        blocks = unpack_blocks(self._request(node, f"/sync/blocks?start={start}&end={end}"))
+        if len(blocks) != len(headers):
+            raise SyncError(f"expected {len(headers)} blocks, got {len(blocks)}")
+        for block, header in zip(blocks, headers):
+            if block.index != header.index or block.hash != header.hash or block.merkle_root != header.merkle_root:
+                raise SyncError(f"block {header.index} does not match its header")
+        return blocks
+
+    # ---- HTTP ----
+
+    def _get_json(self, node: str, path: str) -> Dict:
+        return self._parse_json(self._request(node, path))
+
+    def _post_json(self, node: str, path: str, payload: Dict) -> Dict:
+        return self._parse_json(self._request(node, path, json.dumps(payload).encode()))
+
+    def _request(self, node: str, path: str, body: bytes = None) -> bytes:
+        http_request = urllib.request.Request(f"http://{node}{path}", data=body)
+        if body is not None:
+            http_request.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(http_request, timeout=self.timeout) as response:
+                return response.read()
+        except (urllib.error.URLError, OSError) as e:
+            raise SyncError(f"{node}{path}: {e}") from e
+
+    @staticmethod
+    def _parse_json(data: bytes) -> Dict:
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise SyncError(f"invalid JSON answer: {e}") from e
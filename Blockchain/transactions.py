@@ -0,0 +1,169 @@
+### Import Libraries ###
+import json
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Union
+
+
+class Transaction(Mapping):
+    """
+    Compact, immutable transaction record
+    Every transaction type stores its fields in __slots__ instead of a dict.
+    The record behaves like a read-only dict (tx["owner"], tx.get("type"), "type" in tx),
+    so code written against the old dict transactions keeps working.
+    The canonical JSON bytes are computed once and cached.
+    """
+
+    __slots__ = ("_canonical",)
+
+    TYPE = None  # value of the "type" key, None for plain transfers
+    FIELDS = ()  # fields of the transaction type in their natural order
+
+    def __init__(self, **fields: Any) -> None:
+        missing = [name for name in self.FIELDS if name not in fields]
+        unknown = [name for name in fields if name not in self.FIELDS]
+        if missing or unknown:
+            raise ValueError(f"Invalid fields for {self.__class__.__name__}: "
+                             f"missing {missing}, unknown {unknown}")
+
+        for name in self.FIELDS:
+            object.__setattr__(self, name, fields[name])
+        object.__setattr__(self, "_canonical", None)
+
+    @classmethod
+    def from_values(cls, values) -> "Transaction":
+        """
+        Creates a record from its field values in FIELDS order
+        Used by the binary decoder, the values come from a known record type so the field check is skipped.
+        """
+        record = cls.__new__(cls)
+        for name, value in zip(cls.FIELDS, values):
+            object.__setattr__(record, name, value)
+        object.__setattr__(record, "_canonical", None)
+        return record
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        # Pickle through the dict form, __setattr__ is blocked
+        return transaction_from_dict, (self.to_dict(),)
+
+    # ---- Mapping interface ----
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "type" and self.TYPE is not None:
+            return self.TYPE
+        if key in self.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        if self.TYPE is not None:
+            yield "type"
+        yield from self.FIELDS
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + (self.TYPE is not None)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+    # ---- Serialization ----
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert transaction to a plain dictionary
+        """
+        return dict(self.items())
+
+    @property
+    def canonical_bytes(self) -> bytes:
+        """
+        Canonical JSON (sorted keys, no whitespace), cached after the first call
+        """
+        if self._canonical is None:
+            canonical = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":")).encode()
+            object.__setattr__(self, "_canonical", canonical)
+        return self._canonical
+
+    @property
+    def size(self) -> int:
+        """
+        Size of the canonical serialization in bytes
+        """
+        return len(self.canonical_bytes)
+
+
+class TransferTransaction(Transaction):
+    FIELDS = ("sender", "recipient", "amount", "timestamp", "signature", "transaction_id")
+    __slots__ = FIELDS
+
+
+class DataUploadTransaction(Transaction):
+    TYPE = "data_upload"
+    FIELDS = ("owner", "metadata", "price", "timestamp", "signature", "transaction_id")
+    __slots__ = FIELDS
+
+
+class ModelUploadTransaction(Transaction):
+    TYPE = "model_upload"
+    FIELDS = ("owner", "metadata", "price", "timestamp", "signature", "transaction_id")
+    __slots__ = FIELDS
+
+
+class DataPurchaseTransaction(Transaction):
+    TYPE = "data_purchase"
+    FIELDS = ("buyer", "seller", "data_id", "amount", "timestamp", "signature", "transaction_id")
+    __slots__ = FIELDS
+
+
+class ModelPurchaseTransaction(Transaction):
+    TYPE = "model_purchase"
+    FIELDS = ("buyer", "seller", "model_id", "amount", "timestamp", "signature", "transaction_id")
+    __slots__ = FIELDS
+
+
+# "type" value -> record class
+TRANSACTION_TYPES = {
+    None: TransferTransaction,
+    DataUploadTransaction.TYPE: DataUploadTransaction,
+    ModelUploadTransaction.TYPE: ModelUploadTransaction,
+    DataPurchaseTransaction.TYPE: DataPurchaseTransaction,
+    ModelPurchaseTransaction.TYPE: ModelPurchaseTransaction,
+}
+
+
+def transaction_from_dict(data: Dict[str, Any]) -> Union[Transaction, Dict[str, Any]]:
+    """
+    Converts a transaction dict (e.g. loaded from JSON) into its typed record
+    Dicts which do not match a known transaction type exactly are returned unchanged,
+    so validate_transaction can still reject them
+    :param data: transaction as dict
+    :return: typed record or the original dict
+    """
+    fields = dict(data)
+    transaction_type = fields.pop("type", None)
+    if "type" in data and transaction_type is None:
+        return data
+    record_class = TRANSACTION_TYPES.get(transaction_type)
+    if record_class is None or set(fields) != set(record_class.FIELDS):
+        return data
+    return record_class(**fields)
+
+
+def as_transaction(transaction: Union[Transaction, Dict[str, Any]]) -> Union[Transaction, Dict[str, Any]]:
+    """
+    Returns typed records unchanged and converts dicts where possible
+    """
+    if isinstance(transaction, Transaction):
+        return transaction
+    return transaction_from_dict(transaction)
+
+
+def canonical_bytes(transaction: Union[Transaction, Dict[str, Any]]) -> bytes:
+    """
+    Canonical JSON bytes of a record or a plain dict transaction
+    """
+    if isinstance(transaction, Transaction):
+        return transaction.canonical_bytes
+    return json.dumps(transaction, sort_keys=True, separators=(",", ":")).encode()
@@ -0,0 +1,226 @@
+### Import Libraries ###
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional, Sequence
+
+from Blockchain.merkle import merkle_root
+from Blockchain.proof import valid_proof
+
+# Blocks per task of the parallel validation (the previous block is sent along)
+CHUNK_SIZE = 256
+# Below this number of blocks the pool start-up (spawn, pickling) costs more than it saves
+PARALLEL_MIN_BLOCKS = 10_000
+
+# Required fields of a plain transfer (no "type" key)
+TRANSFER_FIELDS = ("sender", "recipient", "amount", "timestamp", "signature")
+
+# Required fields per transaction type
+REQUIRED_FIELDS = {
+    "data_upload": ("owner", "metadata", "price", "timestamp", "signature"),
+    "model_upload": ("owner", "metadata", "price", "timestamp", "signature"),
+    "data_purchase": ("buyer", "seller", "data_id", "amount", "timestamp", "signature"),
+    "model_purchase": ("buyer", "seller", "model_id", "amount", "timestamp", "signature"),
+}
+
+
+def validate_transaction(transaction: Dict) -> bool:
+    """
+    Checks that a transaction has all fields of its type
+    :param transaction: <dict> transaction or typed record
+    :return: True if valid False otherwise
+    """
+    if "type" not in transaction:
+        # Standard-Transaktion (Geldtransfer)
+        required = TRANSFER_FIELDS
+    else:
+        required = REQUIRED_FIELDS.get(transaction["type"])
+
+    if required is None:
+        # Unbekannter Transaktionstyp
+        return False
+
+    # Hier könnten weitere Validierungen hinzugefügt werden, z.B.:
+    # - Überprüfung der Signatur
+    # - Überprüfung des Guthabens des Käufers
+    return all(k in transaction for k in required)
+
+
+def validate_block(block, previous_block, verifier=None, consensus=None) -> bool:
+    """
+    Validates a given Block against its predecessor by checking:
+    previous block hash,
+    index,
+    PoW or the seal of the consensus engine,
+    Merkle root,
+    no transaction twice in the block,
+    the block hash itself,
+    validating all transactions in the Block,
+    the signatures of all transactions as one batch (if a verifier is given)
+    :param block: <Block> Block to validate
+    :param previous_block: <Block> Block before it in the chain
+    :param verifier: <SignatureVerifier> checks the transaction signatures (optional)
+    :param consensus: <ConsensusEngine> checks PoW or seal (default: PoW)
+    :return: True if valid False otherwise
+    """
+    if not validate_header(block, previous_block, consensus):
+        return False
+
+    # Merkle root in the header has to match the transactions
+    leaves = block.transaction_hashes()
+    if block.merkle_root != merkle_root(leaves).hex():
+        return False
+
+    # An odd last node is paired with itself, so [a, b, c] and [a, b, c, c] have the same root.
+    # A block repeating a transaction (or its id) would pass the Merkle check and is rejected here.
+    if len(set(leaves)) != len(leaves):
+        return False
+    transaction_ids = [transaction.get("transaction_id") for transaction in block.transactions
+                       if transaction.get("transaction_id")]
+    if len(set(transaction_ids)) != len(transaction_ids):
+        return False
+
+    # The stored hash has to match the header, otherwise the next block links to a forged block
+    if block.hash != block.calculate_hash():
+        return False
+
+    if not all(validate_transaction(transaction) for transaction in block.transactions):
+        return False
+
+    return verifier is None or verifier.verify_block(block)
+
+
+def validate_header(header, previous_header, consensus=None) -> bool:
+    """
+    Checks the link of a block or header to its predecessor:
+    previous block hash,
+    index,
+    PoW or the seal of the consensus engine
+    :param header: <Block> or <BlockHeader>
+    :param previous_header: <Block> or <BlockHeader> before it
+    :param consensus: <ConsensusEngine> checks PoW or seal (default: PoW)
+    :return: True if valid False otherwise
+    """
+    if header.previous_hash != previous_header.hash:
+        return False
+
+    if header.index != previous_header.index + 1:
+        return False
+
+    if consensus is None:
+        return valid_proof(previous_header.proof, header.proof, header.difficulty)
+    return consensus.verify_header(header, previous_header)
+
+
+def validate_headers(headers: Sequence, previous_header=None, consensus=None) -> bool:
+    """
+    Validates a chain of headers before their bodies are downloaded
+    Checks the links, the PoW or seals and the header hashes. Merkle roots, legacy hashes and
+    transactions can only be checked with the bodies (validate_block).
+    :param headers: <list> consecutive BlockHeaders
+    :param previous_header: header before the first one, None if the first one is a genesis block
+    :param consensus: <ConsensusEngine> checks PoW or seals (default: PoW)
+    :return: True if valid False otherwise
+    """
+    for header in headers:
+        if previous_header is None:
+            if header.index != 0:
+                return False
+        elif not validate_header(header, previous_header, consensus):
+            return False
+        if not header.hash_matches():
+            return False
+        previous_header = header
+    return True
+
+
+def validate_range(blocks: Sequence, verifier=None, consensus=None) -> bool:
+    """
+    Validates each block of a sequence against the block before it
+    The first block is only used as predecessor, it is not validated itself.
+    Runs in the worker processes of the parallel validation.
+    :param blocks: <list> consecutive blocks
+    :param verifier: <SignatureVerifier> checks the transaction signatures (optional)
+    :param consensus: <ConsensusEngine> checks PoW or seals (default: PoW)
+    :return: True if all blocks after the first one are valid
+    """
+    for i in range(1, len(blocks)):
+        if not validate_block(blocks[i], blocks[i - 1], verifier, consensus):
+            return False
+    return True
+
+
+def validate_range_parallel(blocks: Sequence, workers: int, chunk_size: int = CHUNK_SIZE, verifier=None,
+                            consensus=None) -> bool:
+    """
+    Validates a sequence of blocks in chunks on a process pool
+    Neighbouring chunks overlap by one block so every link is checked exactly once.
+    :param blocks: <list> consecutive blocks, the first one is only used as predecessor
+    :param workers: <int> number of processes
+    :param chunk_size: <int> blocks validated per task
+    :param verifier: <SignatureVerifier> checks the transaction signatures, is sent to the workers (optional)
+    :param consensus: <ConsensusEngine> checks PoW or seals, is sent to the workers (default: PoW)
+    :return: True if all blocks after the first one are valid
+    """
+    chunks = [blocks[start - 1:start + chunk_size] for start in range(1, len(blocks), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        return all(validate_range(chunk, verifier, consensus) for chunk in chunks)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as executor:
+        for valid in executor.map(partial(validate_range, verifier=verifier, consensus=consensus), chunks):
+            if not valid:
+                # Stop at the first invalid chunk, the rest does not matter anymore
+                executor.shutdown(wait=True, cancel_futures=True)
+                return False
+    return True
+
+
+@dataclass
+class ValidationCheckpoint:
+    """
+    "Validated up to block N with tip hash H"
+    length is the number of blocks at the start of the chain which are known to be valid.
+    Because every block hash covers the previous hash, a chain whose block at
+    length - 1 has the same hash shares the whole validated prefix.
+    """
+    length: int
+    tip_hash: str
+
+    def covers(self, chain: List) -> bool:
+        """
+        Checks if the validated prefix is part of the given chain
+        """
+        return 0 < self.length <= len(chain) and chain[self.length - 1].hash == self.tip_hash
+
+    def to_dict(self) -> Dict:
+        return {"length": self.length, "tip_hash": self.tip_hash}
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ValidationCheckpoint"]:
+        """
+        Reads a checkpoint file
+        :param path: <str> path of the JSON file
+        :return: checkpoint or None if the file is missing or unreadable
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            return cls(length=int(data["length"]), tip_hash=str(data["tip_hash"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: str) -> None:
+        """
+        Writes the checkpoint atomically (temporary file + os.replace)
+        :param path: <str> path of the JSON file
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
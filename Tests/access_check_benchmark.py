@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark Zugriffsprüfung
+=========================
+
+Füllt data_purchases mit vielen Käufen und misst has_access (eine EXISTS-Abfrage über Besitz
+und Käufe): ohne den zusammengesetzten Index (user_id, data_id), mit Index und aus dem Cache.
+
+Aufruf: python Tests/access_check_benchmark.py [käufe]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from database import DatabaseManager, User, DataEntry, data_purchases
+from marketplace import MarketplaceBlockchain
+
+USERS = 1_000
+ITEMS = 1_000
+CHECKS = 2_000
+
+
+def fill(db_manager, purchases):
+    with db_manager.engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [{'id': i + 1, 'address': f"Nutzer{i}"} for i in range(USERS)])
+        connection.execute(DataEntry.__table__.insert(), [
+            {'id': i + 1, 'data_id': f"daten{i}", 'owner_id': i % USERS + 1, 'price': 1.0, 'timestamp': 0.0}
+            for i in range(ITEMS)])
+        pairs = random.Random(1).sample(range(USERS * ITEMS), purchases)
+        connection.execute(data_purchases.insert(), [
+            {'user_id': pair // ITEMS + 1, 'data_id': pair % ITEMS + 1} for pair in pairs])
+
+
+def measure(marketplace, cached):
+    rng = random.Random(2)
+    checks = [(f"Nutzer{rng.randrange(USERS)}", f"daten{rng.randrange(ITEMS)}") for _ in range(CHECKS)]
+    latencies = []
+    for address, data_id in checks:
+        if not cached:
+            marketplace.access_cache.clear()
+        start = time.perf_counter()
+        marketplace.has_access(address, data_id)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    purchases = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print("🚀 ZUGRIFFSPRÜFUNG BENCHMARK")
+    print("=" * 50)
+    print(f"Käufe: {purchases}, Benutzer: {USERS}, Datensätze: {ITEMS}, Prüfungen: {CHECKS}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'access.db')}")
+        fill(db_manager, purchases)
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+
+        with db_manager.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_data_purchases_user_data"))
+        without_index = measure(marketplace, cached=False)
+        with db_manager.engine.begin() as connection:
+            connection.execute(text("CREATE UNIQUE INDEX ix_data_purchases_user_data "
+                                    "ON data_purchases (user_id, data_id)"))
+        with_index = measure(marketplace, cached=False)
+        measure(marketplace, cached=True)
+        cached = measure(marketplace, cached=True)
+
+        print("\n🔐 has_access")
+        for name, latencies in (("Ohne Index", without_index), ("Mit Index", with_index), ("Cache", cached)):
+            print(f"   {name:<12} Median {statistics.median(latencies) * 1000:8.3f} ms")
+        print(f"   Beschleunigung durch den Index {statistics.median(without_index) / statistics.median(with_index):7.1f}x")
+        marketplace.miner.shutdown()
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
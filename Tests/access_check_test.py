@@ -0,0 +1,182 @@
+# access_check_test.py
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from Blockchain.mempool import EVICT_OLDEST
+from database import DatabaseManager, data_purchases, model_purchases
+from database_handling import backfill_transaction_table
+from marketplace import MarketplaceBlockchain
+
+
+def purchase_rows(db_manager, table):
+    with db_manager.engine.connect() as connection:
+        return connection.execute(table.select()).fetchall()
+
+
+def test_access_from_ownership_and_purchase_tables():
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # IPFS-Ordner und data_keys.json liegen im Arbeitsverzeichnis
+        os.chdir(tmp)
+        try:
+            db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'access.db')}")
+            marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+            for address in ("Owner", "Buyer", "Stranger"):
+                marketplace.register_user(address)
+            data_id, key = marketplace.upload_data_with_file("Owner", "a,b\n1,2\n", {"name": "Set"}, 3.0)
+            model_id, _ = marketplace.upload_model_with_file("Owner", b"\x00weights", {"name": "Modell"}, 5.0)
+            marketplace.mine_block(difficulty=1)
+
+            # Eine einzige Abfrage, danach aus dem Cache
+            statements = []
+            event.listen(db_manager.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+            assert marketplace.has_access("Owner", data_id)
+            assert len(statements) == 1 and "EXISTS" in statements[0]
+            assert marketplace.has_access("Owner", data_id)
+            assert len(statements) == 1
+            assert marketplace.has_access("Owner", model_id, model=True)
+            assert not marketplace.has_access("Owner", data_id, model=True)
+
+            # Fremde haben keinen Zugriff
+            with pytest.raises(ValueError, match="Kein Zugriff"):
+                marketplace.get_data_file("Stranger", data_id, key)
+
+            # Ausstehender Kauf: noch nicht in der Datenbank, Zugriff über den Mempool
+            marketplace.data_purchase_transaction("Buyer", data_id, 3.0)
+            assert not marketplace.has_access("Buyer", data_id)
+            assert marketplace.get_data_file("Buyer", data_id, key) == b"a,b\n1,2\n"
+
+            # Mit dem Block steht der Kauf in data_purchases, das gecachte "nein" ist sofort ungültig
+            marketplace.mine_block(difficulty=1)
+            assert len(purchase_rows(db_manager, data_purchases)) == 1
+            assert marketplace.has_access("Buyer", data_id)
+            assert not marketplace.has_access("Buyer", model_id, model=True)
+
+            # Käufe über purchase_model landen erst mit dem Block in model_purchases, nur einmal
+            marketplace.purchase_model("Buyer", model_id, 5.0)
+            assert not marketplace.has_access("Buyer", model_id, model=True)
+            assert purchase_rows(db_manager, model_purchases) == []
+            marketplace.mine_block(difficulty=1)
+            assert len(purchase_rows(db_manager, model_purchases)) == 1
+            assert marketplace.has_access("Buyer", model_id, model=True)
+            assert marketplace.get_model_file("Buyer", model_id, marketplace._load_encryption_key(model_id))
+
+            # Verworfener Block nimmt den Kauf wieder mit
+            marketplace.discard_last_block()
+            assert purchase_rows(db_manager, model_purchases) == []
+
+            # Ältere Datenbank ohne Kaufzeilen: backfill-transactions trägt die bestätigten Käufe nach
+            with db_manager.engine.begin() as connection:
+                connection.execute(data_purchases.delete())
+            backfill_transaction_table(db_manager)
+            assert len(purchase_rows(db_manager, data_purchases)) == 1
+            db_manager.engine.dispose()
+        finally:
+            os.chdir(previous)
+
+
+def test_evicted_purchase_grants_no_access():
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'evict.db')}")
+            marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+            for address in ("Owner", "Buyer"):
+                marketplace.register_user(address)
+            data_id, key = marketplace.upload_data_with_file("Owner", "a,b\n1,2\n", {"name": "Set"}, 3.0)
+            marketplace.mine_block(difficulty=1)
+
+            # Ausstehender Kauf: Zugriff nur solange er im Mempool ist
+            marketplace.mempool.capacity = 1
+            marketplace.mempool.eviction = EVICT_OLDEST
+            assert marketplace.purchase_data("Buyer", data_id, 3.0) == key
+            assert marketplace.get_data_file("Buyer", data_id, key) == b"a,b\n1,2\n"
+
+            # Verdrängt: wird nie gemined, also auch keine Zeile und kein Zugriff
+            marketplace.make_transaction("Alice", "Bob", 1)
+            assert len(marketplace.mempool) == 1
+            assert purchase_rows(db_manager, data_purchases) == []
+            assert not marketplace.has_access("Buyer", data_id)
+            with pytest.raises(ValueError, match="Kein Zugriff"):
+                marketplace.get_data_file("Buyer", data_id, key)
+
+            marketplace.mine_block(difficulty=1)
+            assert not marketplace.has_access("Buyer", data_id)
+            db_manager.engine.dispose()
+        finally:
+            os.chdir(previous)
+
+
+def test_rollback_keeps_repeated_purchase():
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'repeat.db')}")
+            marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+            for address in ("Owner", "Buyer"):
+                marketplace.register_user(address)
+            data_id, _ = marketplace.upload_data_with_file("Owner", "a,b\n1,2\n", {"name": "Set"}, 3.0)
+            marketplace.mine_block(difficulty=1)
+
+            # Derselbe Kauf in zwei Blöcken, die Tabelle hat nur eine Zeile
+            marketplace.data_purchase_transaction("Buyer", data_id, 3.0)
+            marketplace.mine_block(difficulty=1)
+            confirmed = list(marketplace.chain)
+            marketplace.data_purchase_transaction("Buyer", data_id, 3.0)
+            marketplace.mine_block(difficulty=1)
+            marketplace.data_purchase_transaction("Buyer", data_id, 3.0)
+            marketplace.mine_block(difficulty=1)
+            assert len(purchase_rows(db_manager, data_purchases)) == 1
+
+            # Der erste Kauf bleibt bestätigt, also auch die Zeile
+            marketplace.discard_last_block()
+            assert len(purchase_rows(db_manager, data_purchases)) == 1
+            assert marketplace.has_access("Buyer", data_id)
+            marketplace.replace_chain(confirmed)
+            assert len(purchase_rows(db_manager, data_purchases)) == 1
+            assert marketplace.has_access("Buyer", data_id)
+
+            # Ohne Kauf in der verbleibenden Chain verschwindet sie
+            marketplace.discard_last_block()
+            assert purchase_rows(db_manager, data_purchases) == []
+            assert not marketplace.has_access("Buyer", data_id)
+            db_manager.engine.dispose()
+        finally:
+            os.chdir(previous)
+
+
+def test_unique_purchase_indexes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'index.db')}"
+        db_manager = DatabaseManager(db_url)
+        indexes = {index['name']: index for index in inspect(db_manager.engine).get_indexes('data_purchases')}
+        assert indexes['ix_data_purchases_user_data']['unique']
+        assert indexes['ix_data_purchases_user_data']['column_names'] == ['user_id', 'data_id']
+
+        with db_manager.engine.begin() as connection:
+            connection.execute(data_purchases.insert(), {'user_id': 1, 'data_id': 1})
+        with pytest.raises(IntegrityError):
+            with db_manager.engine.begin() as connection:
+                connection.execute(data_purchases.insert(), {'user_id': 1, 'data_id': 1})
+
+        # Datenbank aus einer älteren Version ohne Index: wird beim Start ergänzt
+        with db_manager.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_model_purchases_user_model"))
+        db_manager.engine.dispose()
+        db_manager = DatabaseManager(db_url)
+        indexes = {index['name'] for index in inspect(db_manager.engine).get_indexes('model_purchases')}
+        assert 'ix_model_purchases_user_model' in indexes
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_access_from_ownership_and_purchase_tables()
+    test_evicted_purchase_grants_no_access()
+    test_rollback_keeps_repeated_purchase()
+    test_unique_purchase_indexes()
@@ -0,0 +1,85 @@
+# accounts_test.py
+import pytest
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.accounts import InsufficientFundsError, MINT_ADDRESS
+
+
+def test_balances_follow_blocks():
+    blockchain = Blockchain(mining_workers=1)
+    assert blockchain.get_balance("genesis") == 1
+
+    blockchain.make_transaction(MINT_ADDRESS, "Alice", 100)
+    blockchain.mine_block(difficulty=1)
+    data_id = blockchain.data_upload_transaction("Owner", {"name": "Set"}, 30.0)
+    blockchain.make_transaction("Alice", "Bob", 25)
+    blockchain.mine_block(difficulty=1)
+    blockchain.data_purchase_transaction("Alice", data_id, 30.0)
+    blockchain.mine_block(difficulty=1)
+
+    assert blockchain.get_balance("Alice") == 45
+    assert blockchain.get_balance("Bob") == 25
+    assert blockchain.get_balance("Owner") == 30
+
+    # Ohne Durchsetzung werden Überziehungen nur verbucht
+    blockchain.make_transaction("Bob", "Carol", 1000)
+    assert blockchain.get_balance("Bob", include_pending=True) == -975
+    blockchain.mine_block(difficulty=1)
+    assert blockchain.get_balance("Bob") == -975
+
+
+def test_overspending_is_rejected_at_admission():
+    blockchain = Blockchain(mining_workers=1, enforce_balances=True)
+    blockchain.make_transaction(MINT_ADDRESS, "Alice", 100)
+    blockchain.mine_block(difficulty=1)
+
+    blockchain.make_transaction("Alice", "Bob", 60)
+    # Ausstehende Ausgaben zählen schon mit
+    with pytest.raises(InsufficientFundsError):
+        blockchain.make_transaction("Alice", "Bob", 60)
+    with pytest.raises(InsufficientFundsError):
+        blockchain.make_transaction("Alice", "Bob", -5)
+    assert len(blockchain.mempool) == 1
+
+    data_id = blockchain.data_upload_transaction("Owner", {"name": "Set"}, 50.0)
+    with pytest.raises(InsufficientFundsError):
+        blockchain.data_purchase_transaction("Alice", data_id, 50.0)
+    blockchain.data_purchase_transaction("Alice", data_id, 40.0)
+
+    blockchain.mine_block(difficulty=1)
+    assert blockchain.get_balance("Alice") == blockchain.get_balance("Alice", include_pending=True) == 0
+    assert blockchain.get_balance("Bob") == 60
+
+
+def test_discarded_block_is_rolled_back():
+    blockchain = Blockchain(mining_workers=1)
+    blockchain.make_transaction(MINT_ADDRESS, "Alice", 100)
+    data_id = blockchain.data_upload_transaction("Owner", {"name": "Set"}, 10.0)
+    blockchain.mine_block(difficulty=1)
+    before = dict(blockchain.accounts.balances)
+
+    blockchain.make_transaction("Alice", "Bob", 70)
+    purchase_id = blockchain.data_purchase_transaction("Alice", data_id, 10.0)
+    block, _ = blockchain.mine_block(difficulty=1)
+    assert blockchain.has_purchased("Alice", data_id)
+
+    assert blockchain.discard_last_block() is block
+    assert blockchain.accounts.balances == before
+    assert not blockchain.has_purchased("Alice", data_id)
+    assert blockchain.find_transaction(purchase_id)[0] is None
+    assert blockchain.get_balance("Alice", include_pending=True) == 20
+
+    # Die Transaktionen sind wieder ausstehend und landen im nächsten Block
+    blockchain.mine_block(difficulty=1)
+    assert blockchain.get_balance("Alice") == 20
+    assert blockchain.has_purchased("Alice", data_id)
+    assert blockchain.validate_chain()
+
+    with pytest.raises(ValueError):
+        Blockchain(mining_workers=1).discard_last_block()
+
+
+if __name__ == "__main__":
+    test_balances_follow_blocks()
+    test_overspending_is_rejected_at_admission()
+    test_discarded_block_is_rolled_back()
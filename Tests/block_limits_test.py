@@ -0,0 +1,52 @@
+# block_limits_test.py
+from Blockchain.blockchain import Blockchain, HEADER_FORMAT
+
+
+def test_block_transaction_limit():
+    blockchain = Blockchain(mining_workers=1, max_block_transactions=10)
+    for i in range(25):
+        blockchain.make_transaction("Alice", "Bob", i)
+    tx_ids = [tx["transaction_id"] for tx in blockchain.current_transactions]
+
+    mined = blockchain.mine_pending(difficulty=1)
+    for block, mining_time in mined:
+        print(f"Block {block.index}: {len(block.transactions)} TX, {block.size} Bytes, {mining_time:.4f}s")
+
+    assert [len(block.transactions) for block, _ in mined] == [10, 10, 5]
+    assert len(blockchain.mempool) == 0
+    # Reihenfolge bleibt über die Blöcke hinweg erhalten
+    assert [tx["transaction_id"] for block, _ in mined for tx in block.transactions] == tx_ids
+    assert blockchain.validate_chain()
+
+
+def test_block_byte_limit():
+    max_bytes = HEADER_FORMAT.size + 2_000
+    blockchain = Blockchain(mining_workers=1, max_block_bytes=max_bytes)
+    for i in range(40):
+        blockchain.data_upload_transaction("Alice", {"name": f"Datensatz {i}", "description": "x" * 100}, 5)
+
+    mined = blockchain.mine_pending(difficulty=1)
+    assert len(mined) > 1
+    assert all(block.size <= max_bytes for block, _ in mined)
+    assert sum(len(block.transactions) for block, _ in mined) == 40
+
+    # max_blocks begrenzt die Anzahl der Blöcke pro Aufruf
+    for i in range(40):
+        blockchain.make_transaction("Alice", "Bob", i)
+    assert len(blockchain.mine_pending(difficulty=1, max_blocks=1)) == 1
+    assert len(blockchain.mempool) > 0
+
+
+def test_oversized_transaction_gets_own_block():
+    blockchain = Blockchain(mining_workers=1, max_block_bytes=HEADER_FORMAT.size + 200)
+    blockchain.data_upload_transaction("Alice", {"description": "x" * 1_000}, 5)
+    blockchain.make_transaction("Alice", "Bob", 1)
+
+    mined = blockchain.mine_pending(difficulty=1)
+    assert [len(block.transactions) for block, _ in mined] == [1, 1]
+
+
+if __name__ == "__main__":
+    test_block_transaction_limit()
+    test_block_byte_limit()
+    test_oversized_transaction_gets_own_block()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark Block-Persistenz
+==========================
+
+Speichert dieselben Blöcke (je 10 Transaktionen) einmal wie bisher über das ORM
+(MarketplaceBlockchain._save_block_to_database, SQLite-Datei) und einmal im Block-Log
+mit den fsync-Strategien always, batch und never. Gemessen wird die Latenz pro Block
+(Median, p99, Maximum) und danach der wahlfreie Zugriff auf einzelne Blöcke.
+
+Aufruf: python Tests/block_log_benchmark.py [blöcke]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Blockchain.blockchain import Block
+from Blockchain.block_log import BlockLog, SYNC_ALWAYS, SYNC_BATCH, SYNC_NEVER
+from Blockchain.transactions import TransferTransaction
+from database import DatabaseManager
+from marketplace import MarketplaceBlockchain
+
+TRANSACTIONS_PER_BLOCK = 10
+RANDOM_READS = 500
+
+
+def build_blocks(count):
+    blocks = [Block(0, "0", 1700000000.0, [], proof=100)]
+    for index in range(1, count + 1):
+        transactions = [TransferTransaction(sender=f"Käufer{i}", recipient=f"Verkäufer{index}", amount=i,
+                                            timestamp=1700000000.0 + index, signature="placeholder_signature",
+                                            transaction_id=f"{index:016x}{i:016x}")
+                        for i in range(TRANSACTIONS_PER_BLOCK)]
+        blocks.append(Block(index, blocks[-1].hash, 1700000000.0 + index, transactions, proof=index, difficulty=0))
+    return blocks
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name, latencies, total):
+    print(f"   {name:<16} Median {statistics.median(latencies) * 1000:7.3f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.3f} ms, Maximum {max(latencies) * 1000:7.2f} ms, "
+          f"{len(latencies) / total:8.0f} Blöcke/s")
+
+
+def measure(store, blocks):
+    latencies = []
+    start = time.perf_counter()
+    for block in blocks:
+        begin = time.perf_counter()
+        store(block)
+        latencies.append(time.perf_counter() - begin)
+    return latencies, time.perf_counter() - start
+
+
+def measure_reads(read, count):
+    indexes = [random.randrange(count) for _ in range(RANDOM_READS)]
+    start = time.perf_counter()
+    for index in indexes:
+        read(index)
+    return (time.perf_counter() - start) / RANDOM_READS
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    blocks = build_blocks(count)
+
+    print("🚀 BLOCK-PERSISTENZ BENCHMARK")
+    print("=" * 50)
+    print(f"Blöcke: {count}, Transaktionen pro Block: {TRANSACTIONS_PER_BLOCK}")
+    print("\n💾 Schreiben")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'orm.db')}")
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+        latencies, total = measure(marketplace._save_block_to_database, blocks[1:])
+        report("ORM (SQLite)", latencies, total)
+        orm_read = measure_reads(lambda index: marketplace._load_database_blocks(index, index + 1), count)
+
+        logs = {}
+        for policy in (SYNC_ALWAYS, SYNC_BATCH, SYNC_NEVER):
+            log = BlockLog(os.path.join(tmp, policy), sync=policy)
+            log.append(blocks[0])
+            latencies, total = measure(log.append, blocks[1:])
+            report(f"Block-Log {policy}", latencies, total)
+            logs[policy] = log
+
+        log = logs[SYNC_BATCH]
+        log_read = measure_reads(log.read, count)
+        print("\n📖 Wahlfreier Zugriff auf einen Block")
+        print(f"   ORM (SQLite)     {orm_read * 1000:7.3f} ms")
+        print(f"   Block-Log        {log_read * 1000:7.3f} ms")
+
+        for log in logs.values():
+            log.close()
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# block_log_test.py
+import os
+import tempfile
+
+import pytest
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.block_log import BlockLog, BlockLogError, SYNC_ALWAYS, SYNC_NEVER
+from database import DatabaseManager
+from database_handling import initialize_blockchain_from_database
+from marketplace import MarketplaceBlockchain
+
+
+def build_chain(blocks):
+    blockchain = Blockchain(mining_workers=1)
+    for i in range(blocks):
+        blockchain.make_transaction("A", f"B{i}", i)
+        blockchain.mine_block(difficulty=1)
+    return blockchain.chain
+
+
+def segment_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".log"))
+
+
+def test_segments_and_random_access():
+    chain = build_chain(40)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Kleine Segmente und ein dünner Index, damit beides mehrfach vorkommt
+        log = BlockLog(tmp, segment_size=2048, index_interval=4, sync=SYNC_ALWAYS)
+        log.append_many(chain[:20])
+        for block in chain[20:]:
+            log.append(block)
+        assert len(log) == 41 and len(segment_files(tmp)) > 2
+
+        assert [block.hash for block in log.iter_blocks()] == [block.hash for block in chain]
+        assert [block.hash for block in log.read_range(17, 29)] == [block.hash for block in chain[17:29]]
+        assert log.read(33).hash == chain[33].hash
+        with pytest.raises(IndexError):
+            log.read(41)
+        with pytest.raises(BlockLogError):
+            log.append(chain[5])
+        log.close()
+
+        # Nach dem Neustart: volle Segmente über ihre Index-Dateien, gleicher Inhalt
+        reopened = BlockLog(tmp, segment_size=2048, index_interval=4)
+        assert len(reopened) == 41 and reopened.recovered_bytes == 0
+        assert [block.hash for block in reopened.iter_blocks(30)] == [block.hash for block in chain[30:]]
+        reopened.close()
+
+
+def test_torn_tail_is_cut_off():
+    chain = build_chain(10)
+    with tempfile.TemporaryDirectory() as tmp:
+        log = BlockLog(tmp, sync=SYNC_NEVER)
+        log.append_many(chain)
+        log.close()
+
+        # Absturz mitten im Schreiben des letzten Blocks
+        path = os.path.join(tmp, segment_files(tmp)[-1])
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 7)
+
+        recovered = BlockLog(tmp)
+        assert len(recovered) == 10 and recovered.recovered_bytes > 0
+        assert recovered.read(9).hash == chain[9].hash
+        # Der fehlende Block kann wieder angehängt werden
+        recovered.append(chain[10])
+        assert [block.hash for block in recovered.iter_blocks()] == [block.hash for block in chain]
+
+        # Beschädigter Inhalt (falsche Prüfsumme) im letzten Segment: ebenfalls abgeschnitten
+        recovered.close()
+        with open(path, "r+b") as f:
+            f.seek(os.path.getsize(path) - 3)
+            f.write(b"xyz")
+        assert len(BlockLog(tmp)) == 10
+
+
+def test_truncate_across_segments():
+    chain = build_chain(30)
+    with tempfile.TemporaryDirectory() as tmp:
+        log = BlockLog(tmp, segment_size=2048, index_interval=3)
+        log.append_many(chain)
+        segments = len(segment_files(tmp))
+
+        log.truncate(12)
+        assert len(log) == 12 and len(segment_files(tmp)) < segments
+        assert [block.hash for block in log.iter_blocks()] == [block.hash for block in chain[:12]]
+        log.append_many(chain[12:20])
+        log.close()
+
+        reopened = BlockLog(tmp, segment_size=2048, index_interval=3)
+        assert [block.hash for block in reopened.iter_blocks()] == [block.hash for block in chain[:20]]
+        reopened.truncate(0)
+        assert len(reopened) == 0 and list(reopened.iter_blocks()) == []
+        reopened.close()
+
+
+def test_marketplace_persists_blocks_in_log():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'log.db')}")
+        # Bestehende Datenbank mit Blöcken in der Tabelle blocks
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+        for i in range(3):
+            marketplace.make_transaction("M", "N", i)
+            marketplace.mine_block(difficulty=1)
+        old_chain = [block.hash for block in marketplace.chain]
+
+        # Das neue Block-Log übernimmt die Blöcke einmalig, danach wird nur noch angehängt
+        log_dir = os.path.join(tmp, "block_log")
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1, block_log_dir=log_dir, lazy_blocks=True,
+                                            block_cache_size=2)
+        assert [block.hash for block in marketplace.block_log.iter_blocks()] == old_chain
+        assert initialize_blockchain_from_database(marketplace)
+        for i in range(3):
+            marketplace.make_transaction("M", "N", i)
+            marketplace.mine_block(difficulty=1)
+        marketplace.discard_last_block()
+        assert len(marketplace.block_log) == 6
+        assert marketplace.validate_chain(use_checkpoint=False)
+        chain = [block.hash for block in marketplace.chain]
+        marketplace.block_log.close()
+
+        restarted = MarketplaceBlockchain(db_manager, mining_workers=1, block_log_dir=log_dir)
+        assert initialize_blockchain_from_database(restarted)
+        assert [block.hash for block in restarted.chain] == chain
+        restarted.block_log.close()
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_segments_and_random_access()
+    test_torn_tail_is_cut_off()
+    test_truncate_across_segments()
+    test_marketplace_persists_blocks_in_log()
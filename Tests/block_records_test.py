@@ -0,0 +1,66 @@
+# block_records_test.py
+import json
+import pickle
+import sys
+
+import pytest
+
+from Blockchain.blockchain import Blockchain, Block
+from Blockchain.transactions import DataUploadTransaction, transaction_from_dict
+
+
+def test_transaction_records_behave_like_dicts():
+    blockchain = Blockchain(mining_workers=1)
+    data_id = blockchain.data_upload_transaction("Alice", {"name": "Iris"}, 10.0)
+    tx = blockchain.current_transactions[0]
+
+    assert isinstance(tx, DataUploadTransaction)
+    assert tx["type"] == "data_upload" and tx.get("owner") == "Alice"
+    assert tx.get("buyer") is None and "sender" not in tx
+    assert dict(tx)["transaction_id"] == data_id
+
+    with pytest.raises(AttributeError):
+        tx.price = 0.0
+
+    # Kanonische Bytes werden einmal berechnet und wiederverwendet
+    assert tx.canonical_bytes is tx.canonical_bytes
+    assert json.loads(tx.canonical_bytes) == tx.to_dict()
+    assert transaction_from_dict(tx.to_dict()) == tx
+    assert pickle.loads(pickle.dumps(tx)) == tx
+
+    # Unbekannte Formate bleiben Dicts und werden weiterhin abgelehnt
+    unknown = transaction_from_dict({"type": "gift", "amount": 1})
+    assert isinstance(unknown, dict)
+    assert not blockchain.validate_transaction(unknown)
+
+    print(f"Record: {sys.getsizeof(tx)} Bytes, Dict: {sys.getsizeof(tx.to_dict())} Bytes")
+
+
+def test_block_is_immutable_and_caches_serialization():
+    blockchain = Blockchain(mining_workers=1)
+    blockchain.make_transaction("Alice", "Bob", 5)
+    blockchain.data_upload_transaction("Alice", {"name": "Iris"}, 10.0)
+    block, _ = blockchain.mine_block(difficulty=2)
+
+    with pytest.raises(AttributeError):
+        block.proof = 1
+    with pytest.raises(AttributeError):
+        block.extra = "nicht erlaubt"
+
+    assert block.transactions_json is block.transactions_json
+    assert block.size == block.size > 0
+
+    # Gespeichertes JSON ergibt wieder denselben Block
+    restored = Block.from_storage(
+        index=block.index, previous_hash=block.previous_hash, timestamp=block.timestamp,
+        transactions=json.loads(block.transactions_json), proof=block.proof,
+        difficulty=block.difficulty, mining_time=block.mining_time, hash=block.hash)
+    assert restored.hash == restored.calculate_hash() == block.hash
+    assert restored.transactions == block.transactions
+
+    assert pickle.loads(pickle.dumps(block)).hash == block.hash
+
+
+if __name__ == "__main__":
+    test_transaction_records_behave_like_dicts()
+    test_block_is_immutable_and_caches_serialization()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark Bloom-Filter pro Block
+================================
+
+Erzeugt eine synthetische Chain (Standard: 100.000 Blöcke) mit Uploads,
+Käufen und Überweisungen und vergleicht die Suche nach den Transaktionen
+einer Adresse: kompletter Scan aller Transaktionen (wie bisher im Dashboard)
+gegen transactions_matching, das Blöcke über ihren Bloom-Filter überspringt.
+Gemessen wird für mehrere Falsch-Positiv-Raten, dazu Filtergröße und die
+Anzahl der unnötig geprüften Blöcke.
+
+Aufruf: python Tests/bloom_benchmark.py [anzahl_bloecke] [transaktionen_pro_block]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Blockchain.blockchain import Blockchain, Block
+from Blockchain.transactions import TransferTransaction, DataUploadTransaction, DataPurchaseTransaction
+
+FALSE_POSITIVE_RATES = (0.1, 0.01, 0.001)
+ADDRESSES = 20_000
+SEARCHES = 20
+
+
+def build_blocks(blocks, transactions_per_block):
+    rng = random.Random(7)
+    chain = []
+    items = []
+    previous_hash = "0"
+    for index in range(blocks):
+        transactions = []
+        for n in range(transactions_per_block):
+            kind = rng.random()
+            timestamp = 1700000000.0 + index
+            if kind < 0.2 or not items:
+                tx = DataUploadTransaction(owner=f"user{rng.randrange(ADDRESSES)}", metadata={"name": f"Set {index}"},
+                                           price=1.0, timestamp=timestamp, transaction_id=f"{index:010x}{n:06x}",
+                                           signature="placeholder_signature")
+                items.append((tx["transaction_id"], tx["owner"]))
+            elif kind < 0.5:
+                item_id, seller = items[rng.randrange(len(items))]
+                tx = DataPurchaseTransaction(buyer=f"user{rng.randrange(ADDRESSES)}", seller=seller, data_id=item_id,
+                                             amount=1.0, timestamp=timestamp, transaction_id=f"{index:010x}{n:06x}",
+                                             signature="placeholder_signature")
+            else:
+                tx = TransferTransaction(sender=f"user{rng.randrange(ADDRESSES)}",
+                                         recipient=f"user{rng.randrange(ADDRESSES)}", amount=1,
+                                         timestamp=timestamp, transaction_id=f"{index:010x}{n:06x}",
+                                         signature="placeholder_signature")
+            transactions.append(tx)
+        block = Block(index, previous_hash, 1700000000.0 + index, transactions, proof=0, difficulty=0)
+        chain.append(block)
+        previous_hash = block.hash
+    return chain
+
+
+def full_scan(blockchain, address):
+    found = []
+    for block in blockchain.chain:
+        for tx in block.transactions:
+            if address in (tx.get("owner"), tx.get("buyer"), tx.get("seller"), tx.get("sender"), tx.get("recipient")):
+                found.append((block.index, tx["transaction_id"]))
+    return found
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    transactions_per_block = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("🚀 BLOOM-FILTER BENCHMARK")
+    print("=" * 50)
+    print(f"Blöcke: {blocks}, Transaktionen pro Block: {transactions_per_block}, Adressen: {ADDRESSES}")
+
+    chain = build_blocks(blocks, transactions_per_block)
+    addresses = [f"user{n}" for n in random.Random(3).sample(range(ADDRESSES), SEARCHES)]
+
+    blockchain = Blockchain(mining_workers=1)
+    blockchain.chain = chain
+    start = time.perf_counter()
+    expected = [full_scan(blockchain, address) for address in addresses]
+    scan_time = (time.perf_counter() - start) / SEARCHES
+    matching_blocks = sum(len({index for index, _ in found}) for found in expected) / SEARCHES
+    print(f"\n   Kompletter Scan:   {scan_time * 1e3:8.1f} ms pro Adresse "
+          f"({matching_blocks:.0f} Blöcke mit Treffern)")
+
+    for rate in FALSE_POSITIVE_RATES:
+        blockchain.bloom_false_positive_rate = rate
+        start = time.perf_counter()
+        blockchain.rebuild_transaction_index()
+        build_time = time.perf_counter() - start
+        filter_bytes = sum(len(bloom.bits) for bloom in blockchain.block_filters)
+
+        start = time.perf_counter()
+        results = [[(block.index, tx["transaction_id"]) for block, tx in blockchain.transactions_matching(address)]
+                   for address in addresses]
+        search_time = (time.perf_counter() - start) / SEARCHES
+        assert results == expected
+
+        candidates = sum(len(list(blockchain.blocks_matching(address))) for address in addresses) / SEARCHES
+        print(f"   Rate {rate:<6} Filter {filter_bytes / 1e6:5.2f} MB, Index-Aufbau {build_time:5.1f}s, "
+              f"Suche {search_time * 1e3:7.1f} ms ({scan_time / search_time:4.1f}x), "
+              f"{candidates - matching_blocks:6.0f} falsch-positive Blöcke")
+
+
+if __name__ == "__main__":
+    main()
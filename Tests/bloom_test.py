@@ -0,0 +1,86 @@
+# bloom_test.py
+import os
+import tempfile
+
+import pytest
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.bloom import BloomFilter, block_filter, transaction_keys
+
+
+def test_bloom_filter_rates():
+    bloom = BloomFilter.for_capacity(1_000, 0.01)
+    keys = [f"adresse-{i}" for i in range(1_000)]
+    for key in keys:
+        bloom.add(key)
+
+    # Keine falsch-negativen Treffer
+    assert all(key in bloom for key in keys)
+
+    # Falsch-positive Rate ungefähr wie angefordert
+    false_positives = sum(f"fremd-{i}" in bloom for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+
+    restored = BloomFilter(bloom.size, bloom.hash_count, bloom.to_bytes())
+    assert all(key in restored for key in keys)
+
+    with pytest.raises(ValueError):
+        BloomFilter.for_capacity(10, 1.5)
+
+
+def build_chain(path=None):
+    blockchain = Blockchain(mining_workers=1, snapshot_path=path, snapshot_interval=3)
+    for i in range(8):
+        data_id = blockchain.data_upload_transaction(f"Owner{i}", {"name": f"Set {i}"}, 1.0)
+        blockchain.make_transaction(f"Sender{i}", "Bob", i)
+        if i % 2 == 0:
+            blockchain.data_purchase_transaction("Käufer", data_id, 1.0)
+        blockchain.mine_block(difficulty=1)
+    return blockchain
+
+
+def brute_force(blockchain, key):
+    return [(block.index, tx["transaction_id"]) for block in blockchain.chain for tx in block.transactions
+            if key in transaction_keys(tx)]
+
+
+def test_scans_skip_blocks():
+    blockchain = build_chain()
+    assert len(blockchain.block_filters) == len(blockchain.chain)
+
+    # Blöcke ohne die Adresse werden übersprungen (bis auf seltene falsch-positive)
+    candidates = list(blockchain.blocks_matching("Owner3"))
+    assert 4 in [block.index for block in candidates] and len(candidates) <= 2
+
+    for key in ("Käufer", "Bob", "Owner5", blockchain.data_list[2]["data_id"], "Unbekannt"):
+        found = [(block.index, tx["transaction_id"]) for block, tx in blockchain.transactions_matching(key)]
+        assert found == brute_force(blockchain, key)
+    assert len(list(blockchain.transactions_matching("Käufer"))) == 4
+
+    # Verworfener Block verliert seinen Filter
+    blockchain.discard_last_block()
+    assert len(blockchain.block_filters) == len(blockchain.chain)
+    assert list(blockchain.transactions_matching("Owner7")) == []
+
+
+def test_filters_after_restore():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.json")
+        blockchain = build_chain(path)
+
+        restarted = Blockchain(mining_workers=1, snapshot_path=path)
+        restarted.chain = list(blockchain.chain)
+        assert 0 < restarted.restore_derived_state() < len(blockchain.chain)
+        assert [bloom.to_bytes() for bloom in restarted.block_filters] == \
+               [block_filter(block).to_bytes() for block in blockchain.chain]
+
+        rebuilt = Blockchain(mining_workers=1)
+        rebuilt.chain = list(blockchain.chain)
+        rebuilt.rebuild_transaction_index()
+        assert list(rebuilt.transactions_matching("Bob")) == list(blockchain.transactions_matching("Bob"))
+
+
+if __name__ == "__main__":
+    test_bloom_filter_rates()
+    test_scans_skip_blocks()
+    test_filters_after_restore()
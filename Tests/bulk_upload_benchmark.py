@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark Bulk-Upload
+=====================
+
+Befüllt einen leeren Marktplatz mit Datensätzen (je 4 KB CSV): einmal Stück für Stück mit
+upload_data_with_file, einmal mit upload_data_many (paralleles Verschlüsseln, ein IPFS-Stapel,
+Bulk-Insert in einer Datenbanktransaktion, alle Transaktionen auf einmal in den Mempool).
+
+Aufruf: python Tests/bulk_upload_benchmark.py [datensätze]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from marketplace import MarketplaceBlockchain
+
+FILE_SIZE = 4096
+OWNERS = 20
+
+
+def build_uploads(count):
+    return [(f"Anbieter{i % OWNERS}", f"spalte_a,spalte_b\n{i},".ljust(FILE_SIZE, "x"),
+             {"name": f"Datensatz {i}", "category": "Benchmark"}, 1.0 + i % 10)
+            for i in range(count)]
+
+
+def run(directory, upload):
+    # IPFS-Ordner und data_keys.json entstehen im Arbeitsverzeichnis
+    os.makedirs(directory)
+    os.chdir(directory)
+    db_manager = DatabaseManager(f"sqlite:///{os.path.join(directory, 'bulk.db')}")
+    marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+    # Anbieter sind wie nach dem Login schon registriert
+    for i in range(OWNERS):
+        marketplace.register_user(f"Anbieter{i}")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        upload(marketplace)
+    elapsed = time.perf_counter() - start
+    assert len(marketplace.mempool) > 0
+    marketplace.miner.shutdown()
+    db_manager.engine.dispose()
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    uploads = build_uploads(count)
+    previous = os.getcwd()
+
+    print("🚀 BULK-UPLOAD BENCHMARK")
+    print("=" * 50)
+    print(f"Datensätze: {count}, Dateigröße: {FILE_SIZE} Bytes, CPU-Kerne: {os.cpu_count()}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            single = run(os.path.join(tmp, "einzeln"), lambda marketplace: [
+                marketplace.upload_data_with_file(*upload) for upload in uploads])
+            bulk = run(os.path.join(tmp, "bulk"), lambda marketplace: marketplace.upload_data_many(uploads))
+        finally:
+            os.chdir(previous)
+
+    print("\n📦 Hochladen")
+    print(f"   Einzeln            {single:7.2f} s, {count / single:8.0f} Datensätze/s")
+    print(f"   upload_data_many   {bulk:7.2f} s, {count / bulk:8.0f} Datensätze/s")
+    print(f"   Beschleunigung     {single / bulk:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
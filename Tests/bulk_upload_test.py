@@ -0,0 +1,92 @@
+# bulk_upload_test.py
+import json
+import os
+import tempfile
+from unittest import mock
+
+import pytest
+
+from database import DatabaseManager, DataEntry, ModelEntry, EncryptedFile
+from encryption import decrypt_file
+from marketplace import MarketplaceBlockchain
+
+
+def test_upload_many_data_and_models():
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # IPFS-Ordner und data_keys.json liegen im Arbeitsverzeichnis
+        os.chdir(tmp)
+        try:
+            db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bulk.db')}")
+            marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+            marketplace.register_user("Anna")
+
+            uploads = [("Anna" if i % 2 else "Ben", f"x,y\n{i},{i * i}\n", {"name": f"Set {i}"}, float(i))
+                       for i in range(6)]
+            uploads.append(("Ben", uploads[0][1], {"name": "Kopie"}, 1.0))  # gleicher Inhalt
+            results = marketplace.upload_data_many(uploads, workers=2)
+            models = marketplace.upload_model_many([("Anna", b"\x00weights", {"name": "Modell"}, 9.0)])
+
+            # Alle Upload-Transaktionen im Mempool und als Listings
+            data_ids = [data_id for data_id, _ in results]
+            assert [tx["transaction_id"] for tx in marketplace.mempool.by_type("data_upload")] == data_ids
+            assert len(marketplace.data_list) == 7 and len(marketplace.model_list) == 1
+
+            session = db_manager.get_session()
+            entries = {entry.data_id: entry for entry in session.query(DataEntry)}
+            assert set(entries) == set(data_ids)
+            assert session.query(ModelEntry).one().encrypted_file.ipfs_cid
+            for (owner, content, metadata, price), (data_id, key) in zip(uploads, results):
+                entry = entries[data_id]
+                assert entry.owner.address == owner and entry.price == price
+                assert json.loads(entry.data_metadata) == metadata
+                # Inhalt aus dem IPFS mit dem zurückgegebenen Schlüssel lesbar
+                encrypted = marketplace.ipfs.get(entry.encrypted_file.ipfs_cid)
+                assert decrypt_file(encrypted, key.encode()).decode() == content
+            assert session.query(EncryptedFile).count() == 8
+            assert len({entry.encrypted_file.file_hash for entry in entries.values()}) == 7
+            session.close()
+
+            # Jeder Inhalt mit Metadaten abgelegt und gepinnt
+            assert set(marketplace.ipfs.list_pins()) == set(marketplace.ipfs.list_objects())
+            assert len(marketplace.ipfs.list_pins()) == 8
+            with open("data_keys.json") as f:
+                assert {entry["data_id"] for entry in json.load(f)["datasets"]} == set(data_ids) | {models[0][0]}
+
+            # Nach dem Mining wie einzelne Uploads in der Chain
+            block, _ = marketplace.mine_block(difficulty=1)
+            assert [tx["transaction_id"] for tx in block.transactions] == data_ids + [models[0][0]]
+            db_manager.engine.dispose()
+        finally:
+            os.chdir(previous)
+
+
+def test_failed_upload_leaves_no_pending_transactions():
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bulk.db')}")
+            marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+            marketplace.make_transaction("Anna", "Ben", 1)
+
+            # Die Transaktionen sind schon im Mempool, dann schlägt der Bulk-Insert fehl
+            with mock.patch("marketplace.insert", side_effect=RuntimeError("Datenbank nicht erreichbar")):
+                with pytest.raises(RuntimeError):
+                    marketplace.upload_data_many([("Anna", "x,y\n1,2\n", {"name": "Set"}, 1.0)] * 3)
+
+            # Keine verwaisten Uploads: weder im Mempool noch als Listing oder im Index
+            assert [tx.get("type") for tx in marketplace.mempool] == [None]
+            assert marketplace.data_list == [] and marketplace.data_entries == {}
+            assert len(marketplace.transaction_index) == len(marketplace.chain[0].transactions) + 1
+            session = db_manager.get_session()
+            assert session.query(DataEntry).count() == 0
+            session.close()
+            db_manager.engine.dispose()
+        finally:
+            os.chdir(previous)
+
+
+if __name__ == "__main__":
+    test_upload_many_data_and_models()
+    test_failed_upload_leaves_no_pending_transactions()
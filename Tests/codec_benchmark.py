@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark Block-Serialisierung
+==============================
+
+Vergleicht den bisherigen JSON-Pfad (to_dict + json.dumps, json.loads + Block)
+und die Wiederherstellung aus der Datenbank (transactions_json + Block.from_storage,
+berechnet Merkle-Root und Hash neu) mit dem binären Format aus Blockchain/codec.py:
+Kodier- und Dekodierzeit sowie Bytes pro Block.
+
+Aufruf: python Tests/codec_benchmark.py [anzahl_bloecke] [transaktionen_pro_block]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Blockchain.blockchain import Block
+from Blockchain.codec import encode_block, decode_block
+
+
+def build_blocks(count, transactions_per_block):
+    blocks = []
+    previous_hash = "0"
+    for index in range(count):
+        transactions = []
+        for i in range(transactions_per_block):
+            n = index * transactions_per_block + i
+            if i % 3 == 0:
+                transactions.append({"sender": f"{n:032x}", "recipient": f"{n + 1:032x}", "amount": float(n),
+                                     "timestamp": time.time(), "signature": "placeholder_signature",
+                                     "transaction_id": f"{n:032x}"})
+            elif i % 3 == 1:
+                transactions.append({"type": "data_upload", "owner": f"{n:032x}",
+                                     "metadata": {"name": f"Datensatz {n}", "description": "Benchmark",
+                                                  "format": "csv", "size": n * 10},
+                                     "price": 9.99, "timestamp": time.time(),
+                                     "signature": "placeholder_signature", "transaction_id": f"{n:032x}"})
+            else:
+                transactions.append({"type": "data_purchase", "buyer": f"{n:032x}", "seller": f"{n - 1:032x}",
+                                     "data_id": f"{n - 1:032x}", "amount": 9.99, "timestamp": time.time(),
+                                     "signature": "placeholder_signature", "transaction_id": f"{n:032x}"})
+        block = Block(index, previous_hash, time.time(), transactions, proof=index * 17, difficulty=4.0,
+                      mining_time=1.5)
+        blocks.append(block)
+        previous_hash = block.hash
+    return blocks
+
+
+def json_encode(block):
+    return json.dumps(block.to_dict()).encode()
+
+
+def json_decode(data):
+    fields = json.loads(data)
+    return Block(
+        index=fields["index"],
+        previous_hash=fields["previous_hash"],
+        timestamp=fields["timestamp"],
+        transactions=fields["transactions"],
+        proof=fields["proof"],
+        difficulty=fields["difficulty"],
+        mining_time=fields["mining_time"],
+        hash=fields["hash"],
+        merkle_root=fields["merkle_root"],
+        version=fields["version"],
+    )
+
+
+def storage_encode(block):
+    header = {"index": block.index, "previous_hash": block.previous_hash, "timestamp": block.timestamp,
+              "proof": block.proof, "hash": block.hash}
+    return json.dumps(header).encode() + b"\n" + block.transactions_json.encode()
+
+
+def storage_decode(data):
+    header, transactions_json = data.split(b"\n", 1)
+    header = json.loads(header)
+    return Block.from_storage(transactions=json.loads(transactions_json), **header)
+
+
+def measure(label, blocks, encode, decode):
+    start = time.perf_counter()
+    encoded = [encode(block) for block in blocks]
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = [decode(data) for data in encoded]
+    decode_time = time.perf_counter() - start
+
+    assert [block.hash for block in decoded] == [block.hash for block in blocks]
+    average_bytes = sum(len(data) for data in encoded) / len(encoded)
+    print(f"   {label:<8} kodieren {encode_time:7.3f}s   dekodieren {decode_time:7.3f}s   "
+          f"{average_bytes:10.0f} Bytes/Block")
+    return encode_time, decode_time, average_bytes
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    transactions_per_block = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    print("📦 BLOCK-SERIALISIERUNG BENCHMARK")
+    print("=" * 50)
+    print(f"Blöcke: {count}, Transaktionen pro Block: {transactions_per_block}")
+
+    blocks = build_blocks(count, transactions_per_block)
+    json_result = measure("JSON", blocks, json_encode, json_decode)
+    storage_result = measure("DB-JSON", blocks, storage_encode, storage_decode)
+    binary_result = measure("Binär", blocks, encode_block, decode_block)
+
+    print("\n📊 Binär im Vergleich zu JSON:")
+    print(f"   Kodieren:   {json_result[0] / binary_result[0]:5.2f}x")
+    print(f"   Dekodieren: {json_result[1] / binary_result[1]:5.2f}x "
+          f"({storage_result[1] / binary_result[1]:.2f}x gegenüber der Wiederherstellung aus der DB)")
+    print(f"   Größe:      {binary_result[2] / json_result[2] * 100:5.1f}% der JSON-Bytes")
+
+
+if __name__ == "__main__":
+    main()
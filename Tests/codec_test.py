@@ -0,0 +1,67 @@
+# codec_test.py
+import pytest
+
+from Blockchain.blockchain import Blockchain, Block, LEGACY_BLOCK_VERSION
+from Blockchain.codec import (
+    encode_block, decode_block, encode_transaction, decode_transaction, encoded_block_hash, CodecError,
+)
+from Blockchain.transactions import canonical_bytes
+
+
+def assert_same_block(decoded, block):
+    assert decoded.to_dict() == block.to_dict()
+    assert [type(tx) for tx in decoded.transactions] == [type(tx) for tx in block.transactions]
+    assert [canonical_bytes(tx) for tx in decoded.transactions] == [canonical_bytes(tx) for tx in block.transactions]
+    assert decoded.hash == decoded.calculate_hash() == block.hash
+
+
+def test_round_trip_mined_blocks():
+    blockchain = Blockchain(mining_workers=1)
+    blockchain.make_transaction("Alice", "Bob", 5)
+    data_id = blockchain.data_upload_transaction("Owner", {"name": "Set", "tags": ["a", "b"], "rows": 10}, 1.5)
+    blockchain.data_purchase_transaction("Buyer", data_id, 1.5)
+    blockchain.model_upload_transaction("Owner", {"name": "Modell", "accuracy": 0.93, "public": True}, 2)
+    blockchain.mine_block(difficulty=1)
+
+    for block in blockchain.chain:
+        data = encode_block(block)
+        # Deterministisch: gleicher Block, gleiche Bytes
+        assert encode_block(block) == data
+        assert encoded_block_hash(data) == block.hash
+        decoded = decode_block(data)
+        assert_same_block(decoded, block)
+        assert len(data) < block.size
+        print(f"Block {block.index}: {len(data)} Bytes binär, {block.size} Bytes JSON")
+
+    # Genesis-Block behält seinen kurzen previous_hash "0"
+    assert decode_block(encode_block(blockchain.chain[0])).previous_hash == "0"
+    assert blockchain.validate_chain(chain=[decode_block(encode_block(b)) for b in blockchain.chain])
+
+
+def test_round_trip_legacy_and_dict_transactions():
+    # Legacy-Blöcke hashen ihr JSON, int und float müssen daher erhalten bleiben
+    legacy = Block(3, "ab" * 32, 1700000000, [{"transaction_id": "x", "note": "frei"}],
+                   proof=42, difficulty=4, mining_time=0, version=LEGACY_BLOCK_VERSION)
+    decoded = decode_block(encode_block(legacy))
+    assert_same_block(decoded, legacy)
+    assert isinstance(decoded.difficulty, int) and isinstance(decoded.timestamp, int)
+
+    for tx in ({"transaction_id": "x", "nested": {"a": [1, 2.5, None]}},
+               {"sender": "ABCDEF", "recipient": "", "amount": -3, "timestamp": 1.25,
+                "signature": "sig", "transaction_id": "00ff"}):
+        assert canonical_bytes(decode_transaction(encode_transaction(tx))) == canonical_bytes(tx)
+
+
+def test_invalid_data():
+    block = Block(1, "0" * 64, 1.0, [{"transaction_id": "a"}], proof=5)
+    data = encode_block(block)
+
+    for broken in (b"", b"XX" + data[2:], data[:-1], data + b"\x00", data[:2] + b"\x09" + data[3:]):
+        with pytest.raises(CodecError):
+            decode_block(broken)
+
+
+if __name__ == "__main__":
+    test_round_trip_mined_blocks()
+    test_round_trip_legacy_and_dict_transactions()
+    test_invalid_data()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark Konsens-Engines
+=========================
+
+Misst, wie lange ein Block mit 10 Transaktionen braucht, bis er in der Chain ist:
+Proof of Work mit fester Schwierigkeit gegen Proof of Authority (Ed25519-Siegel).
+Danach die Validierung der Chain (PoW-Prüfung gegen Siegelprüfung).
+
+Aufruf: python Tests/consensus_benchmark.py [blöcke] [schwierigkeit]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.consensus import ProofOfWork, ProofOfAuthority
+from Blockchain.signatures import generate_private_key, public_key_hex
+
+TRANSACTIONS_PER_BLOCK = 10
+
+
+def produce(blockchain, blocks, difficulty):
+    latencies = []
+    for n in range(blocks):
+        for i in range(TRANSACTIONS_PER_BLOCK):
+            blockchain.make_transaction(f"Käufer{i}", f"Verkäufer{n}", i)
+        start = time.perf_counter()
+        blockchain.mine_block(difficulty)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def validate(blockchain):
+    start = time.perf_counter()
+    assert blockchain.validate_chain(use_checkpoint=False)
+    return time.perf_counter() - start
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    difficulty = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    key = generate_private_key()
+    engines = {
+        f"PoW (Schwierigkeit {difficulty:g})": ProofOfWork(),
+        "Proof of Authority": ProofOfAuthority([public_key_hex(key)], private_key=key),
+    }
+
+    print("🚀 KONSENS BENCHMARK")
+    print("=" * 50)
+    print(f"Blöcke: {blocks}, Transaktionen pro Block: {TRANSACTIONS_PER_BLOCK}, CPU-Kerne: {os.cpu_count()}")
+
+    for name, engine in engines.items():
+        blockchain = Blockchain(consensus=engine)
+        latencies = produce(blockchain, blocks, difficulty)
+        validation_time = validate(blockchain)
+        print(f"\n⛏️  {name}")
+        print(f"   Block bis zur Chain: Median {statistics.median(latencies) * 1000:9.2f} ms, "
+              f"Maximum {max(latencies) * 1000:9.2f} ms")
+        print(f"   Validierung:         {validation_time * 1000:9.2f} ms für {blocks} Blöcke")
+        blockchain.miner.shutdown()
+
+
+if __name__ == "__main__":
+    main()
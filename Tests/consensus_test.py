@@ -0,0 +1,93 @@
+# consensus_test.py
+import os
+import tempfile
+
+import pytest
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.codec import encode_block, decode_block
+from Blockchain.consensus import ProofOfAuthority, ConsensusError, seal_signer
+from Blockchain.header import BlockHeader
+from Blockchain.signatures import generate_private_key, public_key_hex
+from Blockchain import validation
+from database import DatabaseManager
+from marketplace import MarketplaceBlockchain
+
+
+def test_proof_of_authority_seals_blocks():
+    key = generate_private_key()
+    engine = ProofOfAuthority([public_key_hex(key)], private_key=key)
+    blockchain = Blockchain(mining_workers=1, consensus=engine)
+    for i in range(5):
+        blockchain.make_transaction("A", "B", i)
+        block, mining_time = blockchain.mine_block()
+        # Keine Suche: kein Proof, keine Schwierigkeit
+        assert block.proof == 0 and block.difficulty == 0 and mining_time == 0.0
+        assert seal_signer(block) == public_key_hex(key)
+    assert blockchain.validate_chain(use_checkpoint=False)
+
+    # Das Siegel ist nicht Teil des Hashes, übersteht aber Codec und Header
+    block = blockchain.last_block
+    assert block.with_seal("").hash == block.hash
+    assert decode_block(encode_block(block)).seal == block.seal
+    assert BlockHeader.from_dict(BlockHeader.from_block(block).to_dict()).seal == block.seal
+    assert validation.validate_headers([BlockHeader.from_block(b) for b in blockchain.chain], None, engine)
+
+    # Ohne Siegel, mit fremdem Schlüssel oder mit vertauschtem Siegel ungültig
+    previous = blockchain.chain[-2]
+    assert not blockchain.validate_block(block.with_seal(""), previous)
+    assert not blockchain.validate_block(block.with_seal(previous.seal), previous)
+    outsider = generate_private_key()
+    forged = ProofOfAuthority([public_key_hex(outsider)], private_key=outsider).seal_block(block)
+    assert not blockchain.validate_block(forged, previous)
+
+
+def test_validators_and_transition_from_proof_of_work():
+    key = generate_private_key()
+    blockchain = Blockchain(mining_workers=1)
+    for i in range(3):
+        blockchain.make_transaction("A", "B", i)
+        blockchain.mine_block(difficulty=1)
+
+    # Ab Block 4 signiert, die PoW-Blöcke davor bleiben gültig
+    blockchain.consensus = ProofOfAuthority([public_key_hex(key)], private_key=key,
+                                            transition_height=len(blockchain.chain))
+    for i in range(3):
+        blockchain.make_transaction("A", "B", i)
+        blockchain.mine_block()
+    assert [bool(block.seal) for block in blockchain.chain] == [False] * 4 + [True] * 3
+    assert blockchain.validate_chain(use_checkpoint=False, workers=1)
+    assert validation.validate_range_parallel(blockchain.chain, workers=2, chunk_size=2,
+                                              consensus=blockchain.consensus)
+
+    # Knoten ohne Schlüssel validieren nur
+    follower = ProofOfAuthority([public_key_hex(key)], transition_height=4)
+    assert validation.validate_range(blockchain.chain, consensus=follower)
+    with pytest.raises(ConsensusError):
+        follower.prepare_block(blockchain, blockchain.last_block)
+    with pytest.raises(ConsensusError):
+        ProofOfAuthority([public_key_hex(key)], private_key=generate_private_key())
+
+
+def test_marketplace_stores_seals():
+    key = generate_private_key()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'poa.db')}")
+        engine = ProofOfAuthority([public_key_hex(key)], private_key=key, transition_height=1)
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1, lazy_blocks=True, block_cache_size=1,
+                                            consensus=engine)
+        for i in range(3):
+            marketplace.make_transaction("M", "N", i)
+            marketplace.mine_block()
+
+        # Aus der Datenbank geladene Blöcke tragen ihr Siegel
+        stored = marketplace._load_stored_blocks(1, 4)
+        assert [block.seal for block in stored] == [block.seal for block in marketplace.chain[1:]]
+        assert marketplace.validate_chain(use_checkpoint=False)
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_proof_of_authority_seals_blocks()
+    test_validators_and_transition_from_proof_of_work()
+    test_marketplace_stores_seals()
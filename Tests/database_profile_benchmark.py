@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark Engine-Profil und Sitzung pro Anfrage
+===============================================
+
+Vergleicht das Standardprofil (create_engine ohne Anpassungen, eine Sitzung pro Methode)
+mit dem Profil production (WAL, synchronous=NORMAL, Seiten-Cache, Verbindungspool) und einer
+gemeinsamen Sitzung pro Flask-Anfrage. Gemessen werden eine kaufähnliche Anfrage mit
+mehreren Marktplatz-Methoden und das Speichern von Blöcken.
+
+Aufruf: python Tests/database_profile_benchmark.py [anfragen]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+
+from database import DatabaseManager, PROFILE_DEFAULT, PROFILE_PRODUCTION
+from marketplace import MarketplaceBlockchain
+
+BLOCKS = 200
+WARMUP_REQUESTS = 100
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure_requests(db_manager, marketplace, requests, request_scope):
+    app = Flask(__name__)
+    if request_scope:
+        db_manager.init_app(app)
+
+    @app.route("/buy/<int:n>")
+    def buy(n):
+        # Wie ein Kauf: Benutzer anlegen bzw. finden, Käufer erneut laden, Abfrage der Transaktionen
+        address = f"Käufer{n % 50}"
+        marketplace.register_user(address)
+        marketplace.register_user(address)
+        marketplace.query_transactions(address=address, limit=10)
+        return "ok"
+
+    client = app.test_client()
+    for n in range(WARMUP_REQUESTS):
+        client.get(f"/buy/{n}")
+
+    checkouts = []
+    event.listen(db_manager.engine, "checkout", lambda *args: checkouts.append(1))
+    latencies = []
+    for n in range(requests):
+        start = time.perf_counter()
+        client.get(f"/buy/{n}")
+        latencies.append(time.perf_counter() - start)
+    return latencies, len(checkouts) / requests
+
+
+def measure_blocks(marketplace):
+    latencies = []
+    for i in range(BLOCKS):
+        marketplace.make_transaction("Alice", "Bob", i)
+        start = time.perf_counter()
+        marketplace.mine_block(difficulty=0)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+
+    print("🚀 DATENBANK-PROFIL BENCHMARK")
+    print("=" * 50)
+    print(f"Anfragen: {requests}, Blöcke: {BLOCKS}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, profile, request_scope in (("Standard", PROFILE_DEFAULT, False),
+                                             ("production", PROFILE_PRODUCTION, True)):
+            db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, profile + '.db')}", profile=profile)
+            marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+            latencies, checkouts = measure_requests(db_manager, marketplace, requests, request_scope)
+            block_latencies = measure_blocks(marketplace)
+
+            print(f"\n🗄️  {name}")
+            print(f"   Anfrage:      Median {statistics.median(latencies) * 1000:7.3f} ms, "
+                  f"p99 {percentile(latencies, 0.99) * 1000:7.3f} ms, {checkouts:.1f} Verbindungen pro Anfrage")
+            print(f"   Block:        Median {statistics.median(block_latencies) * 1000:7.3f} ms, "
+                  f"p99 {percentile(block_latencies, 0.99) * 1000:7.3f} ms")
+            marketplace.miner.shutdown()
+            db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Simulation Difficulty-Retargeting
+=================================
+
+Spielt die Historie einer Chain (difficulty, mining_time pro Block) mit dem
+DifficultyRetargeter nach: jeder historische Block liefert die Hashrate seines
+Miners, der simulierte Block wird mit der nachgeregelten Schwierigkeit gemined.
+Verglichen wird, wie nah die Blockzeiten am Zielintervall liegen.
+
+Ohne Datenbank (oder mit zu wenig Blöcken) wird eine synthetische Historie
+erzeugt: feste Schwierigkeit 4, Hashrate vervierfacht sich nach der Hälfte.
+
+Aufruf: python Tests/difficulty_simulation.py [sqlite-url] [zielzeit_s] [fenster]
+"""
+
+import os
+import random
+import statistics
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Blockchain.difficulty import DifficultyRetargeter, expected_attempts, simulate
+
+
+def load_history(db_url):
+    """(difficulty, mining_time) aller gespeicherten Blöcke"""
+    from database import DatabaseManager, BlockEntry
+
+    session = DatabaseManager(db_url).get_session()
+    try:
+        rows = session.query(BlockEntry.difficulty, BlockEntry.mining_time).order_by(BlockEntry.index).all()
+        return [(float(difficulty), float(mining_time)) for difficulty, mining_time in rows if mining_time]
+    finally:
+        session.close()
+
+
+def synthetic_history(blocks=200, hash_rate=250_000.0, seed=42):
+    """Feste Schwierigkeit, exponentiell verteilte Blockzeiten, Hashrate-Sprung in der Mitte"""
+    rng = random.Random(seed)
+    history = []
+    for i in range(blocks):
+        rate = hash_rate * (4 if i >= blocks // 2 else 1)
+        history.append((4.0, rng.expovariate(rate / expected_attempts(4.0))))
+    return history
+
+
+def describe(times, target):
+    mean = statistics.mean(times)
+    deviation = statistics.mean(abs(t - target) for t in times)
+    return f"Ø {mean:8.3f}s, Ø Abweichung vom Ziel {deviation:8.3f}s"
+
+
+def main():
+    db_url = sys.argv[1] if len(sys.argv) > 1 else 'sqlite:///marketplace.db'
+    target = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    window = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    print("⛏️  DIFFICULTY-RETARGETING SIMULATION")
+    print("=" * 60)
+
+    history = []
+    try:
+        history = load_history(db_url)
+    except Exception as e:
+        print(f"Datenbank nicht lesbar ({e})")
+
+    if len(history) < 2:
+        print("Zu wenig Blöcke in der Datenbank, verwende synthetische Historie")
+        history = synthetic_history()
+    else:
+        print(f"Historie aus {db_url}: {len(history)} Blöcke")
+
+    retargeter = DifficultyRetargeter(target_block_time=target, window=window, min_difficulty=0.0)
+    results = simulate(history, retargeter)
+
+    print(f"Zielzeit {target}s, Fenster {window} Blöcke\n")
+    print(f"{'Block':>6} {'hist. Diff':>10} {'hist. Zeit':>11} {'neue Diff':>10} {'sim. Zeit':>10}")
+    step = max(1, len(results) // 25)
+    for row in results[::step]:
+        print(f"{row['index']:>6} {row['historic_difficulty']:>10.2f} {row['historic_time']:>10.3f}s "
+              f"{row['difficulty']:>10.2f} {row['time']:>9.3f}s")
+
+    print()
+    print(f"   Historisch:  {describe([row['historic_time'] for row in results], target)}")
+    print(f"   Retargeting: {describe([row['time'] for row in results], target)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# difficulty_test.py
+import hashlib
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.difficulty import DifficultyRetargeter, SimulatedBlock, expected_attempts, simulate
+from Blockchain.proof import ProofChecker, difficulty_bits
+
+
+def chain_with_times(difficulty, times):
+    return [SimulatedBlock(0, 0.0, 0.0)] + [
+        SimulatedBlock(i, difficulty, t) for i, t in enumerate(times, start=1)]
+
+
+def test_fractional_difficulty_counts_zero_bits():
+    for difficulty in (0.25, 1.5, 2.75, 3):
+        bits = difficulty_bits(difficulty)
+        checker = ProofChecker(7, difficulty)
+        for proof in range(5000):
+            value = int.from_bytes(hashlib.sha256(f"7{proof}".encode()).digest(), "big")
+            assert checker.check(proof) == (value >> (256 - bits) == 0)
+
+    # Ganze Schwierigkeiten behalten ihre Bedeutung (führende Hex-Nullen)
+    assert difficulty_bits(3) == 12
+
+
+def test_retargeting_moves_towards_target():
+    retargeter = DifficultyRetargeter(target_block_time=5.0, window=5)
+
+    # Ohne Blockzeiten: Startwert
+    assert retargeter.next_difficulty([SimulatedBlock(0, 0.0, 0.0)]) == 4.0
+
+    # Blöcke zu schnell (0.3s statt 5s bei 16^4 Hashes): ca. 16x mehr Arbeit nötig
+    fast = retargeter.next_difficulty(chain_with_times(4.0, [0.3] * 5))
+    assert fast == 5.0
+    # Zu langsam: Schwierigkeit sinkt, Schritt auf eine Hex-Null begrenzt
+    assert retargeter.next_difficulty(chain_with_times(4.0, [500.0] * 5)) == 3.0
+    # Nahe am Ziel bleibt die Schwierigkeit gleich
+    assert retargeter.next_difficulty(chain_with_times(4.0, [5.0] * 5)) == 4.0
+    # Ergebnis in Schritten von einem Null-Bit
+    assert retargeter.next_difficulty(chain_with_times(4.0, [1.25] * 5)) == 4.5
+
+
+def test_simulation_converges():
+    # Konstante Hashrate: 16^4 Hashes in 0.1s
+    history = [(4.0, 0.1)] * 60
+    retargeter = DifficultyRetargeter(target_block_time=2.0, window=5)
+    results = simulate(history, retargeter)
+
+    assert len(results) == 60
+    last = results[-10:]
+    assert all(abs(row["time"] - 2.0) < 1.0 for row in last)
+    hash_rate = expected_attempts(4.0) / 0.1
+    assert abs(expected_attempts(last[-1]["difficulty"]) / hash_rate - last[-1]["time"]) < 1e-9
+
+
+def test_mine_block_uses_retargeted_difficulty():
+    blockchain = Blockchain(mining_workers=1)
+    blockchain.retargeter = DifficultyRetargeter(target_block_time=60.0, initial_difficulty=1.5,
+                                                 max_difficulty=3.0)
+
+    blockchain.make_transaction("Alice", "Bob", 1)
+    block, _ = blockchain.mine_block()
+    assert block.difficulty == 1.5
+
+    # Blöcke sind viel schneller als 60s: Schwierigkeit steigt, höchstens eine Hex-Null pro Block
+    assert blockchain.next_difficulty() == 2.5
+    blockchain.make_transaction("Alice", "Bob", 2)
+    block, _ = blockchain.mine_block()
+    assert block.difficulty == 2.5
+    assert blockchain.validate_chain()
+
+
+def test_window_reads_only_recent_blocks():
+    class CountingChain(list):
+        # Zählt gelesene Blöcke wie die Ladevorgänge einer Lazy-Chain
+        reads = 0
+
+        def __getitem__(self, index):
+            CountingChain.reads += 1
+            return list.__getitem__(self, index)
+
+    retargeter = DifficultyRetargeter(target_block_time=5.0, window=5)
+    assert retargeter.lookback == 20
+
+    # Lange Chain ohne Blockzeiten (z.B. PoA): nur lookback Blöcke gelesen, dann der Startwert
+    chain = CountingChain(chain_with_times(4.0, [0.0] * 1000))
+    assert retargeter.next_difficulty(chain) == 4.0
+    assert CountingChain.reads == 20
+
+    # Blockzeiten vor dem lookback zählen nicht mehr
+    chain = CountingChain(chain_with_times(4.0, [0.3] * 5 + [0.0] * 20))
+    assert retargeter.next_difficulty(chain) == 4.0
+    chain = CountingChain(chain_with_times(4.0, [0.3] * 5 + [0.0] * 15))
+    assert retargeter.next_difficulty(chain) == 5.0
+
+
+if __name__ == "__main__":
+    test_fractional_difficulty_counts_zero_bits()
+    test_retargeting_moves_towards_target()
+    test_simulation_converges()
+    test_mine_block_uses_retargeted_difficulty()
+    test_window_reads_only_recent_blocks()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark Block-Header im Speicher, Blöcke bei Bedarf laden
+===========================================================
+
+Baut eine Marketplace-Chain in einer temporären SQLite-Datenbank auf und
+vergleicht nach dem Neustart den Speicherbedarf (tracemalloc) der Chain mit
+allen Blöcken im Speicher und mit lazy_blocks (nur Header, LRU-Cache).
+Zusätzlich wird die Zeit für zufällige Blockzugriffe (chain[i]) gemessen.
+
+Aufruf: python Tests/lazy_chain_benchmark.py [anzahl_bloecke] [transaktionen_pro_block] [cache_groesse]
+"""
+
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from marketplace import MarketplaceBlockchain
+from database_handling import initialize_blockchain_from_database
+
+
+def build_database(db_url, blocks, transactions_per_block):
+    blockchain = MarketplaceBlockchain(DatabaseManager(db_url), mining_workers=1)
+    for i in range(blocks):
+        for j in range(transactions_per_block):
+            blockchain.make_transaction(f"{i:016x}", f"{j:016x}", j)
+        # Schwierigkeit 0: jeder Proof ist gültig, es geht nur um den Speicher
+        blockchain.make_block(proof=0, difficulty=0)
+
+
+def restart(db_url, lazy_blocks, cache_size):
+    gc.collect()
+    tracemalloc.start()
+    blockchain = MarketplaceBlockchain(DatabaseManager(db_url), mining_workers=1,
+                                       lazy_blocks=lazy_blocks, block_cache_size=cache_size)
+    with contextlib.redirect_stdout(io.StringIO()):
+        initialize_blockchain_from_database(blockchain)
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return memory, blockchain
+
+
+def random_access(blockchain, accesses):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(accesses):
+        blockchain.chain[rng.randrange(len(blockchain.chain))].transactions
+    return (time.perf_counter() - start) / accesses
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    transactions_per_block = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    cache_size = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+
+    print("🚀 LAZY BLOCKS BENCHMARK")
+    print("=" * 50)
+    print(f"Blöcke: {blocks}, Transaktionen pro Block: {transactions_per_block}, Cache: {cache_size} Blöcke")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'benchmark.db')}"
+        build_database(db_url, blocks, transactions_per_block)
+
+        full_memory, full = restart(db_url, False, cache_size)
+        lazy_memory, lazy = restart(db_url, True, cache_size)
+        assert [block.hash for block in lazy.chain] == [block.hash for block in full.chain]
+
+        full_access = random_access(full, 2_000)
+        lazy_access = random_access(lazy, 2_000)
+
+        print(f"   Alle Blöcke:  {full_memory / 1e6:8.1f} MB   chain[i]: {full_access * 1e6:8.1f} µs")
+        print(f"   Lazy Blocks:  {lazy_memory / 1e6:8.1f} MB   chain[i]: {lazy_access * 1e6:8.1f} µs")
+        print(f"   Speicher:     {lazy_memory / full_memory:8.1%} der vollen Chain")
+        print(f"   Cache:        {lazy.chain.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# lazy_chain_test.py
+import contextlib
+import io
+import os
+import tempfile
+
+import pytest
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.lazy_chain import LazyChain, MissingBlockError
+from database import DatabaseManager
+from database_handling import initialize_blockchain_from_database
+from marketplace import MarketplaceBlockchain
+
+
+def build_blocks(count):
+    blockchain = Blockchain(mining_workers=1)
+    for i in range(count):
+        blockchain.make_transaction("A", "B", i)
+        blockchain.mine_block(difficulty=1)
+    return list(blockchain.chain)
+
+
+def test_lazy_chain_loads_through_lru():
+    blocks = build_blocks(20)
+    loads = []
+
+    def load_blocks(start, end):
+        loads.append((start, end))
+        return blocks[start:end]
+
+    chain = LazyChain(load_blocks, cache_size=4, blocks=blocks)
+    assert len(chain) == 21 and chain.cached_blocks() == 4
+    assert loads == []
+
+    # Zugriffe wie auf eine Liste
+    assert chain[3].hash == blocks[3].hash and chain[-1] is blocks[-1]
+    assert [block.hash for block in chain[5:9]] == [block.hash for block in blocks[5:9]]
+    assert [block.index for block in chain] == list(range(21))
+    assert [block.index for block in reversed(chain)][:3] == [20, 19, 18]
+    assert chain.header(7).transaction_count == len(blocks[7].transactions)
+    assert chain.cached_blocks() <= 4
+
+    # Ein Bereich wird mit einer Abfrage geladen
+    loads.clear()
+    chain[10:14]
+    assert loads == [(10, 14)]
+    loads.clear()
+    chain[12]
+    assert loads == []
+
+    assert chain.pop().index == 20 and len(chain) == 20
+    with pytest.raises(IndexError):
+        chain.pop(3)
+    with pytest.raises(IndexError):
+        chain[20]
+
+    # Speicher liefert einen anderen Block als der Header
+    forged = LazyChain(lambda start, end: blocks[start + 1:end + 1], cache_size=1, blocks=blocks)
+    with pytest.raises(MissingBlockError):
+        forged[2]
+
+
+def test_marketplace_with_lazy_blocks():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'lazy.db')}")
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1, lazy_blocks=True, block_cache_size=3)
+        data_ids = []
+        for i in range(12):
+            data_ids.append(marketplace.data_upload_transaction(f"Owner{i}", {"name": f"Set {i}"}, 1.0))
+            marketplace.make_transaction("A", "B", i)
+            marketplace.mine_block(difficulty=1)
+        marketplace.data_purchase_transaction("Käufer", data_ids[0], 1.0)
+        marketplace.mine_block(difficulty=1)
+
+        assert marketplace.lazy_blocks and marketplace.chain.cached_blocks() <= 3
+        # Der Index hält bei lazy_blocks keine Transaktionen, sie werden aus dem Block geladen
+        assert all(entry[2] is None for entry in marketplace.transaction_index.values())
+        assert marketplace.find_item(data_ids[1])["metadata"] == {"name": "Set 1"}
+        assert marketplace.get_transaction_proof(data_ids[2])["block_index"] == 3
+        assert marketplace.has_purchased("Käufer", data_ids[0])
+        assert marketplace.validate_chain(use_checkpoint=False)
+        assert sum(len(block.transactions) for block in marketplace.chain) == 1 + 12 * 2 + 1
+
+        # Neustart aus der Datenbank, wieder nur mit Headern im Speicher
+        restarted = MarketplaceBlockchain(db_manager, mining_workers=1, lazy_blocks=True, block_cache_size=3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert initialize_blockchain_from_database(restarted)
+        assert restarted.lazy_blocks and len(restarted.chain) == 14
+        assert [block.hash for block in restarted.chain] == [header.hash for header in marketplace.chain.headers]
+        assert restarted.get_data_listing() == marketplace.get_data_listing()
+        assert restarted.next_difficulty() == marketplace.next_difficulty()
+
+        discarded = restarted.discard_last_block()
+        assert discarded.index == 13 and len(restarted.mempool) == 1
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_lazy_chain_loads_through_lru()
+    test_marketplace_with_lazy_blocks()
@@ -0,0 +1,133 @@
+# mempool_test.py
+from Blockchain.blockchain import Blockchain
+from Blockchain.mempool import Mempool, MempoolFullError, EVICT_OLDEST
+from Blockchain.transactions import DataPurchaseTransaction, TransferTransaction
+
+
+def transfer(tx_id, sender="Alice", recipient="Bob"):
+    return TransferTransaction(sender=sender, recipient=recipient, amount=1, timestamp=0.0,
+                               signature="sig", transaction_id=tx_id)
+
+
+def purchase(tx_id, buyer, data_id):
+    return DataPurchaseTransaction(buyer=buyer, seller="Seller", data_id=data_id, amount=5,
+                                   timestamp=0.0, signature="sig", transaction_id=tx_id)
+
+
+def test_dedup_indexes_and_order():
+    mempool = Mempool()
+    assert mempool.add(transfer("t1"))
+    assert mempool.add(purchase("p1", "Carol", "d1"))
+    assert mempool.add(transfer("t2", sender="Carol"))
+    # Gleiche ID wird nicht doppelt aufgenommen
+    assert not mempool.add(transfer("t1"))
+
+    assert len(mempool) == 3
+    assert [tx["transaction_id"] for tx in mempool.ordered()] == ["t1", "p1", "t2"]
+    assert [tx["transaction_id"] for tx in mempool.ordered(2)] == ["t1", "p1"]
+    assert [tx["transaction_id"] for tx in mempool.by_type("data_purchase")] == ["p1"]
+    assert [tx["transaction_id"] for tx in mempool.by_type(None)] == ["t1", "t2"]
+    assert [tx["transaction_id"] for tx in mempool.by_address("Carol")] == ["p1", "t2"]
+    assert [tx["transaction_id"] for tx in mempool.by_address("Carol", ("data_purchase",))] == ["p1"]
+
+    assert mempool.remove(["p1", "unknown"]) == 1
+    assert mempool.by_address("Carol") == [mempool.get("t2")]
+    assert mempool.by_type("data_purchase") == []
+
+
+def test_capacity_and_eviction():
+    mempool = Mempool(capacity=2)
+    mempool.add(transfer("t1"))
+    mempool.add(transfer("t2"))
+    try:
+        mempool.add(transfer("t3"))
+        assert False, "voller Mempool muss ablehnen"
+    except MempoolFullError:
+        pass
+
+    evicted = []
+    mempool = Mempool(capacity=2, eviction=EVICT_OLDEST, on_evict=evicted.append)
+    for tx_id in ("t1", "t2", "t3"):
+        mempool.add(transfer(tx_id))
+    assert [tx["transaction_id"] for tx in mempool] == ["t2", "t3"]
+    assert [tx["transaction_id"] for tx in evicted] == ["t1"]
+    assert mempool.evicted_count == 1
+
+
+def test_add_many():
+    mempool = Mempool(capacity=4)
+    mempool.add(transfer("t1"))
+    assert mempool.add_many([transfer("t1"), transfer("t2"), transfer("t3"), transfer("t3")]) == 2
+    assert [tx["transaction_id"] for tx in mempool] == ["t1", "t2", "t3"]
+
+    # Passen nicht alle neuen Transaktionen, wird keine aufgenommen
+    try:
+        mempool.add_many([transfer("t4"), transfer("t5")])
+        assert False, "voller Mempool muss den ganzen Stapel ablehnen"
+    except MempoolFullError:
+        pass
+    assert len(mempool) == 3
+
+
+def test_blockchain_uses_mempool():
+    blockchain = Blockchain(mining_workers=1, mempool_capacity=3, mempool_eviction=EVICT_OLDEST)
+    # make_transaction gibt den Index des nächsten Blocks zurück, die IDs kommen aus dem Mempool
+    blockchain.make_transaction("Alice", "Bob", 1)
+    first = blockchain.current_transactions[0]["transaction_id"]
+    assert blockchain.find_transaction(first)[0] is None
+    for i in range(3):
+        blockchain.make_transaction("Alice", "Bob", i + 2)
+
+    # Verdrängte Transaktion ist auch aus dem Index verschwunden
+    assert len(blockchain.mempool) == 3
+    assert first not in blockchain.mempool
+    assert blockchain.find_transaction(first) is None
+    assert all(blockchain.find_transaction(tx["transaction_id"])[0] is None for tx in blockchain.current_transactions)
+
+    pending = [tx["transaction_id"] for tx in blockchain.current_transactions]
+    block, _ = blockchain.mine_block(difficulty=1)
+
+    assert [tx["transaction_id"] for tx in block.transactions] == pending
+    assert len(blockchain.mempool) == 0
+    assert blockchain.current_transactions == []
+    assert blockchain.find_transaction(pending[0])[0] == block.index
+
+    # Zuweisung an current_transactions ersetzt den Mempool
+    blockchain.make_transaction("Bob", "Carol", 1)
+    tx_id = blockchain.current_transactions[0]["transaction_id"]
+    assert blockchain.find_transaction(tx_id)[2]["recipient"] == "Carol"
+    blockchain.current_transactions = []
+    assert len(blockchain.mempool) == 0
+    assert blockchain.find_transaction(tx_id) is None
+
+
+def test_evicted_upload_loses_listing():
+    blockchain = Blockchain(mining_workers=1, mempool_capacity=2, mempool_eviction=EVICT_OLDEST)
+    data_id = blockchain.data_upload_transaction("Owner", {"name": "Set"}, 3.0)
+    model_id = blockchain.model_upload_transaction("Owner", {"name": "Modell"}, 5.0)
+    assert [entry["data_id"] for entry in blockchain.data_list] == [data_id]
+
+    # Verdrängte Uploads werden nie gemined, also auch nicht mehr angeboten
+    blockchain.make_transaction("Alice", "Bob", 1)
+    assert blockchain.data_list == [] and data_id not in blockchain.data_entries
+    assert [entry["model_id"] for entry in blockchain.model_list] == [model_id]
+
+    # Auch innerhalb eines Stapels verdrängte Uploads
+    ids = blockchain.upload_transactions("data_upload", [("Owner", {"name": f"Set {i}"}, 1.0) for i in range(3)])
+    assert [entry["data_id"] for entry in blockchain.data_list] == ids[1:]
+    assert blockchain.model_list == []
+
+    # Bestätigte Listings bleiben
+    blockchain.mine_block(difficulty=1)
+    blockchain.make_transaction("Alice", "Bob", 2)
+    blockchain.make_transaction("Alice", "Bob", 3)
+    blockchain.make_transaction("Alice", "Bob", 4)
+    assert [entry["data_id"] for entry in blockchain.data_list] == ids[1:]
+
+
+if __name__ == "__main__":
+    test_dedup_indexes_and_order()
+    test_capacity_and_eviction()
+    test_add_many()
+    test_blockchain_uses_mempool()
+    test_evicted_upload_loses_listing()
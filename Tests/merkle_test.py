@@ -0,0 +1,75 @@
+# merkle_test.py
+from Blockchain.blockchain import Blockchain, Block, LEGACY_BLOCK_VERSION, HEADER_FORMAT
+from Blockchain.merkle import transaction_hash, verify_merkle_proof
+
+
+def test_merkle_proofs():
+    blockchain = Blockchain(mining_workers=1)
+
+    # Ungerade Anzahl, damit auch das Duplizieren des letzten Knotens geprüft wird
+    tx_ids = [blockchain.data_upload_transaction(f"Owner{i}", {"name": f"Set {i}"}, float(i)) for i in range(7)]
+    block, _ = blockchain.mine_block(difficulty=2)
+
+    assert len(block.header_bytes()) == HEADER_FORMAT.size
+    assert block.merkle_root == block.calculate_merkle_root()
+
+    for position, tx_id in enumerate(tx_ids):
+        proof = blockchain.get_transaction_proof(tx_id)
+        assert proof["block_index"] == block.index
+        assert proof["position"] == position
+        assert proof["leaf_hash"] == transaction_hash(block.transactions[position]).hex()
+        assert blockchain.verify_transaction_proof(proof)
+
+    # Manipulierte Transaktion passt nicht mehr zur Merkle-Root
+    proof = blockchain.get_transaction_proof(tx_ids[3])
+    forged = dict(block.transactions[3], price=0.0)
+    assert not verify_merkle_proof(transaction_hash(forged).hex(), proof["path"], proof["merkle_root"])
+
+    # Ausstehende Transaktionen haben noch keinen Proof
+    pending_id = blockchain.data_upload_transaction("Owner", {"name": "Pending"}, 1.0)
+    assert blockchain.get_transaction_proof(pending_id) is None
+
+    assert blockchain.validate_chain()
+    print(f"Merkle-Root von Block {block.index}: {block.merkle_root}")
+
+
+def test_header_hash_independent_of_payload():
+    small = Block(1, "0" * 64, 1.0, [{"transaction_id": "a"}], proof=5)
+    large = Block(1, "0" * 64, 1.0, [{"transaction_id": str(i)} for i in range(1000)], proof=5)
+    assert len(small.header_bytes()) == len(large.header_bytes())
+    assert small.hash != large.hash
+
+    # Alte Blöcke werden weiterhin über ihr JSON gehasht
+    legacy = Block(1, "0", 1.0, [], proof=5, version=LEGACY_BLOCK_VERSION)
+    assert legacy.hash == legacy.calculate_hash()
+    assert legacy.hash != Block(1, "0", 1.0, [], proof=5).hash
+
+
+def test_repeated_transactions_are_rejected():
+    blockchain = Blockchain(mining_workers=1)
+    for i in range(3):
+        blockchain.make_transaction("Alice", "Bob", i)
+    block, _ = blockchain.mine_block(difficulty=1)
+    previous = blockchain.chain[-2]
+    assert blockchain.validate_block(block, previous)
+
+    def rebuild(transactions, **header):
+        return Block(block.index, block.previous_hash, block.timestamp, transactions, block.proof,
+                     block.difficulty, block.mining_time, **header)
+
+    # Letzte Transaktion doppelt: gleiche Merkle-Root und gleicher Hash wie der echte Block
+    mutated = rebuild(list(block.transactions) + [block.transactions[-1]],
+                      hash=block.hash, merkle_root=block.merkle_root)
+    assert mutated.calculate_merkle_root() == block.merkle_root
+    assert mutated.calculate_hash() == block.hash
+    assert not blockchain.validate_block(mutated, previous)
+
+    # Gleiche transaction_id mit anderem Inhalt, Merkle-Root und Hash neu berechnet
+    copy = dict(block.transactions[0], amount=99)
+    assert not blockchain.validate_block(rebuild(list(block.transactions) + [copy]), previous)
+
+
+if __name__ == "__main__":
+    test_merkle_proofs()
+    test_header_hash_independent_of_payload()
+    test_repeated_transactions_are_rejected()
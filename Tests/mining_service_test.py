@@ -0,0 +1,153 @@
+# mining_service_test.py
+import importlib
+import os
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.consensus import ProofOfAuthority
+from Blockchain.signatures import generate_private_key, private_key_to_hex, public_key_hex
+from mining_service import MiningService, JOB_DONE, JOB_FAILED
+
+
+def test_job_runs_in_background():
+    blockchain = Blockchain(mining_workers=1)
+    service = MiningService(blockchain)
+    blockchain.make_transaction("Alice", "Bob", 5)
+
+    try:
+        job = service.submit(difficulty=3)
+        # Der Aufrufer wird nicht blockiert, der Job läuft auf dem Hintergrund-Thread
+        assert service.get(job.job_id)["status"] in ("queued", "running", "done")
+
+        status = service.wait(job.job_id, timeout=60)
+        print(f"Job {job.job_id}: {status['status']}, {status['attempts']} Versuche, "
+              f"{status['hash_rate']:.0f} H/s")
+
+        assert status["status"] == JOB_DONE
+        assert status["progress"] == 1.0
+        assert status["block"]["block_index"] == blockchain.last_block.index
+        assert status["block"]["proof"] == blockchain.last_block.proof
+        assert status["attempts"] == blockchain.last_block.proof + 1
+        assert len(blockchain.mempool) == 0
+
+        # Leerer Mempool: Job schlägt fehl statt einen leeren Block zu minen
+        failed = service.wait(service.submit(difficulty=1).job_id, timeout=10)
+        assert failed["status"] == JOB_FAILED and failed["error"]
+        assert service.get("unknown") is None
+    finally:
+        service.shutdown()
+
+
+def test_drain_job_and_progress():
+    blockchain = Blockchain(mining_workers=1, max_block_transactions=2)
+    service = MiningService(blockchain)
+    for i in range(5):
+        blockchain.make_transaction("Alice", "Bob", i)
+
+    reports = []
+    original = blockchain.proof_of_work
+
+    def proof_of_work(last_proof, difficulty=4, progress=None):
+        return original(last_proof, difficulty, lambda attempts, elapsed: reports.append(attempts) or progress(attempts, elapsed))
+
+    blockchain.proof_of_work = proof_of_work
+    blockchain.miner.chunk_size = 500
+
+    try:
+        status = service.wait(service.submit(difficulty=3, drain=True).job_id, timeout=60)
+        assert status["status"] == JOB_DONE
+        assert [block["transactions_mined"] for block in status["blocks"]] == [2, 2, 1]
+        assert status["total_attempts"] == sum(block["attempts"] for block in status["blocks"])
+        # Zwischenstände wurden während der Suche gemeldet
+        assert reports
+    finally:
+        service.shutdown()
+
+
+def test_proof_of_authority_job():
+    key = generate_private_key()
+    blockchain = Blockchain(mining_workers=1, consensus=ProofOfAuthority([public_key_hex(key)], private_key=key))
+    service = MiningService(blockchain)
+    blockchain.make_transaction("Alice", "Bob", 5)
+
+    try:
+        status = service.wait(service.submit().job_id, timeout=60)
+        # Keine Suche: Block ohne Versuche und Hashrate, aber kein Fehler
+        assert status["status"] == JOB_DONE, status["error"]
+        assert status["block"]["block_index"] == 1 == blockchain.last_block.index
+        assert status["attempts"] == 0 and status["block"]["hash_rate"] == 0
+    finally:
+        service.shutdown()
+
+
+def test_mining_endpoints_with_proof_of_authority():
+    key = generate_private_key()
+    environment = {"CONSENSUS": "poa", "POA_AUTHORITIES": public_key_hex(key),
+                   "POA_PRIVATE_KEY": private_key_to_hex(key), "DB_PROFILE": "default"}
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, environment):
+        # app.py legt Datenbank, Benutzer und Uploads im Arbeitsverzeichnis an
+        os.chdir(tmp)
+        sys.modules.pop("app", None)
+        try:
+            app = importlib.import_module("app")
+            app.blockchain.make_transaction("Alice", "Bob", 5)
+            client = app.app.test_client()
+            with client.session_transaction() as session:
+                session["username"] = "demo"
+                session["blockchain_address"] = "Alice"
+
+            # Der Endpunkt legt nur den Job an, gemined wird im Hintergrund
+            response = client.post("/api/mine/start", json={})
+            assert response.status_code == 202, response.get_json()
+            app.mining_service.wait(response.get_json()["job_id"], timeout=60)
+            result = client.get(response.get_json()["status_url"]).get_json()
+            assert result["status"] == JOB_DONE, result["error"]
+            assert result["block"]["block_index"] == 1 == app.blockchain.last_block.index
+            assert result["attempts"] == 0 and result["block"]["hash_rate"] == 0
+
+            # Auch /api/mine/pending: alle Transaktionen in höchstens max_blocks Blöcken
+            for i in range(3):
+                app.blockchain.make_transaction("Alice", "Bob", i)
+            response = client.post("/api/mine/pending", json={"max_blocks": 1})
+            assert response.status_code == 202
+            result = app.mining_service.wait(response.get_json()["job_id"], timeout=60)
+            assert result["status"] == JOB_DONE and len(result["blocks"]) == 1
+            assert result["block"]["transactions_mined"] == 3
+            app.mining_service.shutdown()
+            app.blockchain.miner.shutdown()
+            app.db_manager.engine.dispose()
+        finally:
+            sys.modules.pop("app", None)
+            os.chdir(previous)
+
+
+def test_transactions_can_be_added_while_mining():
+    blockchain = Blockchain(mining_workers=1)
+    blockchain.make_transaction("Alice", "Bob", 1)
+    started = threading.Event()
+    added = []
+
+    def progress(attempts, elapsed):
+        if not started.is_set():
+            started.set()
+            # Während der PoW-Suche ist die Chain nicht gesperrt
+            added.append(blockchain.make_transaction("Carol", "Dave", 2))
+
+    blockchain.miner.chunk_size = 500
+    block, _ = blockchain.mine_block(difficulty=4, progress=progress)
+    assert added
+    # Die neue Transaktion landet im Block, wenn sie vor dem Abschluss hinzugefügt wurde
+    assert len(block.transactions) == 2
+    assert blockchain.validate_chain()
+
+
+if __name__ == "__main__":
+    test_job_runs_in_background()
+    test_drain_job_and_progress()
+    test_proof_of_authority_job()
+    test_mining_endpoints_with_proof_of_authority()
+    test_transactions_can_be_added_while_mining()
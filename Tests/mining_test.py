@@ -0,0 +1,86 @@
+# mining_test.py
+import hashlib
+import os
+import runpy
+import tempfile
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.mining import ParallelMiner
+from Blockchain.proof import ProofChecker
+
+
+def test_proof_checker_matches_hexdigest():
+    # Referenz: die ursprüngliche String-Prüfung von valid_proof
+    def reference(last_proof, proof, difficulty):
+        guess_hash = hashlib.sha256(f"{last_proof}{proof}".encode()).hexdigest()
+        return guess_hash[:difficulty] == "0" * difficulty
+
+    blockchain = Blockchain(mining_workers=1)
+    for difficulty in (-1, 0, 1, 2, 3, 65):
+        checker = ProofChecker(100, difficulty)
+        for proof in range(3000):
+            expected = reference(100, proof, difficulty)
+            assert checker.check(proof) == expected
+            assert blockchain.valid_proof(100, proof, difficulty) == expected
+
+    # Batch-Suche findet den kleinsten gültigen Proof
+    checker = ProofChecker(100, 3)
+    proof, tested = checker.search(0, 100_000)
+    assert proof == next(p for p in range(100_000) if reference(100, p, 3))
+    assert tested == proof + 1
+
+
+def test_parallel_miner():
+    blockchain = Blockchain(mining_workers=1)
+    miner = ParallelMiner(workers=2, chunk_size=5_000)
+
+    try:
+        for last_proof in (100, 35293, 7):
+            result = miner.mine(last_proof, difficulty=4)
+            print(f"last_proof={last_proof}: proof={result.proof}, {result.attempts} Versuche, "
+                  f"{result.hash_rate:.0f} H/s, {result.workers} Worker")
+
+            assert blockchain.valid_proof(last_proof, result.proof, 4)
+            assert result.workers == 2
+            assert result.attempts > 0
+            # Deterministisch: der kleinste gültige Proof, wie bei der seriellen Suche
+            assert result.proof == ProofChecker(last_proof, 4).search(0, result.proof + 1)[0]
+    finally:
+        miner.shutdown()
+
+
+def test_mine_block_reports_hash_rate():
+    blockchain = Blockchain(mining_workers=1)
+    blockchain.make_transaction("Alice", "Bob", 5)
+
+    new_block, mining_time = blockchain.mine_block(difficulty=3)
+    result = blockchain.last_mining_result
+
+    print(f"Block {new_block.index}: {mining_time:.4f}s, {result.hash_rate:.0f} H/s")
+
+    assert result.proof == new_block.proof
+    assert result.time_taken == mining_time
+    # Seriell wird der kleinste gültige Proof gefunden, wie bisher
+    assert result.attempts == new_block.proof + 1
+    assert blockchain.validate_chain()
+
+
+def test_worker_import_of_app_skips_setup():
+    # So lädt ein spawn-Worker das Hauptmodul, wenn der Server mit "python app.py" läuft
+    app_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            namespace = runpy.run_path(app_path, run_name="__mp_main__")
+            # Keine Datenbank, keine Chain, kein Mining-Dienst und kein Demo-Benutzer im Worker
+            assert "blockchain" not in namespace and "mining_service" not in namespace
+            assert not {"marketplace.db", "users.json"} & set(os.listdir(tmp))
+        finally:
+            os.chdir(previous)
+
+
+if __name__ == "__main__":
+    test_parallel_miner()
+    test_mine_block_reports_hash_rate()
+    test_worker_import_of_app_skips_setup()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark Proof-of-Work
+============================
+
+Vergleicht die Hashes pro Sekunde des bisherigen valid_proof-Pfads
+(String formatieren, hexdigest, slicen) mit dem Midstate-Pfad des ProofChecker.
+
+Aufruf: python Tests/pow_benchmark.py [anzahl_nonces]
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Blockchain.proof import ProofChecker
+
+
+def hexdigest_rate(last_proof, difficulty, nonces):
+    """Bisheriger Pfad: jeder Nonce wird komplett neu gehasht"""
+    target = "0" * difficulty
+    start = time.perf_counter()
+    for proof in range(nonces):
+        guess_hash = hashlib.sha256(f"{last_proof}{proof}".encode()).hexdigest()
+        if guess_hash[:difficulty] == target:
+            pass
+    return nonces / (time.perf_counter() - start)
+
+
+def midstate_rate(last_proof, nonces):
+    """Midstate-Pfad: Präfix einmal hashen, Batches auf Digest-Bytes prüfen"""
+    # Unerreichbare Schwierigkeit, damit jeder Nonce getestet wird
+    checker = ProofChecker(last_proof, 64)
+    start = time.perf_counter()
+    tested = 0
+    while tested < nonces:
+        _, count = checker.search(tested)
+        tested += count
+    return tested / (time.perf_counter() - start)
+
+
+def main():
+    nonces = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    last_proof = 123456789012345678901234567890
+
+    print("⚡ PROOF-OF-WORK MICROBENCHMARK")
+    print("=" * 50)
+    print(f"Nonces pro Lauf: {nonces}")
+
+    baseline = hexdigest_rate(last_proof, 4, nonces)
+    fast = midstate_rate(last_proof, nonces)
+
+    print(f"   hexdigest-Pfad: {baseline:,.0f} H/s")
+    print(f"   Midstate-Pfad:  {fast:,.0f} H/s")
+    print(f"   Speedup:        {fast / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
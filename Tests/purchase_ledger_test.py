@@ -0,0 +1,54 @@
+# purchase_ledger_test.py
+from Blockchain.blockchain import Blockchain
+
+
+def test_ledger_updated_on_block_commit():
+    blockchain = Blockchain(mining_workers=1)
+    data_id = blockchain.data_upload_transaction("Alice", {"name": "Datensatz"}, 10)
+    model_id = blockchain.model_upload_transaction("Alice", {"name": "Modell"}, 20)
+    blockchain.mine_block(difficulty=1)
+
+    blockchain.data_purchase_transaction("Bob", data_id, 10)
+    blockchain.model_purchase_transaction("Bob", model_id, 20)
+    blockchain.data_purchase_transaction("Carol", data_id, 10)
+
+    # Ausstehende Käufe zählen noch nicht
+    assert not blockchain.has_purchased("Bob", data_id)
+    assert blockchain.get_data_listing()[0]["purchased_by"] == []
+
+    block, _ = blockchain.mine_block(difficulty=1)
+
+    assert blockchain.has_purchased("Bob", data_id)
+    assert blockchain.has_purchased("Bob", model_id)
+    assert blockchain.has_purchased("Carol", data_id)
+    assert not blockchain.has_purchased("Carol", model_id)
+    assert not blockchain.has_purchased("Alice", data_id)
+
+    ledger = blockchain.purchase_ledger
+    assert ledger.buyers(data_id) == {"Bob", "Carol"}
+    assert ledger.items("Bob") == [data_id, model_id]
+    assert [index for index, _ in ledger.purchases("Bob")] == [block.index, block.index]
+    assert ledger.purchase_count("Carol") == 1
+    assert blockchain.get_data_listing()[0]["purchased_by"] == ["Bob", "Carol"]
+    assert blockchain.get_model_listing()[0]["purchased_by"] == ["Bob"]
+
+
+def test_ledger_rebuilt_with_index():
+    blockchain = Blockchain(mining_workers=1)
+    data_id = blockchain.data_upload_transaction("Alice", {"name": "Datensatz"}, 10)
+    blockchain.mine_block(difficulty=1)
+    blockchain.data_purchase_transaction("Bob", data_id, 10)
+    blockchain.mine_block(difficulty=1)
+
+    blockchain.purchase_ledger.clear()
+    assert not blockchain.has_purchased("Bob", data_id)
+
+    blockchain.rebuild_transaction_index()
+    assert blockchain.has_purchased("Bob", data_id)
+    # Kein doppelter Eintrag nach dem Neuaufbau
+    assert blockchain.purchase_ledger.purchase_count("Bob") == 1
+
+
+if __name__ == "__main__":
+    test_ledger_updated_on_block_commit()
+    test_ledger_rebuilt_with_index()
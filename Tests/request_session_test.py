@@ -0,0 +1,115 @@
+# request_session_test.py
+import os
+import tempfile
+
+from flask import Flask
+from sqlalchemy import event, text
+
+from database import DatabaseManager, User, PROFILE_PRODUCTION, POOL_SIZE, data_purchases
+from marketplace import MarketplaceBlockchain
+
+
+def test_production_profile_pragmas():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'wal.db')}", profile=PROFILE_PRODUCTION)
+        with db_manager.engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert connection.execute(text("PRAGMA cache_size")).scalar() == -64000
+        assert db_manager.engine.pool.size() == POOL_SIZE
+        db_manager.engine.dispose()
+
+        # Ohne Profil bleibt es beim Standard von SQLite
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'plain.db')}")
+        with db_manager.engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        db_manager.engine.dispose()
+
+
+def test_one_session_per_request():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'request.db')}", profile=PROFILE_PRODUCTION)
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+        app = Flask(__name__)
+        db_manager.init_app(app)
+
+        checkouts = []
+        event.listen(db_manager.engine, "checkout", lambda *args: checkouts.append(1))
+
+        def buy(address):
+            # Mehrere Methoden wie bei einem Kauf, jede mit eigenem get_session()/close()
+            user = marketplace.register_user(address)
+            marketplace.register_user(address)
+            marketplace.count_transactions()
+            return user
+
+        @app.route("/buy/<address>")
+        def buy_route(address):
+            assert marketplace.register_user(address) is buy(address)
+            assert db_manager.get_session() is db_manager.get_session()
+            return "ok"
+
+        @app.route("/fail")
+        def fail():
+            db_manager.get_session().add(User(address="never"))
+            raise RuntimeError("Abbruch")
+
+        buy("Bob")
+        without_request = len(checkouts)
+        checkouts.clear()
+        client = app.test_client()
+        assert client.get("/buy/Alice").status_code == 200
+        # Eine Verbindung je Datenbanktransaktion statt je Methode
+        assert len(checkouts) < without_request
+
+        # Fehler in der Anfrage: nicht bestätigte Änderungen werden verworfen
+        app.config["PROPAGATE_EXCEPTIONS"] = False
+        assert client.get("/fail").status_code == 500
+        assert not db_manager.request_sessions.registry.has()
+
+        # Außerhalb einer Anfrage wieder eigene Sitzungen
+        session = db_manager.get_session()
+        assert session is not db_manager.get_session()
+        assert session.query(User).filter_by(address="never").first() is None
+        assert session.query(User).filter_by(address="Alice").count() == 1
+        session.close()
+        db_manager.engine.dispose()
+
+
+def test_uncommitted_work_ends_with_its_method():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'scope.db')}")
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+        app = Flask(__name__)
+        db_manager.init_app(app)
+
+        @app.route("/methods")
+        def methods():
+            # Methode ohne commit: close() verwirft ihre Zeile, das commit der nächsten Methode nimmt sie nicht mit
+            session = db_manager.get_session()
+            session.execute(data_purchases.insert(), {"user_id": 1, "data_id": 1})
+            session.add(User(address="Anna"))
+            session.close()
+            assert not session.uncommitted_writes
+            marketplace.register_user("Ben")
+
+            # Fehlschlag mit rollback: trifft nur die eigene Änderung
+            session = db_manager.get_session()
+            session.query(User).filter_by(address="Ben").delete()
+            session.rollback()
+            session.close()
+            marketplace.register_user("Carl")
+            return "ok"
+
+        assert app.test_client().get("/methods").status_code == 200
+        session = db_manager.get_session()
+        assert {user.address for user in session.query(User)} == {"Ben", "Carl"}
+        assert session.execute(data_purchases.select()).fetchall() == []
+        session.close()
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_production_profile_pragmas()
+    test_one_session_per_request()
+    test_uncommitted_work_ends_with_its_method()
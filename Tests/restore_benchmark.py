@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark Wiederherstellung der Chain
+=====================================
+
+Füllt eine SQLite-Datenbank mit Blöcken (je 10 Transaktionen) und misst den Start:
+bisher alle Zeilen auf einmal laden, dekodieren und danach den abgeleiteten Zustand
+in einem zweiten Durchgang aufbauen, gegen initialize_blockchain_from_database, das
+die Zeilen stapelweise liest und die Chain in einem Durchgang aufbaut (in einem Prozess
+und mit mehreren Prozessen zum Dekodieren).
+
+Aufruf: python Tests/restore_benchmark.py [blöcke]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Blockchain.blockchain import Block
+from Blockchain.transactions import TransferTransaction
+from database import DatabaseManager, BlockEntry
+from database_handling import initialize_blockchain_from_database
+from marketplace import MarketplaceBlockchain, BLOCK_ROW_COLUMNS, decode_block_rows
+
+TRANSACTIONS_PER_BLOCK = 10
+
+
+def build_blocks(count):
+    blocks = [Block(0, "0", 1700000000.0, [], proof=100)]
+    for index in range(1, count + 1):
+        transactions = [TransferTransaction(sender=f"Käufer{i}", recipient=f"Verkäufer{index}", amount=i,
+                                            timestamp=1700000000.0 + index, signature="placeholder_signature",
+                                            transaction_id=f"{index:016x}{i:016x}")
+                        for i in range(TRANSACTIONS_PER_BLOCK)]
+        blocks.append(Block(index, blocks[-1].hash, 1700000000.0 + index, transactions, proof=index, difficulty=0))
+    return blocks
+
+
+def fill_database(db_manager, blocks):
+    # Der Genesis-Block kommt vom Marktplatz selbst
+    marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+    for block in blocks[1:]:
+        marketplace._save_block_to_database(block)
+    marketplace.miner.shutdown()
+
+
+def restore_all_at_once(blockchain):
+    # Vorheriges Vorgehen: alle Zeilen in den Speicher, dann ein zweiter Durchgang für den Zustand
+    session = blockchain.db_manager.get_session()
+    try:
+        rows = session.query(*BLOCK_ROW_COLUMNS).order_by(BlockEntry.index).all()
+    finally:
+        session.close()
+    blockchain.chain = decode_block_rows(rows)
+    blockchain.restore_derived_state()
+    return True
+
+
+def measure(name, restore, db_manager, count):
+    blockchain = MarketplaceBlockchain(db_manager, mining_workers=1)
+    start = time.perf_counter()
+    assert restore(blockchain)
+    elapsed = time.perf_counter() - start
+    assert len(blockchain.chain) == count + 1
+    print(f"   {name:<32} {elapsed:7.2f} s, {len(blockchain.chain) / elapsed:8.0f} Blöcke/s")
+    blockchain.miner.shutdown()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    workers = os.cpu_count() or 1
+
+    print("🚀 WIEDERHERSTELLUNG BENCHMARK")
+    print("=" * 50)
+    print(f"Blöcke: {count}, Transaktionen pro Block: {TRANSACTIONS_PER_BLOCK}, CPU-Kerne: {workers}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'restore.db')}")
+        fill_database(db_manager, build_blocks(count))
+
+        print("\n🔁 Start aus der Datenbank")
+        measure("Alle Zeilen, zwei Durchgänge", restore_all_at_once, db_manager, count)
+        measure("Stapelweise, ein Prozess", lambda blockchain: initialize_blockchain_from_database(
+            blockchain, workers=1), db_manager, count)
+        measure(f"Stapelweise, {max(workers, 2)} Prozesse", lambda blockchain: initialize_blockchain_from_database(
+            blockchain, workers=max(workers, 2)), db_manager, count)
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# restore_test.py
+import os
+import tempfile
+
+import pytest
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.consensus import ProofOfAuthority
+from Blockchain.signatures import generate_private_key, public_key_hex
+from database import DatabaseManager, BlockEntry
+from database_handling import initialize_blockchain_from_database
+from marketplace import MarketplaceBlockchain
+
+
+def derived_state(blockchain):
+    return (blockchain.transaction_index, blockchain.data_list, blockchain.model_list,
+            blockchain.purchase_ledger._buyers, blockchain.purchase_ledger._purchases,
+            blockchain.accounts.balances)
+
+
+def build_chain(blockchain, rounds):
+    for i in range(rounds):
+        data_id = blockchain.data_upload_transaction(f"Owner{i}", {"name": f"Set {i}"}, float(i))
+        blockchain.mine_block(difficulty=1)
+        blockchain.data_purchase_transaction("Buyer", data_id, float(i))
+        blockchain.make_transaction("Alice", "Bob", i)
+        blockchain.mine_block(difficulty=1)
+    return blockchain
+
+
+def test_restore_blocks_in_one_pass():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.json")
+        blockchain = build_chain(Blockchain(mining_workers=1, snapshot_path=path, snapshot_interval=4), 4)
+        blockchain.data_upload_transaction("Late", {"name": "Neu"}, 1.0)
+        blockchain.mine_block(difficulty=1)
+
+        expected = Blockchain(mining_workers=1)
+        expected.chain = list(blockchain.chain)
+        expected.rebuild_transaction_index()
+
+        # Aus einem Generator: Snapshot bei Block 7, nur der letzte Block wird nachgespielt
+        restored = Blockchain(mining_workers=1, snapshot_path=path)
+        assert restored.restore_blocks(block for block in blockchain.chain) == 1
+        assert [block.hash for block in restored.chain] == [block.hash for block in blockchain.chain]
+        assert derived_state(restored) == derived_state(expected)
+
+        # Snapshot einer anderen Chain: alles wird nachgespielt
+        other = build_chain(Blockchain(mining_workers=1), 5)
+        restored = Blockchain(mining_workers=1, snapshot_path=path)
+        assert restored.restore_blocks(iter(other.chain)) == len(other.chain)
+        assert len(restored.data_list) == 5
+
+        # Lücken in den gespeicherten Blöcken
+        with pytest.raises(ValueError):
+            Blockchain(mining_workers=1).restore_blocks(blockchain.chain[:3] + blockchain.chain[4:])
+
+
+def test_database_restore_keeps_all_header_fields():
+    key = generate_private_key()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'restore.db')}")
+        # Erst Proof of Work, ab Block 5 signiert
+        marketplace = build_chain(MarketplaceBlockchain(db_manager, mining_workers=1), 2)
+        engine = ProofOfAuthority([public_key_hex(key)], private_key=key, transition_height=5)
+        marketplace.consensus = engine
+        build_chain(marketplace, 2)
+        chain = list(marketplace.chain)
+
+        # Ohne binäre Kopie: Schwierigkeit, Mining-Zeit und Siegel kommen aus den Spalten
+        session = db_manager.get_session()
+        session.query(BlockEntry).filter(BlockEntry.index % 2 == 1).update({BlockEntry.block_data: None})
+        session.commit()
+        session.close()
+
+        for workers, batch_size in ((1, 500), (2, 2)):
+            restarted = MarketplaceBlockchain(db_manager, mining_workers=1, consensus=engine)
+            assert initialize_blockchain_from_database(restarted, workers=workers, batch_size=batch_size)
+            assert [(block.hash, block.difficulty, block.mining_time, block.seal) for block in restarted.chain] == \
+                [(block.hash, block.difficulty, block.mining_time, block.seal) for block in chain]
+            assert derived_state(restarted) == derived_state(marketplace)
+            assert restarted.validate_chain(use_checkpoint=False)
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_restore_blocks_in_one_pass()
+    test_database_restore_keeps_all_header_fields()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark Signaturprüfung pro Block
+===================================
+
+Signiert 1.000 und 10.000 Transaktionen mit Ed25519 und misst den Durchsatz
+von SignatureVerifier.verify_transactions (Transaktionen pro Sekunde):
+seriell, auf einem Thread-Pool und auf einem Prozess-Pool.
+
+Aufruf: python Tests/signature_benchmark.py [worker]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Blockchain.signatures import (
+    SignatureVerifier, EXECUTOR_THREAD, EXECUTOR_PROCESS, generate_private_key, public_key_hex, sign_transaction,
+)
+from Blockchain.transactions import TransferTransaction
+
+BLOCK_SIZES = (1_000, 10_000)
+SENDERS = 100
+
+
+def build_transactions(count, keys):
+    transactions = []
+    for n in range(count):
+        fields = {"sender": f"User{n % SENDERS}", "recipient": f"Recipient{n}", "amount": n % 50,
+                  "timestamp": 1700000000.0 + n, "transaction_id": f"{n:032x}"}
+        fields["signature"] = sign_transaction(fields, keys[n % SENDERS])
+        transactions.append(TransferTransaction(**fields))
+    return transactions
+
+
+def measure(verifier, transactions):
+    # Erster Lauf wärmt Pool und Schlüssel-Cache auf
+    verifier.verify_transactions(transactions[:verifier.parallel_min])
+    start = time.perf_counter()
+    results = verifier.verify_transactions(transactions)
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return elapsed
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    keys = [generate_private_key() for _ in range(SENDERS)]
+    public_keys = {f"User{i}": public_key_hex(key) for i, key in enumerate(keys)}
+
+    print("🚀 SIGNATURPRÜFUNG BENCHMARK")
+    print("=" * 50)
+    print(f"CPU-Kerne: {os.cpu_count()}, Worker: {workers}")
+
+    verifiers = {
+        "Seriell": SignatureVerifier(public_keys, workers=1),
+        "Threads": SignatureVerifier(public_keys, workers=workers, executor=EXECUTOR_THREAD),
+        "Prozesse": SignatureVerifier(public_keys, workers=workers, executor=EXECUTOR_PROCESS),
+    }
+    try:
+        for size in BLOCK_SIZES:
+            transactions = build_transactions(size, keys)
+            print(f"\n📦 Block mit {size} Transaktionen")
+            serial_time = None
+            for name, verifier in verifiers.items():
+                elapsed = measure(verifier, transactions)
+                serial_time = serial_time or elapsed
+                print(f"   {name:<9} {elapsed:7.3f}s  {size / elapsed:9.0f} tx/s  "
+                      f"({serial_time / elapsed:4.2f}x)")
+    finally:
+        for verifier in verifiers.values():
+            verifier.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# signatures_test.py
+import os
+import tempfile
+
+import pytest
+
+from Blockchain.blockchain import Blockchain, Block
+from Blockchain.signatures import (
+    SignatureVerifier, SignatureError, EXECUTOR_PROCESS, PLACEHOLDER_SIGNATURE, generate_private_key, public_key_hex,
+    private_key_to_hex, private_key_from_hex, sign_transaction, verify_signature, signer,
+)
+from Blockchain.transactions import TransferTransaction
+from database import DatabaseManager
+from database_handling import initialize_blockchain_from_database
+from marketplace import MarketplaceBlockchain
+
+
+def test_signed_transactions_validate():
+    alice_key = generate_private_key()
+    blockchain = Blockchain(mining_workers=1, require_signatures=True)
+    blockchain.register_public_key("Alice", public_key_hex(alice_key))
+
+    blockchain.make_transaction("Alice", "Bob", 5, private_key=alice_key)
+    data_id = blockchain.data_upload_transaction("Alice", {"name": "Set"}, 1.0, private_key=alice_key)
+    blockchain.data_purchase_transaction("Alice", data_id, 1.0, private_key=alice_key)
+    block, _ = blockchain.mine_block(difficulty=1)
+
+    assert all(verify_signature(tx, public_key_hex(alice_key)) for tx in block.transactions)
+    assert blockchain.validate_chain(use_checkpoint=False)
+
+    # Unsignierte oder fremd signierte Transaktionen werden nicht angenommen
+    with pytest.raises(SignatureError):
+        blockchain.make_transaction("Alice", "Bob", 5)
+    with pytest.raises(SignatureError):
+        blockchain.make_transaction("Alice", "Bob", 5, private_key=generate_private_key())
+    assert len(blockchain.mempool) == 0
+
+    # Schlüssel lassen sich als Hex speichern
+    restored = private_key_from_hex(private_key_to_hex(alice_key))
+    assert public_key_hex(restored) == public_key_hex(alice_key)
+
+
+def test_forged_block_fails_validation():
+    key = generate_private_key()
+    blockchain = Blockchain(mining_workers=1)
+    blockchain.register_public_key("Alice", public_key_hex(key))
+    blockchain.make_transaction("Alice", "Bob", 5, private_key=key)
+    # Platzhalter sind ohne require_signatures weiterhin erlaubt
+    blockchain.make_transaction("Carol", "Bob", 1)
+    block, _ = blockchain.mine_block(difficulty=1)
+    assert blockchain.validate_chain(use_checkpoint=False)
+
+    # Betrag nach dem Signieren geändert: gleicher Block, aber Signatur passt nicht mehr
+    fields = block.transactions[0].to_dict()
+    fields["amount"] = 500
+    forged = Block(block.index, block.previous_hash, block.timestamp,
+                   [TransferTransaction(**fields)] + list(block.transactions[1:]),
+                   proof=block.proof, difficulty=block.difficulty, mining_time=block.mining_time)
+    assert not blockchain.validate_block(forged, blockchain.chain[-2])
+    assert not SignatureVerifier({"Alice": public_key_hex(key)}).verify_block(forged)
+
+    strict = SignatureVerifier({"Alice": public_key_hex(key)}, require_signatures=True)
+    assert strict.verify_transactions(block.transactions) == [True, False]
+
+
+def test_placeholder_rejected_for_registered_signer():
+    key = generate_private_key()
+    verifier = SignatureVerifier({"Alice": public_key_hex(key)})
+    placeholder = TransferTransaction(sender="Alice", recipient="Bob", amount=5, timestamp=1.0,
+                                      transaction_id="a" * 32, signature=PLACEHOLDER_SIGNATURE)
+    keyless = TransferTransaction(sender="Carol", recipient="Bob", amount=1, timestamp=1.0,
+                                  transaction_id="c" * 32, signature=PLACEHOLDER_SIGNATURE)
+
+    # Wer einen Schlüssel registriert hat, muss auch signieren
+    assert not verifier.check_transaction(placeholder)
+    assert verifier.check_transaction(keyless)
+    block = Block(1, "0" * 64, 1.0, [placeholder, keyless], proof=0)
+    assert not verifier.verify_block(block)
+    assert verifier.verify_block(Block(1, "0" * 64, 1.0, [keyless], proof=0))
+
+    blockchain = Blockchain(mining_workers=1)
+    blockchain.register_public_key("Alice", public_key_hex(key))
+    with pytest.raises(SignatureError):
+        blockchain.make_transaction("Alice", "Bob", 5)
+    blockchain.make_transaction("Carol", "Bob", 1)
+    assert len(blockchain.mempool) == 1
+
+
+def test_marketplace_signs_with_registered_key():
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # IPFS-Ordner und data_keys.json liegen im Arbeitsverzeichnis
+        os.chdir(tmp)
+        try:
+            db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'keys.db')}")
+            marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+            owner_key, buyer_key = generate_private_key(), generate_private_key()
+            marketplace.register_user("Owner", public_key_hex(owner_key))
+            marketplace.register_user("Buyer", public_key_hex(buyer_key))
+
+            data_id, _ = marketplace.upload_data_with_file("Owner", "a,b\n1,2\n", {"name": "Set"}, 3.0,
+                                                           private_key=owner_key)
+            with pytest.raises(SignatureError):
+                marketplace.purchase_data("Buyer", data_id, 3.0)
+            marketplace.purchase_data("Buyer", data_id, 3.0, private_key=buyer_key)
+            block, _ = marketplace.mine_block(difficulty=1)
+            assert all(verify_signature(tx, public_key_hex(owner_key if signer(tx) == "Owner" else buyer_key))
+                       for tx in block.transactions if signer(tx) != "0")
+
+            # Nach einem Neustart kommen die Schlüssel aus der Datenbank
+            restored = MarketplaceBlockchain(db_manager, mining_workers=1)
+            initialize_blockchain_from_database(restored, workers=1)
+            assert len(restored.chain) == 2
+            assert restored.validate_chain(use_checkpoint=False)
+            with pytest.raises(SignatureError):
+                restored.data_purchase_transaction("Buyer", data_id, 3.0)
+            db_manager.engine.dispose()
+        finally:
+            os.chdir(previous)
+
+
+@pytest.mark.parametrize("executor", ["thread", EXECUTOR_PROCESS])
+def test_batch_verification_on_pool(executor):
+    keys = [generate_private_key() for _ in range(4)]
+    public_keys = {f"User{i}": public_key_hex(key) for i, key in enumerate(keys)}
+    transactions = []
+    for n in range(64):
+        fields = {"sender": f"User{n % 4}", "recipient": "Bob", "amount": n, "timestamp": 1.0,
+                  "transaction_id": f"{n:032x}"}
+        fields["signature"] = sign_transaction(fields, keys[n % 4])
+        transactions.append(TransferTransaction(**fields))
+    fields = transactions[10].to_dict()
+    fields["recipient"] = "Mallory"
+    transactions[10] = TransferTransaction(**fields)
+
+    verifier = SignatureVerifier(public_keys, workers=2, executor=executor, parallel_min=8)
+    try:
+        results = verifier.verify_transactions(transactions)
+    finally:
+        verifier.close()
+    assert results == [n != 10 for n in range(64)]
+
+
+if __name__ == "__main__":
+    test_signed_transactions_validate()
+    test_forged_block_fails_validation()
+    test_placeholder_rejected_for_registered_signer()
+    test_marketplace_signs_with_registered_key()
+    test_batch_verification_on_pool("thread")
+    test_batch_verification_on_pool(EXECUTOR_PROCESS)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark Start mit Chain-Snapshot
+==================================
+
+Baut eine Marketplace-Chain in einer temporären SQLite-Datenbank auf und
+misst den Neustart (initialize_blockchain_from_database) einmal ohne Snapshot
+(alle Blöcke werden nachgespielt) und einmal mit Snapshot (nur die Blöcke
+nach dem Snapshot werden nachgespielt).
+
+Aufruf: python Tests/snapshot_benchmark.py [anzahl_bloecke] [transaktionen_pro_block]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from marketplace import MarketplaceBlockchain
+from database_handling import initialize_blockchain_from_database
+from Blockchain.snapshot import ChainSnapshot
+
+
+def build_database(db_url, snapshot_path, blocks, transactions_per_block):
+    blockchain = MarketplaceBlockchain(DatabaseManager(db_url), mining_workers=1, snapshot_path=snapshot_path)
+    blockchain.snapshot_interval = max(blocks // 2, 1)
+    for i in range(blocks):
+        for j in range(transactions_per_block // 2):
+            item_id = blockchain.data_upload_transaction(f"{i:016x}", {"name": f"Set {i}/{j}"}, 1.0)
+            blockchain.data_purchase_transaction(f"{j:016x}", item_id, 1.0)
+        # Schwierigkeit 0: jeder Proof ist gültig, es geht nur um den Neustart
+        blockchain.make_block(proof=0, difficulty=0)
+    return blockchain
+
+
+def restart(db_url, snapshot_path):
+    blockchain = MarketplaceBlockchain(DatabaseManager(db_url), mining_workers=1, snapshot_path=snapshot_path)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        initialize_blockchain_from_database(blockchain)
+    return time.perf_counter() - start, blockchain
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    transactions_per_block = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print("🚀 START MIT CHAIN-SNAPSHOT BENCHMARK")
+    print("=" * 50)
+    print(f"Blöcke: {blocks}, Transaktionen pro Block: {transactions_per_block}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'benchmark.db')}"
+        snapshot_path = os.path.join(tmp, "snapshot.json")
+        original = build_database(db_url, snapshot_path, blocks, transactions_per_block)
+        snapshot = ChainSnapshot.load(snapshot_path)
+
+        without_time, without = restart(db_url, None)
+        with_time, restored = restart(db_url, snapshot_path)
+
+        assert [block.hash for block in restored.chain] == [block.hash for block in original.chain]
+        assert restored.data_list == without.data_list
+        assert restored.transaction_index.keys() == without.transaction_index.keys()
+
+        print(f"   Ohne Snapshot: {without_time:7.3f}s  ({len(without.chain)} Blöcke nachgespielt)")
+        print(f"   Mit Snapshot:  {with_time:7.3f}s  "
+              f"({len(restored.chain) - snapshot.height} Blöcke nachgespielt)")
+        print(f"   Speedup:       {without_time / with_time:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
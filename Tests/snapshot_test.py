@@ -0,0 +1,82 @@
+# snapshot_test.py
+import os
+import tempfile
+
+from Blockchain.blockchain import Blockchain
+from Blockchain.snapshot import ChainSnapshot
+
+
+def derived_state(blockchain):
+    return (blockchain.transaction_index, blockchain.data_list, blockchain.model_list,
+            blockchain.data_entries, blockchain.model_entries,
+            blockchain.purchase_ledger._buyers, blockchain.purchase_ledger._purchases,
+            blockchain.accounts.balances)
+
+
+def build_chain(snapshot_path):
+    blockchain = Blockchain(mining_workers=1, snapshot_path=snapshot_path, snapshot_interval=2)
+    for i in range(5):
+        data_id = blockchain.data_upload_transaction(f"Owner{i}", {"name": f"Set {i}"}, float(i))
+        model_id = blockchain.model_upload_transaction(f"Owner{i}", {"name": f"Modell {i}"}, 2.0)
+        blockchain.mine_block(difficulty=1)
+        blockchain.data_purchase_transaction("Buyer", data_id, float(i))
+        blockchain.model_purchase_transaction("Buyer", model_id, 2.0)
+        blockchain.make_transaction("Alice", "Bob", i)
+        blockchain.mine_block(difficulty=1)
+    return blockchain
+
+
+def test_snapshot_restore_replays_only_new_blocks():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.json")
+        blockchain = build_chain(path)
+
+        # Snapshot wird alle 2 Blöcke geschrieben, der letzte bei Block 10
+        snapshot = ChainSnapshot.load(path)
+        assert snapshot.height == 11 == len(blockchain.chain)
+        assert snapshot.covers(blockchain.chain)
+
+        # Noch ein Block nach dem Snapshot und eine ausstehende Transaktion
+        blockchain.data_upload_transaction("Late", {"name": "Neu"}, 1.0)
+        blockchain.mine_block(difficulty=1)
+        pending_id = blockchain.model_upload_transaction("Pending", {"name": "Offen"}, 1.0)
+
+        restarted = Blockchain(mining_workers=1, snapshot_path=path, snapshot_interval=2)
+        restarted.chain = list(blockchain.chain)
+        restarted.current_transactions = blockchain.current_transactions
+        assert restarted.restore_derived_state() == 1
+
+        expected = Blockchain(mining_workers=1)
+        expected.chain = list(blockchain.chain)
+        expected.current_transactions = blockchain.current_transactions
+        expected.rebuild_transaction_index()
+
+        assert derived_state(restarted) == derived_state(expected)
+        assert len(restarted.data_list) == 6 and len(restarted.model_list) == 6
+        assert restarted.find_item(pending_id) is not None
+        assert restarted.has_purchased("Buyer", blockchain.data_list[0]["data_id"])
+        print(f"Snapshot bei Block {snapshot.height - 1}, {len(restarted.data_list)} Datensätze wiederhergestellt")
+
+
+def test_snapshot_of_other_chain_is_ignored():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.json")
+        blockchain = build_chain(path)
+
+        other = Blockchain(mining_workers=1, snapshot_path=path)
+        other.make_transaction("Alice", "Bob", 1)
+        other.mine_block(difficulty=1)
+        assert other.restore_derived_state() == len(other.chain)
+        assert other.data_list == []
+
+        # Kaputte Datei: kompletter Neuaufbau statt Fehler
+        with open(path, "w") as f:
+            f.write("{kaputt")
+        assert ChainSnapshot.load(path) is None
+        assert blockchain.restore_derived_state() == len(blockchain.chain)
+        assert len(blockchain.data_list) == 5
+
+
+if __name__ == "__main__":
+    test_snapshot_restore_replays_only_new_blocks()
+    test_snapshot_of_other_chain_is_ignored()
@@ -0,0 +1,193 @@
+# sync_test.py
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+
+from flask import Flask
+from werkzeug.serving import make_server
+
+from Blockchain.blockchain import Blockchain, Block
+from database import DatabaseManager, BlockEntry
+from marketplace import MarketplaceBlockchain
+from Blockchain.sync import ChainSync, create_sync_blueprint, block_locator, fork_point, pack_blocks, unpack_blocks
+
+
+class Node:
+    """
+    Blockchain mit eigenem Flask-Server auf einem freien lokalen Port
+    """
+
+    def __init__(self):
+        self.blockchain = Blockchain(mining_workers=1)
+        app = Flask(__name__)
+        app.register_blueprint(create_sync_blueprint(self.blockchain))
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.address = f"127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def post(self, path, payload=None):
+        request = urllib.request.Request(f"http://{self.address}{path}", data=json.dumps(payload or {}).encode(),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read())
+
+    def mine(self, blocks, label):
+        for i in range(blocks):
+            self.blockchain.make_transaction(label, f"Empfänger{i}", i)
+            self.blockchain.mine_block(difficulty=1)
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def start_nodes(count):
+    nodes = [Node() for _ in range(count)]
+    for node in nodes:
+        node.post("/nodes/register", {"nodes": [other.address for other in nodes if other is not node]})
+    return nodes
+
+
+def test_nodes_converge_on_longest_chain():
+    nodes = start_nodes(4)
+    try:
+        a, b, c, d = nodes
+        a.mine(30, "A")
+        b.mine(5, "B")  # eigene, kürzere Chain mit anderem Genesis-Block
+        d.blockchain.replace_chain(a.blockchain.chain[:12])  # gemeinsamer Anfang, dann zurück
+        d.mine(3, "D")
+
+        start = time.perf_counter()
+        for node in (b, c, d):
+            result = node.post("/nodes/sync")
+            # Nach B hat auch B die längste Chain, die Quelle ist egal
+            assert result["adopted"] and result["height"] == 31
+        seconds = time.perf_counter() - start
+
+        tips = {node.blockchain.last_block.hash for node in nodes}
+        assert tips == {a.blockchain.last_block.hash}
+        assert all(len(node.blockchain.chain) == 31 for node in nodes)
+        assert all(node.blockchain.validate_chain(use_checkpoint=False) for node in nodes)
+
+        # D hatte die ersten 12 Blöcke schon, nur der Rest wurde geladen
+        assert result["fork_point"] == 12 and result["downloaded_blocks"] == 19
+        # Transaktionen der verworfenen Blöcke sind wieder ausstehend
+        assert len(b.blockchain.mempool) == 5 and len(d.blockchain.mempool) == 3
+        assert b.blockchain.get_balance("A") == a.blockchain.get_balance("A")
+
+        # Nichts Neues: keine Übernahme
+        assert not c.post("/nodes/sync")["adopted"]
+        print(f"Konvergenz von 3 Knoten auf {len(a.blockchain.chain)} Blöcke in {seconds:.3f}s")
+    finally:
+        for node in nodes:
+            node.stop()
+
+
+def test_invalid_longer_chain_is_rejected():
+    nodes = start_nodes(3)
+    try:
+        honest, forger, fresh = nodes
+        honest.mine(6, "A")
+        forger.mine(4, "F")
+        # Längere Chain, aber die Blöcke haben keinen gültigen PoW
+        for _ in range(6):
+            last = forger.blockchain.last_block
+            forger.blockchain.chain.append(Block(last.index + 1, last.hash, time.time(), [], proof=0, difficulty=4))
+
+        sync = ChainSync(fresh.blockchain, workers=2, range_size=2)
+        result = sync.synchronize()
+        assert result.adopted and result.peer == honest.address
+        assert forger.address in result.rejected
+        assert fresh.blockchain.last_block.hash == honest.blockchain.last_block.hash
+
+        # Nicht erreichbarer Knoten wird übersprungen
+        nodes[1].stop()
+        fresh.blockchain.register_node("http://127.0.0.1:9")
+        honest.mine(3, "A")
+        result = ChainSync(fresh.blockchain, timeout=2).synchronize()
+        assert result.adopted and result.fork_point == 7 and result.downloaded_blocks == 3
+        assert "127.0.0.1:9" in result.rejected
+    finally:
+        for node in (honest, fresh):
+            node.stop()
+
+
+def test_chain_with_more_work_wins_over_longer_chain():
+    nodes = start_nodes(3)
+    try:
+        honest, cheap, fresh = nodes
+        for i in range(3):
+            honest.blockchain.make_transaction("A", f"Empfänger{i}", i)
+            honest.blockchain.mine_block(difficulty=2)
+        # Viel längere Chain ohne Schwierigkeit: jeder Proof ist gültig, aber kaum Arbeit
+        for i in range(30):
+            cheap.blockchain.make_transaction("C", f"Empfänger{i}", i)
+            cheap.blockchain.mine_block(difficulty=0)
+        assert cheap.blockchain.validate_chain(use_checkpoint=False)
+        assert cheap.blockchain.cumulative_work() < honest.blockchain.cumulative_work()
+
+        result = ChainSync(fresh.blockchain).synchronize()
+        assert result.adopted and result.peer == honest.address and result.height == 4
+        assert fresh.blockchain.last_block.hash == honest.blockchain.last_block.hash
+
+        # Die längere Chain verdrängt die mit mehr Arbeit nicht
+        assert not honest.post("/nodes/sync")["adopted"]
+        assert len(honest.blockchain.chain) == 4
+        result = cheap.post("/nodes/sync")
+        assert result["adopted"] and result["height"] == 4
+    finally:
+        for node in nodes:
+            node.stop()
+
+
+def test_locator_and_block_packing():
+    blockchain = Blockchain(mining_workers=1)
+    for i in range(40):
+        blockchain.make_transaction("A", "B", i)
+        blockchain.mine_block(difficulty=1)
+
+    locator = block_locator(blockchain.chain)
+    assert locator[0] == [40, blockchain.last_block.hash] and locator[-1][0] == 0
+    assert len(locator) < 20
+    assert fork_point(blockchain.chain, locator) == 41
+    # Der Locator ist zur Genesis hin lückenhaft: der gemeinsame Anfang wird eher zu kurz geschätzt
+    assert 15 <= fork_point(blockchain.chain[:25], locator) <= 25
+    assert fork_point(blockchain.chain, [[3, "x" * 64]]) == 0
+
+    blocks = unpack_blocks(pack_blocks(blockchain.chain[5:9]))
+    assert [block.hash for block in blocks] == [block.hash for block in blockchain.chain[5:9]]
+
+
+def test_marketplace_stores_adopted_chain():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'sync.db')}")
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+        for i in range(4):
+            marketplace.make_transaction("M", "N", i)
+            marketplace.mine_block(difficulty=1)
+
+        other = Blockchain(mining_workers=1)
+        for i in range(2):
+            other.make_transaction("O", "P", i)
+            other.mine_block(difficulty=1)
+        marketplace.replace_chain(list(other.chain))
+
+        # Alte Blöcke 3 und 4 sind weg, Block 0 bis 2 gehören zur neuen Chain
+        session = db_manager.get_session()
+        try:
+            stored = [entry.block_hash for entry in session.query(BlockEntry).order_by(BlockEntry.index)]
+        finally:
+            session.close()
+        assert stored == [block.hash for block in other.chain]
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_nodes_converge_on_longest_chain()
+    test_invalid_longer_chain_is_rejected()
+    test_chain_with_more_work_wins_over_longer_chain()
+    test_locator_and_block_packing()
+    test_marketplace_stores_adopted_chain()
@@ -0,0 +1,35 @@
+# transaction_index_test.py
+from Blockchain.blockchain import Blockchain
+
+
+def test_transaction_index():
+    blockchain = Blockchain(mining_workers=1)
+
+    data_id = blockchain.data_upload_transaction("Alice", {"name": "Iris"}, 10.0)
+    model_id = blockchain.model_upload_transaction("Bob", {"name": "CNN"}, 25.0)
+
+    # Ausstehende Uploads sind ohne Block-Index im Index
+    block_index, position, tx = blockchain.find_transaction(data_id)
+    assert block_index is None and position is None and tx["owner"] == "Alice"
+    assert blockchain.find_item(model_id)["type"] == "model_upload"
+    assert blockchain.find_item(model_id, confirmed_only=True) is None
+
+    new_block, _ = blockchain.mine_block(difficulty=2)
+
+    # Nach dem Mining zeigt der Index auf Block und Position
+    assert blockchain.find_transaction(data_id)[:2] == (new_block.index, 0)
+    assert blockchain.find_transaction(model_id)[:2] == (new_block.index, 1)
+
+    purchase_id = blockchain.data_purchase_transaction("Charlie", data_id, 10.0)
+    assert blockchain.find_transaction(purchase_id)[2]["seller"] == "Alice"
+
+    # Index lässt sich aus der Chain neu aufbauen
+    expected = dict(blockchain.transaction_index)
+    blockchain.rebuild_transaction_index()
+    assert blockchain.transaction_index == expected
+
+    print(f"{len(blockchain.transaction_index)} Transaktionen indiziert")
+
+
+if __name__ == "__main__":
+    test_transaction_index()
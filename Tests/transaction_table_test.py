@@ -0,0 +1,101 @@
+# transaction_table_test.py
+import os
+import tempfile
+from unittest import mock
+
+import pytest
+from sqlalchemy import inspect
+
+from database import DatabaseManager, TransactionEntry
+import database_handling
+from database_handling import backfill_transaction_table, initialize_blockchain_from_database
+from marketplace import MarketplaceBlockchain, TRANSFER_TYPE
+
+
+def fill(marketplace):
+    data_id = marketplace.data_upload_transaction("Owner", {"name": "Set"}, 3.0)
+    model_id = marketplace.model_upload_transaction("Owner", {"name": "Modell"}, 5.0)
+    marketplace.mine_block(difficulty=1)
+    marketplace.data_purchase_transaction("Buyer", data_id, 3.0)
+    marketplace.make_transaction("Alice", "Buyer", 7)
+    marketplace.mine_block(difficulty=1)
+    return data_id, model_id
+
+
+def test_transactions_are_stored_with_their_block():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'tx.db')}")
+        marketplace = MarketplaceBlockchain(db_manager, mining_workers=1)
+        data_id, model_id = fill(marketplace)
+        assert marketplace.transaction_table_ready
+        # Mit der Überweisung aus dem Genesis-Block
+        assert marketplace.count_transactions() == 5
+        assert marketplace.count_transactions('data_purchase') == 1
+
+        # Indizes auf Typ, Adressen und Angebot
+        indexed = {index['column_names'][0] for index in inspect(db_manager.engine).get_indexes('transactions')}
+        assert {'type', 'owner', 'buyer', 'seller', 'item_id'} <= indexed
+
+        # Abfragen wie im Block, neueste zuerst
+        buyer = marketplace.query_transactions(address="Buyer")
+        assert [tx.get('type', TRANSFER_TYPE) for tx in buyer] == [TRANSFER_TYPE, 'data_purchase']
+        assert buyer[0]['sender'] == "Alice" and buyer[0]['amount'] == 7
+        assert buyer[1] == {**{key: value for key, value in marketplace.chain[2].transactions[0].items()
+                               if key != 'signature'}, 'block_index': 2, 'position': 0}
+        assert [tx['transaction_id'] for tx in marketplace.query_transactions(item_id=data_id)] == \
+            [buyer[1]['transaction_id'], data_id]
+        assert marketplace.query_transactions(transaction_type='model_upload')[0]['price'] == 5.0
+        assert len(marketplace.query_transactions(limit=3)) == 3
+
+        # Verworfene Blöcke verlieren ihre Zeilen
+        marketplace.discard_last_block()
+        assert marketplace.count_transactions() == 3 and marketplace.check_transaction_table()
+        db_manager.engine.dispose()
+
+
+def test_backfill_existing_database():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'old.db')}")
+        fill(MarketplaceBlockchain(db_manager, mining_workers=1))
+
+        # Datenbank aus einer älteren Version: Tabelle transactions leer
+        session = db_manager.get_session()
+        session.query(TransactionEntry).delete()
+        session.commit()
+        session.close()
+
+        restarted = MarketplaceBlockchain(db_manager, mining_workers=1)
+        assert initialize_blockchain_from_database(restarted)
+        assert not restarted.transaction_table_ready
+
+        assert backfill_transaction_table(db_manager, batch_size=2) == 5
+        assert restarted.check_transaction_table()
+        assert backfill_transaction_table(db_manager) == 5
+        assert restarted.count_transactions() == 5
+
+        # Abbruch nach dem ersten Stapel: die übrigen Blöcke behalten ihre alten Zeilen
+        stream_stored_blocks = database_handling.stream_stored_blocks
+
+        def interrupted(db_manager, workers, batch_size):
+            blocks = stream_stored_blocks(db_manager, workers, batch_size)
+            yield from (next(blocks), next(blocks))
+            raise KeyboardInterrupt
+
+        with mock.patch.object(database_handling, "stream_stored_blocks", interrupted):
+            with pytest.raises(KeyboardInterrupt):
+                backfill_transaction_table(db_manager, batch_size=1)
+        assert restarted.count_transactions() == 5 and restarted.check_transaction_table()
+
+        # Zeilen von Blöcken, die es nicht mehr gibt, verschwinden mit dem letzten Stapel
+        session = db_manager.get_session()
+        session.add(TransactionEntry(tx_id="veraltet", block_index=9, position=0, type=TRANSFER_TYPE))
+        session.commit()
+        session.close()
+        assert backfill_transaction_table(db_manager, batch_size=2) == 5
+        assert restarted.count_transactions() == 5
+        db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_transactions_are_stored_with_their_block()
+    test_backfill_existing_database()
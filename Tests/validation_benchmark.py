@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark Chain-Validierung
+===========================
+
+Vergleicht die serielle Validierung einer langen Kette mit der parallelen
+Validierung im Prozess-Pool und der Validierung ab einem Checkpoint
+(nur die zuletzt angehängten Blöcke werden geprüft).
+
+Aufruf: python Tests/validation_benchmark.py [anzahl_bloecke] [worker]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Blockchain.blockchain import Blockchain
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<22} {elapsed:8.3f}s  gültig={result}")
+    return elapsed
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    print("🔍 CHAIN-VALIDIERUNG BENCHMARK")
+    print("=" * 50)
+    print(f"Blöcke: {blocks}, Worker: {workers}")
+
+    blockchain = Blockchain(mining_workers=1)
+    for i in range(blocks):
+        blockchain.make_transaction("Alice", "Bob", i)
+        blockchain.mine_block(difficulty=1)
+
+    serial = timed("Seriell", lambda: blockchain.validate_chain(use_checkpoint=False))
+    timed("Parallel", lambda: blockchain.validate_chain(workers=workers, use_checkpoint=False))
+
+    # Checkpoint setzen, dann 10 neue Blöcke anhängen
+    blockchain.validate_chain()
+    for i in range(10):
+        blockchain.make_transaction("Bob", "Carol", i)
+        blockchain.mine_block(difficulty=1)
+    tail = timed("Checkpoint + 10 Blöcke", lambda: blockchain.validate_chain())
+
+    print(f"   Speedup Checkpoint:    {serial / tail:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
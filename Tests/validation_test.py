@@ -0,0 +1,97 @@
+# validation_test.py
+import os
+import tempfile
+
+from Blockchain import validation
+from Blockchain.blockchain import Block, Blockchain
+
+
+def build_chain(blocks=6):
+    blockchain = Blockchain(mining_workers=1)
+    for i in range(blocks):
+        blockchain.make_transaction("Alice", "Bob", i + 1)
+        blockchain.mine_block(difficulty=2)
+    return blockchain
+
+
+def forge(block, **changes):
+    # Block mit geänderten Feldern, aber dem alten gespeicherten Hash
+    fields = dict(index=block.index, previous_hash=block.previous_hash, timestamp=block.timestamp,
+                  transactions=block.transactions, proof=block.proof, difficulty=block.difficulty,
+                  mining_time=block.mining_time, hash=block.hash, merkle_root=block.merkle_root,
+                  version=block.version)
+    fields.update(changes)
+    return Block(**fields)
+
+
+def test_block_hash_is_recomputed():
+    blockchain = build_chain()
+    assert blockchain.validate_chain(use_checkpoint=False)
+
+    # Geänderter Zeitstempel: Verkettung, PoW und Merkle-Root stimmen noch, der Hash nicht
+    forged = list(blockchain.chain)
+    forged[3] = forge(forged[3], timestamp=forged[3].timestamp + 1)
+    assert not blockchain.validate_block(forged[3], forged[2])
+    assert not blockchain.validate_chain(forged, use_checkpoint=False)
+
+    # Auch der letzte Block (auf den kein Nachfolger verweist) wird geprüft
+    forged = list(blockchain.chain)
+    forged[-1] = forge(forged[-1], mining_time=123.0)
+    assert not blockchain.validate_chain(forged, use_checkpoint=False)
+
+
+def test_parallel_validation_matches_serial():
+    blockchain = build_chain(8)
+    chain = blockchain.chain
+
+    assert validation.validate_range_parallel(chain, workers=2, chunk_size=3)
+
+    forged = list(chain)
+    forged[5] = forge(forged[5], timestamp=forged[5].timestamp + 1)
+    assert not validation.validate_range(forged)
+    assert not validation.validate_range_parallel(forged, workers=2, chunk_size=3)
+
+
+def test_checkpoint_only_checks_tail():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "checkpoint.json")
+        blockchain = build_chain(4)
+        blockchain.checkpoint_path = path
+
+        assert blockchain.validate_chain()
+        assert blockchain.validation_checkpoint.length == len(blockchain.chain)
+        assert os.path.exists(path)
+
+        # Neuer Prozess: Checkpoint wird geladen
+        restored = Blockchain(mining_workers=1, checkpoint_path=path)
+        assert restored.validation_checkpoint == blockchain.validation_checkpoint
+
+        # Neue Blöcke: nur der Teil nach dem Checkpoint wird validiert
+        blockchain.make_transaction("Bob", "Carol", 1)
+        blockchain.mine_block(difficulty=2)
+        checked = []
+        original = validation.validate_range
+        validation.validate_range = lambda blocks, verifier=None, consensus=None: (
+            checked.extend(blocks) or original(blocks, verifier, consensus))
+        try:
+            assert blockchain.validate_chain()
+        finally:
+            validation.validate_range = original
+
+        # Vorgänger + neuer Block
+        assert [block.index for block in checked] == [blockchain.chain[-2].index, blockchain.chain[-1].index]
+        assert blockchain.validation_checkpoint.tip_hash == blockchain.last_block.hash
+
+        # Eine andere Kette mit anderem Präfix wird komplett geprüft
+        # und verschiebt den Checkpoint der eigenen Kette nicht
+        other = build_chain(2)
+        checkpoint = blockchain.validation_checkpoint
+        assert not checkpoint.covers(other.chain)
+        assert blockchain.validate_chain(other.chain)
+        assert blockchain.validation_checkpoint == checkpoint
+
+
+if __name__ == "__main__":
+    test_block_hash_is_recomputed()
+    test_parallel_validation_matches_serial()
+    test_checkpoint_only_checks_tail()
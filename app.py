@@ -5,6 +5,7 @@ import json
 import hashlib
 import uuid
 from functools import wraps
+from itertools import islice
 from datetime import datetime
 import time
 import json
@@ -15,15 +16,41 @@ from flask import send_file
 import io
 import json
 from database import User
-from database_handling import reset_database
-from database import DatabaseManager
+from database_handling import reset_database, SNAPSHOT_FILE, BLOCK_LOG_DIR
+from mining_service import MiningService
+from Blockchain.sync import create_sync_blueprint
+from Blockchain.consensus import ProofOfWork, ProofOfAuthority, CONSENSUS_POA, seal_signer
+from Blockchain.signatures import private_key_from_hex, private_key_to_hex, generate_private_key, public_key_hex
+from Blockchain.block_log import SYNC_BATCH
+import atexit
+from database import DatabaseManager, PROFILE_PRODUCTION
 # Flask App Initialisierung
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'entwicklungsschluessel')
 
 # Blockchain Instanz erstellen
 
-blockchain = MarketplaceBlockchain()
+
+def create_consensus():
+    """Wählt die Konsens-Engine über Umgebungsvariablen
+
+    CONSENSUS=poa schaltet auf Proof of Authority um:
+        POA_AUTHORITIES: kommagetrennte öffentliche Ed25519-Schlüssel (hex) der Knoten, die Blöcke signieren dürfen
+        POA_PRIVATE_KEY: privater Schlüssel (hex) dieses Knotens, ohne Schlüssel wird nur validiert
+        POA_TRANSITION_HEIGHT: erster signierter Block, ältere Blöcke bleiben PoW-Blöcke (Standard: 0)
+
+    Returns:
+        ProofOfAuthority oder ProofOfWork
+    """
+    if os.environ.get('CONSENSUS', '').lower() != CONSENSUS_POA:
+        return ProofOfWork()
+    private_key = os.environ.get('POA_PRIVATE_KEY')
+    return ProofOfAuthority(
+        authorities=[key.strip() for key in os.environ.get('POA_AUTHORITIES', '').split(',') if key.strip()],
+        private_key=private_key_from_hex(private_key) if private_key else None,
+        transition_height=int(os.environ.get('POA_TRANSITION_HEIGHT', '0')),
+    )
+
 
 # Benutzerdaten-Datei
 USERS_FILE = 'users.json'
@@ -52,20 +79,66 @@ def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 
+def new_user_entry(username, password_hash):
+    """Neuer Eintrag für users.json mit Adresse und eigenem Ed25519-Signaturschlüssel."""
+    return {
+        "username": username,
+        "password_hash": password_hash,
+        "blockchain_address": str(uuid.uuid4()).replace('-', ''),
+        "signing_key": private_key_to_hex(generate_private_key())
+    }
+
+
+def signing_key(username):
+    """Signaturschlüssel eines Benutzers, None bei Konten aus der Zeit vor den Signaturen."""
+    key = load_users().get(username, {}).get('signing_key')
+    return private_key_from_hex(key) if key else None
+
+
+def signing_public_key(username):
+    """Öffentlicher Schlüssel zu signing_key, wird bei der Registrierung in der Datenbank hinterlegt."""
+    key = signing_key(username)
+    return public_key_hex(key) if key else None
+
+
 # Erstelle Demo-Benutzer beim Start
 def initialize():
     users = load_users()
     if "demo" not in users:
-        users["demo"] = {
-            "username": "demo",
-            "password_hash": hash_password("password"),
-            "blockchain_address": str(uuid.uuid4()).replace('-', '')
-        }
+        users["demo"] = new_user_entry("demo", hash_password("password"))
         save_users(users)
         print("Demo-Benutzer erstellt.")
 
 
-initialize()
+# Die Prozess-Pools (Mining, Validierung, Signaturen, Wiederherstellung) starten ihre Worker mit spawn,
+# jeder Worker importiert das Hauptmodul erneut als __mp_main__. Bei "python app.py" würde sonst jeder
+# Worker Datenbank, Chain, Block-Log und Mining-Dienst des Servers noch einmal öffnen.
+if __name__ != '__mp_main__':
+    # DB_PROFILE=default: SQLite ohne WAL, Pragmas und Verbindungspool (Standard: production)
+    db_manager = DatabaseManager(profile=os.environ.get('DB_PROFILE', PROFILE_PRODUCTION))
+    # Alle Datenbankzugriffe einer Anfrage teilen sich eine Sitzung
+    db_manager.init_app(app)
+
+    # LAZY_BLOCKS=1: nur Block-Header im Speicher, Blöcke werden bei Bedarf aus der Datenbank geladen
+    # BLOCK_LOG=1: Blöcke im Block-Log statt in der Tabelle blocks, BLOCK_LOG_SYNC=always|batch|never
+    blockchain = MarketplaceBlockchain(db_manager, snapshot_path=SNAPSHOT_FILE,
+                                       lazy_blocks=os.environ.get('LAZY_BLOCKS') == '1',
+                                       consensus=create_consensus(),
+                                       block_log_dir=BLOCK_LOG_DIR if os.environ.get('BLOCK_LOG') == '1' else None,
+                                       block_log_sync=os.environ.get('BLOCK_LOG_SYNC', SYNC_BATCH))
+    if blockchain.block_log is not None:
+        # Noch nicht synchronisierte Blöcke beim Beenden auf die Platte schreiben
+        atexit.register(blockchain.block_log.close)
+
+    # Mining-Jobs laufen im Hintergrund, nicht im Request-Thread
+    mining_service = MiningService(blockchain)
+
+    # Synchronisation mit anderen Knoten (/sync/..., /nodes/...), Knoten z.B. BLOCKCHAIN_NODES=127.0.0.1:5001,127.0.0.1:5002
+    app.register_blueprint(create_sync_blueprint(blockchain))
+    for node in filter(None, os.environ.get('BLOCKCHAIN_NODES', '').split(',')):
+        blockchain.register_node(node.strip())
+
+    initialize()
 
 
 # Login-Check Decorator
@@ -152,7 +225,7 @@ def login():
                     if not user:
                         # User existiert nicht in DB → registriere ihn
                         print(f"Registriere User {username} in Datenbank...")
-                        user = blockchain.register_user(blockchain_address)
+                        user = blockchain.register_user(blockchain_address, signing_public_key(username))
                         print(f"User registriert: {blockchain_address}")
 
                     # Session setzen
@@ -200,20 +273,14 @@ def register():
             return render_template('register.html')
 
         try:
-            # Generiere neue Blockchain-Adresse
-            blockchain_address = str(uuid.uuid4()).replace('-', '')
-            password_hash = hash_password(password)
-
-            # Speichere in users.json
-            users[username] = {
-                "username": username,
-                "password_hash": password_hash,
-                "blockchain_address": blockchain_address
-            }
+            # Generiere neue Blockchain-Adresse und Signaturschlüssel, speichere in users.json
+            users[username] = new_user_entry(username, hash_password(password))
+            blockchain_address = users[username]['blockchain_address']
             save_users(users)
 
-            # Registriere User in der Datenbank
-            user = blockchain.register_user(blockchain_address)
+            # Registriere User mit öffentlichem Schlüssel in der Datenbank, seine Transaktionen
+            # müssen ab jetzt signiert sein
+            user = blockchain.register_user(blockchain_address, signing_public_key(username))
 
             # Automatisch einloggen
             session['username'] = username
@@ -264,6 +331,26 @@ def internal_server_error(e):
     return render_template('500.html'), 500
 
 
+def confirmed_transaction_count():
+    """Anzahl bestätigter Transaktionen, über die Tabelle transactions statt durch alle Blöcke"""
+    if blockchain.transaction_table_ready:
+        return blockchain.count_transactions()
+    return sum(len(block.transactions) for block in blockchain.chain)
+
+
+def latest_transactions(limit):
+    """Neueste bestätigte Transaktionen als (Blockindex, Blockzeit, Transaktion)
+
+    Über die Indizes der Tabelle transactions, ohne vollständige Tabelle rückwärts durch die Blöcke.
+    """
+    if blockchain.transaction_table_ready:
+        return [(tx['block_index'], blockchain.block_header(tx['block_index']).timestamp, tx)
+                for tx in blockchain.query_transactions(limit=limit)]
+    return list(islice(((block.index, block.timestamp, transaction)
+                        for block in reversed(blockchain.chain)
+                        for transaction in reversed(block.transactions)), limit))
+
+
 # Blockchain Explorer Route
 @app.route('/blockchain')
 def blockchain_explorer():
@@ -275,9 +362,9 @@ def blockchain_explorer():
             'total_blocks': len(blockchain.chain),
             'latest_block_index': blockchain.last_block.index,
             'latest_block_hash': blockchain.last_block.hash,
-            'pending_transactions': len(blockchain.current_transactions),
-            'total_transactions': sum(len(block.transactions) for block in blockchain.chain),
-            'network_difficulty': 4,  # Standard-Schwierigkeit
+            'pending_transactions': len(blockchain.mempool),
+            'total_transactions': confirmed_transaction_count(),
+            'network_difficulty': blockchain.next_difficulty(),  # Retargeting aus den letzten Blockzeiten
             'average_block_time': '~30 seconds',  # Simuliert
             'last_mined': blockchain.last_block.timestamp if blockchain.chain else time.time()
         }
@@ -292,82 +379,72 @@ def blockchain_explorer():
                 'timestamp': block.timestamp,
                 'transaction_count': len(block.transactions),
                 'proof': block.proof,
-                'size_kb': len(str(block.transactions)) / 1024  # Approximierte Größe
+                'size_kb': block.size / 1024  # Gecachte serialisierte Größe
             }
             recent_blocks.append(block_info)
 
         # Letzte 10 Transaktionen aus allen Blöcken
         recent_transactions = []
-        transaction_count = 0
-
-        # Durchsuche Blöcke rückwärts für die neuesten Transaktionen
-        for block in reversed(blockchain.chain):
-            for transaction in reversed(block.transactions):
-                if transaction_count >= 10:
-                    break
-
-                # Bestimme Transaktions-Typ für bessere Anzeige
-                tx_type = transaction.get('type', 'transfer')
-                if tx_type == 'data_upload':
-                    tx_display = {
-                        'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
-                        'type': 'Data Upload',
-                        'from_to': f"Upload by {transaction.get('owner', 'Unknown')[:20]}...",
-                        'amount': f"${transaction.get('price', 0)}",
-                        'timestamp': block.timestamp,
-                        'status': 'Confirmed',
-                        'block_index': block.index
-                    }
-                elif tx_type == 'model_upload':
-                    tx_display = {
-                        'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
-                        'type': 'Model Upload',
-                        'from_to': f"Upload by {transaction.get('owner', 'Unknown')[:20]}...",
-                        'amount': f"${transaction.get('price', 0)}",
-                        'timestamp': block.timestamp,
-                        'status': 'Confirmed',
-                        'block_index': block.index
-                    }
-                elif tx_type == 'data_purchase':
-                    tx_display = {
-                        'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
-                        'type': 'Data Purchase',
-                        'from_to': f"{transaction.get('buyer', 'Unknown')[:15]}... → {transaction.get('seller', 'Unknown')[:15]}...",
-                        'amount': f"${transaction.get('amount', 0)}",
-                        'timestamp': block.timestamp,
-                        'status': 'Confirmed',
-                        'block_index': block.index
-                    }
-                elif tx_type == 'model_purchase':
-                    tx_display = {
-                        'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
-                        'type': 'Model Purchase',
-                        'from_to': f"{transaction.get('buyer', 'Unknown')[:15]}... → {transaction.get('seller', 'Unknown')[:15]}...",
-                        'amount': f"${transaction.get('amount', 0)}",
-                        'timestamp': block.timestamp,
-                        'status': 'Confirmed',
-                        'block_index': block.index
-                    }
-                else:
-                    # Standard Transfer
-                    tx_display = {
-                        'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
-                        'type': 'Transfer',
-                        'from_to': f"{transaction.get('sender', 'Unknown')[:15]}... → {transaction.get('recipient', 'Unknown')[:15]}...",
-                        'amount': f"${transaction.get('amount', 0)}",
-                        'timestamp': block.timestamp,
-                        'status': 'Confirmed',
-                        'block_index': block.index
-                    }
 
-                recent_transactions.append(tx_display)
-                transaction_count += 1
+        for block_index, block_timestamp, transaction in latest_transactions(10):
+            # Bestimme Transaktions-Typ für bessere Anzeige
+            tx_type = transaction.get('type', 'transfer')
+            if tx_type == 'data_upload':
+                tx_display = {
+                    'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
+                    'type': 'Data Upload',
+                    'from_to': f"Upload by {transaction.get('owner', 'Unknown')[:20]}...",
+                    'amount': f"${transaction.get('price', 0)}",
+                    'timestamp': block_timestamp,
+                    'status': 'Confirmed',
+                    'block_index': block_index
+                }
+            elif tx_type == 'model_upload':
+                tx_display = {
+                    'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
+                    'type': 'Model Upload',
+                    'from_to': f"Upload by {transaction.get('owner', 'Unknown')[:20]}...",
+                    'amount': f"${transaction.get('price', 0)}",
+                    'timestamp': block_timestamp,
+                    'status': 'Confirmed',
+                    'block_index': block_index
+                }
+            elif tx_type == 'data_purchase':
+                tx_display = {
+                    'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
+                    'type': 'Data Purchase',
+                    'from_to': f"{transaction.get('buyer', 'Unknown')[:15]}... → {transaction.get('seller', 'Unknown')[:15]}...",
+                    'amount': f"${transaction.get('amount', 0)}",
+                    'timestamp': block_timestamp,
+                    'status': 'Confirmed',
+                    'block_index': block_index
+                }
+            elif tx_type == 'model_purchase':
+                tx_display = {
+                    'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
+                    'type': 'Model Purchase',
+                    'from_to': f"{transaction.get('buyer', 'Unknown')[:15]}... → {transaction.get('seller', 'Unknown')[:15]}...",
+                    'amount': f"${transaction.get('amount', 0)}",
+                    'timestamp': block_timestamp,
+                    'status': 'Confirmed',
+                    'block_index': block_index
+                }
+            else:
+                # Standard Transfer
+                tx_display = {
+                    'id': transaction.get('transaction_id', 'N/A')[:16] + '...',
+                    'type': 'Transfer',
+                    'from_to': f"{transaction.get('sender', 'Unknown')[:15]}... → {transaction.get('recipient', 'Unknown')[:15]}...",
+                    'amount': f"${transaction.get('amount', 0)}",
+                    'timestamp': block_timestamp,
+                    'status': 'Confirmed',
+                    'block_index': block_index
+                }
 
-            if transaction_count >= 10:
-                break
+            recent_transactions.append(tx_display)
 
         # Ausstehende Transaktionen hinzufügen
-        for transaction in blockchain.current_transactions[:5]:  # Max 5 pending
+        for transaction in blockchain.mempool.ordered(5):  # Max 5 pending
             tx_type = transaction.get('type', 'transfer')
 
             if tx_type == 'data_upload':
@@ -424,7 +501,7 @@ def block_details(block_index):
             'timestamp': block.timestamp,
             'proof': block.proof,
             'transaction_count': len(block.transactions),
-            'block_size': len(str(block.transactions)),  # Größe in Bytes
+            'block_size': block.size,  # Größe in Bytes (gecacht)
             'formatted_timestamp': datetime.fromtimestamp(block.timestamp).strftime("%d.%m.%Y, %H:%M:%S"),
         }
 
@@ -441,11 +518,20 @@ def block_details(block_index):
         else:
             block_details['mining_time'] = "Genesis Block"
 
+        # Proof-of-Authority-Blöcke sind signiert statt gemined
+        block_details['seal_verification'] = None
+        if block_index > 0 and block.seal:
+            block_details['seal_verification'] = {
+                'signer': seal_signer(block),
+                'is_valid': blockchain.consensus.verify_header(block, blockchain.chain[block_index - 1])
+            }
+            block_details['pow_verification'] = None
+
         # Proof-of-Work Verification - USE STORED DIFFICULTY
-        if block_index > 0:
+        elif block_index > 0:
             last_proof = blockchain.chain[block_index - 1].proof
             current_proof = block.proof
-            stored_difficulty = getattr(block, 'difficulty', 4)  # Use stored difficulty or default to 4
+            stored_difficulty = getattr(block, 'difficulty', 4)  # Use stored difficulty or default to 4 (may be fractional)
 
             guess = f"{last_proof}{current_proof}".encode()
             guess_hash = hashlib.sha256(guess).hexdigest()
@@ -456,8 +542,8 @@ def block_details(block_index):
                 'combined_hash': guess_hash,
                 'leading_zeros': len(guess_hash) - len(guess_hash.lstrip('0')),
                 'difficulty_used': stored_difficulty,  # Show the actual difficulty used
-                'target_zeros': '0' * stored_difficulty,  # Show the target pattern
-                'is_valid': guess_hash.startswith('0' * stored_difficulty)  # Validate with correct difficulty
+                'target_zeros': '0' * int(stored_difficulty),  # Show the target pattern (whole hex zeros)
+                'is_valid': blockchain.valid_proof(last_proof, current_proof, stored_difficulty)  # Validate with correct difficulty
             }
         else:
             block_details['pow_verification'] = None
@@ -471,7 +557,7 @@ def block_details(block_index):
                 'type': transaction.get('type', 'transfer'),
                 'timestamp': transaction.get('timestamp', block.timestamp),
                 'signature': transaction.get('signature', 'N/A'),
-                'raw_data': transaction  # Vollständige Transaktion für Details
+                'raw_data': dict(transaction)  # Vollständige Transaktion für Details
             }
 
             # Typ-spezifische Details
@@ -532,8 +618,8 @@ def blockchain_stats_api():
             'total_blocks': len(blockchain.chain),
             'latest_block_index': blockchain.last_block.index,
             'latest_block_hash': blockchain.last_block.hash[:16] + '...',
-            'pending_transactions': len(blockchain.current_transactions),
-            'total_transactions': sum(len(block.transactions) for block in blockchain.chain),
+            'pending_transactions': len(blockchain.mempool),
+            'total_transactions': confirmed_transaction_count(),
             'last_update': time.time()
         }
 
@@ -543,6 +629,22 @@ def blockchain_stats_api():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/transactions/<transaction_id>/proof')
+def transaction_proof_api(transaction_id):
+    """Merkle-Inclusion-Proof für eine bestätigte Transaktion (z.B. einen Kauf)"""
+
+    try:
+        proof = blockchain.get_transaction_proof(transaction_id)
+        if proof is None:
+            return jsonify({'error': 'Transaktion nicht gefunden oder noch nicht gemined'}), 404
+
+        proof['verified'] = blockchain.verify_transaction_proof(proof)
+        return jsonify(proof)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # MARKETPLACE
 def initialize_demo_marketplace_data():
     """Prüft ob die Blockchain bereit ist"""
@@ -710,17 +812,10 @@ def marketplace_item_details(item_id):
 
     try:
         # Suche das Item in der Blockchain
-        found_item = None
+        found_item = blockchain.find_item(item_id, confirmed_only=True)
         found_block = None
-
-        for block in blockchain.chain:
-            for tx in block.transactions:
-                if tx.get('transaction_id') == item_id and tx.get('type') in ['data_upload', 'model_upload']:
-                    found_item = tx
-                    found_block = block
-                    break
-            if found_item:
-                break
+        if found_item:
+            found_block = blockchain.chain[blockchain.find_transaction(item_id)[0]]
 
         if not found_item:
             flash(f'Item mit ID {item_id} wurde nicht gefunden.', 'warning')
@@ -774,7 +869,7 @@ def marketplace_item_details(item_id):
         # Prüfe ob aktueller Benutzer bereits Besitzer ist
         current_user_address = session.get('blockchain_address', '')
         is_owner = current_user_address == item_details['owner']
-        has_purchased = False  # TODO: Implementiere Purchase-Check
+        has_purchased = blockchain.has_purchased(current_user_address, item_id)
 
         # Ähnliche Items finden
         similar_items = []
@@ -826,15 +921,11 @@ def marketplace_purchase():
 
         print(f"DEBUG Purchase: Käufer {buyer_address} kauft Item {item_id}")
 
-        # Suche das Item
+        # Suche das Item (nur bestätigte Transaktionen)
         found_item = None
-        for block in blockchain.chain:
-            for tx in block.transactions:
-                if tx.get('transaction_id') == item_id:
-                    found_item = tx
-                    break
-            if found_item:
-                break
+        indexed = blockchain.find_transaction(item_id)
+        if indexed is not None and indexed[0] is not None:
+            found_item = indexed[2]
 
         if not found_item:
             flash('Item nicht gefunden.', 'danger')
@@ -868,11 +959,11 @@ def marketplace_purchase():
         # Erstelle Purchase-Transaktion
         if item_type == 'data_upload':
             transaction_id = blockchain.data_purchase_transaction(
-                buyer_address, item_id, item_price
+                buyer_address, item_id, item_price, signing_key(session.get('username'))
             )
         elif item_type == 'model_upload':
             transaction_id = blockchain.model_purchase_transaction(
-                buyer_address, item_id, item_price
+                buyer_address, item_id, item_price, signing_key(session.get('username'))
             )
         else:
             flash('Ungültiger Item-Typ.', 'danger')
@@ -967,47 +1058,45 @@ def marketplace_dashboard():
         owned_items = []
         purchased_items = []
 
-        for block in blockchain.chain:
-            for tx in block.transactions:
-                # Eigene Uploads
-                if (tx.get('type') in ['data_upload', 'model_upload']
-                        and tx.get('owner') == user_address):
-
-                    item = {
-                        'id': tx.get('transaction_id'),
-                        'name': tx.get('metadata', {}).get('name', 'Unnamed'),
-                        'type': 'dataset' if tx.get('type') == 'data_upload' else 'model',
-                        'price': tx.get('price', 0),
-                        'upload_date': datetime.fromtimestamp(tx.get('timestamp', block.timestamp)).strftime(
-                            "%d.%m.%Y"),
-                        'block_index': block.index
-                    }
-                    owned_items.append(item)
-
-                # Gekaufte Items
-                elif (tx.get('type') in ['data_purchase', 'model_purchase']
-                      and tx.get('buyer') == user_address):
-
-                    item_id = tx.get('data_id') or tx.get('model_id')
-                    purchase_item = {
-                        'id': item_id,
-                        'transaction_id': tx.get('transaction_id'),
-                        'type': 'dataset' if tx.get('type') == 'data_purchase' else 'model',
-                        'amount': tx.get('amount', 0),
-                        'purchase_date': datetime.fromtimestamp(tx.get('timestamp', block.timestamp)).strftime(
-                            "%d.%m.%Y"),
-                        'seller': tx.get('seller', 'Unknown'),
-                        'block_index': block.index
-                    }
+        # Nur Blöcke, deren Bloom-Filter die Adresse enthalten kann
+        for block, tx in blockchain.transactions_matching(user_address):
+            # Eigene Uploads
+            if (tx.get('type') in ['data_upload', 'model_upload']
+                    and tx.get('owner') == user_address):
+
+                item = {
+                    'id': tx.get('transaction_id'),
+                    'name': tx.get('metadata', {}).get('name', 'Unnamed'),
+                    'type': 'dataset' if tx.get('type') == 'data_upload' else 'model',
+                    'price': tx.get('price', 0),
+                    'upload_date': datetime.fromtimestamp(tx.get('timestamp', block.timestamp)).strftime(
+                        "%d.%m.%Y"),
+                    'block_index': block.index
+                }
+                owned_items.append(item)
+
+            # Gekaufte Items
+            elif (tx.get('type') in ['data_purchase', 'model_purchase']
+                  and tx.get('buyer') == user_address):
+
+                item_id = tx.get('data_id') or tx.get('model_id')
+                purchase_item = {
+                    'id': item_id,
+                    'transaction_id': tx.get('transaction_id'),
+                    'type': 'dataset' if tx.get('type') == 'data_purchase' else 'model',
+                    'amount': tx.get('amount', 0),
+                    'purchase_date': datetime.fromtimestamp(tx.get('timestamp', block.timestamp)).strftime(
+                        "%d.%m.%Y"),
+                    'seller': tx.get('seller', 'Unknown'),
+                    'block_index': block.index
+                }
 
-                    # Finde Original-Item für Namen
-                    for search_block in blockchain.chain:
-                        for search_tx in search_block.transactions:
-                            if search_tx.get('transaction_id') == item_id:
-                                purchase_item['name'] = search_tx.get('metadata', {}).get('name', 'Unnamed')
-                                break
+                # Finde Original-Item für Namen
+                original_tx = blockchain.find_item(item_id, confirmed_only=True)
+                if original_tx is not None:
+                    purchase_item['name'] = original_tx.get('metadata', {}).get('name', 'Unnamed')
 
-                    purchased_items.append(purchase_item)
+                purchased_items.append(purchase_item)
 
         # Statistiken
         dashboard_stats = {
@@ -1218,7 +1307,7 @@ def upload_dataset():
                 # Verwende upload_data_with_file für automatische Verschlüsselung
                 print(f"DEBUG Upload: Verwende upload_data_with_file für Dataset...")
                 data_id, encryption_key = blockchain.upload_data_with_file(
-                    owner_address, file_content, metadata, price
+                    owner_address, file_content, metadata, price, signing_key(session.get('username'))
                 )
                 upload_id = data_id
                 print(f"DEBUG Upload: Dataset hochgeladen - ID: {data_id}, Key: {encryption_key[:20]}...")
@@ -1227,7 +1316,7 @@ def upload_dataset():
                 # upload_model_with_file für automatische Verschlüsselung
                 print(f"DEBUG Upload: Verwende upload_model_with_file für Model...")
                 model_id, encryption_key = blockchain.upload_model_with_file(
-                    owner_address, file_content, metadata, price
+                    owner_address, file_content, metadata, price, signing_key(session.get('username'))
                 )
                 upload_id = model_id
                 print(f"DEBUG Upload: Model hochgeladen - ID: {model_id}, Key: {encryption_key[:20]}...")
@@ -1238,7 +1327,7 @@ def upload_dataset():
 
             # Erfolgsmeldung mit Hinweis auf Mining
             item_type = "Dataset" if upload_type == 'dataset' else "Modell"
-            pending_count = len(blockchain.current_transactions)
+            pending_count = len(blockchain.mempool)
 
             flash(f'Die Transaktion wartet jetzt auf Mining. Es sind {pending_count} Transaktionen ausstehend.', 'info')
             flash(f'Verschlüsselungsschlüssel wurde sicher gespeichert.', 'info')
@@ -1297,20 +1386,13 @@ def upload_status(upload_id):
 @app.route('/api/mine-block', methods=['POST'])
 @login_required
 def mine_block_api():
-    """Mined einen neuen Block mit ausstehenden Transaktionen"""
+    """Legt einen Mining-Job für einen Block mit ausstehenden Transaktionen an (202 mit Job-ID)"""
     try:
-        if len(blockchain.current_transactions) == 0:
+        if len(blockchain.mempool) == 0:
             return jsonify({'error': 'Keine ausstehenden Transaktionen'}), 400
 
-        # Mine Block mit niedriger Schwierigkeit für Demo
-        new_block, mining_time = blockchain.mine_block(difficulty=2)
-
-        return jsonify({
-            'success': True,
-            'block_index': new_block.index,
-            'mining_time': f"{mining_time:.2f} seconds",
-            'transactions_count': len(new_block.transactions)
-        })
+        # Schwierigkeit per Retargeting aus den letzten Blockzeiten
+        return mining_job_response(mining_service.submit())
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1353,7 +1435,7 @@ def mine_page():
     """Mining-Seite mit Live-Animation"""
 
     # Prüfe ob Transaktionen zum Minen vorhanden sind
-    pending_count = len(blockchain.current_transactions)
+    pending_count = len(blockchain.mempool)
 
     if pending_count == 0:
         flash('Keine ausstehenden Transaktionen zum Minen verfügbar.', 'info')
@@ -1364,14 +1446,14 @@ def mine_page():
         'pending_transactions': pending_count,
         'last_block_hash': blockchain.last_block.hash,
         'last_proof': blockchain.last_block.proof,
-        'difficulty': 4,  # Standard Schwierigkeit
-        'target_zeros': '0000',  # Für Difficulty 4
+        'difficulty': blockchain.next_difficulty(),  # Vorschlag des Retargetings
+        'target_zeros': '0' * int(blockchain.next_difficulty()),
         'next_block_index': len(blockchain.chain)
     }
 
     # Beispiel der aktuellen Transaktionen für Anzeige
     pending_transactions = []
-    for i, tx in enumerate(blockchain.current_transactions[:5]):  # Zeige max 5
+    for i, tx in enumerate(blockchain.mempool.ordered(5)):  # Zeige max 5
         tx_display = {
             'index': i + 1,
             'type': tx.get('type', 'transfer'),
@@ -1415,7 +1497,9 @@ def simulate_mining():
             'leading_zeros': leading_zeros,
             'target_zeros': difficulty,
             'difficulty': difficulty,
-            'attempts_per_second': 1000  # Simulierte Geschwindigkeit
+            # Echte Hashrate des letzten Minings, sonst simulierte Geschwindigkeit
+            'attempts_per_second': (blockchain.last_mining_result.hash_rate
+                                    if blockchain.last_mining_result else 1000)
         })
 
     except Exception as e:
@@ -1425,38 +1509,86 @@ def simulate_mining():
 @app.route('/api/mine/start', methods=['POST'])
 @login_required
 def start_mining():
-    """API-Endpunkt um echtes Mining zu starten"""
+    """API-Endpunkt um echtes Mining zu starten, läuft als Mining-Job im Hintergrund (202 mit Job-ID)"""
 
     try:
-        if len(blockchain.current_transactions) == 0:
+        if len(blockchain.mempool) == 0:
             return jsonify({'error': 'Keine ausstehenden Transaktionen'}), 400
 
-        # Mining-Parameter aus Request
-        difficulty = int(request.json.get('difficulty', 4))
+        # Mining-Parameter aus Request (ohne Angabe: Retargeting)
+        payload = request.get_json(silent=True) or {}
+        difficulty = payload.get('difficulty')
+        difficulty = float(difficulty) if difficulty is not None else None
 
-        print(f"\n=== API MINING START DEBUG ===")
-        print(f"Difficulty: {difficulty}")
+        return mining_job_response(mining_service.submit(difficulty))
 
-        # Verwende die echte mine_block Methode
-        new_block, mining_time = blockchain.mine_block(difficulty)
+    except Exception as e:
+        print(f"ERROR in start_mining API: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
-        print(f"API: Zurückgegebene Mining-Zeit: {mining_time:.6f}")
-        print(f"API: Block Mining-Zeit Attribut: {new_block.mining_time:.6f}")
-        print(f"=== API MINING DEBUG ENDE ===\n")
 
-        return jsonify({
-            'success': True,
-            'block_index': new_block.index,
-            'proof': new_block.proof,
-            'hash': new_block.hash,
-            'mining_time': mining_time,
-            'block_mining_time': new_block.mining_time,  # NEW: Also return block's mining time
-            'transactions_mined': len(new_block.transactions),
-            'difficulty': difficulty
-        })
+def mining_job_response(job):
+    """Antwort auf einen neu angelegten Mining-Job: 202 mit Job-ID und Status-URL"""
+    return jsonify({
+        'success': True,
+        'job_id': job.job_id,
+        'status': job.status,
+        'status_url': url_for('mining_job_status', job_id=job.job_id)
+    }), 202
+
+
+@app.route('/api/mine/jobs', methods=['POST'])
+@login_required
+def create_mining_job():
+    """Legt einen Mining-Job an und antwortet sofort (202) mit der Job-ID"""
+
+    try:
+        if len(blockchain.mempool) == 0:
+            return jsonify({'error': 'Keine ausstehenden Transaktionen'}), 400
+
+        payload = request.get_json(silent=True) or {}
+        difficulty = payload.get('difficulty')  # ohne Angabe: Retargeting pro Block
+        difficulty = float(difficulty) if difficulty is not None else None
+        drain = bool(payload.get('drain', False))
+
+        return mining_job_response(mining_service.submit(difficulty, drain))
 
     except Exception as e:
-        print(f"ERROR in start_mining API: {str(e)}")
+        print(f"ERROR in create_mining_job API: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/mine/jobs/<job_id>')
+@login_required
+def mining_job_status(job_id):
+    """Status eines Mining-Jobs: Fortschritt, Versuche, Hashrate und gefundener Block"""
+
+    job = mining_service.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Mining-Job nicht gefunden'}), 404
+    return jsonify(job)
+
+
+@app.route('/api/mine/pending', methods=['POST'])
+@login_required
+def mine_pending_api():
+    """Mined alle ausstehenden Transaktionen in so viele Blöcke wie nötig (Blockgrenzen beachten)
+    Läuft als Mining-Job im Hintergrund, die Blöcke stehen im Status des Jobs (202 mit Job-ID)"""
+
+    try:
+        if len(blockchain.mempool) == 0:
+            return jsonify({'error': 'Keine ausstehenden Transaktionen'}), 400
+
+        payload = request.get_json(silent=True) or {}
+        difficulty = payload.get('difficulty')  # ohne Angabe: Retargeting pro Block
+        difficulty = float(difficulty) if difficulty is not None else None
+        max_blocks = payload.get('max_blocks')
+
+        return mining_job_response(mining_service.submit(difficulty, drain=True,
+                                                         max_blocks=int(max_blocks) if max_blocks else None))
+
+    except Exception as e:
+        print(f"ERROR in mine_pending API: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 
@@ -1474,39 +1606,35 @@ def my_purchases():
         purchased_items = []
         pending_purchases = []
 
-        # 1. Suche in der Blockchain nach bestätigten Käufen
-        for block in blockchain.chain:
-            for tx in block.transactions:
-                if (tx.get('type') in ['data_purchase', 'model_purchase']
-                        and tx.get('buyer') == user_address):
-                    # WICHTIG: item_id ist die ORIGINAL Upload-Transaction-ID
-                    original_item_id = tx.get('data_id') or tx.get('model_id')
-
-                    print(f"DEBUG: Gefundener Kauf - Original Item ID: {original_item_id}")
-
-                    # Suche Original-Upload für Details
-                    original_item = find_original_item(original_item_id)
-
-                    purchased_item = {
-                        'purchase_tx_id': tx.get('transaction_id'),  # Purchase-Transaction-ID
-                        'item_id': original_item_id,  # ORIGINAL Upload-Transaction-ID für Download
-                        'item_name': original_item.get('name', 'Unknown') if original_item else 'Unknown',
-                        'item_type': 'Dataset' if tx.get('type') == 'data_purchase' else 'Model',
-                        'purchase_amount': tx.get('amount', 0),
-                        'purchase_date': datetime.fromtimestamp(tx.get('timestamp', block.timestamp)).strftime(
-                            "%d.%m.%Y %H:%M"),
-                        'block_index': block.index,
-                        'seller': tx.get('seller', 'Unknown'),
-                        'status': 'confirmed',
-                        'can_download': True,
-                        'original_metadata': original_item.get('metadata', {}) if original_item else {}
-                    }
-                    purchased_items.append(purchased_item)
+        # 1. Bestätigte Käufe aus dem Purchase-Ledger (ohne die ganze Blockchain zu durchsuchen)
+        for block_index, tx in blockchain.purchase_ledger.purchases(user_address):
+            # WICHTIG: item_id ist die ORIGINAL Upload-Transaction-ID
+            original_item_id = tx.get('data_id') or tx.get('model_id')
+
+            print(f"DEBUG: Gefundener Kauf - Original Item ID: {original_item_id}")
+
+            # Suche Original-Upload für Details
+            original_item = find_original_item(original_item_id)
+
+            purchased_item = {
+                'purchase_tx_id': tx.get('transaction_id'),  # Purchase-Transaction-ID
+                'item_id': original_item_id,  # ORIGINAL Upload-Transaction-ID für Download
+                'item_name': original_item.get('name', 'Unknown') if original_item else 'Unknown',
+                'item_type': 'Dataset' if tx.get('type') == 'data_purchase' else 'Model',
+                'purchase_amount': tx.get('amount', 0),
+                'purchase_date': datetime.fromtimestamp(tx.get('timestamp', 0)).strftime(
+                    "%d.%m.%Y %H:%M"),
+                'block_index': block_index,
+                'seller': tx.get('seller', 'Unknown'),
+                'status': 'confirmed',
+                'can_download': True,
+                'original_metadata': original_item.get('metadata', {}) if original_item else {}
+            }
+            purchased_items.append(purchased_item)
 
         # 2. Suche in Pending Transactions nach wartenden Käufen
-        for tx in blockchain.current_transactions:
-            if (tx.get('type') in ['data_purchase', 'model_purchase']
-                    and tx.get('buyer') == user_address):
+        for tx in blockchain.mempool.by_address(user_address, ('data_purchase', 'model_purchase')):
+            if tx.get('buyer') == user_address:
                 original_item_id = tx.get('data_id') or tx.get('model_id')
                 original_item = find_original_item(original_item_id)
 
@@ -1555,20 +1683,20 @@ def find_original_item(item_id):
 
     print(f"DEBUG Original: Suche Original-Item für ID {item_id}")
 
-    for block_idx, block in enumerate(blockchain.chain):
-        for tx_idx, tx in enumerate(block.transactions):
-            if (tx.get('type') in ['data_upload', 'model_upload']
-                    and tx.get('transaction_id') == item_id):
-                print(f"DEBUG Original: GEFUNDEN in Block {block_idx}, TX {tx_idx}")
+    # O(1) über den Transaktions-Index, nur bestätigte Uploads
+    tx = blockchain.find_item(item_id, confirmed_only=True)
+    if tx is not None:
+        block_idx, tx_idx, _ = blockchain.find_transaction(item_id)
+        print(f"DEBUG Original: GEFUNDEN in Block {block_idx}, TX {tx_idx}")
 
-                metadata = tx.get('metadata', {})
-                return {
-                    'name': metadata.get('name', 'Unknown'),
-                    'description': metadata.get('description', ''),
-                    'metadata': metadata,
-                    'owner': tx.get('owner', 'Unknown'),
-                    'price': tx.get('price', 0)
-                }
+        metadata = tx.get('metadata', {})
+        return {
+            'name': metadata.get('name', 'Unknown'),
+            'description': metadata.get('description', ''),
+            'metadata': metadata,
+            'owner': tx.get('owner', 'Unknown'),
+            'price': tx.get('price', 0)
+        }
 
     print(f"DEBUG Original: NICHT GEFUNDEN für ID {item_id}")
     return None
@@ -1577,22 +1705,10 @@ def find_original_item(item_id):
 def determine_item_type(item_id):
     """Bestimmt ob es sich um ein Model oder Dataset handelt"""
 
-    # Suche in der Blockchain nach der Upload-Transaktion
-    for block in blockchain.chain:
-        for tx in block.transactions:
-            if tx.get('transaction_id') == item_id:
-                if tx.get('type') == 'model_upload':
-                    return 'model'
-                elif tx.get('type') == 'data_upload':
-                    return 'dataset'
-
-    # Fallback: auch in ausstehenden Transaktionen suchen
-    for tx in blockchain.current_transactions:
-        if tx.get('transaction_id') == item_id:
-            if tx.get('type') == 'model_upload':
-                return 'model'
-            elif tx.get('type') == 'data_upload':
-                return 'dataset'
+    # Upload-Transaktion über den Index (Blockchain und ausstehende Transaktionen)
+    tx = blockchain.find_item(item_id)
+    if tx is not None and tx.get('type') == 'model_upload':
+        return 'model'
 
     # Standard-Fallback
     return 'dataset'
@@ -1748,29 +1864,13 @@ def check_download_permission(user_address, item_id):
 
     print(f"✗ User ist NICHT Owner")
 
-    # 2. Prüfe ob User das Item gekauft hat
-    print(f"Prüfe Käufe in der Blockchain...")
-
-    purchase_found = False
-    for block_idx, block in enumerate(blockchain.chain):
-        for tx_idx, tx in enumerate(block.transactions):
-            if (tx.get('type') in ['data_purchase', 'model_purchase']
-                    and tx.get('buyer') == user_address):
+    # 2. Prüfe ob User das Item gekauft hat (Purchase-Ledger, O(1))
+    print(f"Prüfe Käufe im Purchase-Ledger...")
 
-                purchased_item_id = tx.get('data_id') or tx.get('model_id')
-
-                print(
-                    f"  Block {block_idx}, TX {tx_idx}: {tx.get('type')} von {tx.get('buyer')} -> Item {purchased_item_id}")
-
-                if purchased_item_id == item_id:
-                    print(f"✓ PURCHASE MATCH gefunden!")
-                    purchase_found = True
-                    break
-
-        if purchase_found:
-            break
-
-    if not purchase_found:
+    purchase_found = blockchain.has_purchased(user_address, item_id)
+    if purchase_found:
+        print(f"✓ PURCHASE MATCH gefunden!")
+    else:
         print(f"✗ KEIN Kauf von {item_id} durch {user_address} gefunden")
 
     print(f"=== BERECHTIGUNG: {'JA' if purchase_found else 'NEIN'} ===\n")
@@ -1914,20 +2014,14 @@ def purchase_status_api():
 
         # Zähle pending vs confirmed purchases
         pending_count = 0
-        confirmed_count = 0
 
         # Pending transactions
-        for tx in blockchain.current_transactions:
-            if (tx.get('type') in ['data_purchase', 'model_purchase']
-                    and tx.get('buyer') == user_address):
+        for tx in blockchain.mempool.by_address(user_address, ('data_purchase', 'model_purchase')):
+            if tx.get('buyer') == user_address:
                 pending_count += 1
 
         # Confirmed transactions
-        for block in blockchain.chain:
-            for tx in block.transactions:
-                if (tx.get('type') in ['data_purchase', 'model_purchase']
-                        and tx.get('buyer') == user_address):
-                    confirmed_count += 1
+        confirmed_count = blockchain.purchase_ledger.purchase_count(user_address)
 
         return jsonify({
             'pending_purchases': pending_count,
@@ -1945,7 +2039,7 @@ if __name__ == '__main__':
     print("=== APP START ===")
     print("Führe Database Reset durch...")
 
-    result = reset_database()
+    result = reset_database(blockchain)
     if result:
         print("✅ Reset erfolgreich")
     else:
@@ -1,15 +1,34 @@
 import os
 import json
-from Blockchain.blockchain import Block
+import multiprocessing
 import time
-from marketplace import MarketplaceBlockchain
-from database import User, DataEntry, ModelEntry, EncryptedFile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from marketplace import MarketplaceBlockchain, BLOCK_ROW_COLUMNS, decode_block_rows, transaction_entries, record_purchases
+from database import DatabaseManager, User, DataEntry, ModelEntry, EncryptedFile, BlockEntry, TransactionEntry
 
+# Snapshot des abgeleiteten Zustands (Listings, Käufe, Transaktions-Index)
+SNAPSHOT_FILE = 'chain_snapshot.json'
 
-def reset_database():
+# Segment-Dateien des Block-Logs (Blockchain/block_log.py), wenn es aktiviert ist
+BLOCK_LOG_DIR = 'block_log'
+
+# Blöcke pro Datenbankabfrage beim Wiederherstellen der Chain
+RESTORE_BATCH_SIZE = 500
+# Ab dieser Chain-Länge dekodieren mehrere Prozesse, darunter lohnt der Start der Prozesse nicht
+PARALLEL_RESTORE_MIN_BLOCKS = 20_000
+# Fortschrittsmeldung alle ... Blöcke
+RESTORE_PROGRESS_INTERVAL = 10_000
+
+
+def reset_database(blockchain=None):
     """
     Setzt die Datenbank zurück, um mit einer frischen Blockchain zu starten.
     Löscht die SQLite-Datenbankdatei, die data_keys.json und den IPFS Storage.
+
+    Args:
+        blockchain: laufende MarketplaceBlockchain, ihr geöffnetes Block-Log wird geleert
+                    statt gelöscht und beginnt wieder mit ihrem Genesis-Block (optional)
     """
     import time
     try:
@@ -28,6 +47,28 @@ def reset_database():
                         print("⚠️ Datenbank konnte nicht gelöscht werden (wird von anderem Prozess verwendet)")
                         print("→ Wird beim nächsten Start überschrieben")
 
+        # WAL-Dateien des Profils production gehören zur gelöschten Datenbank
+        for suffix in ('-wal', '-shm'):
+            if not os.path.exists('marketplace.db') and os.path.exists('marketplace.db' + suffix):
+                os.remove('marketplace.db' + suffix)
+
+        # Snapshot gehört zur gelöschten Chain
+        if os.path.exists(SNAPSHOT_FILE):
+            os.remove(SNAPSHOT_FILE)
+            print("Chain-Snapshot gelöscht.")
+
+        # Block-Log ebenso
+        block_log = getattr(blockchain, 'block_log', None)
+        if block_log is not None:
+            block_log.truncate(0)
+            block_log.append(blockchain.chain[0])
+            block_log.sync()
+            print("Block-Log geleert.")
+        elif os.path.exists(BLOCK_LOG_DIR):
+            import shutil
+            shutil.rmtree(BLOCK_LOG_DIR)
+            print("Block-Log gelöscht.")
+
         # data_keys.json löschen
         if os.path.exists('data_keys.json'):
             os.remove('data_keys.json')
@@ -64,78 +105,206 @@ def reset_database():
         return False
 
 
-def initialize_blockchain_from_database(blockchain):
+def _iter_block_rows(db_manager, batch_size):
+    """
+    Liest die Tabelle blocks stapelweise nach Index, ohne alle Zeilen auf einmal zu laden
+
+    Args:
+        db_manager: DatabaseManager
+        batch_size: Zeilen pro Abfrage
+
+    Yields:
+        Listen von Zeilen mit den Werten von BLOCK_ROW_COLUMNS
+    """
+    last_index = -1
+    while True:
+        session = db_manager.get_session()
+        try:
+            # Keyset-Paginierung: jede Abfrage setzt hinter dem letzten Index an (kein OFFSET)
+            rows = session.query(*BLOCK_ROW_COLUMNS).filter(BlockEntry.index > last_index).order_by(
+                BlockEntry.index).limit(batch_size).all()
+        finally:
+            session.close()
+        if not rows:
+            return
+        yield [tuple(row) for row in rows]
+        last_index = rows[-1][0]
+
+
+def stream_stored_blocks(db_manager, workers=1, batch_size=RESTORE_BATCH_SIZE):
+    """
+    Liefert die Blöcke der Tabelle blocks in Index-Reihenfolge
+    Mit mehreren Workern dekodieren Prozesse die Stapel, während der nächste Stapel gelesen
+    wird. Höchstens zwei Stapel pro Worker sind gleichzeitig unterwegs.
+
+    Args:
+        db_manager: DatabaseManager
+        workers: Anzahl Prozesse zum Dekodieren (1: im aufrufenden Prozess)
+        batch_size: Blöcke pro Stapel
+
+    Yields:
+        Block
+    """
+    batches = _iter_block_rows(db_manager, batch_size)
+    if workers <= 1:
+        for rows in batches:
+            yield from decode_block_rows(rows)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        pending = deque()
+        for rows in batches:
+            pending.append(executor.submit(decode_block_rows, rows))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _report_progress(blocks, total, start_time):
+    """
+    Reicht die Blöcke durch und meldet regelmäßig den Fortschritt
+
+    Args:
+        blocks: Blöcke
+        total: erwartete Anzahl Blöcke
+        start_time: Start der Wiederherstellung (time.perf_counter)
+
+    Yields:
+        Block
+    """
+    for count, block in enumerate(blocks, 1):
+        if count % RESTORE_PROGRESS_INTERVAL == 0:
+            elapsed = time.perf_counter() - start_time
+            print(f"  {count}/{total} Blöcke wiederhergestellt ({count / elapsed:.0f} Blöcke/s)")
+        yield block
+
+
+def initialize_blockchain_from_database(blockchain, workers=None, batch_size=RESTORE_BATCH_SIZE):
     """
     Initialisiert die Blockchain basierend auf den Einträgen in der Datenbank.
+    Die Blöcke werden stapelweise gelesen und in einem Durchgang in die Chain übernommen,
+    der abgeleitete Zustand (Listings, Käufe, Index) entsteht dabei gleich mit.
 
     Args:
         blockchain: Eine Instanz von MarketplaceBlockchain
+        workers: Prozesse zum Dekodieren der Blöcke aus der Datenbank (Standard: alle CPU-Kerne
+                 ab PARALLEL_RESTORE_MIN_BLOCKS Blöcken, sonst 1)
+        batch_size: Blöcke pro Datenbankabfrage
 
     Returns:
         bool: True bei Erfolg, False bei Fehler
     """
     try:
-        db_manager = blockchain.db_manager
-        session_db = db_manager.get_session()
-
-        try:
-            # Prüfe, ob Blocks in der Datenbank existieren
-            from database import BlockEntry
-
-            # Blockchain-Instanz zurücksetzen
-            blockchain.chain = []  # Bestehende Chain löschen
-            blockchain.current_transactions = []  # Transaktionen zurücksetzen
+        start_time = time.perf_counter()
+        blockchain.current_transactions = []  # Mempool zurücksetzen
 
-            # Genesis-Block wurde bereits erstellt, entfernen
-            if len(blockchain.chain) > 0:
-                blockchain.chain = []
-
-            # Blöcke aus der Datenbank laden
-            blocks = session_db.query(BlockEntry).order_by(BlockEntry.index).all()
+        # Mit Block-Log kommen die Blöcke aus den Segment-Dateien statt aus der Tabelle blocks
+        block_log = getattr(blockchain, 'block_log', None)
+        if block_log is not None and len(block_log) > 0:
+            if block_log.recovered_bytes:
+                print(f"Block-Log: unvollständiger letzter Eintrag entfernt ({block_log.recovered_bytes} Bytes)")
+            source = "Block-Log"
+            total = len(block_log)
+            blocks = block_log.iter_blocks()
+        else:
+            source = "Datenbank"
+            session_db = blockchain.db_manager.get_session()
+            try:
+                total = session_db.query(BlockEntry).count()
+            finally:
+                session_db.close()
 
-            if not blocks:
+            if not total:
                 print("Keine Blöcke in der Datenbank gefunden. Erstelle Genesis-Block.")
+                blockchain.chain = []
                 blockchain.create_genesis_block()
                 return True
 
-            print(f"Gefundene Blöcke in der Datenbank: {len(blocks)}")
+            if workers is None:
+                workers = (os.cpu_count() or 1) if total >= PARALLEL_RESTORE_MIN_BLOCKS else 1
+            blocks = stream_stored_blocks(blockchain.db_manager, workers, batch_size)
 
-            # Blöcke wiederherstellen
-            for block_entry in blocks:
-                try:
-                    # Transaktionen parsen
-                    transactions = json.loads(block_entry.transactions_json)
-
-                    # Block-Objekt erstellen
-                    block = Block(
-                        index=block_entry.index,
-                        previous_hash=block_entry.previous_hash,
-                        timestamp=block_entry.timestamp,
-                        transactions=transactions,
-                        proof=block_entry.proof,
-                        hash=block_entry.block_hash
-                    )
-
-                    # Block zur Chain hinzufügen
-                    blockchain.chain.append(block)
-                    print(f"Block {block.index} wiederhergestellt")
-                except Exception as block_error:
-                    print(f"Fehler beim Wiederherstellen von Block {block_entry.index}: {block_error}")
-
-            print("Blockchain aus Datenbank wiederhergestellt.")
-            return True
+        print(f"Gefundene Blöcke ({source}): {total}")
+        replayed = blockchain.restore_blocks(_report_progress(blocks, total, start_time))
+        if blockchain.snapshot_path and replayed >= blockchain.snapshot_interval:
+            blockchain.save_snapshot()
+        if not blockchain.check_transaction_table():
+            print("⚠️ Tabelle transactions unvollständig, nachtragen mit: "
+                  "python database_handling.py backfill-transactions")
 
-        except Exception as inner_error:
-            print(f"Innerer Fehler bei der Wiederherstellung der Blockchain: {inner_error}")
-            return False
-        finally:
-            session_db.close()
+        elapsed = time.perf_counter() - start_time
+        restored = len(blockchain.chain)
+        print(f"Blockchain aus {source} wiederhergestellt.")
+        print(f"Startzeit: {elapsed:.3f}s ({restored} Blöcke, {restored / max(elapsed, 1e-9):.0f} Blöcke/s, "
+              f"{replayed} ohne Snapshot nachgespielt)")
+        return True
 
     except Exception as e:
         print(f"Fehler bei der Wiederherstellung der Blockchain: {e}")
         return False
 
 
+def _write_backfill_batch(session, blocks, start, final=False):
+    # Alte Zeilen der Blöcke ab start (beim letzten Stapel auch aller späteren) in derselben
+    # Datenbanktransaktion ersetzen, die Tabelle ist nach jedem commit vollständig
+    stale = session.query(TransactionEntry).filter(TransactionEntry.block_index >= start)
+    if not final:
+        stale = stale.filter(TransactionEntry.block_index <= blocks[-1].index)
+    stale.delete(synchronize_session=False)
+    entries = [entry for block in blocks for entry in transaction_entries(block)]
+    session.add_all(entries)
+    record_purchases(session, blocks)
+    session.commit()
+    return len(entries)
+
+
+def backfill_transaction_table(db_manager, block_log_dir=None, batch_size=RESTORE_BATCH_SIZE):
+    """
+    Füllt die Tabelle transactions aus den gespeicherten Blöcken (Datenbanken aus älteren Versionen)
+    und ergänzt die bestätigten Käufe in data_purchases und model_purchases.
+    Vorhandene Zeilen der Tabelle transactions werden ersetzt, jeder Stapel Blöcke wird in einer eigenen Datenbanktransaktion
+    geschrieben, die auch die alten Zeilen dieser Blöcke löscht. Ein abgebrochener Lauf hinterlässt für die
+    restlichen Blöcke die alten Zeilen und kann einfach wiederholt werden.
+
+    Args:
+        db_manager: DatabaseManager
+        block_log_dir: Verzeichnis des Block-Logs, wenn die Blöcke dort liegen (optional)
+        batch_size: Blöcke pro Datenbanktransaktion
+
+    Returns:
+        int: Anzahl geschriebener Transaktionen
+    """
+    if block_log_dir:
+        from Blockchain.block_log import BlockLog
+        block_log = BlockLog(block_log_dir)
+        blocks = block_log.iter_blocks()
+    else:
+        block_log = None
+        blocks = stream_stored_blocks(db_manager, 1, batch_size)
+
+    session = db_manager.get_session()
+    written = 0
+    try:
+        batch = []
+        start = 0
+        for block in blocks:
+            batch.append(block)
+            if block.index % batch_size == batch_size - 1:
+                written += _write_backfill_batch(session, batch, start)
+                start = block.index + 1
+                batch = []
+        written += _write_backfill_batch(session, batch, start, final=True)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+        if block_log is not None:
+            block_log.close()
+    return written
+
+
 def handle_database_initialization(blockchain, reset_db=False):
     """
     Zentrale Funktion zur Initialisierung der Datenbank und Blockchain.
@@ -151,7 +320,7 @@ def handle_database_initialization(blockchain, reset_db=False):
     """
     if reset_db:
         print("Datenbank wird zurückgesetzt...")
-        if reset_database():
+        if reset_database(blockchain):
             print("Datenbank erfolgreich zurückgesetzt.")
             return True
         else:
@@ -164,4 +333,22 @@ def handle_database_initialization(blockchain, reset_db=False):
             return True
         else:
             print("Fehler bei der Initialisierung der Blockchain.")
-            return False
\ No newline at end of file
+            return False
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Wartung der Marktplatz-Datenbank")
+    commands = parser.add_subparsers(dest='command', required=True)
+    backfill = commands.add_parser('backfill-transactions',
+                                   help="Tabelle transactions und Käufe aus den gespeicherten Blöcken füllen")
+    backfill.add_argument('--db', default='sqlite:///marketplace.db', help="Verbindungsstring der Datenbank")
+    backfill.add_argument('--block-log', default=None,
+                          help=f"Blöcke aus dem Block-Log lesen (z.B. {BLOCK_LOG_DIR})")
+    arguments = parser.parse_args()
+
+    if arguments.command == 'backfill-transactions':
+        start_time = time.perf_counter()
+        count = backfill_transaction_table(DatabaseManager(arguments.db), arguments.block_log)
+        print(f"{count} Transaktionen in {time.perf_counter() - start_time:.2f}s eingetragen.")
@@ -7,6 +7,20 @@ import base64
 
 # speichert einen Schlüssel für ein Datenset
 def save_key(name, data_id, encryption_key):
+    save_keys([(name, data_id, encryption_key)])
+    print(f"Saved key for {name} with ID {data_id}")
+    return True
+
+
+# speichert mehrere Schlüssel auf einmal (Bulk-Upload), die Datei wird nur einmal gelesen und geschrieben
+def save_keys(keys):
+    """
+    Args:
+        keys: Liste von (name, data_id, encryption_key)
+
+    Returns:
+        int: Anzahl gespeicherter Schlüssel
+    """
     file_path = "data_keys.json"
     data = {
         "datasets": []
@@ -21,30 +35,31 @@ def save_key(name, data_id, encryption_key):
 
             data = {"datasets": []}
 
+    # erster Eintrag je data_id
+    positions = {}
+    for i, dataset in enumerate(data["datasets"]):
+        positions.setdefault(dataset["data_id"], i)
 
-    entry = {
-        "name": name,
-        "data_id": data_id,
-        "encryption_key": encryption_key,
-        "upload_date": "2025-05-04"  # Current date
-    }
-
+    for name, data_id, encryption_key in keys:
+        entry = {
+            "name": name,
+            "data_id": data_id,
+            "encryption_key": encryption_key,
+            "upload_date": "2025-05-04"  # Current date
+        }
 
-    for i, dataset in enumerate(data["datasets"]):
-        if dataset["data_id"] == data_id:
+        if data_id in positions:
             # Update existing entry
-            data["datasets"][i] = entry
-            break
-    else:
-
-        data["datasets"].append(entry)
+            data["datasets"][positions[data_id]] = entry
+        else:
+            positions[data_id] = len(data["datasets"])
+            data["datasets"].append(entry)
 
 
     with open(file_path, 'w') as f:
         json.dump(data, f, indent=2)
 
-    print(f"Saved key for {name} with ID {data_id}")
-    return True
+    return len(keys)
 
 
 # Holt den Schlüssel für ein Datenset basierend auf der ID
@@ -1,22 +1,334 @@
 from Blockchain.blockchain import Blockchain, Block
-from database import DatabaseManager, User, DataEntry, ModelEntry, EncryptedFile
+from Blockchain.codec import encode_block, decode_block, CodecError
+from Blockchain.lazy_chain import BLOCK_CACHE_SIZE
+from Blockchain.block_log import BlockLog, SYNC_BATCH
+from database import DatabaseManager, User, DataEntry, ModelEntry, EncryptedFile, data_purchases, model_purchases
 from encryption import generate_key, encrypt_file, decrypt_file, hash_key
 import json
 import hashlib
 import time
-from database import BlockEntry
+from database import BlockEntry, TransactionEntry
+from sqlalchemy import insert, or_
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import threading
+import os
 from simulated_ipfs import SimulatedIPFS
 import uuid
 
+# Blöcke pro Schritt, wenn ein neues Block-Log die Tabelle blocks übernimmt
+BLOCK_LOG_MIGRATION_BATCH = 1000
+
+# Spalten einer Zeile der Tabelle blocks, in der Reihenfolge von block_from_row
+BLOCK_ROW_COLUMNS = (BlockEntry.index, BlockEntry.previous_hash, BlockEntry.timestamp, BlockEntry.proof,
+                     BlockEntry.difficulty, BlockEntry.mining_time, BlockEntry.block_hash,
+                     BlockEntry.transactions_json, BlockEntry.block_data, BlockEntry.seal)
+
+
+def block_from_row(row):
+    """
+    Erstellt einen Block aus einer Zeile der Tabelle blocks
+    Die binäre Kopie wird bevorzugt. Fehlt sie oder passt sie nicht zum gespeicherten Hash,
+    wird der Block mit allen Header-Feldern aus den Spalten und dem JSON der Transaktionen gebaut.
+
+    Args:
+        row: Werte der Spalten BLOCK_ROW_COLUMNS
+
+    Returns:
+        Block
+    """
+    (index, previous_hash, timestamp, proof, difficulty, mining_time, block_hash,
+     transactions_json, block_data, seal) = row
+    if block_data:
+        try:
+            block = decode_block(block_data)
+            if block.hash == block_hash:
+                return block
+            print(f"Hash von Block {index} passt nicht zur binären Kopie, verwende JSON")
+        except CodecError as e:
+            print(f"Binärer Block {index} ist ungültig, verwende JSON: {e}")
+
+    # Blöcke von vor den Merkle-Headern behalten ihren JSON-Hash, dort war die Schwierigkeit
+    # noch ganzzahlig (die Spalte liefert 4.0 statt 4)
+    transactions = json.loads(transactions_json)
+    fields = dict(index=index, previous_hash=previous_hash, timestamp=timestamp, transactions=transactions,
+                  proof=proof, difficulty=difficulty, mining_time=mining_time, hash=block_hash, seal=seal or "")
+    block = Block.from_storage(**fields)
+    if block.calculate_hash() != block_hash and float(difficulty).is_integer():
+        fields["difficulty"] = int(difficulty)
+        block = Block.from_storage(**fields)
+    return block
+
+
+def decode_block_rows(rows):
+    """
+    Erstellt die Blöcke mehrerer Zeilen (auch in einem Worker-Prozess aufrufbar)
+
+    Args:
+        rows: Zeilen mit den Werten von BLOCK_ROW_COLUMNS
+
+    Returns:
+        Liste der Blöcke
+    """
+    return [block_from_row(tuple(row)) for row in rows]
+
+
+# Zugriffsentscheidungen je (Benutzer, Angebot): Gültigkeit in Sekunden und maximale Anzahl
+ACCESS_CACHE_TTL = 5.0
+ACCESS_CACHE_SIZE = 10_000
+
+# Kauf-Transaktionen: Zuordnungstabelle, deren Spalte für das Angebot, Modellklasse und ID-Spalte des Angebots
+PURCHASE_TABLES = {
+    'data_purchase': (data_purchases, 'data_id', DataEntry, DataEntry.data_id),
+    'model_purchase': (model_purchases, 'model_id', ModelEntry, ModelEntry.model_id),
+}
+
+# Wert der Spalte transactions.type für einfache Überweisungen (ohne "type" im Block)
+TRANSFER_TYPE = 'transfer'
+
+
+def transaction_entries(block):
+    """
+    Zeilen der Tabelle transactions für die Transaktionen eines Blocks
+
+    Args:
+        block: Block
+
+    Returns:
+        Liste von TransactionEntry
+    """
+    entries = []
+    for position, tx in enumerate(block.transactions):
+        transaction_type = tx.get('type') or TRANSFER_TYPE
+        if transaction_type in ('data_upload', 'model_upload'):
+            item_id, amount = tx.get('transaction_id'), tx.get('price')
+        else:
+            item_id, amount = tx.get('data_id') or tx.get('model_id'), tx.get('amount')
+        entries.append(TransactionEntry(
+            tx_id=tx.get('transaction_id'),
+            block_index=block.index,
+            position=position,
+            type=transaction_type,
+            owner=tx.get('owner'),
+            buyer=tx.get('buyer', tx.get('sender')),
+            seller=tx.get('seller', tx.get('recipient')),
+            item_id=item_id,
+            amount=amount,
+            timestamp=tx.get('timestamp')
+        ))
+    return entries
+
+
+def _transaction_from_entry(entry):
+    """
+    Transaktion aus einer Zeile der Tabelle transactions, mit den Schlüsseln wie im Block
+    (ohne Metadaten und Signatur), dazu block_index und position
+    """
+    tx = {'timestamp': entry.timestamp, 'block_index': entry.block_index, 'position': entry.position}
+    if entry.tx_id is not None:
+        tx['transaction_id'] = entry.tx_id
+    if entry.type == TRANSFER_TYPE:
+        tx.update(sender=entry.buyer, recipient=entry.seller, amount=entry.amount)
+    elif entry.type in ('data_upload', 'model_upload'):
+        tx.update(type=entry.type, owner=entry.owner, price=entry.amount)
+    else:
+        item_key = 'data_id' if entry.type == 'data_purchase' else 'model_id'
+        tx.update({'type': entry.type, 'buyer': entry.buyer, 'seller': entry.seller, item_key: entry.item_id,
+                   'amount': entry.amount})
+    return tx
+
+
+def purchase_pairs(session, blocks):
+    """
+    Zeilen der Tabellen data_purchases und model_purchases für die Käufe in den Blöcken
+    Käufer oder Angebote, die nicht in der Datenbank stehen, werden übersprungen.
+
+    Args:
+        session: Datenbanksitzung
+        blocks: Blöcke
+
+    Returns:
+        dict: Kauftyp -> {(user_id, entry_id): (Käufer-Adresse, data_id bzw. model_id)}
+    """
+    purchases = [(tx['type'], tx.get('buyer'), tx.get('data_id') or tx.get('model_id'))
+                 for block in blocks for tx in block.transactions if tx.get('type') in PURCHASE_TABLES]
+    if not purchases:
+        return {}
+
+    buyers = {buyer for _, buyer, _ in purchases}
+    user_ids = dict(session.query(User.address, User.id).filter(User.address.in_(buyers)).all())
+    pairs = {}
+    for purchase_type, (_, _, entry_class, item_column) in PURCHASE_TABLES.items():
+        items = {item_id for kind, _, item_id in purchases if kind == purchase_type}
+        if not items:
+            continue
+        entry_ids = dict(session.query(item_column, entry_class.id).filter(item_column.in_(items)).all())
+        pairs[purchase_type] = {(user_ids[buyer], entry_ids[item_id]): (buyer, item_id)
+                                for kind, buyer, item_id in purchases
+                                if kind == purchase_type and buyer in user_ids and item_id in entry_ids}
+    return pairs
+
+
+def add_purchase_rows(session, purchase_type, pairs):
+    """
+    Fügt fehlende Zeilen in data_purchases bzw. model_purchases ein (ohne commit)
+
+    Args:
+        session: Datenbanksitzung
+        purchase_type: 'data_purchase' oder 'model_purchase'
+        pairs: (user_id, entry_id)-Paare
+
+    Returns:
+        set: Neu eingefügte Paare
+    """
+    table, column = PURCHASE_TABLES[purchase_type][:2]
+    pairs = set(pairs)
+    if not pairs:
+        return set()
+    existing = {tuple(row) for row in session.query(table.c.user_id, table.c[column]).filter(
+        table.c.user_id.in_({user_id for user_id, _ in pairs}),
+        table.c[column].in_({entry_id for _, entry_id in pairs}))}
+    new = pairs - existing
+    if new:
+        session.execute(table.insert(), [{'user_id': user_id, column: entry_id} for user_id, entry_id in new])
+    return new
+
+
+def record_purchases(session, blocks):
+    """
+    Trägt die Käufe der Blöcke in data_purchases und model_purchases ein (ohne commit)
+
+    Args:
+        session: Datenbanksitzung
+        blocks: Blöcke
+
+    Returns:
+        list: Schlüssel der betroffenen Zugriffsentscheidungen (Käufer, Angebots-ID, Modell ja/nein)
+    """
+    keys = []
+    for purchase_type, pairs in purchase_pairs(session, blocks).items():
+        add_purchase_rows(session, purchase_type, pairs)
+        keys.extend((buyer, item_id, purchase_type == 'model_purchase') for buyer, item_id in pairs.values())
+    return keys
+
+
+def forget_purchases(session, blocks, still_purchased):
+    """
+    Löscht die Käufe der Blöcke aus data_purchases und model_purchases (ohne commit)
+    Zeilen, die ein verbleibender Block ebenfalls gewährt (wiederholter Kauf), bleiben stehen.
+
+    Args:
+        session: Datenbanksitzung
+        blocks: Verworfene Blöcke
+        still_purchased: (Käufer-Adresse, data_id bzw. model_id) -> True, wenn die verbleibende Chain
+                         den Kauf weiterhin enthält
+    """
+    for purchase_type, pairs in purchase_pairs(session, blocks).items():
+        table, column = PURCHASE_TABLES[purchase_type][:2]
+        for (user_id, entry_id), (buyer, item_id) in pairs.items():
+            if not still_purchased(buyer, item_id):
+                session.execute(table.delete().where(table.c.user_id == user_id, table.c[column] == entry_id))
+
+
+class AccessCache:
+    """
+    Kurzlebiger Cache für Zugriffsentscheidungen je (Benutzer, Angebot)
+    Einträge verfallen nach ttl Sekunden, bei mehr als max_entries fällt der älteste heraus.
+    """
+
+    def __init__(self, ttl=ACCESS_CACHE_TTL, max_entries=ACCESS_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns:
+            bool oder None, wenn nichts (mehr) gültig gecacht ist
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _encrypt_upload(file_content):
+    """
+    Verschlüsselt den Inhalt eines Uploads mit einem neuen Schlüssel
+
+    Returns:
+        tuple: (key, encrypted_content, key_hash)
+    """
+    key = generate_key()
+    return key, encrypt_file(file_content, key), hash_key(key)
+
 
 class MarketplaceBlockchain(Blockchain):
-    def __init__(self, db_manager=None):
-        """Initialisiert die Blockchain mit Datenbankanbindung"""
-        super().__init__()
+    def __init__(self, db_manager=None, mining_workers=None, checkpoint_path=None, snapshot_path=None,
+                 lazy_blocks=False, block_cache_size=BLOCK_CACHE_SIZE, consensus=None,
+                 block_log_dir=None, block_log_sync=SYNC_BATCH):
+        """Initialisiert die Blockchain mit Datenbankanbindung
+
+        Args:
+            db_manager: Datenbankmanager (optional)
+            mining_workers: Anzahl Prozesse für das Mining (Standard: alle Kerne)
+            checkpoint_path: JSON-Datei für den Validierungs-Checkpoint (optional)
+            snapshot_path: JSON-Datei für Snapshots des abgeleiteten Zustands (optional)
+            lazy_blocks: Nur Block-Header im Speicher halten, Blöcke bei Bedarf aus der Datenbank laden
+            block_cache_size: Anzahl der Blöcke im LRU-Cache bei lazy_blocks
+            consensus: Konsens-Engine, z.B. ProofOfAuthority (Standard: Proof of Work)
+            block_log_dir: Verzeichnis eines Block-Logs (Blockchain/block_log.py), Blöcke werden dann
+                           dort statt in der Tabelle blocks gespeichert (optional)
+            block_log_sync: fsync-Strategie des Block-Logs (SYNC_ALWAYS, SYNC_BATCH oder SYNC_NEVER)
+        """
+        # Vor super().__init__, der Block-Loader für lazy_blocks liest schon daraus
+        self.block_log = BlockLog(block_log_dir, sync=block_log_sync) if block_log_dir else None
+
+        super().__init__(mining_workers=mining_workers, checkpoint_path=checkpoint_path,
+                         snapshot_path=snapshot_path,
+                         block_loader=self._load_stored_blocks if lazy_blocks else None,
+                         block_cache_size=block_cache_size, consensus=consensus)
 
         # Datenbankmanager erstellen, falls keiner übergeben wurde
         self.db_manager = db_manager or DatabaseManager()
 
+        # Ergebnisse von has_access, bestätigte Käufe beim Speichern der Blöcke entfernen ihre Einträge
+        self.access_cache = AccessCache()
+
+        # Genesis-Block speichern, damit eine wiederhergestellte Chain mit Block 0 beginnt
+        self._save_genesis_block()
+
+        # Öffentliche Schlüssel der Benutzer für die Signaturprüfung
+        self._load_public_keys()
+
+        # Abfragen über die Tabelle transactions erst, wenn sie alle Transaktionen der Chain enthält
+        self.transaction_table_ready = False
+        self.check_transaction_table()
 
         # Initialisiere die IPFS integration
         self.ipfs = SimulatedIPFS()
@@ -38,17 +350,20 @@ class MarketplaceBlockchain(Blockchain):
                 if public_key and not user.public_key:
                     user.public_key = public_key
                     session.commit()
+                    self.register_public_key(address, public_key)
                 return user
 
             # Neuen Benutzer erstellen
             new_user = User(address=address, public_key=public_key)
             session.add(new_user)
             session.commit()
+            if public_key:
+                self.register_public_key(address, public_key)
             return new_user
         finally:
             session.close()
 
-    def upload_data_with_file(self, owner_address, file_content, metadata, price):
+    def upload_data_with_file(self, owner_address, file_content, metadata, price, private_key=None):
         """Lädt Daten mit einer Datei hoch und verschlüsselt sie
 
         Verwendet IPFS für die Speicherung des tatsächlichen Inhalts
@@ -58,6 +373,7 @@ class MarketplaceBlockchain(Blockchain):
             file_content: Dateiinhalt (Bytes oder String)
             metadata: Metadaten-Dictionary
             price: Preis der Daten
+            private_key: Ed25519-Schlüssel des Besitzers (optional, sonst Platzhalter-Signatur)
 
         Returns:
             tuple: (data_id, encryption_key)
@@ -91,7 +407,7 @@ class MarketplaceBlockchain(Blockchain):
             metadata_with_hash['ipfs_cid'] = ipfs_cid
 
             # Transaktion zur Blockchain hinzufügen
-            data_id = self.data_upload_transaction(owner_address, metadata_with_hash, price)
+            data_id = self.data_upload_transaction(owner_address, metadata_with_hash, price, private_key)
 
             # Eintrag in der Datenbank erstellen
             data_entry = DataEntry(
@@ -131,7 +447,7 @@ class MarketplaceBlockchain(Blockchain):
         finally:
             session.close()
 
-    def upload_model_with_file(self, owner_address, file_content, metadata, price):
+    def upload_model_with_file(self, owner_address, file_content, metadata, price, private_key=None):
         """Lädt ein Modell mit einer Datei hoch und verschlüsselt es
 
         Verwendet IPFS für die Speicherung des tatsächlichen Inhalts
@@ -141,6 +457,7 @@ class MarketplaceBlockchain(Blockchain):
             file_content: Dateiinhalt (Bytes oder String)
             metadata: Metadaten-Dictionary
             price: Preis des Modells
+            private_key: Ed25519-Schlüssel des Besitzers (optional, sonst Platzhalter-Signatur)
 
         Returns:
             tuple: (model_id, encryption_key)
@@ -175,7 +492,7 @@ class MarketplaceBlockchain(Blockchain):
             metadata_with_hash['ipfs_cid'] = ipfs_cid
 
             # Transaktion zur Blockchain hinzufügen
-            model_id = self.model_upload_transaction(owner_address, metadata_with_hash, price)
+            model_id = self.model_upload_transaction(owner_address, metadata_with_hash, price, private_key)
 
             # Eintrag in der Datenbank erstellen
             model_entry = ModelEntry(
@@ -214,10 +531,184 @@ class MarketplaceBlockchain(Blockchain):
         finally:
             session.close()
 
+    def upload_data_many(self, uploads, workers=None):
+        """Lädt viele Datensätze auf einmal hoch (z.B. zum Befüllen des Marktplatzes)
+
+        Args:
+            uploads: Liste von (owner_address, file_content, metadata, price) wie bei upload_data_with_file
+            workers: Threads zum Verschlüsseln (Standard: alle Kerne)
+
+        Returns:
+            list: (data_id, encryption_key) je Upload, in derselben Reihenfolge
+        """
+        return self._upload_many('data_upload', uploads, workers)
+
+    def upload_model_many(self, uploads, workers=None):
+        """Lädt viele Modelle auf einmal hoch
+
+        Args:
+            uploads: Liste von (owner_address, file_content, metadata, price) wie bei upload_model_with_file
+            workers: Threads zum Verschlüsseln (Standard: alle Kerne)
+
+        Returns:
+            list: (model_id, encryption_key) je Upload, in derselben Reihenfolge
+        """
+        return self._upload_many('model_upload', uploads, workers)
+
+    def _upload_many(self, upload_type, uploads, workers=None):
+        """Gemeinsamer Bulk-Upload für Daten und Modelle
+
+        Verschlüsselt parallel, legt alle Inhalte gemeinsam im IPFS ab, fügt alle Upload-Transaktionen
+        auf einmal zum Mempool hinzu und schreibt alle Datenbankzeilen in einer Transaktion.
+
+        Args:
+            upload_type: 'data_upload' oder 'model_upload'
+            uploads: Liste von (owner_address, file_content, metadata, price)
+            workers: Threads zum Verschlüsseln
+
+        Returns:
+            list: (item_id, encryption_key) je Upload
+        """
+        uploads = list(uploads)
+        if not uploads:
+            return []
+        is_model = upload_type == 'model_upload'
+        entry_class = ModelEntry if is_model else DataEntry
+        item_ids = []
+
+        session = self.db_manager.get_session()
+        try:
+            # Alle Besitzer mit einer Abfrage, fehlende in einem Schritt anlegen
+            owners = {owner for owner, _, _, _ in uploads}
+            user_ids = dict(session.query(User.address, User.id).filter(User.address.in_(owners)))
+            missing = [User(address=owner) for owner in owners if owner not in user_ids]
+            if missing:
+                session.add_all(missing)
+                session.flush()
+                user_ids.update((user.address, user.id) for user in missing)
+
+            # Verschlüsseln parallel, Threads statt Prozesse: die Inhalte müssen nicht kopiert werden
+            with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+                encrypted = list(executor.map(_encrypt_upload, (content for _, content, _, _ in uploads)))
+
+            file_hashes = []
+            ipfs_items = []
+            now = time.time()
+            for position, ((owner, content, metadata, _), (_, encrypted_content, _)) in enumerate(
+                    zip(uploads, encrypted)):
+                # Wie beim einzelnen Upload, die Position trennt gleiche Inhalte im selben Aufruf
+                unique_data = (str(content) + str(now) + str(user_ids[owner]) + str(position)).encode()
+                file_hash = hashlib.sha256(unique_data).hexdigest()
+                file_hashes.append(file_hash)
+                ipfs_metadata = {"owner": owner, "file_hash": file_hash, "metadata": json.dumps(metadata)}
+                if is_model:
+                    ipfs_metadata["type"] = "model"
+                ipfs_metadata["encrypted"] = True
+                ipfs_items.append((encrypted_content, ipfs_metadata))
+            ipfs_cids = self.ipfs.add_many(ipfs_items, pin=True)
+
+            # Upload-Transaktionen gemeinsam in den Mempool
+            item_ids = self.upload_transactions(upload_type, [
+                (owner, {**metadata, 'file_hash': file_hash, 'ipfs_cid': ipfs_cid}, price)
+                for (owner, _, metadata, price), file_hash, ipfs_cid in zip(uploads, file_hashes, ipfs_cids)])
+
+            # Alle Zeilen als Bulk-Insert in einer Datenbanktransaktion
+            id_column = 'model_id' if is_model else 'data_id'
+            metadata_column = 'model_metadata' if is_model else 'data_metadata'
+            entry_ids = session.scalars(insert(entry_class).returning(entry_class.id, sort_by_parameter_order=True), [
+                {id_column: item_id, 'owner_id': user_ids[owner], metadata_column: json.dumps(metadata),
+                 'price': price, 'timestamp': now}
+                for item_id, (owner, _, metadata, price) in zip(item_ids, uploads)]).all()
+            entry_column = 'model_entry_id' if is_model else 'data_entry_id'
+            session.execute(insert(EncryptedFile), [
+                {'file_hash': file_hash, 'encryption_key_hash': key_hash, 'ipfs_cid': ipfs_cid, entry_column: entry_id}
+                for file_hash, (_, _, key_hash), ipfs_cid, entry_id in zip(file_hashes, encrypted, ipfs_cids,
+                                                                           entry_ids)])
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            # Ohne Datenbankzeilen keine Angebote: Transaktionen und Listings wieder entfernen
+            self._remove_pending_transactions(item_ids)
+            raise e
+        finally:
+            session.close()
+
+        # Verschlüsselungsschlüssel in einem Schreibvorgang speichern
+        keys = [key.decode() for key, _, _ in encrypted]
+        default_name = 'Unknown Model' if is_model else 'Unknown Dataset'
+        try:
+            import key_manager
+            key_manager.save_keys([(metadata.get('name', default_name), item_id, key)
+                                   for (_, _, metadata, _), item_id, key in zip(uploads, item_ids, keys)])
+        except Exception as e:
+            print(f"ERROR beim Speichern der Schlüssel: {e}")
+
+        return list(zip(item_ids, keys))
+
+    def has_access(self, user_address, item_id, model=False):
+        """Prüft mit einer EXISTS-Abfrage, ob der Benutzer Besitzer oder Käufer eines Angebots ist
+        Besitz (owner_id) und Käufe (data_purchases bzw. model_purchases) werden in einer Anfrage
+        über die Indizes geprüft, das Ergebnis je (Benutzer, Angebot) für ACCESS_CACHE_TTL Sekunden gecacht.
+
+        Args:
+            user_address: Adresse des Benutzers
+            item_id: data_id bzw. model_id
+            model: True für Modelle, sonst Datensätze
+
+        Returns:
+            bool: True bei Besitz oder Kauf laut Datenbank
+        """
+        key = (user_address, item_id, model)
+        cached = self.access_cache.get(key)
+        if cached is not None:
+            return cached
+
+        table, column, entry_class, item_column = PURCHASE_TABLES['model_purchase' if model else 'data_purchase']
+        session = self.db_manager.get_session()
+        try:
+            owner = session.query(entry_class.id).join(User, entry_class.owner_id == User.id).filter(
+                item_column == item_id, User.address == user_address).exists()
+            purchase = session.query(table.c.user_id).join(User, table.c.user_id == User.id).join(
+                entry_class, table.c[column] == entry_class.id).filter(
+                User.address == user_address, item_column == item_id).exists()
+            allowed = bool(session.query(or_(owner, purchase)).scalar())
+        finally:
+            session.close()
+
+        self.access_cache.put(key, allowed)
+        return allowed
+
+    def _access_reason(self, user_address, item_id, model=False):
+        """Begründung für den Zugriff auf ein Angebot oder None ohne Zugriff
+
+        Args:
+            user_address: Adresse des Benutzers
+            item_id: data_id bzw. model_id
+            model: True für Modelle, sonst Datensätze
+
+        Returns:
+            str oder None
+        """
+        # 1. Besitzer oder Käufer laut Datenbank
+        if self.has_access(user_address, item_id, model):
+            return "User ist Owner oder Käufer"
+        print(f"⚠️ User ist weder Owner noch Käufer laut Datenbank")
+
+        # 2. Bestätigte Käufe ohne Zeile in der Zuordnungstabelle (z.B. Käufer ohne Benutzerkonto
+        #    beim Speichern des Blocks oder Datenbanken vor backfill-transactions), O(1)
+        if self.has_purchased(user_address, item_id):
+            return "Bestätigter Kauf im Purchase-Ledger gefunden"
+
+        # 3. Ausstehende Käufe im Mempool
+        for tx in self.mempool.by_address(user_address, ('data_purchase', 'model_purchase')):
+            if tx.get('buyer') == user_address and (tx.get('data_id') or tx.get('model_id')) == item_id:
+                return "Purchase in ausstehenden Transaktionen gefunden"
+        return None
+
     def get_model_file(self, user_address, model_id, encryption_key):
         """Gibt die entschlüsselte Modelldatei zurück, wenn der Benutzer Zugriff hat.
         Holt den Inhalt aus IPFS statt direkt aus der Datenbank.
-        KORRIGIERT: Prüft Blockchain direkt für Purchase-Berechtigung.
+        Zugriff über has_access, bestätigte und ausstehende Käufe.
 
         Args:
             user_address: Adresse des Benutzers
@@ -249,58 +740,10 @@ class MarketplaceBlockchain(Blockchain):
             print(f"✅ ModelEntry gefunden: ID {model_entry.id}, Owner ID: {model_entry.owner_id}")
 
             # Überprüfen der Zugriffsberechtigung
-            has_access = False
-            access_reason = ""
-
-            # 1. Prüfe ob User der Owner ist
-            if model_entry.owner_id == user.id:
-                has_access = True
-                access_reason = "User ist Owner"
-                print(f"✅ {access_reason}")
-            else:
-                print(f"⚠️ User ist nicht Owner (Owner ID: {model_entry.owner_id})")
-
-                # 2. Prüfe Blockchain direkt nach Purchase-Transaktionen
-                print(f"🔍 Suche in Blockchain nach Purchase-Transaktionen...")
-
-                purchase_found = False
-                for block_idx, block in enumerate(self.chain):
-                    for tx_idx, tx in enumerate(block.transactions):
-                        if (tx.get('type') in ['data_purchase', 'model_purchase']
-                                and tx.get('buyer') == user_address):
-
-                            purchased_item_id = tx.get('data_id') or tx.get('model_id')
-
-                            if purchased_item_id == model_id:
-                                purchase_found = True
-                                access_reason = f"Purchase gefunden in Block {block_idx}, TX {tx_idx}"
-                                print(f"✅ {access_reason}")
-                                break
-
-                    if purchase_found:
-                        break
-
-                if purchase_found:
-                    has_access = True
-                else:
-                    print(f"❌ Keine Purchase-Transaktion gefunden")
-
-                    # 3. Fallback: Prüfe auch ausstehende Transaktionen
-                    print(f"🔍 Prüfe ausstehende Transaktionen...")
-                    for tx in self.current_transactions:
-                        if (tx.get('type') in ['data_purchase', 'model_purchase']
-                                and tx.get('buyer') == user_address):
-
-                            purchased_item_id = tx.get('data_id') or tx.get('model_id')
-
-                            if purchased_item_id == model_id:
-                                has_access = True
-                                access_reason = "Purchase in ausstehenden Transaktionen gefunden"
-                                print(f"✅ {access_reason}")
-                                break
+            access_reason = self._access_reason(user_address, model_id, model=True)
 
             # Finale Zugriffsprüfung
-            if not has_access:
+            if access_reason is None:
                 print(f"❌ ZUGRIFF VERWEIGERT: Kein Zugriff auf Modell {model_id}")
                 raise ValueError("Kein Zugriff auf dieses Modell")
 
@@ -360,13 +803,14 @@ class MarketplaceBlockchain(Blockchain):
         finally:
             session.close()
 
-    def purchase_data(self, buyer_address, data_id, amount):
+    def purchase_data(self, buyer_address, data_id, amount, private_key=None):
         """Kauft Daten und gibt den Entschlüsselungsschlüssel zurück
 
         Args:
             buyer_address: Adresse des Käufers
             data_id: ID der zu kaufenden Daten
             amount: Zu zahlender Betrag
+            private_key: Ed25519-Schlüssel des Käufers (optional, sonst Platzhalter-Signatur)
 
         Returns:
             str: Entschlüsselungsschlüssel
@@ -374,7 +818,7 @@ class MarketplaceBlockchain(Blockchain):
         session = self.db_manager.get_session()
         try:
             # Benutzer finden oder erstellen
-            user = self.register_user(buyer_address)
+            self.register_user(buyer_address)
 
             # Daten finden
             data_entry = session.query(DataEntry).filter_by(data_id=data_id).first()
@@ -391,14 +835,9 @@ class MarketplaceBlockchain(Blockchain):
             if not encryption_key:
                 raise ValueError(f"Verschlüsselungsschlüssel für {data_id} nicht gefunden")
 
-            # Transaktion durchführen
-            self.data_purchase_transaction(buyer_address, data_id, amount)
-
-            # Beziehung aktualisieren
-            if user not in data_entry.purchased_by:
-                data_entry.purchased_by.append(user)
-
-            session.commit()
+            # Transaktion durchführen. Die Zeile in data_purchases entsteht erst mit dem Block (record_purchases),
+            # bis dahin gibt der Mempool Zugriff, ein verdrängter Kauf hinterlässt so nichts
+            self.data_purchase_transaction(buyer_address, data_id, amount, private_key)
 
             # Schlüssel für den Käufer speichern
             self._save_key_for_buyer(buyer_address, data_id, encryption_key, data_entry)
@@ -407,13 +846,14 @@ class MarketplaceBlockchain(Blockchain):
         finally:
             session.close()
 
-    def purchase_model(self, buyer_address, model_id, amount):
+    def purchase_model(self, buyer_address, model_id, amount, private_key=None):
         """Kauft ein Modell und gibt den Entschlüsselungsschlüssel zurück
 
         Args:
             buyer_address: Adresse des Käufers
             model_id: ID des zu kaufenden Modells
             amount: Zu zahlender Betrag
+            private_key: Ed25519-Schlüssel des Käufers (optional, sonst Platzhalter-Signatur)
 
         Returns:
             str: Entschlüsselungsschlüssel
@@ -421,7 +861,7 @@ class MarketplaceBlockchain(Blockchain):
         session = self.db_manager.get_session()
         try:
             # Benutzer finden oder erstellen
-            user = self.register_user(buyer_address)
+            self.register_user(buyer_address)
 
             # Modell finden
             model_entry = session.query(ModelEntry).filter_by(model_id=model_id).first()
@@ -438,14 +878,9 @@ class MarketplaceBlockchain(Blockchain):
             if not encryption_key:
                 raise ValueError(f"Verschlüsselungsschlüssel für {model_id} nicht gefunden")
 
-            # Transaktion durchführen
-            self.model_purchase_transaction(buyer_address, model_id, amount)
-
-            # Beziehung aktualisieren
-            if user not in model_entry.purchased_by:
-                model_entry.purchased_by.append(user)
-
-            session.commit()
+            # Transaktion durchführen. Die Zeile in model_purchases entsteht erst mit dem Block (record_purchases),
+            # bis dahin gibt der Mempool Zugriff, ein verdrängter Kauf hinterlässt so nichts
+            self.model_purchase_transaction(buyer_address, model_id, amount, private_key)
 
             # Schlüssel für den Käufer speichern
             self._save_key_for_buyer(buyer_address, model_id, encryption_key, model_entry)
@@ -538,7 +973,7 @@ class MarketplaceBlockchain(Blockchain):
     def get_data_file(self, user_address, data_id, encryption_key):
         """Gibt die entschlüsselte Datei zurück, wenn der Benutzer Zugriff hat.
         Holt den Inhalt aus IPFS statt direkt aus der Datenbank.
-        KORRIGIERT: Prüft Blockchain direkt für Purchase-Berechtigung.
+        Zugriff über has_access, bestätigte und ausstehende Käufe.
 
         Args:
             user_address: Adresse des Benutzers
@@ -570,58 +1005,10 @@ class MarketplaceBlockchain(Blockchain):
             print(f"✅ DataEntry gefunden: ID {data_entry.id}, Owner ID: {data_entry.owner_id}")
 
             # Überprüfen der Zugriffsberechtigung
-            has_access = False
-            access_reason = ""
-
-            # 1. Prüfe ob User der Owner ist
-            if data_entry.owner_id == user.id:
-                has_access = True
-                access_reason = "User ist Owner"
-                print(f"✅ {access_reason}")
-            else:
-                print(f"⚠️ User ist nicht Owner (Owner ID: {data_entry.owner_id})")
-
-                # 2. Prüfe Blockchain direkt nach Purchase-Transaktionen
-                print(f"🔍 Suche in Blockchain nach Purchase-Transaktionen...")
-
-                purchase_found = False
-                for block_idx, block in enumerate(self.chain):
-                    for tx_idx, tx in enumerate(block.transactions):
-                        if (tx.get('type') in ['data_purchase', 'model_purchase']
-                                and tx.get('buyer') == user_address):
-
-                            purchased_item_id = tx.get('data_id') or tx.get('model_id')
-
-                            if purchased_item_id == data_id:
-                                purchase_found = True
-                                access_reason = f"Purchase gefunden in Block {block_idx}, TX {tx_idx}"
-                                print(f"✅ {access_reason}")
-                                break
-
-                    if purchase_found:
-                        break
-
-                if purchase_found:
-                    has_access = True
-                else:
-                    print(f"❌ Keine Purchase-Transaktion gefunden")
-
-                    # 3. Fallback: Prüfe auch ausstehende Transaktionen
-                    print(f"🔍 Prüfe ausstehende Transaktionen...")
-                    for tx in self.current_transactions:
-                        if (tx.get('type') in ['data_purchase', 'model_purchase']
-                                and tx.get('buyer') == user_address):
-
-                            purchased_item_id = tx.get('data_id') or tx.get('model_id')
-
-                            if purchased_item_id == data_id:
-                                has_access = True
-                                access_reason = "Purchase in ausstehenden Transaktionen gefunden"
-                                print(f"✅ {access_reason}")
-                                break
+            access_reason = self._access_reason(user_address, data_id)
 
             # Finale Zugriffsprüfung
-            if not has_access:
+            if access_reason is None:
                 print(f"❌ ZUGRIFF VERWEIGERT: Kein Zugriff auf Daten {data_id}")
                 raise ValueError("Kein Zugriff auf diese Daten")
 
@@ -681,6 +1068,78 @@ class MarketplaceBlockchain(Blockchain):
         finally:
             session.close()
 
+    def check_transaction_table(self) -> bool:
+        """
+        Prüft, ob die Tabelle transactions alle bestätigten Transaktionen der Chain enthält
+        Datenbanken aus älteren Versionen werden mit "python database_handling.py backfill-transactions"
+        nachgetragen, bis dahin durchsuchen Explorer und Marktplatz weiter die Blöcke.
+
+        Returns:
+            bool: True, wenn die Tabelle vollständig ist
+        """
+        if self.lazy_blocks:
+            confirmed = sum(header.transaction_count for header in self.chain.headers)
+        else:
+            confirmed = sum(len(block.transactions) for block in self.chain)
+        session = self.db_manager.get_session()
+        try:
+            stored = session.query(TransactionEntry).count()
+        finally:
+            session.close()
+
+        self.transaction_table_ready = stored == confirmed
+        return self.transaction_table_ready
+
+    def query_transactions(self, address=None, item_id=None, transaction_type=None, limit=None):
+        """
+        Bestätigte Transaktionen über die Indizes der Tabelle transactions, neueste zuerst
+
+        Args:
+            address: nur Transaktionen mit dieser Adresse als Anbieter, Käufer oder Verkäufer (optional)
+            item_id: nur Upload und Käufe dieses Angebots (optional)
+            transaction_type: z.B. 'data_purchase' oder TRANSFER_TYPE (optional)
+            limit: maximale Anzahl (optional)
+
+        Returns:
+            Liste von Transaktionen (Schlüssel wie im Block, ohne Metadaten und Signatur,
+            dazu block_index und position)
+        """
+        session = self.db_manager.get_session()
+        try:
+            query = session.query(TransactionEntry)
+            if address is not None:
+                query = query.filter(or_(TransactionEntry.owner == address, TransactionEntry.buyer == address,
+                                         TransactionEntry.seller == address))
+            if item_id is not None:
+                query = query.filter(TransactionEntry.item_id == item_id)
+            if transaction_type is not None:
+                query = query.filter(TransactionEntry.type == transaction_type)
+            query = query.order_by(TransactionEntry.block_index.desc(), TransactionEntry.position.desc())
+            if limit is not None:
+                query = query.limit(limit)
+            return [_transaction_from_entry(entry) for entry in query]
+        finally:
+            session.close()
+
+    def count_transactions(self, transaction_type=None) -> int:
+        """
+        Anzahl bestätigter Transaktionen laut Tabelle transactions
+
+        Args:
+            transaction_type: nur Transaktionen dieses Typs (optional)
+
+        Returns:
+            int: Anzahl
+        """
+        session = self.db_manager.get_session()
+        try:
+            query = session.query(TransactionEntry)
+            if transaction_type is not None:
+                query = query.filter(TransactionEntry.type == transaction_type)
+            return query.count()
+        finally:
+            session.close()
+
     def make_block(self, proof: int, difficulty: int = 4, mining_time: float = 0.0) -> Block:
         """
         Creates a new Block in the Blockchain
@@ -689,39 +1148,179 @@ class MarketplaceBlockchain(Blockchain):
         :param mining_time: The actual time taken to mine this block in seconds
         :return: new Block
         """
-        previous_block = self.last_block
+        # Block erstellen, anhängen und indizieren
+        block = super().make_block(proof, difficulty, mining_time)
 
-        # Neuen Block erstellen mit Schwierigkeit und Mining-Zeit
-        block = Block(
-            index=len(self.chain),
-            previous_hash=previous_block.hash,
-            timestamp=time.time(),
-            transactions=self.current_transactions,
-            proof=proof,
-            difficulty=difficulty,  # Store the difficulty used
-            mining_time=mining_time,  # Store the actual mining time
-        )
+        # block im Block-Log bzw. in der Datenbank speichern
+        try:
+            self._store_block(block)
+        except Exception as e:
+            print(f"Fehler beim Speichern des Blocks in der Datenbank: {e}")
 
-        # Reset transactions
-        self.current_transactions = []
+        return block
+
+    def discard_last_block(self) -> Block:
+        """
+        Verwirft den letzten Block und löscht ihn auch aus der Datenbank
+        """
+        block = super().discard_last_block()
 
-        # block hinzufügen
-        self.chain.append(block)
+        if self.block_log is not None:
+            self.block_log.truncate(block.index)
 
-        # block in der Datenbank speichern
+        session = self.db_manager.get_session()
         try:
-            self._save_block_to_database(block)
+            if self.block_log is None:
+                session.query(BlockEntry).filter_by(index=block.index).delete()
+            session.query(TransactionEntry).filter_by(block_index=block.index).delete()
+            # Der Ledger ist schon zurückgerollt
+            forget_purchases(session, [block], self.has_purchased)
+            session.commit()
         except Exception as e:
-            print(f"Fehler beim Speichern des Blocks in der Datenbank: {e}")
+            session.rollback()
+            print(f"Fehler beim Löschen von Block {block.index} aus der Datenbank: {e}")
+        finally:
+            session.close()
+        self.access_cache.clear()
 
         return block
 
+    def _store_replaced_blocks(self, chain, fork_point: int) -> None:
+        """
+        Speichert die Blöcke einer übernommenen Chain (z.B. der längeren Chain eines anderen Knotens)
+        Läuft vor dem Austausch der Chain, nachgeladene Blöcke (lazy_blocks) kommen dann schon aus der Datenbank.
+
+        Args:
+            chain: Neue, bereits validierte Chain
+            fork_point: Index des ersten ersetzten Blocks
+        """
+        # Käufe der ersetzten Blöcke entfernen, die neue Chain trägt ihre eigenen ein
+        session = self.db_manager.get_session()
+        try:
+            forget_purchases(session, self.chain[fork_point:],
+                             lambda buyer, item_id: self.purchase_ledger.has_purchased_before(buyer, item_id, fork_point))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Löschen der Käufe ab Block {fork_point}: {e}")
+        finally:
+            session.close()
+        self.access_cache.clear()
+
+        if self.block_log is not None:
+            # Das Log wird nur am Ende gekürzt, ab dem Fork-Punkt neu geschrieben
+            self.block_log.truncate(fork_point)
+            self.block_log.append_many(chain[fork_point:])
+            self.block_log.sync()
+            self._replace_transaction_entries(chain[fork_point:], fork_point)
+            return
+
+        for block in chain[fork_point:]:
+            try:
+                self._save_block_to_database(block)
+            except Exception as e:
+                print(f"Fehler beim Speichern von Block {block.index} in der Datenbank: {e}")
+
+        session = self.db_manager.get_session()
+        try:
+            # Blöcke über der neuen Länge stammen noch von der alten Chain
+            session.query(BlockEntry).filter(BlockEntry.index >= len(chain)).delete()
+            session.query(TransactionEntry).filter(TransactionEntry.block_index >= len(chain)).delete()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Löschen der ersetzten Blöcke aus der Datenbank: {e}")
+        finally:
+            session.close()
+
+    def _load_stored_blocks(self, start: int, end: int) -> list:
+        """
+        Lädt gespeicherte Blöcke für die Chain mit lazy_blocks
+
+        Args:
+            start: Index des ersten Blocks
+            end: Index nach dem letzten Block
+
+        Returns:
+            Blöcke mit start <= index < end, nach Index sortiert
+        """
+        if self.block_log is not None:
+            return self.block_log.read_range(start, end)
+        return self._load_database_blocks(start, end)
+
+    def _load_database_blocks(self, start: int, end: int) -> list:
+        """
+        Lädt Blöcke aus der Tabelle blocks (binäre Kopie, sonst JSON)
+
+        Args:
+            start: Index des ersten Blocks
+            end: Index nach dem letzten Block
+
+        Returns:
+            Blöcke mit start <= index < end, nach Index sortiert
+        """
+        session = self.db_manager.get_session()
+        try:
+            rows = session.query(*BLOCK_ROW_COLUMNS).filter(
+                BlockEntry.index >= start, BlockEntry.index < end).order_by(BlockEntry.index).all()
+            return decode_block_rows(rows)
+        finally:
+            session.close()
+
+    def _load_public_keys(self) -> None:
+        """
+        Registriert die Ed25519-Schlüssel aller Benutzer aus der Spalte User.public_key
+        """
+        session = self.db_manager.get_session()
+        try:
+            for address, public_key in session.query(User.address, User.public_key).filter(
+                    User.public_key.isnot(None)):
+                self.register_public_key(address, public_key)
+        finally:
+            session.close()
+
+    def _save_genesis_block(self) -> None:
+        """
+        Speichert den Genesis-Block, falls die Datenbank noch keinen Block 0 enthält
+        Ein neues, leeres Block-Log übernimmt einmalig die Blöcke aus der Tabelle blocks.
+        """
+        session = self.db_manager.get_session()
+        try:
+            exists = session.query(BlockEntry.id).filter_by(index=0).first() is not None
+            stored_blocks = session.query(BlockEntry).count() if self.block_log is not None else 0
+        finally:
+            session.close()
+
+        if self.block_log is not None:
+            if len(self.block_log) > 0:
+                return
+            if stored_blocks:
+                print(f"Übernehme {stored_blocks} Blöcke aus der Datenbank in das Block-Log...")
+                for start in range(0, stored_blocks, BLOCK_LOG_MIGRATION_BATCH):
+                    self.block_log.append_many(self._load_database_blocks(start, start + BLOCK_LOG_MIGRATION_BATCH))
+            else:
+                self.block_log.append(self.chain[0])
+            self.block_log.sync()
+        elif not exists:
+            self._save_block_to_database(self.chain[0])
+
+    def _store_block(self, block: Block) -> None:
+        """
+        Speichert einen neuen Block: angehängt an das Block-Log oder als Zeile der Tabelle blocks
+        """
+        if self.block_log is not None:
+            self.block_log.append(block)
+            self._replace_transaction_entries([block], block.index)
+        else:
+            self._save_block_to_database(block)
+
     def _save_block_to_database(self, block: Block) -> None:
         """
         Speichert einen Block in der Datenbank
         :param block: Der zu speichernde Block
         """
         session = self.db_manager.get_session()
+        block_data = encode_block(block)
         try:
             # Prüfen, ob Block bereits existiert
             existing_block = session.query(BlockEntry).filter_by(index=block.index).first()
@@ -733,7 +1332,10 @@ class MarketplaceBlockchain(Blockchain):
                 existing_block.block_hash = block.hash
                 existing_block.difficulty = getattr(block, 'difficulty', 4)  # Update difficulty
                 existing_block.mining_time = getattr(block, 'mining_time', 0.0)  # Update mining time
-                existing_block.transactions_json = json.dumps(block.transactions)
+                existing_block.transactions_json = block.transactions_json
+                existing_block.block_data = block_data
+                existing_block.seal = block.seal or None
+                session.query(TransactionEntry).filter_by(block_index=block.index).delete()
             else:
                 # Block neu anlegen
                 block_entry = BlockEntry(
@@ -744,14 +1346,43 @@ class MarketplaceBlockchain(Blockchain):
                     block_hash=block.hash,
                     difficulty=getattr(block, 'difficulty', 4),  # Store difficulty
                     mining_time=getattr(block, 'mining_time', 0.0),  # Store mining time
-                    transactions_json=json.dumps(block.transactions)
+                    transactions_json=block.transactions_json,
+                    block_data=block_data,
+                    seal=block.seal or None
                 )
                 session.add(block_entry)
 
+            # Transaktionen als eigene Zeilen und Käufe in den Zuordnungstabellen,
+            # in derselben Datenbanktransaktion wie der Block
+            session.add_all(transaction_entries(block))
+            purchases = record_purchases(session, [block])
             session.commit()
         except Exception as e:
             session.rollback()
             raise e
         finally:
             session.close()
+        # Bisher gecachtes "kein Zugriff" gilt für die bestätigten Käufe nicht mehr
+        self.access_cache.discard(purchases)
+
+    def _replace_transaction_entries(self, blocks, start: int) -> None:
+        """
+        Schreibt die Zeilen der Tabelle transactions ab Block start neu und trägt die Käufe ein (Chain im Block-Log)
 
+        Args:
+            blocks: Blöcke ab Index start
+            start: Index des ersten neu geschriebenen Blocks
+        """
+        session = self.db_manager.get_session()
+        try:
+            session.query(TransactionEntry).filter(TransactionEntry.block_index >= start).delete()
+            for block in blocks:
+                session.add_all(transaction_entries(block))
+            purchases = record_purchases(session, blocks)
+            session.commit()
+            self.access_cache.discard(purchases)
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Speichern der Transaktionen ab Block {start}: {e}")
+        finally:
+            session.close()
@@ -0,0 +1,222 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from Blockchain.difficulty import expected_attempts
+
+# Zustände eines Mining-Jobs
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Anzahl abgeschlossener Jobs, deren Status abrufbar bleibt
+MAX_FINISHED_JOBS = 100
+
+
+@dataclass
+class MiningJob:
+    """Zustand eines Mining-Auftrags, wird vom Hintergrund-Thread aktualisiert"""
+    job_id: str
+    difficulty: Optional[float] = None  # None = Schwierigkeit per Retargeting
+    drain: bool = False
+    max_blocks: Optional[int] = None  # nur mit drain: höchstens so viele Blöcke
+    auto_difficulty: bool = False
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    attempts: int = 0  # getestete Nonces des aktuellen Blocks
+    total_attempts: int = 0  # getestete Nonces aller Blöcke des Jobs
+    elapsed: float = 0.0  # Suchzeit des aktuellen Blocks
+    blocks: List[Dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def expected_attempts(self) -> float:
+        """Erwartete Anzahl Versuche pro Block (16^difficulty)"""
+        return expected_attempts(max(self.difficulty or 0, 0))
+
+    @property
+    def hash_rate(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return self.attempts / self.elapsed
+
+    @property
+    def progress(self) -> float:
+        """Geschätzter Fortschritt des aktuellen Blocks (0.0 - 1.0)"""
+        if self.status == JOB_DONE:
+            return 1.0
+        if self.status != JOB_RUNNING:
+            return 0.0
+        # Schätzung: der Proof kann auch später gefunden werden, daher nie 100% vor dem Ende
+        return min(self.attempts / self.expected_attempts, 0.99)
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'difficulty': self.difficulty,
+            'auto_difficulty': self.auto_difficulty,
+            'drain': self.drain,
+            'max_blocks': self.max_blocks,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'progress': self.progress,
+            'attempts': self.attempts,
+            'total_attempts': self.total_attempts,
+            'expected_attempts': self.expected_attempts,
+            'hash_rate': self.hash_rate,
+            'blocks': list(self.blocks),
+            'block': self.blocks[-1] if self.blocks else None,
+            'error': self.error
+        }
+
+
+class MiningService:
+    """Führt Mining-Jobs auf einem Hintergrund-Thread aus
+
+    Die HTTP-Anfrage legt nur den Job an und bekommt sofort die Job-ID zurück,
+    der Status (Fortschritt, Versuche, Hashrate, Block) wird über get() abgefragt.
+    Jobs laufen nacheinander in der Reihenfolge, in der sie angelegt wurden.
+    """
+
+    def __init__(self, blockchain, max_finished_jobs: int = MAX_FINISHED_JOBS):
+        """
+        Args:
+            blockchain: Blockchain, auf der gemined wird
+            max_finished_jobs: Anzahl abgeschlossener Jobs, die aufbewahrt werden
+        """
+        self.blockchain = blockchain
+        self.max_finished_jobs = max_finished_jobs
+
+        self._jobs: "OrderedDict[str, MiningJob]" = OrderedDict()
+        self._queue: "queue.Queue[Optional[MiningJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, difficulty: float = None, drain: bool = False, max_blocks: int = None) -> MiningJob:
+        """Legt einen Mining-Job an
+
+        Args:
+            difficulty: Anzahl führender Nullen (None = Retargeting aus den letzten Blockzeiten)
+            drain: True = alle ausstehenden Transaktionen minen (mehrere Blöcke), sonst ein Block
+            max_blocks: mit drain höchstens so viele Blöcke (None = bis der Mempool leer ist)
+
+        Returns:
+            Der neue Job (Status queued)
+        """
+        job = MiningJob(job_id=uuid.uuid4().hex, difficulty=difficulty, drain=drain, max_blocks=max_blocks,
+                        auto_difficulty=difficulty is None)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._forget_finished_jobs()
+            self._ensure_worker()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Status eines Jobs als Dictionary (None, wenn unbekannt)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def jobs(self) -> List[Dict]:
+        """Status aller bekannten Jobs, älteste zuerst"""
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def wait(self, job_id: str, timeout: float = None) -> Optional[Dict]:
+        """Wartet, bis ein Job abgeschlossen ist (für Tests und Skripte)"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            status = self.get(job_id)
+            if status is None or status['status'] in (JOB_DONE, JOB_FAILED):
+                return status
+            if deadline is not None and time.time() >= deadline:
+                return status
+            time.sleep(0.01)
+
+    def shutdown(self) -> None:
+        """Beendet den Hintergrund-Thread nach dem laufenden Job"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="mining-service", daemon=True)
+            self._thread.start()
+
+    def _forget_finished_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in (JOB_DONE, JOB_FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._execute(job)
+
+    def _execute(self, job: MiningJob) -> None:
+        with self._lock:
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+
+        def progress(attempts, elapsed):
+            with self._lock:
+                job.attempts = attempts
+                job.elapsed = elapsed
+
+        try:
+            if len(self.blockchain.mempool) == 0:
+                raise ValueError("Keine ausstehenden Transaktionen")
+
+            max_blocks = job.max_blocks if job.drain else 1
+            while len(self.blockchain.mempool) > 0 and (max_blocks is None or len(job.blocks) < max_blocks):
+                with self._lock:
+                    job.attempts = 0
+                    job.elapsed = 0.0
+                    if job.auto_difficulty:
+                        job.difficulty = self.blockchain.next_difficulty()
+                block, mining_time = self.blockchain.mine_block(job.difficulty, progress)
+                # Gemined wird nur auf diesem Thread, die Werte gehören also zu diesem Block
+                result = self.blockchain.last_mining_result
+
+                with self._lock:
+                    job.attempts = result.attempts
+                    job.elapsed = result.time_taken
+                    job.total_attempts += result.attempts
+                    job.blocks.append({
+                        'block_index': block.index,
+                        'hash': block.hash,
+                        'proof': block.proof,
+                        'difficulty': block.difficulty,
+                        'transactions_mined': len(block.transactions),
+                        'mining_time': mining_time,
+                        'attempts': result.attempts,
+                        'hash_rate': result.hash_rate,
+                        'workers': result.workers
+                    })
+
+            with self._lock:
+                job.status = JOB_DONE
+                job.finished_at = time.time()
+
+        except Exception as e:
+            print(f"Fehler im Mining-Job {job.job_id}: {e}")
+            with self._lock:
+                job.status = JOB_FAILED
+                job.error = str(e)
+                job.finished_at = time.time()
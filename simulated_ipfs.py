@@ -4,7 +4,7 @@ import os
 import json
 import shutil
 import base64
-from typing import Dict, Any, Optional, Union, Tuple
+from typing import Dict, Any, List, Optional, Union, Tuple
 
 ###
 # Simulated IPFS-like storage system
@@ -54,6 +54,41 @@ class SimulatedIPFS:
 
         return cid
 
+    def add_many(self, items: List[Tuple[bytes, Optional[Dict[str, Any]]]], pin: bool = False) -> List[str]:
+
+        # Wie add für mehrere Inhalte, Metadaten und Pins werden nur einmal gelesen und geschrieben
+        cids = []
+        new_metadata = {}
+        for content, metadata in items:
+            cid = self._calculate_hash(content)
+            content_path = os.path.join(self.objects_dir, cid)
+            if not os.path.exists(content_path):
+                with open(content_path, 'wb') as f:
+                    f.write(content)
+            if metadata:
+                new_metadata[cid] = metadata
+            cids.append(cid)
+
+        if new_metadata:
+            with open(self.metadata_file, 'r') as f:
+                all_metadata = json.load(f)
+            all_metadata.update(new_metadata)
+            with open(self.metadata_file, 'w') as f:
+                json.dump(all_metadata, f)
+
+        if pin:
+            with open(self.pins_file, 'r') as f:
+                pins = json.load(f)
+            pinned = set(pins)
+            for cid in cids:
+                if cid not in pinned:
+                    pins.append(cid)
+                    pinned.add(cid)
+            with open(self.pins_file, 'w') as f:
+                json.dump(pins, f)
+
+        return cids
+
     def get(self, cid: str) -> Optional[bytes]:
 
         content_path = os.path.join(self.objects_dir, cid)